@@ -12,18 +12,34 @@ Goal:
 NOTE:
   - จุดเรียก engine ทั้งสาม (_call_local/_call_gg/_call_alter_polish)
     ตั้งใจให้เป็น hook ให้ CLS/Liam ผูกกับ client ที่มีอยู่แล้ว
+
+Async router (AsyncHybridRouter / hybrid_route_many):
+  - same routing rules as hybrid_route_text(), engine hooks run in threads
+  - hedged drafts: Local starts if GG has not answered within hedge_after_s
+    (never for sensitivity=high, which stays Local-first)
+  - content-hash LRU cache of drafts and polished outputs
+  - per-engine latency histograms → g/telemetry/hybrid_router_latency.jsonl
 """
 
 from __future__ import annotations
 
+import asyncio
+import bisect
+import hashlib
+import json
 import logging
 import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Any, Dict, Optional, Tuple
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
 
 import yaml
 
+from shared.ttl_cache import TTLCache
+
 try:
     from openai import OpenAI
 except Exception:  # pragma: no cover - optional dependency
@@ -329,6 +345,11 @@ def _provider_config(provider_name: str) -> Dict[str, Any]:
     return data
 
 
+# Clients are pooled per (base_url, api_key): each keeps its own HTTP connection pool
+_CLIENT_CACHE: Dict[Tuple[Optional[str], str], Any] = {}
+_CLIENT_LOCK = threading.Lock()
+
+
 def _build_openai_client(base_url: Optional[str] = None, api_key: Optional[str] = None) -> Optional[Any]:
     if OpenAI is None:
         LOGGER.warning("openai client not available (missing dependency); returning None")
@@ -336,11 +357,18 @@ def _build_openai_client(base_url: Optional[str] = None, api_key: Optional[str]
     if api_key is None:
         LOGGER.warning("openai api_key missing; returning None")
         return None
-    try:
-        return OpenAI(base_url=base_url, api_key=api_key) if base_url else OpenAI(api_key=api_key)
-    except Exception as exc:  # noqa: BLE001
-        LOGGER.warning("failed to init openai client: %s", exc)
-        return None
+    key = (base_url, api_key)
+    with _CLIENT_LOCK:
+        client = _CLIENT_CACHE.get(key)
+        if client is not None:
+            return client
+        try:
+            client = OpenAI(base_url=base_url, api_key=api_key) if base_url else OpenAI(api_key=api_key)
+        except Exception as exc:  # noqa: BLE001
+            LOGGER.warning("failed to init openai client: %s", exc)
+            return None
+        _CLIENT_CACHE[key] = client
+        return client
 
 
 def _extract_choice_content(response: Any) -> Optional[str]:
@@ -367,3 +395,331 @@ def _normalize_language(raw: Optional[str]) -> Optional[str]:
         # Otherwise use the first token (e.g., en-us -> en, zh-hans -> zh)
         return parts[0]
     return value
+
+
+# ---------------------------------------------------------------------------
+# Async router: hedged drafts, result cache, batch API, latency telemetry
+# ---------------------------------------------------------------------------
+
+LATENCY_BUCKETS_MS = (50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000)
+
+
+class LatencyHistogram:
+    """Fixed-bucket latency histogram (ms); last bucket counts everything slower."""
+
+    def __init__(self, buckets: Sequence[float] = LATENCY_BUCKETS_MS) -> None:
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.errors = 0
+        self.sum_ms = 0.0
+
+    def observe(self, elapsed_ms: float, ok: bool = True) -> None:
+        with self._lock:
+            self.counts[bisect.bisect_left(self.buckets, elapsed_ms)] += 1
+            self.count += 1
+            self.sum_ms += elapsed_ms
+            if not ok:
+                self.errors += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "buckets_ms": list(self.buckets),
+                "counts": list(self.counts),
+                "count": self.count,
+                "errors": self.errors,
+                "sum_ms": round(self.sum_ms, 3),
+            }
+
+
+def _cache_key(stage: str, text: str, context: Dict[str, Any]) -> str:
+    """
+    Content hash for a router stage: (text, sensitivity, mode, target language)
+    plus the fields that change the engine prompt (project_id, tone).
+    """
+    parts = [
+        stage,
+        text,
+        (context.get("sensitivity") or "normal").lower(),
+        (context.get("mode") or "draft").lower(),
+        _normalize_language(context.get("language") or context.get("target_language")) or "",
+        str(context.get("project_id") or ""),
+        str(context.get("tone") or ""),
+        "client" if context.get("client_facing") else "internal",
+    ]
+    return hashlib.sha256(json.dumps(parts, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+
+def _retrieve_exception(task: "asyncio.Future[Any]") -> None:
+    # Losing hedge tasks finish in the background; don't log "exception never retrieved"
+    if not task.cancelled():
+        task.exception()
+
+
+class AsyncHybridRouter:
+    """
+    Async version of hybrid_route_text() for concurrent callers.
+
+    Args:
+        hedge_after_s: Latency budget for the primary (GG) draft before the
+            Local backup is started; None disables hedging
+        cache_size / cache_ttl_s: Draft + polish cache bounds (0 disables)
+        max_workers: Threads for the blocking engine hooks
+    """
+
+    def __init__(
+        self,
+        *,
+        hedge_after_s: Optional[float] = 2.0,
+        cache_size: int = 512,
+        cache_ttl_s: float = 3600.0,
+        max_workers: int = 8,
+    ) -> None:
+        self.hedge_after_s = hedge_after_s
+        self.cache = TTLCache(cache_size, cache_ttl_s, name="hybrid-router-cache")
+        self.latency: Dict[str, LatencyHistogram] = {
+            engine: LatencyHistogram() for engine in (ENGINE_LOCAL, ENGINE_GG, ENGINE_ALTER)
+        }
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="hybrid-router")
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=False)
+
+    # -- engine calls -------------------------------------------------------
+    async def _timed(self, engine: str, fn: Callable[..., Any], *args: Any) -> Any:
+        loop = asyncio.get_running_loop()
+        start = time.perf_counter()
+        try:
+            result = await loop.run_in_executor(self._executor, lambda: fn(*args))
+        except Exception:
+            self.latency[engine].observe((time.perf_counter() - start) * 1000, ok=False)
+            raise
+        self.latency[engine].observe((time.perf_counter() - start) * 1000)
+        return result
+
+    def _engine(self, engine: str) -> Callable[[str, Dict[str, Any]], str]:
+        # Resolved at call time so the module-level hooks stay patchable
+        return _call_gg if engine == ENGINE_GG else _call_local
+
+    async def _hedged(
+        self, text: str, context: Dict[str, Any], primary: str, backup: str
+    ) -> Tuple[str, str, bool, Optional[str]]:
+        """
+        Run primary; start backup on primary failure or once hedge_after_s passes.
+
+        Returns (text, engine, hedged, primary_error). If both engines fail the
+        original text comes back from the backup engine, like the sync fallbacks.
+        """
+        first = asyncio.ensure_future(self._timed(primary, self._engine(primary), text, context))
+        done, _ = await asyncio.wait({first}, timeout=self.hedge_after_s)
+        if first in done and first.exception() is None:
+            return first.result(), primary, False, None
+
+        second = asyncio.ensure_future(self._timed(backup, self._engine(backup), text, context))
+        pending = {second} if first in done else {first, second}
+        primary_error = str(first.exception()) if first in done else None
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            # Prefer the primary when both finish in the same tick
+            for task in sorted(done, key=lambda t: t is not first):
+                if task.exception() is None:
+                    for loser in pending:
+                        loser.add_done_callback(_retrieve_exception)
+                    engine = primary if task is first else backup
+                    return task.result(), engine, True, primary_error
+                if task is first:
+                    primary_error = str(task.exception())
+        return text, backup, True, primary_error
+
+    async def _draft(
+        self, text: str, context: Dict[str, Any], primary: str, backup: str, hedge: bool
+    ) -> Tuple[str, str, bool, Optional[str], bool]:
+        """Cached draft: (text, engine, hedged, primary_error, cache_hit)."""
+        key = _cache_key(f"draft:{primary}", text, context)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached[0], cached[1], False, None, True
+
+        if hedge and self.hedge_after_s is not None:
+            draft, engine, hedged, error = await self._hedged(text, context, primary, backup)
+        else:
+            hedged = False
+            try:
+                draft, engine, error = await self._timed(primary, self._engine(primary), text, context), primary, None
+            except Exception as exc:  # noqa: BLE001
+                error = str(exc)
+                try:
+                    draft = await self._timed(backup, self._engine(backup), text, context)
+                except Exception:  # noqa: BLE001
+                    draft = text
+                engine = backup
+
+        # Hooks return the input unchanged when an engine is unavailable: don't pin that
+        if error is None and draft != text:
+            self.cache.put(key, (draft, engine))
+        return draft, engine, hedged, error, False
+
+    # -- routing ------------------------------------------------------------
+    async def route(self, text: str, context: Dict[str, Any]) -> Tuple[str, Dict[str, Any]]:
+        """Async hybrid_route_text(): same rules, same (text, meta) result shape."""
+        sensitivity = (context.get("sensitivity") or "normal").lower()
+        client_facing = bool(context.get("client_facing", False))
+        mode = (context.get("mode") or "draft").lower()
+        base_meta: Dict[str, Any] = {
+            "project_id": context.get("project_id"),
+            "source_agent": context.get("source_agent"),
+            "mode": mode,
+            "sensitivity": sensitivity,
+            "client_facing": client_facing,
+        }
+
+        # Rule 1: ultra-sensitive → Local only (GG only after a Local failure, no hedging)
+        if sensitivity == "high":
+            draft, engine, _, error, hit = await self._draft(text, context, ENGINE_LOCAL, ENGINE_GG, hedge=False)
+            return HybridResult(
+                text=draft,
+                engine_used=engine,
+                fallback=error is not None,
+                error=f"local_error: {error}" if error is not None else None,
+                meta={**base_meta, "cache_hit": hit},
+            ).as_tuple()
+
+        # Rule 2: internal draft/analysis → GG, hedged with Local
+        if not client_facing and mode in ("draft", "analysis"):
+            draft, engine, hedged, error, hit = await self._draft(text, context, ENGINE_GG, ENGINE_LOCAL, hedge=True)
+            return HybridResult(
+                text=draft,
+                engine_used=engine,
+                fallback=engine != ENGINE_GG,
+                error=f"gg_error: {error}" if error is not None else None,
+                meta={**base_meta, "hedged": hedged, "cache_hit": hit},
+            ).as_tuple()
+
+        # Rule 3: client-facing → hedged draft, then Alter polish (cached on the draft)
+        draft, draft_engine, hedged, _, hit = await self._draft(text, context, ENGINE_GG, ENGINE_LOCAL, hedge=True)
+        polish_key = _cache_key("polish", draft, context)
+        cached = self.cache.get(polish_key)
+        if cached is not None:
+            polished, alter_meta = cached
+            return HybridResult(
+                text=polished,
+                engine_used=ENGINE_ALTER,
+                alter_status=alter_meta.get("alter_status", "used"),
+                meta={**base_meta, "draft_engine": draft_engine, **alter_meta, "hedged": hedged, "cache_hit": True},
+            ).as_tuple()
+
+        try:
+            polished, alter_meta = await self._timed(ENGINE_ALTER, _call_alter_polish, draft, context)
+        except Exception as exc:  # noqa: BLE001
+            return HybridResult(
+                text=draft,
+                engine_used=draft_engine,
+                alter_status="error",
+                fallback=True,
+                error=f"alter_error: {exc}",
+                meta={**base_meta, "draft_engine": draft_engine, "hedged": hedged, "cache_hit": hit},
+            ).as_tuple()
+        if alter_meta.get("alter_status", "used") == "used":
+            self.cache.put(polish_key, (polished, dict(alter_meta)))
+        return HybridResult(
+            text=polished,
+            engine_used=ENGINE_ALTER,
+            alter_status=alter_meta.get("alter_status", "used"),
+            meta={**base_meta, "draft_engine": draft_engine, **alter_meta, "hedged": hedged, "cache_hit": False},
+        ).as_tuple()
+
+    async def route_many(
+        self,
+        items: Sequence[Tuple[str, Dict[str, Any]]],
+        *,
+        max_concurrency: int = 4,
+    ) -> List[Tuple[str, Dict[str, Any]]]:
+        """
+        Route many (text, context) pairs concurrently; results keep input order.
+
+        Identical requests inside one batch are routed once. Latency
+        histograms are written to telemetry after the batch.
+        """
+        semaphore = asyncio.Semaphore(max(1, max_concurrency))
+        shared: Dict[str, "asyncio.Future[Tuple[str, Dict[str, Any]]]"] = {}
+
+        async def _one(text: str, context: Dict[str, Any]) -> Tuple[str, Dict[str, Any]]:
+            async with semaphore:
+                return await self.route(text, context)
+
+        futures = []
+        for text, context in items:
+            key = _cache_key("request", text, context)
+            if key not in shared:
+                shared[key] = asyncio.ensure_future(_one(text, context))
+            futures.append(shared[key])
+        results = await asyncio.gather(*futures)
+        self.emit_latency_telemetry()
+        return [(text, dict(meta)) for text, meta in results]
+
+    # -- telemetry ----------------------------------------------------------
+    def latency_snapshot(self) -> Dict[str, Dict[str, Any]]:
+        return {engine: hist.snapshot() for engine, hist in self.latency.items()}
+
+    def emit_latency_telemetry(self, log_path: Optional[Path] = None) -> None:
+        """Append per-engine latency histograms to g/telemetry (best-effort)."""
+        try:
+            from g.tools.lac_telemetry import build_event, log_event
+
+            if log_path is None:
+                base_dir_env = os.getenv("LAC_BASE_DIR")
+                base_dir = Path(base_dir_env).resolve() if base_dir_env else Path.cwd().resolve()
+                log_path = base_dir / "g" / "telemetry" / "hybrid_router_latency.jsonl"
+            event = build_event(
+                "HYBRID_ROUTER_LATENCY",
+                lane="hybrid_router",
+                status="ok",
+                extra={
+                    "engines": self.latency_snapshot(),
+                    "cache": {"hits": self.cache.hits, "misses": self.cache.misses},
+                },
+            )
+            log_event(event, log_path=log_path)
+        except Exception as exc:  # noqa: BLE001
+            LOGGER.warning("failed to emit hybrid router latency telemetry: %s", exc)
+
+
+_ASYNC_ROUTER: Optional[AsyncHybridRouter] = None
+_ASYNC_ROUTER_LOCK = threading.Lock()
+
+
+def get_async_router() -> AsyncHybridRouter:
+    """Process-wide AsyncHybridRouter (shared cache, histograms and thread pool)."""
+    global _ASYNC_ROUTER
+    with _ASYNC_ROUTER_LOCK:
+        if _ASYNC_ROUTER is None:
+            _ASYNC_ROUTER = AsyncHybridRouter()
+        return _ASYNC_ROUTER
+
+
+async def hybrid_route_text_async(text: str, context: Dict[str, Any]) -> Tuple[str, Dict[str, Any]]:
+    return await get_async_router().route(text, context)
+
+
+def _run_sync(factory: Callable[[], Awaitable[Any]]) -> Any:
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(factory())
+    # Called from inside an event loop: run on a helper thread with its own loop
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        return pool.submit(lambda: asyncio.run(factory())).result()
+
+
+def hybrid_route_many(
+    items: Sequence[Tuple[str, Dict[str, Any]]],
+    max_concurrency: int = 4,
+) -> List[Tuple[str, Dict[str, Any]]]:
+    """Sync batch API: route (text, context) pairs concurrently, in input order."""
+    router = get_async_router()
+    return _run_sync(lambda: router.route_many(items, max_concurrency=max_concurrency))
@@ -21,11 +21,13 @@ Status: Implementation (Phase 3.3)
 import os
 import json
 import yaml
+import zlib
+import time
 import hashlib
 import tempfile
 import shutil
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple, Any
+from typing import Dict, Iterable, List, Optional, Tuple, Any, Union
 from dataclasses import dataclass, asdict
 from datetime import datetime
 from enum import Enum
@@ -55,7 +57,7 @@ except ImportError:
     def resolve_world(trigger: str, context=None) -> str:
         return "BACKGROUND"
     
-    def check_write_allowed(path, actor, operation="write", content=None, context=None):
+    def check_write_allowed(path, actor, operation="write", content=None, context=None, compute_checksum=True):
         return type('obj', (object,), {
             'allowed': True,
             'zone': resolve_zone(path),
@@ -64,8 +66,11 @@ except ImportError:
         })()
     
     def compute_file_checksum(path: str) -> str:
+        hasher = hashlib.sha256()
         with open(path, 'rb') as f:
-            return hashlib.sha256(f.read()).hexdigest()
+            for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                hasher.update(chunk)
+        return hasher.hexdigest()
 
 
 # ============================================================================
@@ -259,14 +264,310 @@ def validate_work_order(wo: WorkOrder) -> Tuple[bool, List[str]]:
     return (is_valid, errors)
 
 
+# ============================================================================
+# PRE-IMAGE JOURNAL (backup_restore)
+# ============================================================================
+
+JOURNAL_CHUNK_SIZE = 1024 * 1024
+JOURNAL_COMPRESS_LEVEL = 3
+# Manifests older than this are pruned, along with objects nothing references
+JOURNAL_RETENTION_DAYS = float(os.environ.get("CLC_JOURNAL_RETENTION_DAYS", "7"))
+# Objects younger than this are never pruned (a capture may not be in a manifest yet)
+JOURNAL_GC_GRACE_SECONDS = 3600
+
+
+def _journal_root() -> Path:
+    luka_root = Path(os.environ.get("LUKA_ROOT", os.environ.get("LUKA_SOT", Path.home() / "02luka")))
+    return luka_root / "g" / "rollback" / "clc"
+
+
+class PreImageJournal:
+    """
+    Content of every file a Work Order touches, captured before SIP writes.
+
+    Layout under g/rollback/clc/ (relative to LUKA_ROOT):
+    - objects/<sha[:2]>/<sha>.z — zlib-compressed content, stored once per
+      SHA256 and shared across WOs
+    - wo/<wo_id>.jsonl — one {path, sha256, mode} line per captured path
+      (sha256 null = file did not exist)
+
+    The first capture of a path wins, also across re-runs of the same WO
+    (the manifest is only ever appended to), so restore() brings back the
+    state from before the WO's first run without git. Capture reads each
+    file once, hashing and compressing in the same chunked pass. Only WOs
+    with rollback_strategy backup_restore are journaled; see
+    prune_preimage_journals() for retention.
+    """
+
+    def __init__(self, wo_id: str, root: Optional[Path] = None):
+        if not wo_id or "/" in wo_id or wo_id in (".", ".."):
+            raise ValueError(f"Invalid WO id for pre-image journal: {wo_id!r}")
+        self.wo_id = wo_id
+        self.root = Path(root) if root is not None else _journal_root()
+        self.objects_dir = self.root / "objects"
+        self.manifest_path = self.root / "wo" / f"{wo_id}.jsonl"
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        if self.manifest_path.exists():
+            with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    if line.strip():
+                        record = json.loads(line)
+                        self.entries.setdefault(record["path"], record)
+
+    @classmethod
+    def load(cls, wo_id: str, root: Optional[Path] = None) -> Optional["PreImageJournal"]:
+        """Existing journal for a WO, or None if nothing was captured."""
+        journal = cls(wo_id, root)
+        return journal if journal.manifest_path.exists() else None
+
+    def discard(self) -> None:
+        """Drop the manifest (objects go at the next prune)."""
+        try:
+            self.manifest_path.unlink()
+        except FileNotFoundError:
+            pass
+        self.entries.clear()
+
+    def _object_path(self, digest: str) -> Path:
+        return self.objects_dir / digest[:2] / f"{digest}.z"
+
+    def capture(self, path: str) -> Optional[str]:
+        """
+        Record the current content of path (first call per path only).
+
+        Returns the file's current SHA256, or None if it does not exist.
+        """
+        path = str(path)
+        if path in self.entries:
+            # Already journaled; the WO may have changed it since
+            return compute_file_checksum(path) if os.path.isfile(path) else None
+
+        digest, mode = None, None
+        if os.path.isfile(path):
+            mode = os.stat(path).st_mode & 0o7777
+            digest = self._store(path)
+        record = {"path": path, "sha256": digest, "mode": mode}
+        self.manifest_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.manifest_path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(record) + "\n")
+        self.entries[path] = record
+        return digest
+
+    def _store(self, path: str) -> str:
+        self.objects_dir.mkdir(parents=True, exist_ok=True)
+        hasher = hashlib.sha256()
+        compressor = zlib.compressobj(JOURNAL_COMPRESS_LEVEL)
+        temp_fd, temp_path = tempfile.mkstemp(suffix='.tmp', prefix='.preimage.', dir=str(self.objects_dir))
+        try:
+            with open(path, 'rb') as src, os.fdopen(temp_fd, 'wb') as dst:
+                for chunk in iter(lambda: src.read(JOURNAL_CHUNK_SIZE), b''):
+                    hasher.update(chunk)
+                    dst.write(compressor.compress(chunk))
+                dst.write(compressor.flush())
+            digest = hasher.hexdigest()
+            object_path = self._object_path(digest)
+            if object_path.exists():
+                os.unlink(temp_path)
+            else:
+                object_path.parent.mkdir(exist_ok=True)
+                os.replace(temp_path, object_path)
+            return digest
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.unlink(temp_path)
+            raise
+
+    def _restore_file(self, path: str, digest: str, mode: Optional[int]) -> None:
+        target = Path(path)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        hasher = hashlib.sha256()
+        decompressor = zlib.decompressobj()
+        temp_fd, temp_path = tempfile.mkstemp(suffix='.tmp', prefix=f'.clc_restore_{target.name}.', dir=str(target.parent))
+        try:
+            with open(self._object_path(digest), 'rb') as src, os.fdopen(temp_fd, 'wb') as dst:
+                for chunk in iter(lambda: src.read(JOURNAL_CHUNK_SIZE), b''):
+                    data = decompressor.decompress(chunk)
+                    hasher.update(data)
+                    dst.write(data)
+                data = decompressor.flush()
+                hasher.update(data)
+                dst.write(data)
+            if hasher.hexdigest() != digest:
+                raise ValueError(f"pre-image object is corrupt: {digest}")
+            if mode is not None:
+                os.chmod(temp_path, mode)
+            os.replace(temp_path, path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.unlink(temp_path)
+            raise
+
+    def restore(self) -> Tuple[List[str], List[str]]:
+        """
+        Put every journaled path back to its pre-image (files that did not
+        exist are removed). Returns (restored_paths, errors).
+        """
+        restored, errors = [], []
+        for path, record in self.entries.items():
+            try:
+                if record["sha256"] is None:
+                    if os.path.lexists(path):
+                        os.unlink(path)
+                else:
+                    self._restore_file(path, record["sha256"], record.get("mode"))
+                restored.append(path)
+            except Exception as e:
+                errors.append(f"Restore failed for {path}: {e}")
+        return (restored, errors)
+
+
+def prune_preimage_journals(
+    root: Optional[Path] = None,
+    retention_days: Optional[float] = None,
+    now: Optional[float] = None
+) -> Tuple[int, int]:
+    """
+    Delete manifests older than retention_days, then objects (and stale
+    temp files) that no remaining manifest references.
+
+    Returns (manifests_removed, objects_removed).
+    """
+    root = Path(root) if root is not None else _journal_root()
+    retention_days = JOURNAL_RETENTION_DAYS if retention_days is None else retention_days
+    now = time.time() if now is None else now
+    manifests_removed = objects_removed = 0
+
+    referenced = set()
+    for manifest in sorted((root / "wo").glob("*.jsonl")):
+        try:
+            if now - manifest.stat().st_mtime > retention_days * 86400:
+                manifest.unlink()
+                manifests_removed += 1
+                continue
+            with open(manifest, 'r', encoding='utf-8') as f:
+                for line in f:
+                    if line.strip():
+                        digest = json.loads(line).get("sha256")
+                        if digest:
+                            referenced.add(digest)
+        except (OSError, ValueError):
+            # Unreadable manifest: keep it and everything it might reference
+            return (manifests_removed, objects_removed)
+
+    objects_dir = root / "objects"
+    for path in list(objects_dir.rglob("*")) if objects_dir.is_dir() else []:
+        if not path.is_file():
+            continue
+        try:
+            if now - path.stat().st_mtime < JOURNAL_GC_GRACE_SECONDS:
+                continue
+            if path.name.endswith('.tmp') or path.name[:-len('.z')] not in referenced:
+                path.unlink()
+                objects_removed += 1
+        except OSError:
+            continue
+    return (manifests_removed, objects_removed)
+
+
 # ============================================================================
 # SIP ENGINE (Safe Idempotent Patch)
 # ============================================================================
 
+SIP_CHUNK_SIZE = 1024 * 1024
+
+
+def _fsync_dir(directory: str) -> None:
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+class SIPWriter:
+    """
+    Streaming SIP writes for one Work Order.
+
+    Content (a str, or an iterable of str chunks for large generated files)
+    is encoded, hashed and written to the temp file SIP_CHUNK_SIZE at a
+    time, so checksum_after needs no re-read and memory stays bounded.
+    The temp file is os.replace()d into place. With fsync, file data is
+    synced per file and each touched directory once, in sync().
+    """
+
+    def __init__(self, fsync: bool = True):
+        self.fsync = fsync
+        self.written: Dict[str, Tuple[str, int, int]] = {}  # path -> (sha256, inode, size)
+        self._dirs: Dict[str, None] = {}
+
+    def write(self, path: Path, content: Union[str, Iterable[str]]) -> Tuple[str, str]:
+        """Write content to path via a temp file; returns (checksum_after, temp_path)."""
+        if isinstance(content, str):
+            pieces = (content[i:i + SIP_CHUNK_SIZE] for i in range(0, len(content), SIP_CHUNK_SIZE))
+        else:
+            pieces = content
+        hasher = hashlib.sha256()
+        temp_fd, temp_path = tempfile.mkstemp(
+            suffix='.tmp',
+            prefix=f'.clc_sip_{path.name}.',
+            dir=str(path.parent)
+        )
+        try:
+            with os.fdopen(temp_fd, 'wb') as f:
+                for piece in pieces:
+                    data = piece.encode('utf-8')
+                    hasher.update(data)
+                    f.write(data)
+                if self.fsync:
+                    f.flush()
+                    os.fsync(f.fileno())
+            os.replace(temp_path, path)
+        except BaseException:
+            try:
+                os.unlink(temp_path)
+            except OSError:
+                pass
+            raise
+        checksum = hasher.hexdigest()
+        st = os.stat(path)
+        self.written[str(path)] = (checksum, st.st_ino, st.st_size)
+        self._dirs[str(path.parent)] = None
+        return (checksum, temp_path)
+
+    def verify(self, path: str, checksum: str) -> Optional[str]:
+        """
+        Checksum of path now. Files this writer produced are matched by
+        inode and size instead of being re-read.
+        """
+        record = self.written.get(str(path))
+        if record and record[0] == checksum:
+            try:
+                st = os.stat(path)
+            except OSError:
+                return None
+            if (st.st_ino, st.st_size) == record[1:]:
+                return checksum
+        return compute_file_checksum(str(path))
+
+    def sync(self) -> None:
+        """fsync each directory written to since the last sync, once."""
+        if self.fsync:
+            for directory in self._dirs:
+                _fsync_dir(directory)
+        self._dirs.clear()
+
+
 def apply_sip_single_file(
     file_path: str,
-    new_content: str,
-    operation: str = "modify"
+    new_content: Union[str, Iterable[str]],
+    operation: str = "modify",
+    journal: Optional[PreImageJournal] = None,
+    writer: Optional[SIPWriter] = None
 ) -> Tuple[bool, Optional[str], Optional[str], Optional[str]]:
     """
     Apply SIP (Safe Idempotent Patch) for a single file.
@@ -275,16 +576,19 @@ def apply_sip_single_file(
     1. Read current state (if exists)
     2. Compute checksum before
     3. Create temp file
-    4. Write full new content to temp
-    5. Validate temp file
-    6. Atomic move (mv temp target)
-    7. Post-write verification
-    8. Log checksums
+    4. Write full new content to temp, hashing as it is written
+    5. Atomic move (os.replace temp target)
+    6. Directory fsync (per WO when a shared writer is passed)
+    7. Log checksums
     
     Args:
         file_path: Target file path
-        new_content: New file content
+        new_content: New file content (str or iterable of str chunks)
         operation: Operation type (add/modify/delete)
+        journal: Pre-image journal; when given, the before-checksum comes
+            from the same read that journals the old content
+        writer: Shared SIPWriter for a multi-file WO; the caller calls
+            writer.sync() once after all writes
     
     Returns:
         (success, checksum_before, checksum_after, temp_file_path)
@@ -299,45 +603,31 @@ def apply_sip_single_file(
     
     # Step 1: Read current state (if exists)
     checksum_before = None
-    if path.exists() and operation != "add":
+    if journal is not None:
+        captured = journal.capture(str(path))
+        if operation != "add":
+            checksum_before = captured
+    elif path.exists() and operation != "add":
         checksum_before = compute_file_checksum(str(path))
     
-    # Step 2: Create temp file
-    temp_fd, temp_path = tempfile.mkstemp(
-        suffix='.tmp',
-        prefix=f'.clc_sip_{path.name}.',
-        dir=str(path.parent)
-    )
-    
     try:
-        # Step 3: Write full new content to temp
-        with os.fdopen(temp_fd, 'w', encoding='utf-8') as f:
-            f.write(new_content)
-        
-        # Step 4: Validate temp file (basic checks)
-        # TODO: Add syntax validation for JSON/YAML/etc.
-        temp_checksum = compute_file_checksum(temp_path)
-        
-        # Step 5: Atomic move
         if operation == "delete":
             # For delete, remove file
             if path.exists():
                 path.unlink()
-            os.unlink(temp_path)
-            checksum_after = None
-        else:
-            # Atomic move
-            shutil.move(temp_path, str(path))
-            checksum_after = compute_file_checksum(str(path))
+            return (True, checksum_before, None, None)
+        
+        # Steps 2-5: stream to temp, hash, atomic replace
+        own_writer = writer is None
+        if own_writer:
+            writer = SIPWriter()
+        checksum_after, temp_path = writer.write(path, new_content)
+        if own_writer:
+            writer.sync()
         
         return (True, checksum_before, checksum_after, temp_path)
     
     except Exception as e:
-        # Cleanup on failure
-        try:
-            os.unlink(temp_path)
-        except:
-            pass
         raise Exception(f"SIP execution failed: {e}")
 
 
@@ -347,7 +637,9 @@ def apply_sip_single_file(
 
 def process_file_operation(
     op: Dict[str, Any],
-    wo: WorkOrder
+    wo: WorkOrder,
+    journal: Optional[PreImageJournal] = None,
+    writer: Optional[SIPWriter] = None
 ) -> Tuple[bool, FileOperation, List[str]]:
     """
     Process a single file operation from Work Order.
@@ -355,6 +647,8 @@ def process_file_operation(
     Args:
         op: Operation dictionary
         wo: Work Order context
+        journal: Pre-image journal for backup_restore (optional)
+        writer: Shared SIPWriter for the WO (optional)
     
     Returns:
         (success, file_operation, errors)
@@ -386,7 +680,8 @@ def process_file_operation(
         actor='CLC',
         operation='write',
         content=op.get('content'),
-        context=context
+        context=context,
+        compute_checksum=False
     )
     
     if not sandbox_result.allowed:
@@ -398,7 +693,10 @@ def process_file_operation(
         if file_op.operation == 'delete':
             # Delete operation
             if Path(file_op.path).exists():
-                checksum_before = compute_file_checksum(file_op.path)
+                if journal is not None:
+                    checksum_before = journal.capture(file_op.path)
+                else:
+                    checksum_before = compute_file_checksum(file_op.path)
                 Path(file_op.path).unlink()
                 file_op.checksum_before = checksum_before
                 file_op.checksum_after = None
@@ -416,7 +714,9 @@ def process_file_operation(
             success, checksum_before, checksum_after, temp_file = apply_sip_single_file(
                 file_path=file_op.path,
                 new_content=content,
-                operation=file_op.operation
+                operation=file_op.operation,
+                journal=journal,
+                writer=writer
             )
             
             if not success:
@@ -440,9 +740,14 @@ def process_file_operation(
             file_op.source_path = source
             
             if Path(source).exists():
-                checksum_before = compute_file_checksum(source)
+                if journal is not None:
+                    checksum_before = journal.capture(source)
+                    journal.capture(file_op.path)
+                else:
+                    checksum_before = compute_file_checksum(source)
                 shutil.move(source, file_op.path)
-                checksum_after = compute_file_checksum(file_op.path)
+                # A move keeps the content
+                checksum_after = checksum_before
                 file_op.checksum_before = checksum_before
                 file_op.checksum_after = checksum_after
             else:
@@ -469,8 +774,8 @@ def apply_rollback(
     Apply rollback strategy for a Work Order.
     
     Rollback strategies (AI_OP_001_v5 Section 4.3):
-    - git_revert: Use git to revert changes
-    - backup_restore: Restore from backup
+    - git_revert: Use git to revert changes (single batched git restore)
+    - backup_restore: Restore pre-images from the WO's PreImageJournal
     - manual_script: Execute rollback script
     - wo_rollback: Create new WO for rollback
     
@@ -490,28 +795,41 @@ def apply_rollback(
     strategy = wo.rollback_strategy.lower()
     
     if strategy == "git_revert":
-        # Git revert
+        # Git revert: one `git restore` for all paths (pathspecs on stdin)
+        import subprocess
+        luka_root = Path(os.environ.get("LUKA_ROOT", os.environ.get("LUKA_SOT", Path.home() / "02luka")))
         try:
-            import subprocess
-            luka_root = Path(os.environ.get("LUKA_ROOT", os.environ.get("LUKA_SOT", Path.home() / "02luka")))
-            # Get commit hash before changes (if available)
-            # For now, use git restore
-            for path in execution_result.files_modified:
-                # Resolve relative path if needed
-                if not Path(path).is_absolute():
-                    rel_path = str(Path(path).relative_to(luka_root))
-                else:
-                    rel_path = str(Path(path).relative_to(luka_root))
-                subprocess.run(['git', '-C', str(luka_root), 'restore', rel_path], check=True)
+            rel_paths = [
+                str(Path(path).relative_to(luka_root)) if Path(path).is_absolute() else path
+                for path in execution_result.files_modified
+            ]
+            if rel_paths:
+                subprocess.run(
+                    ['git', '--literal-pathspecs', '-C', str(luka_root), 'restore',
+                     '--pathspec-from-file=-', '--pathspec-file-nul'],
+                    input="\0".join(rel_paths).encode('utf-8'),
+                    capture_output=True,
+                    check=True
+                )
+        except subprocess.CalledProcessError as e:
+            stderr = e.stderr.decode('utf-8', 'replace').strip() if e.stderr else ""
+            errors.append(f"Git revert failed: {stderr or e}")
+            return (False, errors)
         except Exception as e:
             errors.append(f"Git revert failed: {e}")
             return (False, errors)
     
     elif strategy == "backup_restore":
-        # Restore from backup
-        # TODO: Implement backup restore logic
-        errors.append("Backup restore not yet implemented")
-        return (False, errors)
+        # Restore pre-images journaled before the SIP writes
+        journal = PreImageJournal.load(wo.wo_id)
+        if journal is None:
+            errors.append(f"No pre-image journal for {wo.wo_id}")
+            return (False, errors)
+        _, restore_errors = journal.restore()
+        if restore_errors:
+            errors.extend(restore_errors)
+            return (False, errors)
+        journal.discard()
     
     elif strategy == "manual_script":
         # Execute rollback script
@@ -592,11 +910,18 @@ def execute_work_order(wo_path: str) -> ExecutionResult:
         
         # Step 4: Process file operations
         file_operations = []
+        writer = SIPWriter()
         
         if wo.operations:
+            # Journal pre-images so backup_restore can undo the WO
+            journal = None
+            if (wo.rollback_strategy or "").lower() == "backup_restore":
+                prune_preimage_journals()
+                journal = PreImageJournal(wo.wo_id)
+            
             # Use detailed operations from WO
             for op in wo.operations:
-                success, file_op, errors = process_file_operation(op, wo)
+                success, file_op, errors = process_file_operation(op, wo, journal=journal, writer=writer)
                 if not success:
                     execution_result.errors.extend(errors)
                     # Continue processing other files
@@ -609,6 +934,9 @@ def execute_work_order(wo_path: str) -> ExecutionResult:
                         file_op.checksum_before,
                         file_op.checksum_after
                     )
+            
+            # One fsync per touched directory
+            writer.sync()
         else:
             # Fallback: Create operations from target_paths
             # This is a simplified mode - full WO should have operations
@@ -622,7 +950,7 @@ def execute_work_order(wo_path: str) -> ExecutionResult:
                     execution_result.errors.append(f"File missing after write: {file_op.path}")
                     continue
                 
-                current_checksum = compute_file_checksum(file_op.path)
+                current_checksum = writer.verify(file_op.path, file_op.checksum_after)
                 if current_checksum != file_op.checksum_after:
                     execution_result.errors.append(
                         f"Checksum mismatch for {file_op.path}: "
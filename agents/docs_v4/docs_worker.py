@@ -5,19 +5,19 @@ Docs V4 Worker with direct-write capability for documentation files and catalog
 from __future__ import annotations
 
 import datetime as _dt
-import json
 import os
 import subprocess
 from pathlib import Path
 from typing import Any, Dict, List, Optional, Tuple
 
-from agents.ai_manager.hybrid_router import hybrid_route_text
+from agents.ai_manager.hybrid_router import hybrid_route_many, hybrid_route_text
 from agents.alter.helpers import polish_and_translate_if_needed, polish_if_needed
 from agents.docs_v4.cataloger import build_catalog, write_catalog
 from agents.docs_v4.listener import collect_events
 from agents.docs_v4.scanner import scan_paths
 from agents.docs_v4.summarizer import build_summary, summarize_conversations, summarize_events
-from shared.policy import apply_patch, check_write_allowed
+from g.tools.jsonl_tail import read_jsonl
+from shared.policy import apply_patch, apply_patches, check_write_allowed
 
 
 class DocsWorkerV4:
@@ -25,16 +25,47 @@ class DocsWorkerV4:
         """Direct write via shared policy."""
         return apply_patch(file_path, content)
 
-    def write_doc_file(self, file_path: str, content: str) -> dict:
-        """Write a documentation file using policy enforcement."""
+    def self_write_many(self, writes: List[Tuple[str, str]], stop_on_error: bool = True) -> List[dict]:
+        """Direct batch write via shared policy (one fsync per directory)."""
+        return apply_patches(writes, stop_on_error=stop_on_error)
+
+    @staticmethod
+    def _check_doc_content(file_path: str, content: Optional[str]) -> Optional[dict]:
         if content is None or content == "":
             return {
                 "status": "failed",
                 "reason": "MISSING_OR_EMPTY_CONTENT",
                 "file": file_path,
             }
+        return None
+
+    def write_doc_file(self, file_path: str, content: str) -> dict:
+        """Write a documentation file using policy enforcement."""
+        invalid = self._check_doc_content(file_path, content)
+        if invalid is not None:
+            return invalid
         return self.self_write(file_path, content)
 
+    def write_doc_files(self, docs: List[Tuple[str, str]]) -> List[dict]:
+        """
+        Write documentation files as one batch via self_write_many().
+
+        Same checks as write_doc_file(); stops at the first invalid, blocked
+        or failed file (later files are neither written nor reported).
+        """
+        writes: List[Tuple[str, str]] = []
+        invalid = None
+        for file_path, content in docs:
+            invalid = self._check_doc_content(file_path, content)
+            if invalid is not None:
+                break
+            writes.append((file_path, content))
+
+        results = self.self_write_many(writes, stop_on_error=True)
+        if invalid is not None and all(r["status"] == "success" for r in results):
+            results.append(invalid)
+        return results
+
     def plan_docs(self, task: Dict) -> Dict:
         return task.get("plan", task)
 
@@ -55,12 +86,13 @@ class DocsWorkerV4:
         plan = self.plan_docs(task)
         patches = self.generate_doc_patches(plan)
 
-        results = []
-        for patch in patches:
-            content = patch.get("content", "")
-            content = self._polish_content_if_needed(content, task, patch)
-            result = self.write_doc_file(patch["file"], content)
-            results.append(result)
+        results = self.write_doc_files(
+            [
+                (patch["file"], self._polish_content_if_needed(patch.get("content", ""), task, patch))
+                for patch in patches
+            ]
+        )
+        for result in results:
             if result["status"] == "blocked":
                 return {
                     "status": "failed",
@@ -385,24 +417,7 @@ class DocsWorkerV4:
         }
 
     def _load_jsonl(self, path: Path, limit: int) -> List[Dict[str, Any]]:
-        if not path.exists():
-            return []
-        rows: List[Dict[str, Any]] = []
-        try:
-            with path.open("r", encoding="utf-8") as f:
-                for i, line in enumerate(f):
-                    if i >= limit:
-                        break
-                    line = line.strip()
-                    if not line:
-                        continue
-                    try:
-                        rows.append(json.loads(line))
-                    except json.JSONDecodeError:
-                        continue
-        except OSError:
-            return []
-        return rows
+        return read_jsonl(path, limit=limit)
 
     # ------------------------------------------------------------------
     #  New: PD17 client-facing report flow using Hybrid Router + Alter + save.sh
@@ -419,11 +434,18 @@ class DocsWorkerV4:
         This method intentionally:
           - ไม่แตะ MLS โดยตรง (ให้ save gateway จัดการ)
           - ไม่เรียก Alter ตรง ๆ (ผ่าน Hybrid Router เท่านั้น)
+
+        If task["sections"] is given (strings or {"title", "summary"/"body"}),
+        each section is routed concurrently via hybrid_route_many() and the
+        polished sections are joined in order.
         """
 
         project_id = task.get("project_id") or "PD17"
         topic = task.get("topic") or "client_report"
 
+        if task.get("sections"):
+            return self._generate_sectioned_report(task, project_id, topic)
+
         # 1) สร้าง draft ตาม logic เดิมของ DocsWorker
         #    NOTE: ให้ CLS เติม implementation ที่เหมาะสม:
         draft_text = self._build_initial_draft(task)
@@ -462,6 +484,57 @@ class DocsWorkerV4:
             "content": final_text,
         }
 
+    def _generate_sectioned_report(self, task: Dict[str, Any], project_id: str, topic: str) -> Dict[str, Any]:
+        """Batch variant: polish every section concurrently, then save one document."""
+        router_context: Dict[str, Any] = {
+            "project_id": project_id,
+            "client_facing": True,
+            "sensitivity": task.get("sensitivity", "normal"),
+            "mode": task.get("mode", "polish"),
+            "language": task.get("language", "th-en"),
+            "source_agent": "docs_worker_v4",
+        }
+        drafts = [self._section_draft(section) for section in task["sections"]]
+        routed = hybrid_route_many(
+            [(draft, router_context) for draft in drafts],
+            max_concurrency=int(task.get("max_concurrency", 4)),
+        )
+
+        title = task.get("title")
+        parts = [f"# {title}"] if title else []
+        parts.extend(text for text, _ in routed)
+        final_text = "\n\n".join(parts)
+
+        self._save_via_gateway(
+            content=final_text,
+            agent_id="DOCS_V4",
+            source="docs_worker_v4",
+            project_id=project_id,
+            topic=topic,
+        )
+
+        metas = [meta for _, meta in routed]
+        engines = {meta.get("engine_used") for meta in metas}
+        statuses = {meta.get("alter_status") for meta in metas}
+        return {
+            "ok": True,
+            "project_id": project_id,
+            "topic": topic,
+            "engine_used": engines.pop() if len(engines) == 1 else "MIXED",
+            "alter_status": statuses.pop() if len(statuses) == 1 else "mixed",
+            "fallback": any(meta.get("fallback", False) for meta in metas),
+            "router_meta": {"sections": metas},
+            "content": final_text,
+        }
+
+    @staticmethod
+    def _section_draft(section: Any) -> str:
+        if isinstance(section, dict):
+            heading = section.get("title")
+            body = section.get("summary") or section.get("body") or ""
+            return f"## {heading}\n\n{body}" if heading else str(body)
+        return str(section)
+
     # ------------------------------------------------------------------
     #  Internal helpers (ให้ CLS เติมตัวจริง / ปรับ path ตาม 02luka)
     # ------------------------------------------------------------------
@@ -1,11 +1,15 @@
 import os
 import json
+import re
 import yaml
 import logging
 import sys
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional, Set, Tuple
 
 # Add project root to sys.path
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../../")))
@@ -19,6 +23,19 @@ LAC_BASE_DIR = Path(os.environ.get("LAC_BASE_DIR", os.path.expanduser("~/02luka"
 CONFIG_FILE = LAC_BASE_DIR / "g/config/lac_lanes.yaml"
 LOG_FILE = LAC_BASE_DIR / "logs/lac_daemon.log"
 
+DEFAULT_LANE = "dev_lac_manager"
+# Global worker cap across all lanes; per-lane caps come from `max_concurrency`
+MAX_WORKERS = int(os.environ.get("LAC_MAX_WORKERS", "8"))
+DEFAULT_LANE_CONCURRENCY = 1
+# How often (seconds) the lanes config mtime is checked for hot reload
+CONFIG_RELOAD_INTERVAL = 2.0
+# Inbox files younger than this are skipped (avoid partial writes)
+MIN_FILE_AGE = 2.0
+HEARTBEAT_INTERVAL = 10.0
+TASK_SUFFIXES = (".yaml", ".yml", ".json")
+
+_CONDITION_KEYWORD = re.compile(r"intent\s+contains\s+'([^']*)'")
+
 # Setup Logging
 LOG_FILE.parent.mkdir(parents=True, exist_ok=True)
 logging.basicConfig(
@@ -28,47 +45,142 @@ logging.basicConfig(
     datefmt="%Y-%m-%dT%H:%M:%S%z"
 )
 
+class CompiledRoutingRules:
+    """
+    Routing rules compiled once into a single keyword automaton.
+
+    Every keyword of rule i becomes an alternative of group ``r{i}`` inside one
+    zero-width lookahead, ordered by rule index. At each intent offset the regex
+    engine reports the lowest-numbered rule matching there, so the minimum over
+    all offsets is exactly the first rule a sequential scan would pick.
+    """
+
+    def __init__(self, rules: List[Dict[str, Any]]):
+        self.targets: List[str] = []
+        alternatives: List[str] = []
+        for index, rule in enumerate(rules or []):
+            self.targets.append(rule.get("target"))
+            keywords = self.parse_condition(rule.get("if", ""))
+            if not keywords:
+                logging.warning(f"Routing rule {rule.get('name', index)!r} has no usable condition; skipped")
+                continue
+            alternatives.append(f"(?P<r{index}>" + "|".join(re.escape(k) for k in keywords) + ")")
+        self._pattern = re.compile("(?=(?:" + "|".join(alternatives) + "))") if alternatives else None
+
+    @staticmethod
+    def parse_condition(condition: str) -> List[str]:
+        """Extract keywords from "intent contains 'x' or intent contains 'y'"."""
+        keywords: List[str] = []
+        for part in str(condition).split(" or "):
+            match = _CONDITION_KEYWORD.search(part)
+            if match:
+                keywords.append(match.group(1))
+        return keywords
+
+    def match(self, intent: str) -> Optional[str]:
+        """Target of the first rule with a keyword in intent, or None."""
+        if self._pattern is None:
+            return None
+        best: Optional[int] = None
+        for hit in self._pattern.finditer(intent):
+            index = int(hit.lastgroup[1:])
+            if best is None or index < best:
+                best = index
+                if best == 0:
+                    break
+        return None if best is None else self.targets[best]
+
+
+@dataclass
+class _QueuedTask:
+    """An inbox file parsed ahead of claiming, so its lane is known."""
+
+    path: Path
+    task: Optional[Dict[str, Any]]
+    lane: str
+    files: Set[str] = field(default_factory=set)
+    exclusive: bool = False
+    error: Optional[str] = None
+
+
 class LACManager:
-    def __init__(self):
+    def __init__(self, max_workers: Optional[int] = None):
+        self._config_mtime: Optional[float] = None
+        self._config_checked_at = 0.0
         self.config = self._load_config()
-        self.lanes = self.config.get("lanes", {})
-        self.rules = self.config.get("routing_rules", [])
+        self._apply_config(self.config)
+        self.max_workers = max(1, max_workers or MAX_WORKERS)
+
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._local = threading.local()
+        # task file name -> queued entry, for everything claimed but not finished
+        self._in_flight: Dict[str, _QueuedTask] = {}
+        self._lane_running: Dict[str, int] = {}
+        # (name, mtime) -> parsed entry; inbox files are parsed once
+        self._peek_cache: Dict[Tuple[str, float], _QueuedTask] = {}
 
     def _load_config(self) -> Dict[str, Any]:
         if not CONFIG_FILE.exists():
             raise FileNotFoundError(f"LAC Lanes config not found: {CONFIG_FILE}")
+        self._config_mtime = CONFIG_FILE.stat().st_mtime
         with open(CONFIG_FILE, "r") as f:
-            return yaml.safe_load(f)
+            return yaml.safe_load(f) or {}
+
+    def _apply_config(self, config: Dict[str, Any]) -> None:
+        self.lanes = config.get("lanes", {}) or {}
+        self.rules = config.get("routing_rules", []) or []
+        self._router = CompiledRoutingRules(self.rules)
+
+    def reload_config_if_changed(self, force: bool = False) -> bool:
+        """Hot-reload the lanes config when its mtime changes; keeps the old config on errors."""
+        now = time.monotonic()
+        if not force and now - self._config_checked_at < CONFIG_RELOAD_INTERVAL:
+            return False
+        self._config_checked_at = now
+        try:
+            mtime = CONFIG_FILE.stat().st_mtime
+        except OSError:
+            return False
+        if not force and mtime == self._config_mtime:
+            return False
+        try:
+            config = self._load_config()
+            self._apply_config(config)
+        except Exception as e:
+            logging.error(f"Failed to reload LAC lanes config, keeping previous: {e}")
+            self._config_mtime = mtime
+            return False
+        self.config = config
+        # Queued tasks were routed with the old rules
+        self._peek_cache.clear()
+        logging.info(f"Reloaded LAC lanes config ({len(self.rules)} routing rules)")
+        return True
+
+    def lane_concurrency(self, lane: str) -> int:
+        """Per-lane cap from `max_concurrency` in the lanes config."""
+        lane_cfg = self.lanes.get(lane) or {}
+        try:
+            return max(1, int(lane_cfg.get("max_concurrency", DEFAULT_LANE_CONCURRENCY)))
+        except (TypeError, ValueError):
+            return DEFAULT_LANE_CONCURRENCY
 
     def route_request(self, intent: str) -> str:
         """Determines the target lane based on intent."""
-        intent_lower = intent.lower()
-        
-        for rule in self.rules:
-            # Simple eval for "if" condition (very basic for now)
-            # "intent contains 'refactor'" -> "refactor" in intent_lower
-            condition = rule.get("if", "")
-            target = rule.get("target")
-            
-            if self._evaluate_condition(condition, intent_lower):
-                return target
-        
-        return "dev_lac_manager" # Default to self if no match
-
-    def _evaluate_condition(self, condition: str, intent: str) -> bool:
-        # Basic parser for "intent contains 'x' or intent contains 'y'"
-        # This is a placeholder for a real NLP classifier or richer logic
-        parts = condition.split(" or ")
-        for part in parts:
-            if "intent contains" in part:
-                keyword = part.split("'")[1]
-                if keyword in intent:
-                    return True
-        return False
-
-    def process_task(self, task: Dict[str, Any]):
+        target = self._router.match(intent.lower())
+        return target if target is not None else DEFAULT_LANE  # Default to self if no match
+
+    def _ai_manager(self) -> AIManager:
+        """One AIManager per worker thread, reused across tasks."""
+        manager = getattr(self._local, "ai_manager", None)
+        if manager is None:
+            manager = AIManager()
+            self._local.ai_manager = manager
+        return manager
+
+    def process_task(self, task: Dict[str, Any], lane: Optional[str] = None):
         intent = task.get("intent", "")
-        lane = self.route_request(intent)
+        lane = lane or self.route_request(intent)
         self._maybe_polish_report(task)
         
         logging.info(f"Routing task '{intent}' to lane: {lane}")
@@ -80,7 +192,7 @@ class LACManager:
         # v4.2 Implementation: Execute via AI Manager if it's a dev lane
         if "dev" in lane:
             logging.info(f"Executing task via AI Manager in lane {lane}...")
-            ai_manager = AIManager()
+            ai_manager = self._ai_manager()
             dry_run = bool(task.get("dry_run"))
             
             # Construct requirement content as Fenced YAML for reliable parsing
@@ -136,7 +248,15 @@ dry_run: {str(dry_run).lower()}
         task["report_content"] = polished
         task["content"] = polished
 
-    def _append_metrics(self, wo_id: str, status: str, duration_ms: int, queue_depth: int) -> None:
+    def _append_metrics(
+        self,
+        wo_id: str,
+        status: str,
+        duration_ms: int,
+        queue_depth: int,
+        lane: Optional[str] = None,
+        in_flight: Optional[int] = None,
+    ) -> None:
         metrics_path = LAC_BASE_DIR / "g/telemetry/lac_metrics.jsonl"
         metrics_path.parent.mkdir(parents=True, exist_ok=True)
         payload = {
@@ -146,32 +266,188 @@ dry_run: {str(dry_run).lower()}
             "duration_ms": duration_ms,
             "queue_depth": queue_depth,
         }
+        if lane is not None:
+            payload["lane"] = lane
+        if in_flight is not None:
+            payload["in_flight"] = in_flight
         try:
-            with open(metrics_path, "a", encoding="utf-8") as handle:
-                handle.write(json.dumps(payload) + "\n")
+            with self._lock:
+                with open(metrics_path, "a", encoding="utf-8") as handle:
+                    handle.write(json.dumps(payload) + "\n")
         except Exception as e:
             logging.warning(f"Failed to append LAC metrics: {e}")
         
+    @staticmethod
+    def _bridge_dirs() -> Dict[str, Path]:
+        # Use lowercase canonical paths
+        return {
+            name: LAC_BASE_DIR / f"bridge/{name}/lac"
+            for name in ("inbox", "processing", "processed", "quarantine")
+        }
+
+    @staticmethod
+    def _load_task(path: Path) -> Any:
+        # Load based on extension
+        with open(path, "r") as f:
+            if path.suffix in [".yaml", ".yml"]:
+                return yaml.safe_load(f)
+            return json.load(f)  # .json
+
+    def _peek(self, path: Path, mtime: float) -> _QueuedTask:
+        """Parse an inbox file (once per mtime) to learn its lane and footprint."""
+        key = (path.name, mtime)
+        cached = self._peek_cache.get(key)
+        if cached is not None:
+            return cached
+        try:
+            task = self._load_task(path)
+            if not isinstance(task, dict):
+                raise ValueError(f"work order must be a mapping, got {type(task).__name__}")
+        except Exception as e:
+            entry = _QueuedTask(path=path, task=None, lane=DEFAULT_LANE, error=str(e))
+        else:
+            lane = self.route_request(str(task.get("intent", "") or ""))
+            files = task.get("files") or []
+            entry = _QueuedTask(
+                path=path,
+                task=task,
+                lane=lane,
+                files={str(f) for f in files} if isinstance(files, (list, tuple)) else {str(files)},
+                # The dry-run guard patches process-wide builtins, so it cannot overlap other work
+                exclusive="dev" in lane and dry_run_context(task, lane=lane).enabled,
+            )
+        self._peek_cache[key] = entry
+        return entry
+
+    def _pending_tasks(self, inbox: Path) -> List[_QueuedTask]:
+        """Settled inbox work orders, oldest first (FIFO) - YAML and JSON."""
+        now = time.time()
+        found: List[Tuple[float, Path]] = []
+        for path in inbox.iterdir():
+            if path.suffix not in TASK_SUFFIXES:
+                continue
+            try:
+                mtime = path.stat().st_mtime
+            except OSError:
+                continue
+            # Skip recently written files (avoid partial writes)
+            if now - mtime > MIN_FILE_AGE:
+                found.append((mtime, path))
+        found.sort(key=lambda item: item[0])
+        live = {(p.name, m) for m, p in found}
+        for key in [k for k in self._peek_cache if k not in live]:
+            del self._peek_cache[key]
+        return [self._peek(path, mtime) for mtime, path in found]
+
+    def dispatch_ready(self, executor: ThreadPoolExecutor, dirs: Optional[Dict[str, Path]] = None) -> int:
+        """
+        Claim and submit every queued task that fits the current limits.
+
+        A task is held back while its lane is at `max_concurrency`, while an
+        in-flight task declares an overlapping file, or - for dry-run dev tasks -
+        until nothing else is running. Returns the number of tasks submitted.
+        """
+        dirs = dirs or self._bridge_dirs()
+        with self._lock:
+            if any(t.exclusive for t in self._in_flight.values()):
+                return 0
+
+        queued = self._pending_tasks(dirs["inbox"])
+        dispatched = 0
+        for entry in queued:
+            with self._lock:
+                in_flight = len(self._in_flight)
+                if in_flight >= self.max_workers:
+                    break
+                if entry.exclusive and in_flight:
+                    # Barrier: later tasks must not starve the exclusive one
+                    break
+                if entry.error is None and not entry.exclusive:
+                    if self._lane_running.get(entry.lane, 0) >= self.lane_concurrency(entry.lane):
+                        continue
+                    if any(entry.files & t.files for t in self._in_flight.values()):
+                        continue
+
+            proc_path = dirs["processing"] / entry.path.name
+            try:
+                # Move to processing
+                entry.path.rename(proc_path)
+            except FileNotFoundError:
+                continue
+            queue_depth = len(queued) - dispatched
+            logging.info(f"[PICKUP] {entry.path.name} lane={entry.lane} queue_depth={queue_depth}")
+            with self._lock:
+                self._in_flight[entry.path.name] = entry
+                self._lane_running[entry.lane] = self._lane_running.get(entry.lane, 0) + 1
+            executor.submit(self._run_task, entry, proc_path, dirs, queue_depth, in_flight + 1)
+            dispatched += 1
+            if entry.exclusive:
+                break
+        return dispatched
+
+    def _run_task(
+        self,
+        entry: _QueuedTask,
+        proc_path: Path,
+        dirs: Dict[str, Path],
+        queue_depth: int,
+        in_flight: int,
+    ) -> None:
+        """Worker body: process one claimed task, then file it as processed or quarantined."""
+        name = entry.path.name
+        wo_id = entry.path.stem
+        task_wo_id = None
+        status = "completed"
+        started_at = time.time()
+        try:
+            if entry.error is not None:
+                raise ValueError(f"Unreadable work order: {entry.error}")
+            task = entry.task
+            task_wo_id = task.get("wo_id") or task.get("id") or wo_id
+            logging.info(f"[PROCESS] {task.get('objective', 'NO OBJECTIVE')}")
+            self.process_task(task, lane=entry.lane)
+
+            # Move to processed
+            proc_path.rename(dirs["processed"] / name)
+            logging.info(f"[COMPLETE] {name}")
+        except Exception as e:
+            status = "error"
+            logging.error(f"[ERROR] {name}: {e}", exc_info=True)
+            # Quarantine to prevent infinite retry
+            error_file = dirs["quarantine"] / f"ERROR_{name}"
+            try:
+                if proc_path.exists():
+                    proc_path.rename(error_file)
+                logging.warning(f"[QUARANTINE] -> {error_file.name}")
+            except OSError as move_err:
+                logging.error(f"[QUARANTINE] failed for {name}: {move_err}")
+        finally:
+            duration_ms = int((time.time() - started_at) * 1000)
+            self._append_metrics(
+                task_wo_id or wo_id, status, duration_ms, queue_depth, lane=entry.lane, in_flight=in_flight
+            )
+            with self._lock:
+                self._in_flight.pop(name, None)
+                self._lane_running[entry.lane] = max(0, self._lane_running.get(entry.lane, 1) - 1)
+            self._wake.set()
+
     def run(self):
-        """Main daemon loop - watches inbox continuously."""
+        """Main daemon loop - schedules inbox work orders onto a worker pool."""
         import signal
 
-        # Use lowercase canonical paths
-        inbox = LAC_BASE_DIR / "bridge/inbox/lac"
-        processing = LAC_BASE_DIR / "bridge/processing/lac"
-        processed = LAC_BASE_DIR / "bridge/processed/lac"
-        quarantine = LAC_BASE_DIR / "bridge/quarantine/lac"
+        dirs = self._bridge_dirs()
 
         # Ensure directories exist
-        for d in [inbox, processing, processed, quarantine]:
+        for d in dirs.values():
             d.mkdir(parents=True, exist_ok=True)
 
         logging.info("=" * 60)
         logging.info("LAC Manager Daemon started")
         logging.info(f"Agent ID: codex")
         logging.info(f"Base directory: {LAC_BASE_DIR}")
-        logging.info(f"Watching: {inbox}")
-        logging.info(f"Heartbeat: 10 seconds")
+        logging.info(f"Watching: {dirs['inbox']}")
+        logging.info(f"Workers: {self.max_workers}")
+        logging.info(f"Heartbeat: {HEARTBEAT_INTERVAL:g} seconds")
         logging.info("=" * 60)
 
         # Signal handling for graceful shutdown
@@ -181,85 +457,34 @@ dry_run: {str(dry_run).lower()}
             nonlocal shutdown_requested
             logging.info(f"Received signal {signum}, shutting down...")
             shutdown_requested = True
+            self._wake.set()
 
         signal.signal(signal.SIGTERM, signal_handler)
         signal.signal(signal.SIGINT, signal_handler)
 
-        # Main daemon loop
-        while not shutdown_requested:
-            try:
-                # Find oldest work order (FIFO) - accept both YAML and JSON
-                tasks = sorted(
-                    list(inbox.glob("*.yaml")) +
-                    list(inbox.glob("*.yml")) +
-                    list(inbox.glob("*.json")),
-                    key=lambda p: p.stat().st_mtime
-                )
-
-                # Skip recently written files (avoid partial writes)
-                now = time.time()
-                tasks = [t for t in tasks if (now - t.stat().st_mtime) > 2]
-
-                if not tasks:
-                    # Heartbeat - no work
-                    time.sleep(10)
-                    continue
-
-                task_file = tasks[0]
-                queue_depth_at_pickup = len(tasks)
-                logging.info(f"[PICKUP] {task_file.name}")
-                wo_id = task_file.stem
-                started_at = time.time()
-                task_wo_id = None
-
-                proc_path = None  # Initialize to avoid UnboundLocalError
+        executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="lac-worker")
+        try:
+            # Main daemon loop
+            while not shutdown_requested:
                 try:
-                    # Move to processing
-                    proc_path = processing / task_file.name
-                    task_file.rename(proc_path)
-
-                    # Load based on extension
-                    with open(proc_path, "r") as f:
-                        if proc_path.suffix in ['.yaml', '.yml']:
-                            task = yaml.safe_load(f)
-                        else:  # .json
-                            task = json.load(f)
-
-                    task_wo_id = task.get("wo_id") or task.get("id") or wo_id
-                    logging.info(f"[PROCESS] {task.get('objective', 'NO OBJECTIVE')}")
-                    self.process_task(task)
-
-                    # Move to processed
-                    proc_path.rename(processed / task_file.name)
-                    logging.info(f"[COMPLETE] {task_file.name}")
-                    duration_ms = int((time.time() - started_at) * 1000)
-                    self._append_metrics(task_wo_id, "completed", duration_ms, queue_depth_at_pickup)
-
+                    self.reload_config_if_changed()
+                    self._wake.clear()
+                    if self.dispatch_ready(executor, dirs):
+                        continue
+                    with self._lock:
+                        busy = bool(self._in_flight)
+                    # Idle: heartbeat. Busy: re-check as soon as a worker frees a slot.
+                    self._wake.wait(1.0 if busy else HEARTBEAT_INTERVAL)
+
+                except KeyboardInterrupt:
+                    logging.info("Keyboard interrupt, shutting down...")
+                    break
                 except Exception as e:
-                    logging.error(f"[ERROR] {task_file.name}: {e}", exc_info=True)
-                    # Quarantine to prevent infinite retry
-                    error_name = f"ERROR_{task_file.name if task_file.exists() else proc_path.name}"
-                    error_file = quarantine / error_name
-
-                    # Move from wherever it is now
-                    if proc_path and proc_path.exists():
-                        proc_path.rename(error_file)
-                    elif task_file.exists():
-                        task_file.rename(error_file)
-
-                    logging.warning(f"[QUARANTINE] -> {error_file.name}")
-                    duration_ms = int((time.time() - started_at) * 1000)
-                    self._append_metrics(task_wo_id or wo_id, "error", duration_ms, queue_depth_at_pickup)
-
-                # Small delay between files
-                time.sleep(1)
-
-            except KeyboardInterrupt:
-                logging.info("Keyboard interrupt, shutting down...")
-                break
-            except Exception as e:
-                logging.error(f"[DAEMON ERROR] Unexpected: {e}", exc_info=True)
-                time.sleep(5)  # Back off on errors
+                    logging.error(f"[DAEMON ERROR] Unexpected: {e}", exc_info=True)
+                    time.sleep(5)  # Back off on errors
+        finally:
+            logging.info("Waiting for in-flight tasks to finish...")
+            executor.shutdown(wait=True)
 
         logging.info("LAC Manager Daemon shutdown complete")
 
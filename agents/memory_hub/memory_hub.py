@@ -2,12 +2,16 @@
 """
 Unified Memory Hub - Redis-based real-time memory synchronization
 """
+import atexit
 import json
 import redis
 from pathlib import Path
 from datetime import datetime
 import os
+import re
 import sys
+import copy
+import threading
 import time
 from collections import deque
 from typing import List, Dict, Any, Optional
@@ -20,10 +24,82 @@ def get_ledger_path(agent_name: str) -> Path:
     base_dir = Path(os.environ.get('LUKA_SOT', str(Path.home() / '02luka')))
     return base_dir / 'g' / 'memory' / 'ledger' / f'{agent_name}_memory.jsonl'
 
+# Learnings kept per agent in the in-process tail cache
+TAIL_CACHE_SIZE = 50
+# Block size for reverse ledger reads
+_REVERSE_BLOCK_SIZE = 64 * 1024
+# Ledger rotation buckets (strftime formats); enable via LUKA_MEMORY_ROTATE
+ROTATION_BUCKETS = {'day': '%Y%m%d', 'month': '%Y%m'}
+
+_tail_cache: Dict[str, Dict[str, Any]] = {}
+_tail_lock = threading.Lock()
+
+
+def _ledger_sig(path: Path) -> Optional[tuple]:
+    """Identity of the ledger file (inode + size + mtime) for cache validation."""
+    try:
+        st = path.stat()
+    except FileNotFoundError:
+        return None
+    return (st.st_dev, st.st_ino, st.st_size, st.st_mtime_ns)
+
+
+def iter_lines_reversed(path: Path, block_size: int = _REVERSE_BLOCK_SIZE):
+    """Yield the raw lines of a file from last to first, reading fixed-size blocks from the end."""
+    with open(path, 'rb') as f:
+        f.seek(0, os.SEEK_END)
+        pos = f.tell()
+        remainder = b''
+        while pos > 0:
+            read_size = min(block_size, pos)
+            pos -= read_size
+            f.seek(pos)
+            chunk = f.read(read_size) + remainder
+            lines = chunk.split(b'\n')
+            # First piece may be a partial line continued in the previous block
+            remainder = lines.pop(0)
+            for line in reversed(lines):
+                if line.strip():
+                    yield line
+        if remainder.strip():
+            yield remainder
+
+
+def _ledger_segments(agent_name: str) -> List[Path]:
+    """Rotated ledger segments for an agent, newest first."""
+    ledger_path = get_ledger_path(agent_name)
+    if not ledger_path.parent.is_dir():
+        return []
+    pattern = f'{agent_name}_memory.*.jsonl'
+    return sorted(ledger_path.parent.glob(pattern), reverse=True)
+
+
+def _read_recent_learnings(agent_name: str, limit: int) -> tuple:
+    """Return (learnings oldest-first, complete) reading only the ledger tail(s)."""
+    learnings: List[str] = []
+    for path in [get_ledger_path(agent_name)] + _ledger_segments(agent_name):
+        if not path.exists():
+            continue
+        for line in iter_lines_reversed(path):
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if isinstance(entry, dict) and 'learning' in entry:
+                learnings.append(entry['learning'])
+                if len(learnings) >= limit:
+                    return list(reversed(learnings)), False
+    return list(reversed(learnings)), True
+
+
 def load_memory(agent_name: str, limit: int = 5) -> List[str]:
     """
     Load recent learnings for an agent.
     
+    Reads the ledger backwards in blocks, so cost depends on ``limit`` and not
+    on ledger size. Results are kept in a per-agent tail cache that
+    ``save_memory()`` appends to directly.
+
     Args:
         agent_name: Name of the agent (e.g., 'liam', 'gmx')
         limit: Number of recent learnings to return
@@ -31,36 +107,83 @@ def load_memory(agent_name: str, limit: int = 5) -> List[str]:
     Returns:
         List of learning strings
     """
+    if limit <= 0:
+        return []
     ledger_path = get_ledger_path(agent_name)
-    if not ledger_path.exists():
+    sig = _ledger_sig(ledger_path)
+    if sig is None and not _ledger_segments(agent_name):
+        with _tail_lock:
+            _tail_cache.pop(agent_name, None)
         return []
-        
-    learnings = []
+
+    with _tail_lock:
+        cached = _tail_cache.get(agent_name)
+        if cached and cached['sig'] == sig and (cached['complete'] or limit <= len(cached['learnings'])):
+            return list(cached['learnings'])[-limit:]
+
     try:
-        # Efficiently read last N lines
-        with open(ledger_path, 'rb') as f:
-            # Simple approach for now: read all lines (files are small)
-            # Optimization: use deque with maxlen for large files
-            lines = f.readlines()
-            
-        # Parse from end
-        count = 0
-        for line in reversed(lines):
-            if count >= limit:
-                break
-            try:
-                entry = json.loads(line)
-                if 'learning' in entry:
-                    learnings.append(entry['learning'])
-                    count += 1
-            except json.JSONDecodeError:
-                continue
-                
-        return list(reversed(learnings))
+        want = max(limit, TAIL_CACHE_SIZE)
+        learnings, complete = _read_recent_learnings(agent_name, want)
+        with _tail_lock:
+            _tail_cache[agent_name] = {
+                'sig': sig,
+                'learnings': deque(learnings, maxlen=want),
+                'complete': complete,
+            }
+        return learnings[-limit:]
     except Exception as e:
         print(f"Error loading memory for {agent_name}: {e}", file=sys.stderr)
         return []
 
+
+def _ledger_bucket(path: Path, fmt: str) -> Optional[str]:
+    """Time bucket of a ledger, taken from the timestamp of its first entry."""
+    try:
+        with open(path, 'rb') as f:
+            first = json.loads(f.readline())
+        return datetime.fromisoformat(first['timestamp']).strftime(fmt)
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+
+
+def rotate_ledger(agent_name: str, bucket: str = 'month', now: Optional[datetime] = None) -> Optional[Path]:
+    """
+    Move the active ledger to a time-bucketed segment once its bucket has passed.
+
+    The active ``{agent}_memory.jsonl`` becomes ``{agent}_memory.<bucket>.jsonl``
+    (e.g. ``liam_memory.202511.jsonl``) when its first entry is from an earlier
+    bucket than ``now``. ``load_memory()`` transparently reads into segments.
+
+    Returns:
+        Path of the new segment, or None if no rotation was needed
+    """
+    fmt = ROTATION_BUCKETS[bucket]
+    ledger_path = get_ledger_path(agent_name)
+    if not ledger_path.exists():
+        return None
+    ledger_bucket = _ledger_bucket(ledger_path, fmt)
+    current = (now or datetime.now()).strftime(fmt)
+    if ledger_bucket is None or ledger_bucket >= current:
+        return None
+    segment = ledger_path.with_name(f'{agent_name}_memory.{ledger_bucket}.jsonl')
+    if segment.exists():
+        # Same bucket rotated before (e.g. clock skew): append instead of clobbering
+        with open(segment, 'ab') as dst, open(ledger_path, 'rb') as src:
+            while True:
+                chunk = src.read(_REVERSE_BLOCK_SIZE)
+                if not chunk:
+                    break
+                dst.write(chunk)
+        ledger_path.unlink()
+    else:
+        os.replace(ledger_path, segment)
+    with _tail_lock:
+        cached = _tail_cache.get(agent_name)
+        if cached:
+            cached['sig'] = None
+    return segment
+
+
 def save_memory(agent_name: str, outcome: str, learning: str) -> bool:
     """
     Save a new learning to the agent's ledger.
@@ -78,16 +201,37 @@ def save_memory(agent_name: str, outcome: str, learning: str) -> bool:
         
     ledger_path = get_ledger_path(agent_name)
     ledger_path.parent.mkdir(parents=True, exist_ok=True)
+
+    rotation = os.environ.get('LUKA_MEMORY_ROTATE')
+    if rotation in ROTATION_BUCKETS:
+        rotate_ledger(agent_name, rotation)
     
     entry = {
         "timestamp": datetime.now().isoformat(),
         "outcome": outcome,
         "learning": learning.strip()
     }
+    line = (json.dumps(entry, ensure_ascii=False) + "\n").encode('utf-8')
     
     try:
-        with open(ledger_path, 'a', encoding='utf-8') as f:
-            f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        with _tail_lock:
+            sig_before = _ledger_sig(ledger_path)
+            with open(ledger_path, 'ab') as f:
+                f.write(line)
+            sig_after = _ledger_sig(ledger_path)
+
+            # Keep the tail cache current when nobody else touched the ledger
+            cached = _tail_cache.get(agent_name)
+            if cached:
+                expected_size = (sig_before[2] if sig_before else 0) + len(line)
+                if cached['sig'] == sig_before and sig_after and sig_after[2] == expected_size:
+                    tail = cached['learnings']
+                    if len(tail) == tail.maxlen:
+                        cached['complete'] = False
+                    tail.append(entry['learning'])
+                    cached['sig'] = sig_after
+                else:
+                    _tail_cache.pop(agent_name, None)
         return True
     except Exception as e:
         print(f"Error saving memory for {agent_name}: {e}", file=sys.stderr)
@@ -96,14 +240,176 @@ def save_memory(agent_name: str, outcome: str, learning: str) -> bool:
 # --- End V4 Memory API ---
 
 
+def _write_json_atomic(path: Path, data: Any) -> None:
+    """Write JSON via temp file + os.replace so readers never see a torn file."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    tmp.write_text(json.dumps(data, indent=2))
+    os.replace(tmp, path)
+
+
+class ShardedContextStore:
+    """
+    Per-agent context shards with dirty tracking and a debounced flusher.
+
+    Layout under shared_memory/:
+      agents/<agent>.json  - one shard per agent (only dirty shards are rewritten)
+      context.json         - aggregated export for shell tools, rewritten at most
+                             once per flush window
+
+    The in-memory view is the source for reads; disk is only touched by flush().
+    """
+
+    def __init__(self, root: Path, flush_delay: float = 1.0):
+        self.root = root
+        self.shard_dir = root / 'agents'
+        self.export_file = root / 'context.json'
+        self.flush_delay = flush_delay
+        self._view: Dict[str, Any] = {"agents": {}, "current_work": {}}
+        self._dirty: set = set()
+        self._export_dirty = False
+        self._export_sig: Optional[tuple] = None
+        self._lock = threading.RLock()
+        self._timer: Optional[threading.Timer] = None
+        self.load()
+        # Short-lived callers must not lose a pending debounced flush
+        atexit.register(self.close)
+
+    @staticmethod
+    def _shard_name(agent_name: str) -> str:
+        return re.sub(r'[^A-Za-z0-9_.-]', '_', agent_name) + '.json'
+
+    def _file_sig(self, path: Path) -> Optional[tuple]:
+        try:
+            st = path.stat()
+        except FileNotFoundError:
+            return None
+        return (st.st_mtime_ns, st.st_size)
+
+    def _read_export(self) -> Dict[str, Any]:
+        if self.export_file.exists():
+            try:
+                data = json.loads(self.export_file.read_text())
+                if isinstance(data, dict):
+                    return data
+            except json.JSONDecodeError:
+                pass
+        return {"agents": {}, "current_work": {}}
+
+    def load(self):
+        """
+        Load the view from context.json, then overlay per-agent shards.
+
+        A shard older than context.json loses to the agent's entry there (it
+        was edited by another tool); that shard is rewritten to match.
+        """
+        with self._lock:
+            view = self._read_export()
+            view.setdefault('agents', {})
+            view.setdefault('current_work', {})
+            export_sig = self._file_sig(self.export_file)
+            if self.shard_dir.is_dir():
+                for shard in self.shard_dir.glob('*.json'):
+                    try:
+                        payload = json.loads(shard.read_text())
+                        agent, data = payload['agent'], payload['data']
+                    except (json.JSONDecodeError, KeyError, TypeError):
+                        continue
+                    exported = view['agents'].get(agent)
+                    shard_sig = self._file_sig(shard)
+                    if (isinstance(exported, dict) and export_sig and shard_sig
+                            and export_sig[0] > shard_sig[0]):
+                        if exported != data:
+                            _write_json_atomic(shard, {'agent': agent, 'data': exported})
+                        continue
+                    view['agents'][agent] = data
+            self._view = view
+            self._export_sig = export_sig
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return a copy of the current unified view."""
+        with self._lock:
+            return copy.deepcopy(self._view)
+
+    def update_agent(self, agent_name: str, fields: Dict[str, Any]):
+        """Merge fields into an agent entry and schedule a debounced flush."""
+        with self._lock:
+            current = self._view['agents'].get(agent_name)
+            if current is not None and all(current.get(k, object()) == v for k, v in fields.items()):
+                return
+            self._view['agents'].setdefault(agent_name, {}).update(fields)
+            self._dirty.add(agent_name)
+            self._export_dirty = True
+            self._schedule_flush()
+
+    def _schedule_flush(self):
+        if self.flush_delay <= 0:
+            self.flush()
+            return
+        if self._timer is None:
+            self._timer = threading.Timer(self.flush_delay, self.flush)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def _merge_external_export(self):
+        """Pick up agents written to context.json by other tools (e.g. memory_sync.sh)."""
+        if self._file_sig(self.export_file) == self._export_sig:
+            return
+        external = self._read_export()
+        changed = []
+        for agent, data in external.get('agents', {}).items():
+            if agent in self._dirty or not isinstance(data, dict):
+                continue
+            if self._view['agents'].get(agent) != data:
+                self._view['agents'][agent] = data
+                changed.append(agent)
+        # Rewrite those shards too, or load() would bring the old data back
+        self._dirty.update(changed)
+        for key, value in external.items():
+            if key not in ('agents', 'last_update'):
+                self._view[key] = value
+
+    def flush(self):
+        """Write dirty shards and the aggregated export (no-op when clean)."""
+        with self._lock:
+            self._timer = None
+            if not self._export_dirty:
+                return
+            self._merge_external_export()
+            for agent in self._dirty:
+                data = self._view['agents'].get(agent)
+                if data is not None:
+                    _write_json_atomic(
+                        self.shard_dir / self._shard_name(agent),
+                        {'agent': agent, 'data': data}
+                    )
+            self._dirty.clear()
+            self._view['last_update'] = datetime.now().isoformat()
+            _write_json_atomic(self.export_file, self._view)
+            self._export_sig = self._file_sig(self.export_file)
+            self._export_dirty = False
+
+    def close(self):
+        """Cancel any pending timer, flush synchronously and drop the exit hook."""
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+        self.flush()
+        atexit.unregister(self.close)
+
+
 class UnifiedMemoryHub:
-    def __init__(self):
+    REDIS_SCAN_COUNT = 500
+
+    def __init__(self, redis_client=None, flush_delay: float = 1.0):
         self.sot_path = Path(os.environ.get('LUKA_SOT', str(Path.home() / '02luka')))
         self.memory_file = self.sot_path / 'shared_memory' / 'context.json'
         self.bridge_dir = self.sot_path / 'bridge' / 'memory'
-        
+        self.store = ShardedContextStore(self.memory_file.parent, flush_delay=flush_delay)
+
         # Redis connection
-        self.redis_client = redis.Redis(
+        self.redis_client = redis_client or redis.Redis(
             host=os.environ.get('REDIS_HOST', 'localhost'),
             port=int(os.environ.get('REDIS_PORT', 6379)),
             password=os.environ.get('REDIS_PASSWORD', 'changeme-02luka'),
@@ -122,39 +428,77 @@ class UnifiedMemoryHub:
         if self.redis_client:
             self.pubsub = self.redis_client.pubsub()
             self.pubsub.subscribe('memory:updates')
+            self.refresh_from_redis()
     
     def sync_from_file(self):
         """Load context from file system"""
-        if self.memory_file.exists():
-            try:
-                return json.loads(self.memory_file.read_text())
-            except json.JSONDecodeError:
-                return {"agents": {}, "current_work": {}}
-        return {"agents": {}, "current_work": {}}
+        self.store.load()
+        return self.store.snapshot()
     
-    def sync_to_file(self, data):
-        """Save context to file system"""
-        self.memory_file.parent.mkdir(parents=True, exist_ok=True)
-        data['last_update'] = datetime.now().isoformat()
-        self.memory_file.write_text(json.dumps(data, indent=2))
+    def sync_to_file(self, data=None):
+        """Flush pending agent updates to the file system"""
+        if data is not None:
+            for agent, agent_data in data.get('agents', {}).items():
+                self.store.update_agent(agent, agent_data)
+        self.store.flush()
     
+    def _scan_redis_agents(self) -> Dict[str, Dict[str, str]]:
+        """Read all memory:agents:* hashes via SCAN + one pipelined HGETALL per batch"""
+        redis_context = {}
+        batch: List[str] = []
+
+        def drain():
+            pipe = self.redis_client.pipeline(transaction=False)
+            for key in batch:
+                pipe.hgetall(key)
+            for key, agent_data in zip(batch, pipe.execute()):
+                if agent_data:
+                    redis_context[key.split(':')[-1]] = agent_data
+            batch.clear()
+
+        for key in self.redis_client.scan_iter(match='memory:agents:*', count=self.REDIS_SCAN_COUNT):
+            batch.append(key)
+            if len(batch) >= self.REDIS_SCAN_COUNT:
+                drain()
+        if batch:
+            drain()
+        return redis_context
+
+    def refresh_from_redis(self):
+        """Merge Redis agent hashes into the in-memory view (Redis takes precedence)"""
+        if not self.redis_client:
+            return
+        try:
+            for agent, data in self._scan_redis_agents().items():
+                data = dict(data)
+                if isinstance(data.get('context'), str):
+                    try:
+                        data['context'] = json.loads(data['context'])
+                    except json.JSONDecodeError:
+                        pass
+                self.store.update_agent(agent, data)
+        except Exception as e:
+            print(f"WARN: Redis read failed: {e}", file=sys.stderr)
+
+    def _apply_update_event(self, update: Dict[str, Any]):
+        """Fold a memory:updates event into the in-memory view"""
+        agent_name = update.get('agent')
+        if not agent_name or update.get('event') != 'context_update':
+            return
+        self.store.update_agent(agent_name, {
+            'status': 'active',
+            'last_update': update.get('timestamp', datetime.now().isoformat()),
+            'context': update.get('data', {})
+        })
+
     def update_agent_context(self, agent_name, context_update):
         """Update specific agent's context"""
-        # Load current state
-        data = self.sync_from_file()
-        
-        # Update agent data
-        if agent_name not in data.get('agents', {}):
-            data.setdefault('agents', {})[agent_name] = {}
-        
-        data['agents'][agent_name].update({
-            'last_update': datetime.now().isoformat(),
+        now = datetime.now().isoformat()
+        self.store.update_agent(agent_name, {
+            'last_update': now,
             'context': context_update
         })
         
-        # Save to file
-        self.sync_to_file(data)
-        
         # Update Redis if available
         if self.redis_client:
             try:
@@ -163,7 +507,7 @@ class UnifiedMemoryHub:
                     mapping={
                         'status': 'active',
                         'context': json.dumps(context_update),
-                        'last_update': datetime.now().isoformat()
+                        'last_update': now
                     }
                 )
                 
@@ -171,41 +515,20 @@ class UnifiedMemoryHub:
                 self.redis_client.publish('memory:updates', json.dumps({
                     'agent': agent_name,
                     'event': 'context_update',
-                    'timestamp': datetime.now().isoformat(),
+                    'timestamp': now,
                     'data': context_update
                 }))
             except Exception as e:
                 print(f"WARN: Redis update failed: {e}", file=sys.stderr)
     
     def get_unified_context(self):
-        """Get combined context from all agents"""
-        # File-based context
-        file_context = self.sync_from_file()
-        
-        # Redis-based context (if available)
-        if self.redis_client:
-            try:
-                redis_context = {}
-                for key in self.redis_client.keys('memory:agents:*'):
-                    agent_name = key.split(':')[-1]
-                    agent_data = self.redis_client.hgetall(key)
-                    if agent_data:
-                        redis_context[agent_name] = agent_data
-                
-                # Merge contexts (Redis takes precedence for active data)
-                merged = file_context.copy()
-                for agent, data in redis_context.items():
-                    if agent in merged.get('agents', {}):
-                        merged['agents'][agent].update(data)
-                    else:
-                        merged.setdefault('agents', {})[agent] = data
-                
-                return merged
-            except Exception as e:
-                print(f"WARN: Redis read failed: {e}", file=sys.stderr)
-        
-        return file_context
+        """Get combined context from all agents (served from the in-memory view)"""
+        return self.store.snapshot()
     
+    def close(self):
+        """Flush pending updates"""
+        self.store.close()
+
     def run_hub(self):
         """Run hub service continuously"""
         print(f"Memory Hub starting at {datetime.now().isoformat()}")
@@ -213,41 +536,43 @@ class UnifiedMemoryHub:
         # Initial sync from file to Redis
         if self.redis_client:
             try:
-                file_context = self.sync_from_file()
-                for agent, data in file_context.get('agents', {}).items():
-                    self.redis_client.hset(
+                pipe = self.redis_client.pipeline(transaction=False)
+                for agent, data in self.store.snapshot().get('agents', {}).items():
+                    context = data.get('context', {})
+                    pipe.hset(
                         f'memory:agents:{agent}',
                         mapping={
                             'status': data.get('status', 'active'),
-                            'context': json.dumps(data.get('context', {})),
+                            'context': context if isinstance(context, str) else json.dumps(context),
                             'last_update': data.get('last_update', datetime.now().isoformat())
                         }
                     )
+                pipe.execute()
                 print("Initial sync to Redis complete")
             except Exception as e:
                 print(f"WARN: Initial sync failed: {e}", file=sys.stderr)
         
         # Subscribe to updates
-        if self.pubsub:
-            print("Subscribed to memory:updates channel")
-            for message in self.pubsub.listen():
-                if message['type'] == 'message':
-                    try:
-                        update = json.loads(message['data'])
-                        print(f"Received update: {update.get('agent')} - {update.get('event')}")
-                        # Sync to file periodically
-                        if update.get('event') == 'context_update':
-                            unified = self.get_unified_context()
-                            self.sync_to_file(unified)
-                    except Exception as e:
-                        print(f"WARN: Update processing failed: {e}", file=sys.stderr)
-        else:
-            # Fallback: periodic file sync
-            print("Running in file-only mode (Redis unavailable)")
-            while True:
-                time.sleep(60)  # Sync every minute
-                unified = self.get_unified_context()
-                self.sync_to_file(unified)
+        try:
+            if self.pubsub:
+                print("Subscribed to memory:updates channel")
+                for message in self.pubsub.listen():
+                    if message['type'] == 'message':
+                        try:
+                            update = json.loads(message['data'])
+                            print(f"Received update: {update.get('agent')} - {update.get('event')}")
+                            # View is updated in place; the debounced flusher persists it
+                            self._apply_update_event(update)
+                        except Exception as e:
+                            print(f"WARN: Update processing failed: {e}", file=sys.stderr)
+            else:
+                # Fallback: periodic file sync
+                print("Running in file-only mode (Redis unavailable)")
+                while True:
+                    time.sleep(60)  # Sync every minute
+                    self.store.flush()
+        finally:
+            self.store.close()
 
 if __name__ == '__main__':
     hub = UnifiedMemoryHub()
@@ -0,0 +1,249 @@
+"""
+Batched QA helpers for multi-file work orders.
+
+Features:
+- Single-pass security scan (one combined regex for all patterns)
+- Process-pool fan-out of the security scan for large file sets
+- One `ruff check --output-format=json` run over all touched files
+- Per-file result cache keyed by (content hash, tool version, rule set)
+
+Used by QAWorkerFull when a task touches many files; results are identical
+to the per-file path, only the number of subprocesses and regex passes drops.
+"""
+
+import hashlib
+import json
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Tuple
+
+from agents.qa_v4.actions import QaActions
+
+# Enhanced security patterns (8): (regex, message)
+ENHANCED_SECURITY_PATTERNS: List[Tuple[str, str]] = [
+    (r"sk-[a-zA-Z0-9]{20,}", "Potential API Key found (sk-*)"),
+    (r"password\s*=\s*['\"][^'\"]+['\"]", "Hardcoded password found"),
+    (r"api_key\s*=\s*['\"][^'\"]+['\"]", "Hardcoded API key found"),
+    (r"secret\s*=\s*['\"][^'\"]+['\"]", "Hardcoded secret found"),
+    (r"eval\(", "Use of eval() detected"),
+    (r"exec\(", "Use of exec() detected"),
+    (r"os\.system\(", "Use of os.system() detected"),
+    (r"subprocess\.(call|run|Popen)\(.*shell\s*=\s*True", "subprocess with shell=True detected"),
+]
+
+# Each alternative sits inside a zero-width lookahead, so matches may overlap
+# and every pattern is found exactly as a separate re.search() would find it.
+# No two patterns can match at the same start offset (distinct literal prefixes).
+_COMBINED_SECURITY_RE = re.compile(
+    "(?=(?:" + "|".join(
+        f"(?P<p{i}>{pat})" for i, (pat, _) in enumerate(ENHANCED_SECURITY_PATTERNS)
+    ) + "))"
+)
+
+# Files at or above this count use the process pool for the security scan
+POOL_THRESHOLD = 32
+
+# Config files whose content defines the lint rule set
+LINT_CONFIG_FILES = ("pyproject.toml", "ruff.toml", ".ruff.toml", "setup.cfg", ".flake8", "tox.ini")
+
+
+def scan_security_text(content: str) -> List[str]:
+    """Return security messages for content, in pattern-table order."""
+    found = set()
+    total = len(ENHANCED_SECURITY_PATTERNS)
+    for match in _COMBINED_SECURITY_RE.finditer(content):
+        found.add(int(match.lastgroup[1:]))
+        if len(found) == total:
+            break
+    return [msg for i, (_, msg) in enumerate(ENHANCED_SECURITY_PATTERNS) if i in found]
+
+
+def _scan_security_item(item: Tuple[str, str]) -> Tuple[str, List[str]]:
+    """Process-pool worker: (path, content) -> (path, issues)."""
+    path, content = item
+    return path, scan_security_text(content)
+
+
+def content_digest(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+class QAResultCache:
+    """
+    On-disk cache of per-file QA results.
+
+    Keys combine the file content hash with the tool version and rule-set hash,
+    so a file is re-checked only when its content or the QA configuration changes.
+    """
+
+    def __init__(self, cache_dir: Path):
+        self.cache_dir = Path(cache_dir)
+        self.hits = 0
+        self.misses = 0
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / key[:2] / f"{key}.json"
+
+    @staticmethod
+    def make_key(kind: str, digest: str, tool_version: str, rule_set: str) -> str:
+        raw = f"{kind}\0{digest}\0{tool_version}\0{rule_set}"
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        try:
+            value = json.loads(self._path(key).read_text())
+            self.hits += 1
+            return value
+        except (OSError, ValueError):
+            self.misses += 1
+            return None
+
+    def put(self, key: str, value: Dict[str, Any]):
+        path = self._path(key)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+            tmp.write_text(json.dumps(value))
+            os.replace(tmp, path)
+        except OSError:
+            pass
+
+
+class BatchQARunner:
+    """
+    Runs the security scan and ruff lint for a batch of files.
+
+    Args:
+        actions: QaActions used for subprocess calls (mockable)
+        cache: Optional QAResultCache; None disables caching
+        max_workers: Process pool size for the security scan (None = os.cpu_count())
+    """
+
+    def __init__(
+        self,
+        actions: Optional[QaActions] = None,
+        cache: Optional[QAResultCache] = None,
+        max_workers: Optional[int] = None,
+    ):
+        self.actions = actions or QaActions()
+        self.cache = cache
+        self.max_workers = max_workers
+        self._ruff_version: Optional[str] = None
+        self._rule_set: Optional[str] = None
+
+    # ------------------------------------------------------------------
+    def ruff_version(self) -> str:
+        if self._ruff_version is None:
+            res = self.actions.run_command(["ruff", "--version"])
+            self._ruff_version = res["stdout"].strip() if res["success"] else "unavailable"
+        return self._ruff_version
+
+    def rule_set(self) -> str:
+        """Hash of lint config files plus the security pattern table."""
+        if self._rule_set is None:
+            h = hashlib.sha256()
+            h.update(json.dumps(ENHANCED_SECURITY_PATTERNS).encode("utf-8"))
+            for name in LINT_CONFIG_FILES:
+                path = Path(name)
+                if path.is_file():
+                    h.update(name.encode("utf-8"))
+                    h.update(path.read_bytes())
+            self._rule_set = h.hexdigest()
+        return self._rule_set
+
+    @staticmethod
+    def read_digests(files: List[str]) -> Dict[str, Tuple[str, bytes]]:
+        """Read each existing file once: path -> (sha256, raw bytes)."""
+        out = {}
+        for f in files:
+            try:
+                data = Path(f).read_bytes()
+            except OSError:
+                continue
+            out[f] = (content_digest(data), data)
+        return out
+
+    # ------------------------------------------------------------------
+    def scan_security(self, contents: Dict[str, Tuple[str, bytes]]) -> Dict[str, List[str]]:
+        """Security issues per file, from cache or a (pooled) combined-regex scan."""
+        results: Dict[str, List[str]] = {}
+        pending: List[Tuple[str, str]] = []
+        keys: Dict[str, str] = {}
+
+        for f, (digest, data) in contents.items():
+            if self.cache is not None:
+                keys[f] = QAResultCache.make_key("security", digest, "builtin", self.rule_set())
+                cached = self.cache.get(keys[f])
+                if cached is not None:
+                    results[f] = cached["issues"]
+                    continue
+            try:
+                pending.append((f, data.decode("utf-8")))
+            except UnicodeDecodeError:
+                # Matches the per-file path, which swallows read errors
+                results[f] = []
+
+        if len(pending) >= POOL_THRESHOLD and (self.max_workers is None or self.max_workers > 1):
+            chunksize = max(1, len(pending) // ((self.max_workers or os.cpu_count() or 1) * 4))
+            with ProcessPoolExecutor(max_workers=self.max_workers) as pool:
+                scanned = list(pool.map(_scan_security_item, pending, chunksize=chunksize))
+        else:
+            scanned = [_scan_security_item(item) for item in pending]
+
+        for f, issues in scanned:
+            results[f] = issues
+            if self.cache is not None:
+                self.cache.put(keys[f], {"issues": issues})
+        return results
+
+    def run_ruff_batch(self, contents: Dict[str, Tuple[str, bytes]]) -> Dict[str, Dict[str, Any]]:
+        """
+        Lint all Python files with one ruff invocation (JSON output).
+
+        Returns path -> {"success": bool, "diagnostics": [...]}; files that ruff
+        could not report on are omitted so the caller can fall back per file.
+        """
+        results: Dict[str, Dict[str, Any]] = {}
+        keys: Dict[str, str] = {}
+        pending: List[str] = []
+        version = self.ruff_version()
+
+        for f, (digest, _) in contents.items():
+            if not f.endswith(".py"):
+                continue
+            if self.cache is not None and version != "unavailable":
+                keys[f] = QAResultCache.make_key("ruff", digest, version, self.rule_set())
+                cached = self.cache.get(keys[f])
+                if cached is not None:
+                    results[f] = cached
+                    continue
+            pending.append(f)
+
+        if not pending or version == "unavailable":
+            return results
+
+        res = self.actions.run_command(["ruff", "check", "--output-format=json", *pending])
+        # ruff exits 0 (clean) or 1 (violations); anything else is a tool error
+        if res["exit_code"] not in (0, 1):
+            return results
+        try:
+            diagnostics = json.loads(res["stdout"] or "[]")
+        except ValueError:
+            return results
+
+        by_file: Dict[str, List[Dict[str, Any]]] = {f: [] for f in pending}
+        resolved = {str(Path(f).resolve()): f for f in pending}
+        for diag in diagnostics:
+            name = diag.get("filename", "")
+            f = resolved.get(str(Path(name).resolve()), name if name in by_file else None)
+            if f is not None:
+                by_file[f].append(diag)
+
+        for f, diags in by_file.items():
+            entry = {"success": not diags, "diagnostics": diags}
+            results[f] = entry
+            if self.cache is not None and f in keys:
+                self.cache.put(keys[f], entry)
+        return results
@@ -0,0 +1,101 @@
+"""
+Unit tests for batched QA (combined security regex, ruff batch, result cache).
+"""
+
+import json
+import re
+import sys
+from pathlib import Path
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent))
+
+from agents.qa_v4.actions import QaActions
+from agents.qa_v4.batch import ENHANCED_SECURITY_PATTERNS, scan_security_text
+from agents.qa_v4.workers.full import QAWorkerFull
+
+
+SAMPLES = [
+    "x = 1\n",
+    "key = 'sk-abcdefghijklmnopqrstuvwxyz'\npassword = 'hunter2'\n",
+    "subprocess.run(eval(cmd), shell=True)\n",
+    "api_key = \"k\"\nsecret = 'x'\nexec(code)\nos.system('ls')\n",
+    "subprocess.Popen(['a'])\nshell=True\n",
+]
+
+
+def separate_search(content):
+    return [msg for pat, msg in ENHANCED_SECURITY_PATTERNS if re.search(pat, content)]
+
+
+class FakeActions(QaActions):
+    """Records commands; ruff flags files containing 'import os' (unused)."""
+
+    def __init__(self):
+        self.commands = []
+
+    def run_command(self, cmd):
+        self.commands.append(cmd)
+        if cmd[:2] == ["ruff", "--version"]:
+            return {"success": True, "stdout": "ruff 0.0.0-test", "stderr": "", "exit_code": 0}
+        if cmd[:2] == ["ruff", "check"]:
+            files = [c for c in cmd[2:] if not c.startswith("--")]
+            diags = [
+                {"filename": f, "code": "F401"}
+                for f in files if "import os" in Path(f).read_text()
+            ]
+            if "--output-format=json" in cmd:
+                return {"success": not diags, "stdout": json.dumps(diags), "stderr": "", "exit_code": 1 if diags else 0}
+            return {"success": not diags, "stdout": "", "stderr": "", "exit_code": 1 if diags else 0}
+        if cmd[0] == "flake8":
+            return {"success": False, "stdout": "", "stderr": "flake8 missing", "exit_code": -1}
+        return {"success": True, "stdout": "", "stderr": "", "exit_code": 0}
+
+
+def make_files(tmp_path):
+    files = []
+    for i, content in enumerate(SAMPLES + ["import os\n", "def broken(:\n    import os\n"]):
+        path = tmp_path / f"mod_{i}.py"
+        path.write_text(content)
+        files.append(str(path))
+    return files
+
+
+def run_worker(tmp_path, files, batch_mode, actions=None):
+    worker = QAWorkerFull(
+        enable_tests=False,
+        enable_rnd_feedback=False,
+        batch_mode=batch_mode,
+        cache_dir=str(tmp_path / "cache"),
+        max_workers=1,
+    )
+    worker.telemetry_file = tmp_path / "telemetry.jsonl"
+    worker.actions = actions or FakeActions()
+    return worker.process_task({"task_id": "t", "files_touched": files})
+
+
+class TestBatchQA:
+    def test_combined_regex_matches_separate_searches(self):
+        for content in SAMPLES:
+            assert scan_security_text(content) == separate_search(content)
+
+    def test_batch_results_match_per_file(self, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        files = make_files(tmp_path)
+        serial = run_worker(tmp_path, files, batch_mode=False)
+        batched = run_worker(tmp_path, files, batch_mode=True)
+        assert batched["issues"] == serial["issues"]
+        assert batched["warnings"] == serial["warnings"]
+        assert batched["status"] == serial["status"]
+
+    def test_batch_runs_ruff_once_and_caches(self, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        files = make_files(tmp_path)
+        actions = FakeActions()
+        run_worker(tmp_path, files, batch_mode=True, actions=actions)
+        ruff_checks = [c for c in actions.commands if c[:2] == ["ruff", "check"]]
+        assert len(ruff_checks) == 1
+
+        again = FakeActions()
+        run_worker(tmp_path, files, batch_mode=True, actions=again)
+        assert not [c for c in again.commands if c[:2] == ["ruff", "check"] and "--output-format=json" in c]
@@ -8,6 +8,8 @@ Features:
 - R&D feedback (full with categorization)
 - 3-level lint fallback (ruff → flake8 → py_compile)
 - Advanced pattern checks
+- Batched mode for large file sets (one ruff run, pooled security scan,
+  per-file result cache)
 
 Use for:
 - High-risk domains (security, payment, auth)
@@ -18,7 +20,6 @@ Use for:
 
 import json
 import os
-import re
 import sys
 import py_compile
 from pathlib import Path
@@ -29,6 +30,7 @@ from datetime import datetime, timezone
 sys.path.insert(0, os.getcwd())
 
 from agents.qa_v4.actions import QaActions
+from agents.qa_v4.batch import BatchQARunner, QAResultCache, scan_security_text
 from agents.qa_v4.checklist_engine import evaluate_checklist
 from agents.qa_v4.rnd_integration import send_to_rnd
 
@@ -51,6 +53,10 @@ class QAWorkerFull:
         enable_tests: bool = True,
         enable_security: bool = True,
         enable_rnd_feedback: bool = True,
+        batch_mode: Optional[bool] = None,
+        batch_threshold: int = 8,
+        cache_dir: Optional[str] = "g/cache/qa_full",
+        max_workers: Optional[int] = None,
     ):
         """
         Initialize Full QA Worker.
@@ -60,6 +66,11 @@ class QAWorkerFull:
             enable_tests: Enable test execution
             enable_security: Enable security pattern checks
             enable_rnd_feedback: Enable R&D feedback on issues
+            batch_mode: Force batched (True) or per-file (False) QA;
+                None picks batched when files >= batch_threshold
+            batch_threshold: File count at which batched mode kicks in
+            cache_dir: Per-file result cache directory (None disables cache)
+            max_workers: Process pool size for the batched security scan
         """
         self.telemetry_file = Path("g/telemetry/qa_lane_execution.jsonl")
         self.telemetry_file.parent.mkdir(parents=True, exist_ok=True)
@@ -68,32 +79,20 @@ class QAWorkerFull:
         self.enable_tests = enable_tests
         self.enable_security = enable_security
         self.enable_rnd_feedback = enable_rnd_feedback
+        self.batch_mode = batch_mode
+        self.batch_threshold = batch_threshold
+        self.cache_dir = cache_dir
+        self.max_workers = max_workers
 
     def _check_security_enhanced(self, file_path: str) -> List[str]:
         """
-        Enhanced security check with 8 patterns.
+        Enhanced security check with 8 patterns (single combined-regex pass).
         """
-        issues = []
-        patterns = [
-            (r"sk-[a-zA-Z0-9]{20,}", "Potential API Key found (sk-*)"),
-            (r"password\s*=\s*['\"][^'\"]+['\"]", "Hardcoded password found"),
-            (r"api_key\s*=\s*['\"][^'\"]+['\"]", "Hardcoded API key found"),
-            (r"secret\s*=\s*['\"][^'\"]+['\"]", "Hardcoded secret found"),
-            (r"eval\(", "Use of eval() detected"),
-            (r"exec\(", "Use of exec() detected"),
-            (r"os\.system\(", "Use of os.system() detected"),
-            (r"subprocess\.(call|run|Popen)\(.*shell\s*=\s*True", "subprocess with shell=True detected"),
-        ]
-        
         try:
             content = Path(file_path).read_text()
-            for pat, msg in patterns:
-                if re.search(pat, content):
-                    issues.append(msg)
         except Exception:
-            pass
-        
-        return issues
+            return []
+        return scan_security_text(content)
 
     def _run_lint_3level(self, file_path: str) -> Dict[str, Any]:
         """
@@ -106,7 +105,10 @@ class QAWorkerFull:
         lint_res = self.actions.run_ruff(file_path)
         if lint_res["success"]:
             return {**lint_res, "method_used": "ruff"}
-        
+        return self._run_lint_fallback(file_path)
+
+    def _run_lint_fallback(self, file_path: str) -> Dict[str, Any]:
+        """Levels 2-3 of the lint chain: flake8 → py_compile."""
         # Level 2: Try flake8
         lint_res = self.actions.run_flake8(file_path)
         if lint_res["success"]:
@@ -139,6 +141,35 @@ class QAWorkerFull:
                 "method_used": "py_compile"
             }
 
+    def _prepare_batch(self, files: List[str]) -> tuple:
+        """
+        Batched pre-pass over all files: read each once, then run the security
+        scan (pooled) and a single ruff invocation, skipping cached results.
+
+        Returns:
+            (security_map, lint_map) keyed by file path
+        """
+        cache = QAResultCache(Path(self.cache_dir)) if self.cache_dir else None
+        runner = BatchQARunner(self.actions, cache=cache, max_workers=self.max_workers)
+        contents = runner.read_digests(files)
+        security_map = runner.scan_security(contents) if self.enable_security else {}
+        lint_map = runner.run_ruff_batch(contents) if self.enable_lint else {}
+        if cache is not None:
+            print(f"[QA Full] Batch mode: {len(contents)} files, cache hits={cache.hits} misses={cache.misses}")
+        return security_map, lint_map
+
+    def _lint_from_batch(self, file_path: str, entry: Dict[str, Any]) -> Dict[str, Any]:
+        """Turn a batched ruff entry into a lint result, falling back like the per-file chain."""
+        if entry["success"]:
+            return {
+                "success": True,
+                "stdout": "",
+                "stderr": "",
+                "exit_code": 0,
+                "method_used": "ruff"
+            }
+        return self._run_lint_fallback(file_path)
+
     def _categorize_issues(self, issues: List[str], warnings: List[str]) -> Dict[str, List[str]]:
         """
         Categorize issues and warnings for R&D feedback.
@@ -226,6 +257,14 @@ class QAWorkerFull:
         issues = []  # Critical issues
         warnings = []  # Non-critical warnings
         
+        use_batch = self.batch_mode
+        if use_batch is None:
+            use_batch = len(files_touched) >= self.batch_threshold
+        security_map: Dict[str, List[str]] = {}
+        lint_map: Dict[str, Dict[str, Any]] = {}
+        if use_batch:
+            security_map, lint_map = self._prepare_batch(files_touched)
+
         # 1. File Existence & Security
         for f in files_touched:
             path = Path(f)
@@ -236,14 +275,20 @@ class QAWorkerFull:
                 
             # Enhanced Security (8 patterns)
             if self.enable_security:
-                sec_issues = self._check_security_enhanced(f)
+                if f in security_map:
+                    sec_issues = security_map[f]
+                else:
+                    sec_issues = self._check_security_enhanced(f)
                 if sec_issues:
                     results["security_issues"].extend([f"{f}: {i}" for i in sec_issues])
                     issues.extend([f"Security: {f}: {i}" for i in sec_issues])
 
             # Linting (3-level fallback: ruff → flake8 → py_compile)
             if self.enable_lint and f.endswith(".py"):
-                lint_res = self._run_lint_3level(f)
+                if f in lint_map:
+                    lint_res = self._lint_from_batch(f, lint_map[f])
+                else:
+                    lint_res = self._run_lint_3level(f)
                 
                 if not lint_res["success"]:
                     results["lint_success"] = False
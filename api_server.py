@@ -7,6 +7,7 @@ Provides REST API endpoints for user registration and login.
 from fastapi import FastAPI, HTTPException, status
 from pydantic import BaseModel, Field, validator
 from typing import Dict
+import os
 import uvicorn
 
 # Import our existing auth system
@@ -19,8 +20,15 @@ app = FastAPI(
     version="1.0.0"
 )
 
-# Initialize AuthManager
-auth_manager = AuthManager(db_path="data/users.json")
+# Initialize AuthManager (AUTH_DB_PATH=data/users.db switches to the SQLite store;
+# a new database imports the accounts from data/users.json on first start)
+auth_manager = AuthManager(db_path=os.environ.get("AUTH_DB_PATH", "data/users.json"))
+
+
+@app.on_event("shutdown")
+async def shutdown_auth() -> None:
+    """Stop the password hashing pool."""
+    auth_manager.close()
 
 
 # ============================================================================
@@ -119,7 +127,7 @@ async def register(credentials: UserCredentials) -> SuccessResponse:
     Returns success message if registration is successful.
     Raises 400 error if username already exists.
     """
-    success = auth_manager.register(
+    success = await auth_manager.register_async(
         username=credentials.username,
         password=credentials.password
     )
@@ -159,7 +167,7 @@ async def login(credentials: UserCredentials) -> SuccessResponse:
     Returns success message if credentials are valid.
     Raises 401 error if credentials are invalid.
     """
-    success = auth_manager.login(
+    success = await auth_manager.login_async(
         username=credentials.username,
         password=credentials.password
     )
@@ -31,6 +31,8 @@ from datetime import datetime, timezone
 from pathlib import Path
 from flask import Flask, request, jsonify
 
+from wo_status_index import VALID_STATUS_FILTERS, WOStatusIndex
+
 # --- ⚙️ CONFIGURATION & CONSTANTS ---
 # [FIX] Load secure paths from Environment (fallback to standard location)
 LUKA_HOME = Path(os.getenv("LUKA_HOME", os.path.expanduser("~/02luka")))
@@ -66,60 +68,10 @@ NOTIFY_INBOX.mkdir(parents=True, exist_ok=True)
 STATE_DIR.mkdir(parents=True, exist_ok=True)
 
 # --- 📊 STATUS ENUM & HELPERS ---
-# Status Enum (strict - no variants)
-WO_STATUS_QUEUED = "QUEUED"
-WO_STATUS_RUNNING = "RUNNING"
-WO_STATUS_DONE = "DONE"
-WO_STATUS_ERROR = "ERROR"
-WO_STATUS_STALE = "STALE"
-
-def is_wo_stale(state_data):
-    """
-    Check if WO is stale (running > 24h).
-    
-    Returns True if:
-    - Status is running/pending
-    - updated_at > 24 hours ago
-    """
-    updated_at_str = state_data.get("updated_at")
-    if not updated_at_str:
-        return False
-    
-    try:
-        updated_at = datetime.fromisoformat(updated_at_str.replace("Z", "+00:00"))
-        now = datetime.now(timezone.utc)
-        age_hours = (now - updated_at).total_seconds() / 3600
-        return age_hours > 24 and state_data.get("status", "").lower() in ["running", "pending"]
-    except Exception as e:
-        logger.error(f"❌ Error parsing updated_at: {e}")
-        return False
+# Status enum + mapping helpers live in wo_status_index.py
 
-def determine_wo_status(state_data):
-    """
-    Determine WO status from state file data.
-    
-    Returns strict enum: QUEUED | RUNNING | DONE | ERROR | STALE
-    Maps from state file status values to standardized enum.
-    
-    Source of Truth: state_data from followup/state/*.json
-    """
-    status = state_data.get("status", "").lower()
-    last_error = state_data.get("last_error")
-    updated_at = state_data.get("updated_at")
-    
-    # Map to strict enum (no variants)
-    if status in ["done", "completed"]:
-        return WO_STATUS_DONE
-    elif status in ["failed"] or last_error:
-        return WO_STATUS_ERROR
-    elif status in ["running", "pending"]:
-        # Check if stale (>24h)
-        if is_wo_stale(state_data):
-            return WO_STATUS_STALE
-        return WO_STATUS_RUNNING
-    else:
-        # Default to RUNNING if unknown (assume in progress)
-        return WO_STATUS_RUNNING
+# In-memory WO list index (refreshed from file mtimes; see wo_status_index.py)
+WO_INDEX = WOStatusIndex(STATE_DIR, BRIDGE_INBOX)
 
 # --- 🛡️ SECURITY FUNCTIONS ---
 
@@ -344,8 +296,9 @@ def api_wo_status_list():
     - offset: Pagination offset (default: 0)
     
     Returns: { "items": [...], "total": N, "limit": N, "offset": N }
+    Sends a weak ETag; a matching If-None-Match gets 304 Not Modified.
     
-    Source of Truth: followup/state/*.json (primary)
+    Source of Truth: followup/state/*.json (primary), served from WO_INDEX
     """
     # Parse query parameters with validation
     try:
@@ -361,99 +314,31 @@ def api_wo_status_list():
         logger.warning(f"⚠️ [WO_STATUS] Invalid offset parameter, using default: 0")
     
     status_filter = request.args.get("status", "all").upper()
-    valid_statuses = ["ALL", "QUEUED", "RUNNING", "DONE", "ERROR", "STALE"]
-    if status_filter not in valid_statuses:
+    if status_filter not in VALID_STATUS_FILTERS:
         logger.warning(f"⚠️ [WO_STATUS] Invalid status filter '{status_filter}', using 'ALL'")
         status_filter = "ALL"
     
-    items = []
-    
-    # 1. Read state files (SOURCE OF TRUTH)
-    if STATE_DIR.exists():
-        for state_file in STATE_DIR.glob("*.json"):
-            try:
-                state_data = json.loads(state_file.read_text())
-                # NOTE: State schema must have "id" field (or fallback to filename)
-                # If schema changes in future, update this line
-                wo_id = state_data.get("id") or state_file.stem
-                
-                # Determine status (strict enum)
-                wo_status = determine_wo_status(state_data)
-                
-                # Skip if filtered
-                if status_filter != "ALL" and wo_status != status_filter:
-                    continue
-                
-                items.append({
-                    "wo_id": wo_id,
-                    "status": wo_status,  # Strict enum
-                    "lane": state_data.get("lane", "unknown"),
-                    "app_mode": state_data.get("app_mode", "unknown"),
-                    "priority": state_data.get("priority", "medium"),
-                    "objective": (state_data.get("objective") or 
-                                 state_data.get("title") or 
-                                 state_data.get("summary") or "")[:80],
-                    "created_at": state_data.get("created_at"),
-                    "started_at": state_data.get("meta", {}).get("started_at"),
-                    "finished_at": state_data.get("meta", {}).get("finished_at"),
-                    "last_update": state_data.get("updated_at") or state_data.get("created_at"),
-                    "error_message": state_data.get("last_error"),
-                    "source": state_data.get("meta", {}).get("source", "unknown")
-                })
-            except Exception as e:
-                logger.error(f"❌ Error reading state file {state_file}: {e}")
-                continue
-    
-    # 2. Read queued files (not yet processed)
-    if BRIDGE_INBOX.exists():
-        for inbox_file in BRIDGE_INBOX.glob("*.json"):
-            wo_id = inbox_file.stem
-            # Skip if already in items (has state file)
-            if any(item["wo_id"] == wo_id for item in items):
-                continue
-            
-            # Apply filter
-            if status_filter != "ALL" and status_filter != WO_STATUS_QUEUED:
-                continue
-            
-            try:
-                wo_data = json.loads(inbox_file.read_text())
-                items.append({
-                    "wo_id": wo_id,
-                    "status": WO_STATUS_QUEUED,  # Strict enum
-                    "lane": wo_data.get("lane", "unknown"),
-                    "app_mode": wo_data.get("app_mode", "unknown"),
-                    "priority": wo_data.get("priority", "medium"),
-                    "objective": wo_data.get("objective", "")[:80],
-                    "created_at": wo_data.get("apio_log", {}).get("timestamp"),
-                    "started_at": None,
-                    "finished_at": None,
-                    "last_update": wo_data.get("apio_log", {}).get("timestamp"),
-                    "error_message": None,
-                    "source": "opal"
-                })
-            except Exception as e:
-                logger.error(f"❌ Error reading inbox file {inbox_file}: {e}")
-                continue
+    # 1. Pick up new/changed state and inbox files (no-op while the watcher runs)
+    WO_INDEX.maybe_refresh()
     
-    # 3. Sort by last_update desc (most recent first)
-    # NOTE: Uses ISO8601 string comparison (assumes all timestamps are valid ISO8601)
-    # If dashboard shows wrong order, check timestamp format and consider robust parsing
-    items.sort(key=lambda x: (
-        x["last_update"] or x["created_at"] or "1970-01-01T00:00:00Z"
-    ), reverse=True)
+    # 2. Filter, sort (last_update desc) and paginate against the index
+    items, total, etag = WO_INDEX.query(status_filter, offset, limit)
     
-    # 4. Apply pagination
-    total = len(items)
-    items = items[offset:offset+limit]
+    # 3. Conditional GET: the ETag changes whenever any indexed WO changes
+    if request.if_none_match.contains_weak(etag):
+        response = app.response_class(status=304)
+        response.set_etag(etag, weak=True)
+        return response
     
-    return jsonify({
+    response = jsonify({
         "items": items,
         "total": total,
         "limit": limit,
         "offset": offset,
         "timestamp": datetime.now(timezone.utc).isoformat()
-    }), 200
+    })
+    response.set_etag(etag, weak=True)
+    return response, 200
 
 @app.route("/api/notify", methods=["POST"])
 def api_notify():
@@ -529,6 +414,9 @@ if __name__ == "__main__":
     logger.info(f"   Bridge Inbox: {BRIDGE_INBOX}")
     logger.info(f"   Security: {'✅ RELAY_KEY configured' if RELAY_KEY else '⚠️  No RELAY_KEY (open access)'}")
     logger.info(f"   CloudStorage Blocking: ✅ ENABLED")
+    
+    # Keep the WO list index warm off the request path
+    WO_INDEX.start_watcher(interval=1.0)
     logger.info("=" * 60)
     
     # Listen on port 5001 (port 5000 is used by macOS Control Center)
@@ -0,0 +1,424 @@
+#!/usr/bin/env python3
+"""
+WO Status Index for the Opal Gateway
+====================================
+In-memory index behind GET /api/wo_status.
+
+Instead of json-parsing every followup/state/*.json and bridge inbox file on
+each request, the index keeps one entry per file and only re-parses files
+whose (mtime, size) changed since the last scan.
+
+Structures:
+    - entries by file path (parsed list item + sort key)
+    - sorted key lists: all items, QUEUED inbox items, and one per state status
+    - Counter of state wo_ids, so inbox dedupe is O(1)
+    - heap of RUNNING -> STALE deadlines (staleness depends on wall time)
+
+Queries slice the sorted lists directly (offset/limit), so a listing costs
+O(limit) regardless of how many state files exist. Every change bumps a
+generation number that the gateway exposes as an ETag.
+
+Source of Truth is unchanged: followup/state/*.json (primary), inbox (queued).
+"""
+
+import bisect
+import heapq
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+logger = logging.getLogger("OpalGateway")
+
+# --- 📊 STATUS ENUM & HELPERS ---
+# Status Enum (strict - no variants)
+WO_STATUS_QUEUED = "QUEUED"
+WO_STATUS_RUNNING = "RUNNING"
+WO_STATUS_DONE = "DONE"
+WO_STATUS_ERROR = "ERROR"
+WO_STATUS_STALE = "STALE"
+
+VALID_STATUS_FILTERS = ["ALL", "QUEUED", "RUNNING", "DONE", "ERROR", "STALE"]
+
+STALE_AFTER = timedelta(hours=24)
+
+def is_wo_stale(state_data):
+    """
+    Check if WO is stale (running > 24h).
+
+    Returns True if:
+    - Status is running/pending
+    - updated_at > 24 hours ago
+    """
+    updated_at_str = state_data.get("updated_at")
+    if not updated_at_str:
+        return False
+
+    try:
+        updated_at = datetime.fromisoformat(updated_at_str.replace("Z", "+00:00"))
+        now = datetime.now(timezone.utc)
+        age_hours = (now - updated_at).total_seconds() / 3600
+        return age_hours > 24 and state_data.get("status", "").lower() in ["running", "pending"]
+    except Exception as e:
+        logger.error(f"❌ Error parsing updated_at: {e}")
+        return False
+
+def determine_wo_status(state_data):
+    """
+    Determine WO status from state file data.
+
+    Returns strict enum: QUEUED | RUNNING | DONE | ERROR | STALE
+    Maps from state file status values to standardized enum.
+
+    Source of Truth: state_data from followup/state/*.json
+    """
+    status = state_data.get("status", "").lower()
+    last_error = state_data.get("last_error")
+    updated_at = state_data.get("updated_at")
+
+    # Map to strict enum (no variants)
+    if status in ["done", "completed"]:
+        return WO_STATUS_DONE
+    elif status in ["failed"] or last_error:
+        return WO_STATUS_ERROR
+    elif status in ["running", "pending"]:
+        # Check if stale (>24h)
+        if is_wo_stale(state_data):
+            return WO_STATUS_STALE
+        return WO_STATUS_RUNNING
+    else:
+        # Default to RUNNING if unknown (assume in progress)
+        return WO_STATUS_RUNNING
+
+def stale_deadline(state_data):
+    """
+    Epoch seconds after which a RUNNING state becomes STALE, or None.
+
+    Mirrors is_wo_stale(): only running/pending states with a parseable,
+    timezone-aware updated_at ever go stale.
+    """
+    if state_data.get("status", "").lower() not in ["running", "pending"]:
+        return None
+    updated_at_str = state_data.get("updated_at")
+    if not updated_at_str:
+        return None
+    try:
+        updated_at = datetime.fromisoformat(updated_at_str.replace("Z", "+00:00"))
+    except Exception:
+        return None
+    if updated_at.tzinfo is None:
+        return None
+    return (updated_at + STALE_AFTER).timestamp()
+
+def state_list_item(state_data, state_file):
+    """List item for a followup/state/*.json file (raises on malformed data)."""
+    # NOTE: State schema must have "id" field (or fallback to filename)
+    # If schema changes in future, update this line
+    wo_id = state_data.get("id") or state_file.stem
+    return {
+        "wo_id": wo_id,
+        "status": determine_wo_status(state_data),  # Strict enum
+        "lane": state_data.get("lane", "unknown"),
+        "app_mode": state_data.get("app_mode", "unknown"),
+        "priority": state_data.get("priority", "medium"),
+        "objective": (state_data.get("objective") or
+                     state_data.get("title") or
+                     state_data.get("summary") or "")[:80],
+        "created_at": state_data.get("created_at"),
+        "started_at": state_data.get("meta", {}).get("started_at"),
+        "finished_at": state_data.get("meta", {}).get("finished_at"),
+        "last_update": state_data.get("updated_at") or state_data.get("created_at"),
+        "error_message": state_data.get("last_error"),
+        "source": state_data.get("meta", {}).get("source", "unknown")
+    }
+
+def inbox_list_item(wo_data, inbox_file):
+    """List item for a queued bridge/inbox/LIAM/*.json file (raises on malformed data)."""
+    return {
+        "wo_id": inbox_file.stem,
+        "status": WO_STATUS_QUEUED,  # Strict enum
+        "lane": wo_data.get("lane", "unknown"),
+        "app_mode": wo_data.get("app_mode", "unknown"),
+        "priority": wo_data.get("priority", "medium"),
+        "objective": wo_data.get("objective", "")[:80],
+        "created_at": wo_data.get("apio_log", {}).get("timestamp"),
+        "started_at": None,
+        "finished_at": None,
+        "last_update": wo_data.get("apio_log", {}).get("timestamp"),
+        "error_message": None,
+        "source": "opal"
+    }
+
+def sort_timestamp(item):
+    # NOTE: Uses ISO8601 string comparison (assumes all timestamps are valid ISO8601)
+    return str(item["last_update"] or item["created_at"] or "1970-01-01T00:00:00Z")
+
+
+class _Entry:
+    __slots__ = ("kind", "sig", "item", "key", "deadline")
+
+    def __init__(self, kind, sig, item=None, key=None, deadline=None):
+        self.kind = kind          # "state" | "inbox"
+        self.sig = sig            # (mtime_ns, size) at parse time
+        self.item = item          # list item dict, None if the file was unreadable
+        self.key = key            # (sort timestamp, path) - ascending sort key
+        self.deadline = deadline  # RUNNING -> STALE epoch seconds
+
+
+class WOStatusIndex:
+    """
+    Incrementally refreshed index of Work Order list items.
+
+    Args:
+        state_dir: followup/state directory (source of truth)
+        inbox_dir: bridge/inbox/LIAM directory (queued WOs)
+        rescan_interval: Max seconds between full stat scans on the request path
+    """
+
+    def __init__(self, state_dir, inbox_dir, rescan_interval=2.0):
+        self.state_dir = Path(state_dir)
+        self.inbox_dir = Path(inbox_dir)
+        self.rescan_interval = rescan_interval
+
+        self._lock = threading.Lock()
+        self._entries = {}                # path -> _Entry
+        self._all = []                    # sorted keys: state items + inbox items without state
+        self._queued = []                 # sorted keys: every inbox item
+        self._by_status = {s: [] for s in VALID_STATUS_FILTERS if s not in ("ALL", "QUEUED")}
+        self._state_ids = Counter()       # wo_id -> number of state files
+        self._inbox_by_id = {}            # wo_id -> inbox path
+        self._deadlines = []              # heap of (deadline, path, sig)
+
+        self._token = uuid.uuid4().hex[:8]
+        self.generation = 0
+        self._dir_mtimes = None
+        self._last_scan = 0.0
+        self._watcher = None
+        self._stop = threading.Event()
+
+    # ------------------------------------------------------------------
+    # Sorted-list helpers (keys ascending; listing reads from the end)
+    # ------------------------------------------------------------------
+    @staticmethod
+    def _insert(keys, key):
+        bisect.insort(keys, key)
+
+    @staticmethod
+    def _remove(keys, key):
+        i = bisect.bisect_left(keys, key)
+        if i < len(keys) and keys[i] == key:
+            del keys[i]
+
+    def _status_list(self, status):
+        return self._by_status.setdefault(status, [])
+
+    def _add(self, path, entry):
+        self._entries[path] = entry
+        if entry.item is None:
+            return
+        if entry.kind == "state":
+            wo_id = entry.item["wo_id"]
+            self._insert(self._all, entry.key)
+            self._insert(self._status_list(entry.item["status"]), entry.key)
+            self._state_ids[wo_id] += 1
+            if self._state_ids[wo_id] == 1 and wo_id in self._inbox_by_id:
+                # Inbox copy is now shadowed by a state file
+                self._remove(self._all, self._entries[self._inbox_by_id[wo_id]].key)
+            if entry.deadline is not None and entry.item["status"] == WO_STATUS_RUNNING:
+                heapq.heappush(self._deadlines, (entry.deadline, path, entry.sig))
+        else:
+            wo_id = entry.item["wo_id"]
+            self._inbox_by_id[wo_id] = path
+            self._insert(self._queued, entry.key)
+            if not self._state_ids.get(wo_id):
+                self._insert(self._all, entry.key)
+
+    def _discard(self, path):
+        entry = self._entries.pop(path, None)
+        if entry is None or entry.item is None:
+            return
+        wo_id = entry.item["wo_id"]
+        if entry.kind == "state":
+            self._remove(self._all, entry.key)
+            self._remove(self._status_list(entry.item["status"]), entry.key)
+            self._state_ids[wo_id] -= 1
+            if self._state_ids[wo_id] <= 0:
+                del self._state_ids[wo_id]
+                inbox_path = self._inbox_by_id.get(wo_id)
+                if inbox_path is not None:
+                    self._insert(self._all, self._entries[inbox_path].key)
+        else:
+            self._inbox_by_id.pop(wo_id, None)
+            self._remove(self._queued, entry.key)
+            if not self._state_ids.get(wo_id):
+                self._remove(self._all, entry.key)
+
+    # ------------------------------------------------------------------
+    # Scanning
+    # ------------------------------------------------------------------
+    @staticmethod
+    def _scan_dir(directory):
+        """path -> (mtime_ns, size) for every *.json file in directory."""
+        found = {}
+        try:
+            with os.scandir(directory) as it:
+                for entry in it:
+                    if not entry.name.endswith(".json"):
+                        continue
+                    try:
+                        st = entry.stat()
+                    except OSError:
+                        continue
+                    if entry.is_file():
+                        found[entry.path] = (st.st_mtime_ns, st.st_size)
+        except OSError:
+            pass
+        return found
+
+    @staticmethod
+    def _parse(kind, path, sig):
+        file_path = Path(path)
+        try:
+            data = json.loads(file_path.read_text())
+            if kind == "state":
+                item = state_list_item(data, file_path)
+                deadline = stale_deadline(data) if item["status"] == WO_STATUS_RUNNING else None
+            else:
+                item = inbox_list_item(data, file_path)
+                deadline = None
+            return _Entry(kind, sig, item, (sort_timestamp(item), path), deadline)
+        except Exception as e:
+            logger.error(f"❌ Error reading {kind} file {file_path}: {e}")
+            return _Entry(kind, sig)
+
+    def _current_dir_mtimes(self):
+        mtimes = []
+        for directory in (self.state_dir, self.inbox_dir):
+            try:
+                mtimes.append(os.stat(directory).st_mtime_ns)
+            except OSError:
+                mtimes.append(None)
+        return tuple(mtimes)
+
+    def refresh(self):
+        """Stat both directories and re-parse only new or changed files."""
+        dir_mtimes = self._current_dir_mtimes()
+        seen = {}
+        for kind, directory in (("state", self.state_dir), ("inbox", self.inbox_dir)):
+            for path, sig in self._scan_dir(directory).items():
+                seen[path] = (kind, sig)
+
+        # Parse outside the lock so queries keep being served during a large scan
+        with self._lock:
+            known = {path: entry.sig for path, entry in self._entries.items()}
+        changed = {
+            path: self._parse(kind, path, sig)
+            for path, (kind, sig) in seen.items()
+            if known.get(path) != sig
+        }
+        removed = [path for path in known if path not in seen]
+
+        with self._lock:
+            for path in removed:
+                self._discard(path)
+            for path, entry in changed.items():
+                self._discard(path)
+                self._add(path, entry)
+            if changed or removed:
+                self.generation += 1
+            self._dir_mtimes = dir_mtimes
+            self._last_scan = time.monotonic()
+        return len(changed) + len(removed)
+
+    def maybe_refresh(self):
+        """
+        Request-path refresh: rescan when a directory mtime changed (files added,
+        removed or atomically replaced) or rescan_interval elapsed (in-place edits).
+        No-op while the background watcher is running.
+        """
+        if self._watcher is not None and self._watcher.is_alive():
+            return 0
+        if (
+            self._dir_mtimes is None
+            or time.monotonic() - self._last_scan >= self.rescan_interval
+            or self._current_dir_mtimes() != self._dir_mtimes
+        ):
+            return self.refresh()
+        return 0
+
+    def start_watcher(self, interval=1.0):
+        """Refresh the index from a daemon thread every interval seconds."""
+        if self._watcher is not None and self._watcher.is_alive():
+            return
+        self._stop.clear()
+
+        def _loop():
+            while not self._stop.is_set():
+                try:
+                    self.refresh()
+                except Exception as e:
+                    logger.error(f"❌ [WO_INDEX] Refresh failed: {e}")
+                self._stop.wait(interval)
+
+        self.refresh()
+        self._watcher = threading.Thread(target=_loop, name="wo-status-index", daemon=True)
+        self._watcher.start()
+
+    def stop_watcher(self):
+        self._stop.set()
+        if self._watcher is not None:
+            self._watcher.join(timeout=5)
+            self._watcher = None
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+    def _expire_stale(self, now):
+        """Move RUNNING entries whose 24h deadline passed to STALE (lock held)."""
+        moved = False
+        while self._deadlines and self._deadlines[0][0] < now:
+            _, path, sig = heapq.heappop(self._deadlines)
+            entry = self._entries.get(path)
+            if entry is None or entry.sig != sig or entry.item is None:
+                continue
+            if entry.item["status"] != WO_STATUS_RUNNING:
+                continue
+            self._remove(self._status_list(WO_STATUS_RUNNING), entry.key)
+            entry.item["status"] = WO_STATUS_STALE
+            self._insert(self._status_list(WO_STATUS_STALE), entry.key)
+            moved = True
+        if moved:
+            self.generation += 1
+
+    @property
+    def etag(self):
+        return f"{self._token}-{self.generation}"
+
+    def query(self, status_filter="ALL", offset=0, limit=50, now=None):
+        """
+        Return (items, total, etag) sorted by last_update desc (most recent first).
+
+        status_filter semantics match the original directory scan:
+        - ALL: state items plus inbox items that have no state file
+        - QUEUED: every inbox item (state files never map to QUEUED)
+        - other: state items with that status
+        """
+        now = time.time() if now is None else now
+        with self._lock:
+            self._expire_stale(now)
+            if status_filter == "ALL":
+                keys = self._all
+            elif status_filter == WO_STATUS_QUEUED:
+                keys = self._queued
+            else:
+                keys = self._status_list(status_filter)
+            total = len(keys)
+            end = max(total - offset, 0)
+            start = max(end - limit, 0)
+            items = [dict(self._entries[key[1]].item) for key in reversed(keys[start:end])]
+            return items, total, self.etag
@@ -519,11 +519,17 @@ def validate_sip_compliance(
     return (True, None, "SIP compliance verified")
 
 
+CHECKSUM_CHUNK_SIZE = 1024 * 1024
+
+
 def compute_file_checksum(file_path: str) -> Optional[str]:
-    """Compute SHA256 checksum of file."""
+    """Compute SHA256 checksum of file (read in CHECKSUM_CHUNK_SIZE blocks)."""
     try:
+        hasher = hashlib.sha256()
         with open(file_path, 'rb') as f:
-            return hashlib.sha256(f.read()).hexdigest()
+            for chunk in iter(lambda: f.read(CHECKSUM_CHUNK_SIZE), b''):
+                hasher.update(chunk)
+        return hasher.hexdigest()
     except Exception:
         return None
 
@@ -537,7 +543,8 @@ def check_write_allowed(
     actor: str,
     operation: str = "write",
     content: Optional[str] = None,
-    context: Optional[Dict] = None
+    context: Optional[Dict] = None,
+    compute_checksum: bool = True
 ) -> SandboxCheckResult:
     """
     Main sandbox check function (pre-write interception).
@@ -556,6 +563,8 @@ def check_write_allowed(
         operation: Operation type (write/delete/move)
         content: File content (optional, for content validation)
         context: Optional context (WO id, rollback strategy, etc.)
+        compute_checksum: Hash the existing file into the result (callers
+            that read the file themselves can skip this extra read)
     
     Returns:
         SandboxCheckResult with all validation information
@@ -651,7 +660,7 @@ def check_write_allowed(
     
     # Step 9: Compute checksum if file exists
     checksum = None
-    if normalized_path and normalized_path.exists():
+    if compute_checksum and normalized_path and normalized_path.exists():
         checksum = compute_file_checksum(str(normalized_path))
     
     # All checks passed
@@ -1,3 +1,4 @@
 from .manager import AuthManager
+from .store import JsonUserStore, SqliteUserStore
 
-__all__ = ["AuthManager"]
+__all__ = ["AuthManager", "JsonUserStore", "SqliteUserStore"]
@@ -1,55 +1,84 @@
 import os
-import json
+import asyncio
 import hashlib
 import secrets
 import datetime
-from typing import Dict, Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+from .store import open_user_store
+
+PBKDF2_ITERATIONS = 100000
+
+
+def _pbkdf2(password: str, salt: bytes) -> str:
+    # PBKDF2-HMAC-SHA256, 100,000 iterations
+    # Good balance of security and performance for Python
+    key = hashlib.pbkdf2_hmac(
+        'sha256',
+        password.encode('utf-8'),
+        salt,
+        PBKDF2_ITERATIONS
+    )
+    return key.hex()
+
 
 class AuthManager:
     """
-    Manages user authentication using a local JSON file.
+    Manages user authentication using a local user store.
     Security: PBKDF2-HMAC-SHA256 with unique salts.
-    """
-    
-    def __init__(self, db_path: str = "data/users.json"):
-        self.db_path = db_path
-        self._ensure_db()
 
-    def _ensure_db(self):
-        """Ensures the JSON database file exists."""
-        if not os.path.exists(self.db_path):
-            self._save_db({"users": {}})
+    Storage: data/users.json (in-memory index, re-read only when the file
+    changes) or a SQLite file for .db/.sqlite paths (single-row writes).
 
-    def _load_db(self) -> Dict:
-        """Loads users from JSON."""
-        try:
-            with open(self.db_path, "r", encoding="utf-8") as f:
-                return json.load(f)
-        except (FileNotFoundError, json.JSONDecodeError):
-            return {"users": {}}
-
-    def _save_db(self, data: Dict):
-        """Saves users to JSON atomically (write-temp, move)."""
-        temp_path = f"{self.db_path}.tmp"
-        with open(temp_path, "w", encoding="utf-8") as f:
-            json.dump(data, f, indent=2)
-        os.replace(temp_path, self.db_path)
+    The *_async methods run PBKDF2 on a bounded thread pool (one worker per
+    core by default). hashlib releases the GIL while hashing, so concurrent
+    logins use all cores and never block the event loop.
+    """
+
+    def __init__(self, db_path: str = "data/users.json", max_workers: Optional[int] = None):
+        self.db_path = db_path
+        self.store = open_user_store(db_path)
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self._executor: Optional[ThreadPoolExecutor] = None
 
     def _hash_password(self, password: str, salt: bytes) -> str:
         """Hashes password using PBKDF2."""
-        # PBKDF2-HMAC-SHA256, 100,000 iterations
-        # Good balance of security and performance for Python
-        key = hashlib.pbkdf2_hmac(
-            'sha256', 
-            password.encode('utf-8'), 
-            salt, 
-            100000
-        )
-        return key.hex()
+        return _pbkdf2(password, salt)
+
+    def _hash_pool(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="auth-pbkdf2")
+        return self._executor
+
+    async def _hash_password_async(self, password: str, salt: bytes) -> str:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._hash_pool(), _pbkdf2, password, salt)
+
+    def close(self):
+        """Shuts down the hashing pool."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+    def _new_record(self, salt: bytes, password_hash: str, role: str) -> Dict:
+        return {
+            "salt": salt.hex(),
+            "password_hash": password_hash,
+            "role": role,
+            "created_at": datetime.datetime.now().isoformat()
+        }
+
+    def _insert(self, username: str, record: Dict) -> bool:
+        if not self.store.add(username, record):
+            print(f"❌ Registration failed: User '{username}' already exists.")
+            return False
+        print(f"✅ User '{username}' registered with role '{record['role']}'.")
+        return True
 
     def register(self, username: str, password: str, role: str = "user") -> bool:
         """
-        Registers a new user. 
+        Registers a new user.
         Args:
             username: Unique username.
             password: Password to hash.
@@ -57,71 +86,73 @@ class AuthManager:
         Returns:
             True if successful.
         """
-        data = self._load_db()
-        users = data.get("users", {})
-
-        if username in users:
+        if self.store.get(username) is not None:
             print(f"❌ Registration failed: User '{username}' already exists.")
             return False
 
         # Generate unique salt (32 bytes)
         salt = secrets.token_bytes(32)
-        password_hash = self._hash_password(password, salt)
+        return self._insert(username, self._new_record(salt, self._hash_password(password, salt), role))
 
-        users[username] = {
-            "salt": salt.hex(),
-            "password_hash": password_hash,
-            "role": role,
-            "created_at": datetime.datetime.now().isoformat()
-        }
+    async def register_async(self, username: str, password: str, role: str = "user") -> bool:
+        """register() with the password hashed off the event loop."""
+        if self.store.get(username) is not None:
+            print(f"❌ Registration failed: User '{username}' already exists.")
+            return False
 
-        data["users"] = users
-        self._save_db(data)
-        print(f"✅ User '{username}' registered with role '{role}'.")
-        return True
+        salt = secrets.token_bytes(32)
+        password_hash = await self._hash_password_async(password, salt)
+        return self._insert(username, self._new_record(salt, password_hash, role))
 
     def get_role(self, username: str) -> Optional[str]:
         """Returns the role of the user, or None if not found."""
-        data = self._load_db()
-        user = data.get("users", {}).get(username)
+        user = self.store.get(username)
         return user.get("role", "user") if user else None
 
     def promote_user(self, username: str, new_role: str) -> bool:
         """Promotes (or demotes) a user to a new role."""
-        data = self._load_db()
-        users = data.get("users", {})
-        
-        if username not in users:
+        if not self.store.set_role(username, new_role):
             print(f"❌ User '{username}' not found.")
             return False
-            
-        users[username]["role"] = new_role
-        data["users"] = users
-        self._save_db(data)
         print(f"✅ User '{username}' promoted to '{new_role}'.")
         return True
 
+    def list_users(self) -> List[str]:
+        """Returns all usernames, sorted."""
+        return self.store.usernames()
+
+    def delete_user(self, username: str) -> bool:
+        """Deletes a user. Returns False if not found."""
+        return self.store.delete(username)
+
+    def _verify(self, user_record: Dict, attempt_hash: str) -> bool:
+        # Constant-time comparison to prevent timing attacks
+        return secrets.compare_digest(attempt_hash, user_record["password_hash"])
+
     def login(self, username: str, password: str) -> bool:
         """Authenticates a user. Returns True if credentials match."""
-        data = self._load_db()
-        users = data.get("users", {})
-        user_record = users.get(username)
-
+        user_record = self.store.get(username)
         if not user_record:
             return False
 
         try:
             stored_salt = bytes.fromhex(user_record["salt"])
-            stored_hash = user_record["password_hash"]
-            
             # Hash input password with stored salt
-            attempt_hash = self._hash_password(password, stored_salt)
-            
-            # Constant-time comparison to prevent timing attacks
-            if secrets.compare_digest(attempt_hash, stored_hash):
-                return True
+            return self._verify(user_record, self._hash_password(password, stored_salt))
         except Exception:
             # Handle malformed records gracefully
             return False
 
-        return False
+    async def login_async(self, username: str, password: str) -> bool:
+        """login() with the password hashed off the event loop."""
+        user_record = self.store.get(username)
+        if not user_record:
+            return False
+
+        try:
+            stored_salt = bytes.fromhex(user_record["salt"])
+            attempt_hash = await self._hash_password_async(password, stored_salt)
+            return self._verify(user_record, attempt_hash)
+        except Exception:
+            # Handle malformed records gracefully
+            return False
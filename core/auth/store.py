@@ -0,0 +1,175 @@
+import json
+import os
+import sqlite3
+import threading
+from typing import Dict, List, Optional, Tuple
+
+SQLITE_SUFFIXES = (".db", ".sqlite", ".sqlite3")
+RECORD_FIELDS = ("salt", "password_hash", "role", "created_at")
+
+
+class JsonUserStore:
+    """
+    Users in one JSON file ({"users": {name: record}}), indexed in memory.
+
+    The parsed index is reused until the file's (inode, size, mtime_ns)
+    changes, so lookups cost a stat() instead of a full parse. Writes
+    replace the whole file atomically (the format has no row-level update).
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._users: Dict[str, Dict] = {}
+        self._signature: Optional[Tuple[int, int, int]] = None
+        if not os.path.exists(path):
+            self._write({})
+
+    def _stat_signature(self) -> Optional[Tuple[int, int, int]]:
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return None
+        return (st.st_ino, st.st_size, st.st_mtime_ns)
+
+    def _index(self) -> Dict[str, Dict]:
+        """Current users, re-parsed only when the file changed on disk."""
+        signature = self._stat_signature()
+        if signature != self._signature or signature is None:
+            try:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    users = json.load(f).get("users", {})
+            except (OSError, ValueError, AttributeError):
+                users = {}
+            self._users = users if isinstance(users, dict) else {}
+            self._signature = signature
+        return self._users
+
+    def _write(self, users: Dict[str, Dict]) -> None:
+        """Saves users atomically (write-temp, move)."""
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        temp_path = f"{self.path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump({"users": users}, f, indent=2)
+        os.replace(temp_path, self.path)
+        self._users = users
+        self._signature = self._stat_signature()
+
+    def get(self, username: str) -> Optional[Dict]:
+        with self._lock:
+            record = self._index().get(username)
+        return dict(record) if record else None
+
+    def add(self, username: str, record: Dict) -> bool:
+        """Insert a new user; False if the name is taken."""
+        with self._lock:
+            users = self._index()
+            if username in users:
+                return False
+            self._write({**users, username: dict(record)})
+            return True
+
+    def set_role(self, username: str, role: str) -> bool:
+        with self._lock:
+            users = self._index()
+            if username not in users:
+                return False
+            self._write({**users, username: {**users[username], "role": role}})
+            return True
+
+    def delete(self, username: str) -> bool:
+        with self._lock:
+            users = self._index()
+            if username not in users:
+                return False
+            self._write({k: v for k, v in users.items() if k != username})
+            return True
+
+    def usernames(self) -> List[str]:
+        with self._lock:
+            return sorted(self._index())
+
+
+class SqliteUserStore:
+    """
+    Users in a SQLite table keyed by username: O(log n) indexed lookups and
+    single-row inserts/updates. One connection per thread; WAL journal so
+    readers do not block the writer.
+
+    When the users table is first created, accounts from a sibling
+    users.json (the JsonUserStore file) are imported so switching
+    AUTH_DB_PATH to SQLite keeps existing logins working.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with self._conn() as conn:
+            created = conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'users'"
+            ).fetchone() is None
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS users ("
+                "username TEXT PRIMARY KEY, salt TEXT NOT NULL, password_hash TEXT NOT NULL, "
+                "role TEXT NOT NULL DEFAULT 'user', created_at TEXT)"
+            )
+        if created:
+            self.import_json(os.path.join(os.path.dirname(path), "users.json"))
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, username: str) -> Optional[Dict]:
+        row = self._conn().execute(
+            "SELECT salt, password_hash, role, created_at FROM users WHERE username = ?", (username,)
+        ).fetchone()
+        return dict(zip(RECORD_FIELDS, row)) if row else None
+
+    def add(self, username: str, record: Dict) -> bool:
+        """Insert a new user; False if the name is taken."""
+        with self._conn() as conn:
+            cur = conn.execute(
+                "INSERT OR IGNORE INTO users (username, salt, password_hash, role, created_at) VALUES (?, ?, ?, ?, ?)",
+                (username, *(record.get(f) for f in RECORD_FIELDS)),
+            )
+        return cur.rowcount == 1
+
+    def set_role(self, username: str, role: str) -> bool:
+        with self._conn() as conn:
+            cur = conn.execute("UPDATE users SET role = ? WHERE username = ?", (role, username))
+        return cur.rowcount == 1
+
+    def delete(self, username: str) -> bool:
+        with self._conn() as conn:
+            cur = conn.execute("DELETE FROM users WHERE username = ?", (username,))
+        return cur.rowcount == 1
+
+    def usernames(self) -> List[str]:
+        return [r[0] for r in self._conn().execute("SELECT username FROM users ORDER BY username")]
+
+    def import_json(self, json_path: str) -> int:
+        """Copy users from a JSON user file (existing names are kept); returns users added."""
+        try:
+            with open(json_path, "r", encoding="utf-8") as f:
+                users = json.load(f).get("users", {})
+        except (OSError, ValueError, AttributeError):
+            return 0
+        added = 0
+        for username, record in users.items():
+            if isinstance(record, dict) and self.add(username, {"role": "user", **record}):
+                added += 1
+        return added
+
+
+def open_user_store(db_path: str):
+    """SQLite store for .db/.sqlite/.sqlite3 paths, JSON store otherwise."""
+    if db_path.lower().endswith(SQLITE_SUFFIXES):
+        return SqliteUserStore(db_path)
+    return JsonUserStore(db_path)
@@ -1,14 +1,30 @@
-"""Persistent chat profile store for Kim NLP routing."""
+"""Persistent chat profile store for Kim NLP routing.
+
+Storage layout:
+- ``<store>``: JSON snapshot (chat_id -> payload) plus a reserved meta entry
+  carrying the snapshot epoch.
+- ``<store>.log``: append-only op log. The first line names the epoch of the
+  snapshot it extends; every following line is one ``set``/``del`` op.
+
+Writes append a single log line (O(1)). Once the log outgrows the live record
+count the store compacts: it atomically replaces the snapshot under a new
+epoch and starts a fresh log. A log whose epoch does not match the snapshot
+is ignored, so a crash at any point leaves a consistent state.
+"""
 from __future__ import annotations
 
+import heapq
 import json
+import os
+import uuid
 from dataclasses import dataclass
 from datetime import datetime, timedelta, timezone
 from pathlib import Path
 from threading import RLock
-from typing import Dict, Optional
+from typing import Dict, List, Optional, Tuple
 
 ISO_FORMAT = "%Y-%m-%dT%H:%M:%S.%fZ"
+META_KEY = "__profile_store__"
 
 
 def _utcnow() -> datetime:
@@ -57,51 +73,158 @@ class ProfileStore:
         *,
         default_profile: str = "default",
         ttl_days: int = 30,
+        compact_threshold: int = 1000,
+        fsync: bool = False,
     ) -> None:
         self.store_path = Path(store_path)
         self.store_path.parent.mkdir(parents=True, exist_ok=True)
+        self.log_path = self.store_path.with_name(self.store_path.name + ".log")
         self.default_profile = default_profile
         self.ttl = timedelta(days=ttl_days)
+        self.compact_threshold = compact_threshold
+        self.fsync = fsync
         self._lock = RLock()
         self._cache: Dict[str, ProfileRecord] = {}
+        self._expiry_heap: List[Tuple[datetime, str]] = []
+        self._epoch: Optional[str] = None
+        self._log_ops = 0
+        self._log_handle = None
         self._load()
 
     # ------------------------------------------------------------------
     def _load(self) -> None:
-        if not self.store_path.exists():
-            self._cache = {}
+        self._cache = {}
+        self._epoch = None
+        self._log_ops = 0
+        if self.store_path.exists():
+            try:
+                with self.store_path.open("r", encoding="utf-8") as handle:
+                    raw = json.load(handle)
+            except Exception:
+                raw = {}
+            cache: Dict[str, ProfileRecord] = {}
+            if isinstance(raw, dict):
+                meta = raw.get(META_KEY)
+                if isinstance(meta, dict) and isinstance(meta.get("epoch"), str):
+                    self._epoch = meta["epoch"]
+                for chat_id, payload in raw.items():
+                    if not isinstance(chat_id, str) or chat_id == META_KEY:
+                        continue
+                    record = ProfileRecord.from_payload(payload)
+                    if record:
+                        cache[chat_id] = record
+            self._cache = cache
+        if self._epoch is not None and not self._replay_log():
+            # Log belongs to another epoch (or is missing); the next write
+            # compacts so new ops never land behind a stale header.
+            self._epoch = None
+        self._rebuild_heap()
+
+    def _replay_log(self) -> bool:
+        """Apply log ops on top of the snapshot; drop a torn trailing line.
+
+        Returns False when the log is missing or belongs to another epoch.
+        """
+        if not self.log_path.exists():
+            return False
+        good_offset = 0
+        with self.log_path.open("rb") as handle:
+            header = handle.readline()
+            try:
+                if json.loads(header).get("epoch") != self._epoch:
+                    return False
+            except (ValueError, AttributeError):
+                return False
+            good_offset = handle.tell()
+            for line in handle:
+                try:
+                    op = json.loads(line)
+                except ValueError:
+                    break
+                if not line.endswith(b"\n"):
+                    break
+                self._apply_op(op)
+                self._log_ops += 1
+                good_offset += len(line)
+        if good_offset < self.log_path.stat().st_size:
+            os.truncate(self.log_path, good_offset)
+        return True
+
+    def _apply_op(self, op: Dict[str, str]) -> None:
+        chat_id = op.get("chat")
+        if not isinstance(chat_id, str):
             return
-        try:
-            with self.store_path.open("r", encoding="utf-8") as handle:
-                raw = json.load(handle)
-        except Exception:
-            raw = {}
-        cache: Dict[str, ProfileRecord] = {}
-        if isinstance(raw, dict):
-            for chat_id, payload in raw.items():
-                if not isinstance(chat_id, str):
-                    continue
-                record = ProfileRecord.from_payload(payload)
-                if record:
-                    cache[chat_id] = record
-        self._cache = cache
+        if op.get("op") == "set":
+            record = ProfileRecord.from_payload(op)
+            if record:
+                self._cache[chat_id] = record
+        elif op.get("op") == "del":
+            self._cache.pop(chat_id, None)
+
+    def _rebuild_heap(self) -> None:
+        self._expiry_heap = [(record.updated_at, chat_id) for chat_id, record in self._cache.items()]
+        heapq.heapify(self._expiry_heap)
+
+    def _append(self, op: Dict[str, str]) -> None:
+        """Append one op to the log (compacting first if no valid snapshot exists)."""
+        if self._epoch is None:
+            self._persist()
+        if self._log_handle is None:
+            self._log_handle = self.log_path.open("ab")
+        self._log_handle.write(json.dumps(op, sort_keys=True).encode("utf-8") + b"\n")
+        self._log_handle.flush()
+        if self.fsync:
+            os.fsync(self._log_handle.fileno())
+        self._log_ops += 1
+        if self._log_ops >= self.compact_threshold and self._log_ops > len(self._cache):
+            self._persist()
+
+    def _write_atomic(self, path: Path, data: bytes) -> None:
+        tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        with tmp_path.open("wb") as handle:
+            handle.write(data)
+            handle.flush()
+            os.fsync(handle.fileno())
+        os.replace(tmp_path, path)
 
     def _persist(self) -> None:
-        data = {chat_id: record.to_payload() for chat_id, record in self._cache.items()}
-        with self.store_path.open("w", encoding="utf-8") as handle:
-            json.dump(data, handle, indent=2, sort_keys=True)
+        """Compact: atomically write a new snapshot epoch and start a fresh log."""
+        epoch = uuid.uuid4().hex
+        data: Dict[str, Dict[str, str]] = {
+            chat_id: record.to_payload() for chat_id, record in self._cache.items()
+        }
+        data[META_KEY] = {"epoch": epoch}
+        if self._log_handle is not None:
+            self._log_handle.close()
+            self._log_handle = None
+        self._write_atomic(
+            self.store_path,
+            json.dumps(data, indent=2, sort_keys=True).encode("utf-8"),
+        )
+        self._write_atomic(
+            self.log_path,
+            json.dumps({"epoch": epoch}).encode("utf-8") + b"\n",
+        )
+        self._epoch = epoch
+        self._log_ops = 0
+        if len(self._expiry_heap) > 2 * len(self._cache):
+            self._rebuild_heap()
 
-    def _prune_expired(self, now: Optional[datetime] = None) -> None:
+    def _prune_expired(self, now: Optional[datetime] = None) -> int:
+        """Pop expired entries off the expiry heap; stale heap entries are skipped."""
         now = now or _utcnow()
-        expired = [
-            chat_id
-            for chat_id, record in self._cache.items()
-            if now - record.updated_at >= self.ttl
-        ]
-        for chat_id in expired:
+        cutoff = now - self.ttl
+        cleared = 0
+        heap = self._expiry_heap
+        while heap and heap[0][0] <= cutoff:
+            updated_at, chat_id = heapq.heappop(heap)
+            record = self._cache.get(chat_id)
+            if record is None or record.updated_at != updated_at:
+                continue
             self._cache.pop(chat_id, None)
-        if expired:
-            self._persist()
+            self._append({"op": "del", "chat": chat_id})
+            cleared += 1
+        return cleared
 
     # ------------------------------------------------------------------
     def set_profile(self, chat_id: str | int, profile_id: str, *, now: Optional[datetime] = None) -> None:
@@ -113,14 +236,15 @@ class ProfileStore:
         record = ProfileRecord(profile_id=profile_id, updated_at=timestamp)
         with self._lock:
             self._cache[chat_key] = record
-            self._persist()
+            heapq.heappush(self._expiry_heap, (record.updated_at, chat_key))
+            self._append({"op": "set", "chat": chat_key, **record.to_payload()})
 
     def clear_profile(self, chat_id: str | int) -> None:
         chat_key = str(chat_id)
         with self._lock:
             if chat_key in self._cache:
                 self._cache.pop(chat_key, None)
-                self._persist()
+                self._append({"op": "del", "chat": chat_key})
 
     def get_profile(
         self, chat_id: str | int, *, now: Optional[datetime] = None
@@ -135,17 +259,26 @@ class ProfileStore:
             if record:
                 # prune lazy expired entry
                 self._cache.pop(chat_key, None)
-                self._persist()
+                self._append({"op": "del", "chat": chat_key})
             return ProfileRecord(profile_id=self.default_profile, updated_at=now)
 
     def clear_expired(self, *, now: Optional[datetime] = None) -> int:
         """Remove all expired profiles and return the number cleared."""
         now = now or _utcnow()
         with self._lock:
-            before = len(self._cache)
-            self._prune_expired(now)
-            after = len(self._cache)
-        return before - after
+            return self._prune_expired(now)
+
+    def compact(self) -> None:
+        """Fold the op log into a fresh snapshot."""
+        with self._lock:
+            self._persist()
+
+    def close(self) -> None:
+        """Release the op log handle."""
+        with self._lock:
+            if self._log_handle is not None:
+                self._log_handle.close()
+                self._log_handle = None
 
     # ------------------------------------------------------------------
     def export_cache(self) -> Dict[str, Dict[str, str]]:
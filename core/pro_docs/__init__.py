@@ -1,9 +1,17 @@
 """Professional document rules engine package."""
 
-from core.pro_docs.engine import build_doc_spec, load_rules_config, normalize_project_input
+from core.pro_docs.engine import (
+    PricingEngine,
+    QuoteResult,
+    build_doc_spec,
+    load_rules_config,
+    normalize_project_input,
+)
 from core.pro_docs.validate import validate_doc_spec, validate_project_input
 
 __all__ = [
+    "PricingEngine",
+    "QuoteResult",
     "build_doc_spec",
     "load_rules_config",
     "normalize_project_input",
@@ -2,15 +2,29 @@
 
 from __future__ import annotations
 
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from decimal import Decimal
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 
 import yaml
 
-from core.pro_docs.audit import build_audit_trail, new_audit_entry, audit_to_dict
+from core.pro_docs.audit import audit_to_dict, build_audit_trail, new_audit_entry
 from core.pro_docs.schema import DocSpec, LineItem, ProjectInput, ProjectScopeItem
-from core.pro_docs.utils import ENGINE_VERSION, round_decimal, sha256_digest, to_decimal
-from core.pro_docs.validate import enforce_doc_spec, enforce_project_input
+from core.pro_docs.utils import round_decimal, sha256_digest, to_decimal
+from core.pro_docs.validate import (
+    ValidationError,
+    ValidationReport,
+    enforce_config,
+    enforce_doc_spec,
+    validate_project_fields,
+)
+
+# Batches at or above this many inputs are priced in a process pool
+PARALLEL_THRESHOLD = 500
 
 
 def load_rules_config(path: Optional[Path] = None) -> Dict[str, Any]:
@@ -53,206 +67,309 @@ def normalize_project_input(raw_input: Dict[str, Any]) -> ProjectInput:
     )
 
 
-def _line_item_description(scope_item: ProjectScopeItem, item_config: Dict[str, Any]) -> str:
-    if scope_item.description:
-        return scope_item.description
-    return str(item_config.get("label_token", scope_item.code))
-
-
 def _to_number(value: Any) -> Any:
     if value is None:
         return None
     return float(value)
 
 
-def build_doc_spec(raw_input: Dict[str, Any], config: Dict[str, Any]) -> DocSpec:
-    enforce_project_input(raw_input, config)
-    project_input = normalize_project_input(raw_input)
-    rounding = config["rounding"]
-    mode = rounding["mode"]
-    applied_rules = []
-    config_hash = sha256_digest(config)
-
-    applied_rules.append(
-        new_audit_entry(
-            "normalize_input",
-            {
-                "project_type": project_input.project_type,
-                "pricing_profile": project_input.pricing_profile,
-                "currency": project_input.currency,
-            },
+@dataclass(frozen=True)
+class QuoteResult:
+    """One batch entry: the doc spec dict, or None plus the failing report."""
+
+    doc_spec: Optional[Dict[str, Any]]
+    report: ValidationReport
+
+    @property
+    def ok(self) -> bool:
+        return self.doc_spec is not None
+
+
+class PricingEngine:
+    """Rules config compiled once and reused for many quotes.
+
+    The config is validated and hashed at construction and unit prices are
+    pre-rounded into a flat (code, profile) table, so each quote only
+    validates its own input. Output is identical to build_doc_spec(); the
+    config must not be mutated after the engine is built.
+    """
+
+    def __init__(self, config: Dict[str, Any]) -> None:
+        enforce_config(config)
+        self.config = config
+        self.config_hash = sha256_digest(config)
+        self.config_version = config["config_version"]
+        self.rounding = config["rounding"]
+        self.mode = self.rounding["mode"]
+        self.vat_default_percent = to_decimal(config["vat_default_percent"])
+        self._hundred = to_decimal(100)
+        self._rounding_params = {
+            "mode": self.mode,
+            "unit_price_decimals": self.rounding["unit_price_decimals"],
+            "line_amount_decimals": self.rounding["line_amount_decimals"],
+            "subtotal_decimals": self.rounding["subtotal_decimals"],
+            "vat_decimals": self.rounding["vat_decimals"],
+            "grand_total_decimals": self.rounding["grand_total_decimals"],
+        }
+        self._items: Dict[str, Tuple[str, str]] = {}
+        self._unit_prices: Dict[Tuple[str, str], Decimal] = {}
+        for code, item_config in config["pricing"].items():
+            if not isinstance(item_config, dict):
+                continue
+            self._items[code] = (
+                item_config.get("category", "uncategorized"),
+                str(item_config.get("label_token", code)),
+            )
+            prices = item_config.get("prices")
+            for profile, price in (prices.items() if isinstance(prices, dict) else ()):
+                self._unit_prices[(code, profile)] = round_decimal(
+                    price, self.rounding["unit_price_decimals"], self.mode
+                )
+
+    @classmethod
+    def from_path(cls, path: Optional[Path] = None) -> "PricingEngine":
+        return cls(load_rules_config(path))
+
+    def build_doc_spec(self, raw_input: Dict[str, Any]) -> DocSpec:
+        report = validate_project_fields(raw_input, self.config)
+        if report.errors:
+            raise ValidationError(report)
+        return self._compile(normalize_project_input(raw_input))
+
+    def quote(self, raw_input: Dict[str, Any]) -> QuoteResult:
+        """build_doc_spec() that returns the validation report instead of raising."""
+        report = validate_project_fields(raw_input, self.config)
+        if report.errors:
+            return QuoteResult(doc_spec=None, report=report)
+        try:
+            doc_spec = self._compile(normalize_project_input(raw_input))
+        except ValidationError as exc:
+            return QuoteResult(doc_spec=None, report=exc.report)
+        return QuoteResult(doc_spec=doc_spec.to_dict(), report=report)
+
+    def build_doc_specs(
+        self,
+        inputs: Iterable[Dict[str, Any]],
+        *,
+        processes: Optional[int] = None,
+        chunk_size: int = 200,
+    ) -> List[QuoteResult]:
+        """
+        Quote many inputs; results are in input order and one bad input does
+        not stop the batch. Batches of PARALLEL_THRESHOLD or more are split
+        into chunks and priced in a process pool, with each worker compiling
+        the config once; processes=1 (or a small batch) runs inline.
+        """
+        items = list(inputs)
+        workers = processes or os.cpu_count() or 1
+        if workers <= 1 or len(items) < PARALLEL_THRESHOLD:
+            return [self.quote(raw_input) for raw_input in items]
+        chunks = [items[i:i + chunk_size] for i in range(0, len(items), chunk_size)]
+        results: List[QuoteResult] = []
+        with ProcessPoolExecutor(
+            max_workers=workers, initializer=_init_worker, initargs=(self.config,)
+        ) as pool:
+            for part in pool.map(_quote_chunk, chunks):
+                results.extend(part)
+        return results
+
+    def _compile(self, project_input: ProjectInput) -> DocSpec:
+        rounding = self.rounding
+        mode = self.mode
+        profile = project_input.pricing_profile
+        applied_rules = [
+            new_audit_entry(
+                "normalize_input",
+                {
+                    "project_type": project_input.project_type,
+                    "pricing_profile": profile,
+                    "currency": project_input.currency,
+                },
+            )
+        ]
+
+        line_items: List[LineItem] = []
+        for scope_item in project_input.scope_items:
+            category, label = self._items[scope_item.code]
+            unit_price = self._unit_prices[(scope_item.code, profile)]
+            amount = round_decimal(
+                scope_item.qty * unit_price,
+                rounding["line_amount_decimals"],
+                mode,
+            )
+            line_items.append(
+                LineItem(
+                    code=scope_item.code,
+                    description=scope_item.description or label,
+                    qty=scope_item.qty,
+                    unit=scope_item.unit,
+                    unit_price=unit_price,
+                    amount=amount,
+                    category=category,
+                )
+            )
+            applied_rules.append(
+                new_audit_entry(
+                    "unit_price_lookup",
+                    {
+                        "code": scope_item.code,
+                        "pricing_profile": profile,
+                        "unit_price": _to_number(unit_price),
+                    },
+                )
+            )
+            applied_rules.append(
+                new_audit_entry(
+                    "line_amount_calc",
+                    {
+                        "code": scope_item.code,
+                        "qty": _to_number(scope_item.qty),
+                        "unit_price": _to_number(unit_price),
+                        "amount": _to_number(amount),
+                    },
+                )
+            )
+
+        subtotal = round_decimal(
+            sum(item.amount for item in line_items),
+            rounding["subtotal_decimals"],
+            mode,
         )
-    )
 
-    line_items: List[LineItem] = []
-    for scope_item in project_input.scope_items:
-        item_config = config["pricing"][scope_item.code]
-        unit_price_raw = item_config["prices"][project_input.pricing_profile]
-        unit_price = round_decimal(unit_price_raw, rounding["unit_price_decimals"], mode)
-        amount = round_decimal(
-            scope_item.qty * unit_price,
-            rounding["line_amount_decimals"],
+        if project_input.vat_percent is None:
+            vat_percent = self.vat_default_percent
+            vat_source = "default"
+        else:
+            vat_percent = project_input.vat_percent
+            vat_source = "override"
+
+        vat = round_decimal(
+            subtotal * vat_percent / self._hundred,
+            rounding["vat_decimals"],
             mode,
         )
-        description = _line_item_description(scope_item, item_config)
-        line_items.append(
-            LineItem(
-                code=scope_item.code,
-                description=description,
-                qty=scope_item.qty,
-                unit=scope_item.unit,
-                unit_price=unit_price,
-                amount=amount,
-                category=item_config.get("category", "uncategorized"),
-            )
+        grand_total = round_decimal(
+            subtotal + vat,
+            rounding["grand_total_decimals"],
+            mode,
         )
+
         applied_rules.append(
             new_audit_entry(
-                "unit_price_lookup",
+                "vat_rate",
                 {
-                "code": scope_item.code,
-                "pricing_profile": project_input.pricing_profile,
-                "unit_price": _to_number(unit_price),
-            },
+                    "vat_percent": _to_number(vat_percent),
+                    "source": vat_source,
+                },
+            )
         )
-    )
+        applied_rules.append(new_audit_entry("rounding_policy", dict(self._rounding_params)))
         applied_rules.append(
             new_audit_entry(
-                "line_amount_calc",
+                "totals_calculated",
                 {
-                    "code": scope_item.code,
-                    "qty": _to_number(scope_item.qty),
-                    "unit_price": _to_number(unit_price),
-                    "amount": _to_number(amount),
+                    "subtotal": _to_number(subtotal),
+                    "vat": _to_number(vat),
+                    "grand_total": _to_number(grand_total),
                 },
             )
         )
 
-    subtotal = round_decimal(
-        sum(item.amount for item in line_items),
-        rounding["subtotal_decimals"],
-        mode,
-    )
-
-    if project_input.vat_percent is None:
-        vat_percent = to_decimal(config["vat_default_percent"])
-        vat_source = "default"
-    else:
-        vat_percent = project_input.vat_percent
-        vat_source = "override"
-
-    vat = round_decimal(
-        subtotal * vat_percent / to_decimal(100),
-        rounding["vat_decimals"],
-        mode,
-    )
-    grand_total = round_decimal(
-        subtotal + vat,
-        rounding["grand_total_decimals"],
-        mode,
-    )
+        summary = {
+            "project_type": project_input.project_type,
+            "client_name": project_input.client_name,
+            "pricing_profile": profile,
+            "currency": project_input.currency,
+            "vat_percent": _to_number(vat_percent),
+            "area_sqm": _to_number(project_input.area_sqm),
+            "date": project_input.date,
+        }
 
-    applied_rules.append(
-        new_audit_entry(
-            "vat_rate",
-            {
-                "vat_percent": _to_number(vat_percent),
-                "source": vat_source,
-            },
-        )
-    )
-    applied_rules.append(
-        new_audit_entry(
-            "rounding_policy",
-            {
-                "mode": mode,
-                "unit_price_decimals": rounding["unit_price_decimals"],
-                "line_amount_decimals": rounding["line_amount_decimals"],
-                "subtotal_decimals": rounding["subtotal_decimals"],
-                "vat_decimals": rounding["vat_decimals"],
-                "grand_total_decimals": rounding["grand_total_decimals"],
-            },
-        )
-    )
-    applied_rules.append(
-        new_audit_entry(
-            "totals_calculated",
+        line_items_payload = [
             {
+                "code": item.code,
+                "description": item.description,
+                "qty": _to_number(item.qty),
+                "unit": item.unit,
+                "unit_price": _to_number(item.unit_price),
+                "amount": _to_number(item.amount),
+                "category": item.category,
+            }
+            for item in line_items
+        ]
+
+        sections = {
+            "summary": summary,
+            "line_items": line_items_payload,
+            "totals": {
                 "subtotal": _to_number(subtotal),
                 "vat": _to_number(vat),
                 "grand_total": _to_number(grand_total),
             },
+        }
+
+        meta = {
+            "project_id": project_input.project_id,
+            "generated_at": project_input.date,
+            "version": self.config_version,
+        }
+
+        # spec_hash covers the spec with an empty spec_hash, then is filled in
+        audit = audit_to_dict(
+            build_audit_trail(applied_rules, project_input, self.config_hash, "", self.config_version)
         )
-    )
+        spec_hash = sha256_digest(DocSpec(meta=meta, sections=sections, audit=audit, warnings=[]).to_dict())
+        doc_spec = DocSpec(
+            meta=meta,
+            sections=sections,
+            audit={**audit, "spec_hash": spec_hash},
+            warnings=[],
+        )
+        enforce_doc_spec(doc_spec.to_dict(), self.config)
 
-    summary = {
-        "project_type": project_input.project_type,
-        "client_name": project_input.client_name,
-        "pricing_profile": project_input.pricing_profile,
-        "currency": project_input.currency,
-        "vat_percent": _to_number(vat_percent),
-        "area_sqm": _to_number(project_input.area_sqm),
-        "date": project_input.date,
-    }
+        return doc_spec
 
-    line_items_payload = [
-        {
-            "code": item.code,
-            "description": item.description,
-            "qty": _to_number(item.qty),
-            "unit": item.unit,
-            "unit_price": _to_number(item.unit_price),
-            "amount": _to_number(item.amount),
-            "category": item.category,
-        }
-        for item in line_items
-    ]
-
-    sections = {
-        "summary": summary,
-        "line_items": line_items_payload,
-        "totals": {
-            "subtotal": _to_number(subtotal),
-            "vat": _to_number(vat),
-            "grand_total": _to_number(grand_total),
-        },
-    }
 
-    meta = {
-        "project_id": project_input.project_id,
-        "generated_at": project_input.date,
-        "version": config["config_version"],
-    }
+_WORKER_ENGINE: Optional[PricingEngine] = None
 
-    audit_stub = {
-        "applied_rules": [entry.__dict__ for entry in applied_rules],
-        "input_hash": sha256_digest(project_input.to_dict()),
-        "config_hash": config_hash,
-        "spec_hash": "",
-        "engine_version": ENGINE_VERSION,
-        "config_version": config["config_version"],
-    }
-    doc_spec_stub = DocSpec(
-        meta=meta,
-        sections=sections,
-        audit=audit_stub,
-        warnings=[],
-    )
-    spec_hash = sha256_digest(doc_spec_stub.to_dict())
-
-    audit_trail = build_audit_trail(
-        applied_rules=applied_rules,
-        project_input=project_input,
-        config_hash=config_hash,
-        spec_hash=spec_hash,
-        config_version=config["config_version"],
-    )
-    doc_spec = DocSpec(
-        meta=meta,
-        sections=sections,
-        audit=audit_to_dict(audit_trail),
-        warnings=[],
-    )
-    enforce_doc_spec(doc_spec.to_dict(), config)
 
-    return doc_spec
+def _init_worker(config: Dict[str, Any]) -> None:
+    global _WORKER_ENGINE
+    _WORKER_ENGINE = PricingEngine(config)
+
+
+def _quote_chunk(inputs: List[Dict[str, Any]]) -> List[QuoteResult]:
+    return [_WORKER_ENGINE.quote(raw_input) for raw_input in inputs]
+
+
+def build_doc_spec(raw_input: Dict[str, Any], config: Dict[str, Any]) -> DocSpec:
+    """Single quote; use PricingEngine directly to reuse the compiled config."""
+    return PricingEngine(config).build_doc_spec(raw_input)
+
+
+def benchmark(
+    raw_input: Dict[str, Any],
+    config: Dict[str, Any],
+    n_quotes: int = 1000,
+    processes: Optional[int] = 1,
+) -> Dict[str, Any]:
+    """Quotes per second for per-call build_doc_spec() vs one PricingEngine batch."""
+    start = time.perf_counter()
+    for _ in range(n_quotes):
+        build_doc_spec(raw_input, config)
+    per_call = time.perf_counter() - start
+
+    start = time.perf_counter()
+    engine = PricingEngine(config)
+    results = engine.build_doc_specs([raw_input] * n_quotes, processes=processes)
+    batch = time.perf_counter() - start
+    if not all(result.ok for result in results):
+        raise ValidationError(next(result.report for result in results if not result.ok))
+
+    return {
+        "quotes": n_quotes,
+        "processes": processes or os.cpu_count() or 1,
+        "per_call_quotes_per_sec": round(n_quotes / per_call, 1),
+        "engine_quotes_per_sec": round(n_quotes / batch, 1),
+        "speedup": round(per_call / batch, 2),
+    }
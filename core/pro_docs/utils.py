@@ -32,7 +32,12 @@ def round_decimal(value: Any, decimals: int, mode: str) -> Decimal:
     return to_decimal(value).quantize(quant, rounding=rounding)
 
 
+_JSON_SCALARS = (str, int, float, type(None))
+
+
 def _normalize_for_json(value: Any) -> Any:
+    if isinstance(value, _JSON_SCALARS):
+        return value
     if isinstance(value, Decimal):
         return float(value)
     if isinstance(value, dict):
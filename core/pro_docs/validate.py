@@ -96,6 +96,18 @@ def validate_project_input(raw_input: Dict[str, Any], config: Dict[str, Any]) ->
     if config_report.errors:
         return ValidationReport(status="error", errors=errors, warnings=warnings)
 
+    fields_report = validate_project_fields(raw_input, config)
+    errors.extend(fields_report.errors)
+    warnings.extend(fields_report.warnings)
+    status = "error" if errors else "ok"
+    return ValidationReport(status=status, errors=errors, warnings=warnings)
+
+
+def validate_project_fields(raw_input: Dict[str, Any], config: Dict[str, Any]) -> ValidationReport:
+    """Input checks only; the config must already have passed enforce_config()."""
+    errors: List[ValidationIssue] = []
+    warnings: List[ValidationIssue] = []
+
     required_fields = [
         "project_id",
         "project_type",
@@ -341,6 +353,12 @@ def enforce_project_input(raw_input: Dict[str, Any], config: Dict[str, Any]) ->
         raise ValidationError(report)
 
 
+def enforce_config(config: Dict[str, Any]) -> None:
+    report = _validate_config(config)
+    if report.errors:
+        raise ValidationError(report)
+
+
 def enforce_doc_spec(doc_spec: Dict[str, Any], config: Dict[str, Any]) -> None:
     report = validate_doc_spec(doc_spec, config)
     if report.errors:
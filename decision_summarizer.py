@@ -4,9 +4,11 @@
 # - Marker-friendly integration into bridges
 from __future__ import annotations
 
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass, asdict
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 import json
+import os
 import re
 import time
 
@@ -103,17 +105,93 @@ def _norm_text(text: str, max_len: int = 240) -> str:
     return (t[:max_len] + "…") if len(t) > max_len else t
 
 
+# Pattern sources containing anchors / assertions: even if they can match "",
+# they do not necessarily match every text.
+_ASSERTION_RE = re.compile(r"\\[bBAZ]|[\^$]|\(\?<?[=!]")
+
+
+class _RuleMatcher:
+    """
+    RULE_TABLE compiled into one combined regex, evaluated in a single pass.
+
+    Every pattern is a named group ``p{i}`` inside a zero-width lookahead, so
+    finditer() stops at each offset where any pattern matches and reports the
+    first one in table order. Patterns later in the table that also match at
+    that offset are confirmed with an anchored match() there, so the result is
+    exactly what a separate re.search() per pattern would give. The scan stops
+    as soon as every pattern is confirmed.
+
+    Patterns that match the empty string without any anchor or assertion
+    (the ``.*`` default) match every text and are not scanned at all.
+    """
+
+    def __init__(self, rules: List[Dict[str, Any]]):
+        self.patterns: List[Tuple[int, str]] = []  # (rule index, pattern source)
+        self.always: List[int] = []
+        self.separate: List[Tuple[int, re.Pattern]] = []
+        self.compiled: List[re.Pattern] = []
+        self._scan_ids: List[int] = []
+        combined: List[str] = []
+        for rule_index, rule in enumerate(rules):
+            for pat in rule.get("if_any", []):
+                i = len(self.patterns)
+                self.patterns.append((rule_index, pat))
+                compiled = re.compile(pat, re.IGNORECASE)
+                self.compiled.append(compiled)
+                if compiled.match("") is not None:
+                    if _ASSERTION_RE.search(pat):
+                        self.separate.append((i, compiled))
+                    else:
+                        self.always.append(i)
+                else:
+                    self._scan_ids.append(i)
+                    combined.append(f"(?P<p{i}>{pat})")
+        self.combined = re.compile("(?=(?:" + "|".join(combined) + "))", re.IGNORECASE) if combined else None
+
+    def matched_patterns(self, text: str) -> List[int]:
+        """Indices (into self.patterns) of every pattern that re.search() would find in text."""
+        found = set(self.always)
+        for i, compiled in self.separate:
+            if compiled.search(text):
+                found.add(i)
+        if self.combined is not None:
+            pending = set(self._scan_ids)
+            for hit in self.combined.finditer(text):
+                first = int(hit.lastgroup[1:])
+                pending.discard(first)
+                found.add(first)
+                pos = hit.start()
+                for i in [i for i in pending if i > first]:
+                    if self.compiled[i].match(text, pos):
+                        pending.discard(i)
+                        found.add(i)
+                if not pending:
+                    break
+        return sorted(found)
+
+
+_MATCHER_CACHE: Dict[Tuple[Tuple[str, ...], ...], _RuleMatcher] = {}
+
+
+def _matcher() -> _RuleMatcher:
+    """Matcher for the current RULE_TABLE, compiled once per distinct table."""
+    key = tuple(tuple(rule.get("if_any", [])) for rule in RULE_TABLE)
+    matcher = _MATCHER_CACHE.get(key)
+    if matcher is None:
+        matcher = _MATCHER_CACHE[key] = _RuleMatcher(RULE_TABLE)
+    return matcher
+
+
 def _match_rules(text: str) -> List[Tuple[str, Dict[str, Any], List[str]]]:
-    hits: List[Tuple[str, Dict[str, Any], List[str]]] = []
-    for rule in RULE_TABLE:
-        patterns = rule.get("if_any", [])
-        matched: List[str] = []
-        for pat in patterns:
-            if re.search(pat, text, flags=re.IGNORECASE):
-                matched.append(pat)
-        if matched:
-            hits.append((rule["rule_id"], rule, matched))
-    return hits
+    matcher = _matcher()
+    by_rule: Dict[int, List[str]] = {}
+    for i in matcher.matched_patterns(text):
+        rule_index, pat = matcher.patterns[i]
+        by_rule.setdefault(rule_index, []).append(pat)
+    return [
+        (RULE_TABLE[rule_index]["rule_id"], RULE_TABLE[rule_index], matched)
+        for rule_index, matched in sorted(by_rule.items())
+    ]
 
 
 _RISK_ORDER = {"low": 0, "medium": 1, "high": 2, "critical": 3}
@@ -170,6 +248,39 @@ def summarize_decision(
     )
 
 
+# Backlogs at or above this many texts are classified in a process pool
+PARALLEL_THRESHOLD = 2000
+
+
+def _summarize_chunk(texts: List[str]) -> List[DecisionSummary]:
+    return [summarize_decision(t) for t in texts]
+
+
+def summarize_many(
+    texts: Iterable[str],
+    *,
+    processes: Optional[int] = None,
+    chunk_size: int = 500,
+) -> List[DecisionSummary]:
+    """
+    Classify many texts, e.g. when re-scoring a whole decision_log.jsonl.
+
+    Results are in input order and identical to calling summarize_decision()
+    on each text. Large backlogs are split into chunks and spread across a
+    process pool; processes=1 (or a small backlog) runs inline.
+    """
+    items = list(texts)
+    workers = processes or os.cpu_count() or 1
+    if workers <= 1 or len(items) < PARALLEL_THRESHOLD:
+        return _summarize_chunk(items)
+    chunks = [items[i:i + chunk_size] for i in range(0, len(items), chunk_size)]
+    results: List[DecisionSummary] = []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for part in pool.map(_summarize_chunk, chunks):
+            results.extend(part)
+    return results
+
+
 def build_decision_block_for_logs(user_text: str) -> str:
     """
     Human-friendly log block: compact and copy-pasteable.
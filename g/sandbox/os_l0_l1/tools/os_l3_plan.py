@@ -8,17 +8,25 @@ Commands:
 - show-plan --plan-id ID [--db PATH]
 - list-items --plan-id ID [--db PATH]
 - apply-scenario PATH [--db PATH]
-- verify-chain [--db PATH]
+- verify-chain [--db PATH] [--full] [--checkpoint]
+
+Events are hash-chained (prev_hash -> curr_hash). Multi-event writes such as
+apply-scenario chain their events in memory and insert them in one batch;
+signed checkpoints in chain_state let verify-chain resume from the last
+verified event instead of rehashing from genesis.
 """
 
 import argparse
+import contextlib
 import hashlib
+import hmac
 import json
+import os
 import sqlite3
 import sys
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any, Dict, List, Tuple
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 
 
 def find_repo_root(start: Path) -> Path:
@@ -34,6 +42,13 @@ DEFAULT_DB = REPO_ROOT / "g/sandbox/os_l0_l1/data/os_sandbox.db"
 SCHEMA_PATH = REPO_ROOT / "g/sandbox/os_l0_l1/schema/plan_schema.sql"
 SCENARIO_ROOT = REPO_ROOT / "g/sandbox/os_l0_l1/scenarios"
 
+# Verify-and-checkpoint after this many new events (batched writes only)
+CHECKPOINT_INTERVAL = 1000
+# Buffered events are inserted once this many are pending (same transaction)
+EVENT_BATCH_SIZE = 500
+# HMAC key for checkpoints; the sandbox default only guards against accidental edits
+CHECKPOINT_KEY = os.environ.get("L3_CHAIN_CHECKPOINT_KEY", "02luka-os-l3-sandbox").encode("utf-8")
+
 
 def iso_now() -> str:
     return datetime.now(timezone.utc).replace(microsecond=0).isoformat().replace("+00:00", "Z")
@@ -49,6 +64,9 @@ def connect_db(path: Path) -> sqlite3.Connection:
     conn = sqlite3.connect(path)
     conn.row_factory = sqlite3.Row
     conn.execute("PRAGMA foreign_keys = ON;")
+    # WAL: one fsync per commit instead of a rollback journal per transaction
+    conn.execute("PRAGMA journal_mode = WAL;")
+    conn.execute("PRAGMA synchronous = NORMAL;")
     return conn
 
 
@@ -75,6 +93,90 @@ def ensure_schema(conn: sqlite3.Connection) -> None:
     _add_column("plan_items", "exec_error", "TEXT")
 
 
+INSERT_EVENT_SQL = """
+    INSERT INTO events(session_id, task_id, actor, event_type, payload_json, created_ts, prev_hash, curr_hash)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+# id(conn) -> EventBatch while an event_batch() block is active on that connection
+_ACTIVE_BATCHES: Dict[int, "EventBatch"] = {}
+
+
+class EventBatch:
+    """
+    Chains events in memory and inserts them with executemany.
+
+    The previous hash is read from chain_state once, then carried forward in
+    memory; chain_state.latest_hash is written once per flush. Must be used
+    inside the caller's transaction (see event_batch()).
+    """
+
+    def __init__(self, conn: sqlite3.Connection, *, checkpoint_interval: int = CHECKPOINT_INTERVAL) -> None:
+        self.conn = conn
+        self.checkpoint_interval = checkpoint_interval
+        self.prev_hash: Optional[str] = None  # loaded lazily (schema may not exist yet)
+        self.pending: List[Tuple[str, str, str, str, str, str, str, str]] = []
+        self.written = 0
+
+    def append(
+        self,
+        *,
+        event_type: str,
+        payload: Dict[str, Any],
+        actor: str = "",
+        session_id: str = "",
+        task_id: str = "",
+    ) -> str:
+        if self.prev_hash is None:
+            prev_row = self.conn.execute("SELECT value FROM chain_state WHERE key = 'latest_hash'").fetchone()
+            self.prev_hash = prev_row["value"] if prev_row else ""
+        created_ts = iso_now()
+        payload_json = json.dumps(payload, sort_keys=True)
+        curr_hash = compute_hash(self.prev_hash, created_ts, event_type, payload_json)
+        self.pending.append(
+            (session_id, task_id, actor, event_type, payload_json, created_ts, self.prev_hash, curr_hash)
+        )
+        self.prev_hash = curr_hash
+        if len(self.pending) >= EVENT_BATCH_SIZE:
+            self.flush()
+        return curr_hash
+
+    def flush(self) -> None:
+        if not self.pending:
+            return
+        self.conn.executemany(INSERT_EVENT_SQL, self.pending)
+        self.conn.execute(
+            "INSERT OR REPLACE INTO chain_state(key, value) VALUES('latest_hash', ?)",
+            (self.prev_hash,),
+        )
+        self.written += len(self.pending)
+        self.pending = []
+        self._maybe_checkpoint()
+
+    def _maybe_checkpoint(self) -> None:
+        last_id = self.conn.execute("SELECT MAX(id) AS m FROM events").fetchone()["m"] or 0
+        checkpoint = load_checkpoint(self.conn)
+        since = last_id - (checkpoint["event_id"] if checkpoint else 0)
+        if since >= self.checkpoint_interval:
+            # Only checkpoint what has actually been verified
+            verify_chain(self.conn, checkpoint=True)
+
+
+@contextlib.contextmanager
+def event_batch(conn: sqlite3.Connection, *, checkpoint_interval: int = CHECKPOINT_INTERVAL) -> Iterator[EventBatch]:
+    """Route record_event() calls on conn through one EventBatch until the block exits."""
+    if id(conn) in _ACTIVE_BATCHES:
+        yield _ACTIVE_BATCHES[id(conn)]
+        return
+    batch = EventBatch(conn, checkpoint_interval=checkpoint_interval)
+    _ACTIVE_BATCHES[id(conn)] = batch
+    try:
+        yield batch
+        batch.flush()
+    finally:
+        _ACTIVE_BATCHES.pop(id(conn), None)
+
+
 def record_event(
     conn: sqlite3.Connection,
     *,
@@ -84,16 +186,18 @@ def record_event(
     session_id: str = "",
     task_id: str = "",
 ) -> str:
+    batch = _ACTIVE_BATCHES.get(id(conn))
+    if batch is not None:
+        return batch.append(
+            event_type=event_type, payload=payload, actor=actor, session_id=session_id, task_id=task_id
+        )
     created_ts = iso_now()
     payload_json = json.dumps(payload, sort_keys=True)
     prev_row = conn.execute("SELECT value FROM chain_state WHERE key = 'latest_hash'").fetchone()
     prev_hash = prev_row["value"] if prev_row else ""
     curr_hash = compute_hash(prev_hash, created_ts, event_type, payload_json)
     conn.execute(
-        """
-        INSERT INTO events(session_id, task_id, actor, event_type, payload_json, created_ts, prev_hash, curr_hash)
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-        """,
+        INSERT_EVENT_SQL,
         (session_id, task_id, actor, event_type, payload_json, created_ts, prev_hash, curr_hash),
     )
     conn.execute(
@@ -103,9 +207,42 @@ def record_event(
     return curr_hash
 
 
+def sign_checkpoint(event_id: int, curr_hash: str, events: int) -> str:
+    body = f"{event_id}|{curr_hash}|{events}".encode("utf-8")
+    return hmac.new(CHECKPOINT_KEY, body, hashlib.sha256).hexdigest()
+
+
+def load_checkpoint(conn: sqlite3.Connection) -> Optional[Dict[str, Any]]:
+    row = conn.execute("SELECT value FROM chain_state WHERE key = 'checkpoint'").fetchone()
+    if not row:
+        return None
+    try:
+        checkpoint = json.loads(row["value"])
+        return checkpoint if isinstance(checkpoint, dict) else {}
+    except ValueError:
+        return {}
+
+
+def write_checkpoint(conn: sqlite3.Connection, *, event_id: int, curr_hash: str, events: int) -> Dict[str, Any]:
+    checkpoint = {
+        "event_id": event_id,
+        "hash": curr_hash,
+        "events": events,
+        "created_ts": iso_now(),
+        "sig": sign_checkpoint(event_id, curr_hash, events),
+    }
+    conn.execute(
+        "INSERT OR REPLACE INTO chain_state(key, value) VALUES('checkpoint', ?)",
+        (json.dumps(checkpoint, sort_keys=True),),
+    )
+    return checkpoint
+
+
 def init_db(db_path: Path, *, force: bool) -> Dict[str, Any]:
     if db_path.exists() and force:
         db_path.unlink()
+        for suffix in ("-wal", "-shm"):
+            Path(str(db_path) + suffix).unlink(missing_ok=True)
     conn = connect_db(db_path)
     with conn:
         ensure_schema(conn)
@@ -623,7 +760,7 @@ def apply_scenario(conn: sqlite3.Connection, scenario: Dict[str, Any]) -> Dict[s
     # Count events before
     before_events = conn.execute("SELECT COUNT(1) AS c FROM events").fetchone()["c"]
 
-    with conn:
+    with conn, event_batch(conn):
         ensure_schema(conn)
         plan_info = scenario["plan"]
         create_plan(conn, plan_info, session_id, task_id)
@@ -730,28 +867,84 @@ def apply_scenario(conn: sqlite3.Connection, scenario: Dict[str, Any]) -> Dict[s
     return results
 
 
-def verify_chain(conn: sqlite3.Connection) -> Dict[str, Any]:
-    rows = conn.execute(
-        "SELECT id, event_type, payload_json, prev_hash, curr_hash, created_ts FROM events ORDER BY id ASC"
-    ).fetchall()
-    prev_hash = ""
+def _checkpoint_start(conn: sqlite3.Connection, checkpoint: Optional[Dict[str, Any]]) -> Optional[str]:
+    """Return None if the checkpoint can be trusted, else the reason it cannot."""
+    if checkpoint is None:
+        return "missing"
+    try:
+        event_id = int(checkpoint["event_id"])
+        curr_hash = str(checkpoint["hash"])
+        events = int(checkpoint["events"])
+        sig = str(checkpoint["sig"])
+    except (KeyError, TypeError, ValueError):
+        return "malformed"
+    if not hmac.compare_digest(sig, sign_checkpoint(event_id, curr_hash, events)):
+        return "bad_signature"
+    row = conn.execute("SELECT curr_hash FROM events WHERE id = ?", (event_id,)).fetchone()
+    if not row or row["curr_hash"] != curr_hash:
+        return "event_mismatch"
+    return None
+
+
+def verify_chain(conn: sqlite3.Connection, *, full: bool = False, checkpoint: bool = False) -> Dict[str, Any]:
+    """
+    Verify the event hash chain.
+
+    Resumes from the last signed checkpoint unless full=True (or the checkpoint
+    is missing/invalid, which forces a full pass). Rows are streamed from a
+    cursor, never loaded all at once. With checkpoint=True, a clean result
+    advances the checkpoint to the last verified event.
+    """
+    stored = None if full else load_checkpoint(conn)
+    problem = None if full else _checkpoint_start(conn, stored)
+    if full or problem is not None:
+        start_id, prev_hash, counted = 0, "", 0
+    else:
+        start_id, prev_hash, counted = int(stored["event_id"]), str(stored["hash"]), int(stored["events"])
+
+    cur = conn.cursor()
+    cur.row_factory = None
+    cur.execute(
+        "SELECT id, event_type, payload_json, prev_hash, curr_hash, created_ts FROM events WHERE id > ? ORDER BY id ASC",
+        (start_id,),
+    )
     mismatches: List[Dict[str, Any]] = []
-    for row in rows:
-        payload_json = row["payload_json"]
-        computed = compute_hash(prev_hash, row["created_ts"], row["event_type"], payload_json)
-        if row["prev_hash"] != prev_hash or row["curr_hash"] != computed:
+    last_id = start_id
+    for event_id, event_type, payload_json, stored_prev, stored_curr, created_ts in cur:
+        computed = compute_hash(prev_hash, created_ts, event_type, payload_json)
+        if stored_prev != prev_hash or stored_curr != computed:
             mismatches.append(
                 {
-                    "id": row["id"],
+                    "id": event_id,
                     "expected_prev": prev_hash,
-                    "stored_prev": row["prev_hash"],
+                    "stored_prev": stored_prev,
                     "expected_curr": computed,
-                    "stored_curr": row["curr_hash"],
+                    "stored_curr": stored_curr,
                 }
             )
-        prev_hash = row["curr_hash"]
+        prev_hash = stored_curr
+        last_id = event_id
+        counted += 1
     status = "OK" if not mismatches else "CORRUPTED"
-    return {"chain_status": status, "events": len(rows), "mismatches": mismatches}
+    # A checkpoint that exists but does not verify is itself evidence of tampering
+    if problem in ("malformed", "bad_signature", "event_mismatch"):
+        status = "CORRUPTED"
+
+    result: Dict[str, Any] = {
+        "chain_status": status,
+        "events": counted,
+        "mismatches": mismatches,
+        "verified_from": start_id,
+    }
+    if problem not in (None, "missing"):
+        result["checkpoint_error"] = problem
+    if checkpoint and status == "OK" and last_id > start_id:
+        # Standalone calls commit here; inside a caller's transaction the caller commits
+        standalone = not conn.in_transaction
+        result["checkpoint"] = write_checkpoint(conn, event_id=last_id, curr_hash=prev_hash, events=counted)
+        if standalone:
+            conn.commit()
+    return result
 
 
 def json_print(data: Any) -> None:
@@ -801,7 +994,9 @@ def main(argv: List[str]) -> int:
     p_res.add_argument("--session-id", default="L3_PLAN_P0_SESSION")
     p_res.add_argument("--task-id", default="L3_PLAN_P0_TASK")
 
-    sub.add_parser("verify-chain", help="Verify hash-chain integrity")
+    p_verify = sub.add_parser("verify-chain", help="Verify hash-chain integrity")
+    p_verify.add_argument("--full", action="store_true", help="Ignore checkpoints and rehash from genesis")
+    p_verify.add_argument("--checkpoint", action="store_true", help="Record a signed checkpoint if the chain is OK")
 
     args = parser.parse_args(argv)
     db_path = Path(args.db)
@@ -883,7 +1078,7 @@ def main(argv: List[str]) -> int:
         return 0 if result.get("status") != "conflict" else 1
     if args.command == "verify-chain":
         ensure_schema(conn)
-        result = verify_chain(conn)
+        result = verify_chain(conn, full=args.full, checkpoint=args.checkpoint)
         json_print(result)
         return 0 if result.get("chain_status") == "OK" else 1
 
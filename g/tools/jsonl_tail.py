@@ -0,0 +1,443 @@
+#!/usr/bin/env python3
+"""
+jsonl_tail.py
+
+Shared readers for append-only JSONL telemetry and ledger files.
+
+- read_jsonl(): forward streaming parse with an optional line cap
+- tail_lines() / tail_jsonl() / last_json_line(): the end of a file, read
+  backwards in blocks, so cost depends on N and not on file size
+- LineCountCache: line (or non-blank line) counts cached by (dev, inode,
+  size) and extended by counting only appended bytes
+- JsonlFollower + CheckpointStore: forward follow from a persisted
+  (dev, inode, offset) checkpoint with rotation / truncation detection
+
+JSON decoding uses orjson when it is installed and falls back to the stdlib
+for anything orjson rejects (NaN, out-of-range ints, invalid UTF-8), so
+results never depend on which decoder ran.
+
+Import as `g.tools.jsonl_tail` from the project root, or as `jsonl_tail` with
+g/tools on sys.path (the convention of the g/tools scripts).
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from itertools import islice
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+try:
+    import orjson  # type: ignore
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None
+
+# Bytes before a saved offset that must be unchanged to trust a checkpoint
+_FINGERPRINT_BYTES = 64
+_BLOCK_SIZE = 64 * 1024
+
+
+# ---- Decoding ----
+
+def decode_line(raw: bytes) -> Any:
+    """Parse one JSON line; raises ValueError if it is not valid JSON."""
+    if orjson is not None:
+        try:
+            return orjson.loads(raw)
+        except orjson.JSONDecodeError:
+            pass
+    return json.loads(raw.decode("utf-8", errors="replace"))
+
+
+def iter_records(lines: Iterable[bytes]) -> Iterator[Any]:
+    """Decode lines, skipping blank and malformed ones."""
+    for raw in lines:
+        raw = raw.strip()
+        if not raw:
+            continue
+        try:
+            yield decode_line(raw)
+        except ValueError:
+            continue
+
+
+# ---- Low-level helpers ----
+
+def file_signature(path: Path) -> Optional[Tuple[int, int, int, int]]:
+    """(dev, inode, size, mtime_ns) or None if the file is missing."""
+    try:
+        st = path.stat()
+    except OSError:
+        return None
+    return (st.st_dev, st.st_ino, st.st_size, st.st_mtime_ns)
+
+
+def _fingerprint(f, end: int) -> str:
+    start = max(0, end - _FINGERPRINT_BYTES)
+    f.seek(start)
+    return hashlib.sha1(f.read(end - start)).hexdigest()
+
+
+def _count_newlines(f, start: int, end: int) -> int:
+    f.seek(start)
+    remaining = end - start
+    count = 0
+    while remaining > 0:
+        block = f.read(min(_BLOCK_SIZE, remaining))
+        if not block:
+            break
+        count += block.count(b"\n")
+        remaining -= len(block)
+    return count
+
+
+def _count_nonblank_lines(f, start: int, end: int) -> Tuple[int, int, bool]:
+    """
+    Non-blank \\n-terminated lines in [start, end), the offset just past the
+    last newline, and whether the unterminated remainder is non-blank.
+    """
+    f.seek(start)
+    remaining = end - start
+    count = 0
+    carry = b""
+    while remaining > 0:
+        block = f.read(min(_BLOCK_SIZE, remaining))
+        if not block:
+            break
+        remaining -= len(block)
+        lines = (carry + block).split(b"\n")
+        carry = lines.pop()
+        count += sum(1 for line in lines if line.strip())
+    return count, end - remaining - len(carry), bool(carry.strip())
+
+
+# ---- Forward reading ----
+
+def read_jsonl(path: Path, limit: Optional[int] = None) -> List[Any]:
+    """
+    Records of a JSONL file in order, optionally from its first `limit` lines.
+
+    Missing or unreadable files yield whatever was parsed so far (usually []).
+    """
+    rows: List[Any] = []
+    try:
+        with open(path, "rb") as f:
+            lines: Iterable[bytes] = f if limit is None else islice(f, max(limit, 0))
+            rows.extend(iter_records(lines))
+    except OSError:
+        pass
+    return rows
+
+
+# ---- Reverse reading ----
+
+def iter_lines_reversed(path: Path, block_size: int = _BLOCK_SIZE) -> Iterator[bytes]:
+    """
+    Yield the lines of a file last-to-first without reading the whole file.
+
+    Like bytes.split(b"\\n") reversed: a trailing newline yields one leading b"".
+    """
+    with open(path, "rb") as f:
+        f.seek(0, os.SEEK_END)
+        pos = f.tell()
+        pending = b""
+        while pos > 0:
+            step = min(block_size, pos)
+            pos -= step
+            f.seek(pos)
+            pending = f.read(step) + pending
+            parts = pending.split(b"\n")
+            pending = parts[0]
+            for line in reversed(parts[1:]):
+                yield line
+        yield pending
+
+
+def _iter_tail_lines(path: Path) -> Iterator[bytes]:
+    """Lines last-to-first as str.splitlines() would see them (no phantom final line)."""
+    first = True
+    for raw in iter_lines_reversed(path):
+        if first:
+            first = False
+            if raw == b"":
+                # Trailing newline: no line after it
+                continue
+        yield raw
+
+
+def tail_lines(path: Path, n: int) -> List[bytes]:
+    """The last n lines of a file (blank ones included), oldest first."""
+    out: List[bytes] = []
+    if n <= 0:
+        return out
+    for raw in _iter_tail_lines(path):
+        out.append(raw)
+        if len(out) >= n:
+            break
+    out.reverse()
+    return out
+
+
+def tail_jsonl(path: Path, limit: int) -> List[Any]:
+    """The last `limit` parseable records of a JSONL file, oldest first."""
+    out: List[Any] = []
+    if limit <= 0:
+        return out
+    for record in iter_records(_iter_tail_lines(path)):
+        out.append(record)
+        if len(out) >= limit:
+            break
+    out.reverse()
+    return out
+
+
+def last_json_line(path: Path, limit: int) -> Optional[Dict[str, Any]]:
+    """Latest parseable JSON value among the last `limit` lines, or None."""
+    seen = 0
+    for raw in _iter_tail_lines(path):
+        seen += 1
+        if seen > limit:
+            break
+        for record in iter_records((raw,)):
+            return record
+    return None
+
+
+# ---- Persistent state ----
+
+class _JsonStateFile:
+    """A dict persisted as one JSON file, written atomically and only when dirty."""
+
+    def __init__(self, cache_path: Optional[Path] = None) -> None:
+        self.cache_path = cache_path
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        self._dirty = False
+        if cache_path is not None:
+            try:
+                data = json.loads(cache_path.read_text(encoding="utf-8"))
+                if isinstance(data, dict):
+                    self._entries = data
+            except (OSError, ValueError):
+                pass
+
+    def save(self) -> None:
+        if self.cache_path is None or not self._dirty:
+            return
+        try:
+            self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.cache_path.with_name(f".{self.cache_path.name}.{os.getpid()}.tmp")
+            tmp.write_text(json.dumps(self._entries), encoding="utf-8")
+            os.replace(tmp, self.cache_path)
+            self._dirty = False
+        except OSError:
+            pass
+
+
+class LineCountCache(_JsonStateFile):
+    """
+    Line counts for append-only files, cached by (dev, inode, size).
+
+    An entry is reused when the file has the same device/inode, has not
+    shrunk, and the bytes just before the cached offset are unchanged; only
+    the appended range is then scanned. Anything else triggers a full count.
+    Without a cache_path the cache lives for the process only.
+    """
+
+    @staticmethod
+    def _reuse(f, entry: Optional[Dict[str, Any]], dev: int, ino: int, size: int) -> str:
+        """"same", "grown" (only appended to since `entry`) or "" (recount)."""
+        if not entry or entry.get("dev") != dev or entry.get("ino") != ino:
+            return ""
+        if entry.get("size", -1) == size:
+            return "same"
+        if 0 < entry.get("size", -1) < size and _fingerprint(f, entry["size"]) == entry.get("fingerprint"):
+            return "grown"
+        return ""
+
+    def _store(self, key: str, new_entry: Dict[str, Any]) -> None:
+        if self._entries.get(key) != new_entry:
+            self._entries[key] = new_entry
+            self._dirty = True
+
+    def line_count(self, path: Path) -> int:
+        """
+        Number of lines as str.splitlines() would count them for \\n-delimited
+        text (a final line without a trailing newline still counts).
+        """
+        sig = file_signature(path)
+        if sig is None:
+            return 0
+        dev, ino, size, _ = sig
+        key = str(path)
+        entry = self._entries.get(key)
+        with open(path, "rb") as f:
+            reuse = self._reuse(f, entry, dev, ino, size)
+            if reuse == "same":
+                newlines = entry["newlines"]
+            elif reuse == "grown":
+                newlines = entry["newlines"] + _count_newlines(f, entry["size"], size)
+            else:
+                newlines = _count_newlines(f, 0, size)
+
+            last_byte = b""
+            if size:
+                f.seek(size - 1)
+                last_byte = f.read(1)
+            fingerprint = _fingerprint(f, size) if size else ""
+
+        self._store(key, {
+            "dev": dev,
+            "ino": ino,
+            "size": size,
+            "newlines": newlines,
+            "fingerprint": fingerprint,
+        })
+        return newlines + (1 if size and last_byte != b"\n" else 0)
+
+    def nonblank_line_count(self, path: Path) -> int:
+        """
+        Number of \\n-delimited lines with non-whitespace content, i.e. the
+        record count of a JSONL file whose blank lines should not count.
+        """
+        sig = file_signature(path)
+        if sig is None:
+            return 0
+        dev, ino, size, _ = sig
+        key = f"nonblank:{path}"
+        entry = self._entries.get(key)
+        with open(path, "rb") as f:
+            reuse = self._reuse(f, entry, dev, ino, size)
+            if reuse == "same":
+                return entry["lines"] + (1 if entry["tail"] else 0)
+            lines, start = (entry["lines"], entry["end"]) if reuse == "grown" else (0, 0)
+            added, end, tail = _count_nonblank_lines(f, start, size)
+            fingerprint = _fingerprint(f, size) if size else ""
+
+        self._store(key, {
+            "dev": dev,
+            "ino": ino,
+            "size": size,
+            "lines": lines + added,
+            "end": end,
+            "tail": tail,
+            "fingerprint": fingerprint,
+        })
+        return lines + added + (1 if tail else 0)
+
+
+class CheckpointStore(_JsonStateFile):
+    """Follower checkpoints ({dev, ino, offset, fingerprint}) keyed by name."""
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        entry = self._entries.get(key)
+        return dict(entry) if isinstance(entry, dict) else None
+
+    def put(self, key: str, state: Dict[str, Any]) -> None:
+        if self._entries.get(key) != state:
+            self._entries[key] = dict(state)
+            self._dirty = True
+
+
+class JsonlFollower:
+    """
+    Forward reader of one JSONL file that resumes from a saved offset.
+
+    Only newline-terminated lines are consumed; a partially written last line
+    is left for the next call. Reading restarts from offset 0 when the file's
+    inode changes (rotation), it shrinks below the offset (truncation), or the
+    bytes just before the offset differ (rewritten in place). Unread bytes of a
+    rotated-away file are not recovered.
+
+    The position advances as lines are yielded; call checkpoint() to record
+    it in the store and CheckpointStore.save() to persist it.
+    """
+
+    def __init__(self, path: Path, store: Optional[CheckpointStore] = None, key: Optional[str] = None) -> None:
+        self.path = Path(path)
+        self.store = store
+        self.key = key or str(self.path)
+        state = store.get(self.key) if store is not None else None
+        state = state or {}
+        self.dev: Optional[int] = state.get("dev")
+        self.ino: Optional[int] = state.get("ino")
+        self.offset: int = int(state.get("offset", 0) or 0)
+        self._fingerprint: str = state.get("fingerprint", "")
+        # Last bytes before `offset` once the file has been opened; None until then
+        self._tail: Optional[bytes] = None
+        self.rotations = 0
+
+    @property
+    def state(self) -> Dict[str, Any]:
+        fingerprint = self._fingerprint
+        if self._tail is not None:
+            fingerprint = hashlib.sha1(self._tail).hexdigest()
+        return {"dev": self.dev, "ino": self.ino, "offset": self.offset, "fingerprint": fingerprint}
+
+    def _sync(self, f, dev: int, ino: int, size: int) -> None:
+        """Validate the saved position against the file, restarting at 0 if it was replaced."""
+        replaced = (self.ino is not None and (self.dev, self.ino) != (dev, ino)) or size < self.offset
+        if not replaced and self._tail is None and self.offset:
+            start = max(0, self.offset - _FINGERPRINT_BYTES)
+            f.seek(start)
+            tail = f.read(self.offset - start)
+            replaced = hashlib.sha1(tail).hexdigest() != self._fingerprint
+            self._tail = tail
+        elif not replaced and self._tail is not None and self.offset:
+            f.seek(self.offset - len(self._tail))
+            replaced = f.read(len(self._tail)) != self._tail
+        if replaced:
+            self.offset = 0
+            self.rotations += 1
+        if replaced or self._tail is None:
+            self._tail = b""
+        self.dev, self.ino = dev, ino
+
+    def iter_new_lines(self, max_bytes: Optional[int] = None) -> Iterator[bytes]:
+        """
+        Complete lines appended since the last position.
+
+        With max_bytes, reading stops at the first line end at or after
+        offset + max_bytes, so a single line longer than max_bytes is still
+        returned whole instead of stalling the follower.
+        """
+        sig = file_signature(self.path)
+        if sig is None:
+            return
+        dev, ino, size, _ = sig
+        with open(self.path, "rb") as f:
+            self._sync(f, dev, ino, size)
+            end = size if max_bytes is None else min(size, self.offset + max_bytes)
+            f.seek(self.offset)
+            pending = b""
+            pos = self.offset
+            while pos < size and self.offset < end:
+                # Past `end` only to finish the line that straddles it
+                block = f.read(min(_BLOCK_SIZE, (end if pos < end else size) - pos))
+                if not block:
+                    break
+                pos += len(block)
+                pending += block
+                *lines, pending = pending.split(b"\n")
+                for line in lines:
+                    self.offset += len(line) + 1
+                    self._tail = (self._tail + line + b"\n")[-_FINGERPRINT_BYTES:]
+                    yield line
+                    if self.offset >= end:
+                        break
+
+    def reset(self) -> None:
+        """Forget the position so the next read starts at the beginning of the file."""
+        self.dev = self.ino = None
+        self.offset = 0
+        self._fingerprint = ""
+        self._tail = b""
+
+    def read_new(self, max_bytes: Optional[int] = None) -> List[Any]:
+        """Records from lines appended since the last position."""
+        return list(iter_records(self.iter_new_lines(max_bytes)))
+
+    def checkpoint(self) -> None:
+        if self.store is not None:
+            self.store.put(self.key, self.state)
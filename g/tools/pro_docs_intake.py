@@ -7,9 +7,9 @@ import argparse
 import json
 import sys
 from pathlib import Path
-from typing import Any, Dict
+from typing import Any, Dict, Iterable, List, Tuple
 
-from core.pro_docs.engine import build_doc_spec, load_rules_config
+from core.pro_docs.engine import PricingEngine, benchmark, build_doc_spec, load_rules_config
 from core.pro_docs.utils import canonical_json_dumps
 from core.pro_docs.validate import (
     ValidationError,
@@ -30,6 +30,22 @@ def _load_input(path: str | None, use_stdin: bool) -> Dict[str, Any]:
         return json.load(handle)
 
 
+def _read_jsonl(path: str) -> Iterable[Tuple[int, Any]]:
+    """(line number, parsed value or None) for each non-blank line; '-' is stdin."""
+    handle = sys.stdin if path == "-" else Path(path).open("r", encoding="utf-8")
+    try:
+        for line_no, line in enumerate(handle, start=1):
+            if not line.strip():
+                continue
+            try:
+                yield line_no, json.loads(line)
+            except ValueError:
+                yield line_no, None
+    finally:
+        if handle is not sys.stdin:
+            handle.close()
+
+
 def _merge_reports(primary: ValidationReport, secondary: ValidationReport) -> ValidationReport:
     errors = list(primary.errors) + list(secondary.errors)
     warnings = list(primary.warnings) + list(secondary.warnings)
@@ -71,11 +87,55 @@ def _write_outputs(doc_spec: Dict[str, Any], validation: Dict[str, Any], output_
         audit_path.write_text(canonical_json_dumps(doc_spec.get("audit", {})), encoding="utf-8")
 
 
+def _run_jsonl(args: argparse.Namespace, output_dir: Path | None) -> int:
+    """One result line per input line, in order; exit 1 if any input failed."""
+    engine = PricingEngine(load_rules_config())
+    entries = list(_read_jsonl(args.jsonl))
+    valid = [(line_no, raw) for line_no, raw in entries if isinstance(raw, dict)]
+    results = iter(engine.build_doc_specs([raw for _, raw in valid], processes=args.processes))
+    by_line = {line_no: next(results) for line_no, _ in valid}
+
+    doc_specs: List[Dict[str, Any]] = []
+    doc_lines: List[str] = []
+    validation_lines: List[str] = []
+    failed = 0
+    for line_no, _ in entries:
+        result = by_line.get(line_no)
+        if result is None:
+            report = _error_report("INVALID_JSON", f"line {line_no} is not a JSON object", "input")
+            doc_spec = None
+        else:
+            report, doc_spec = result.report, result.doc_spec
+        failed += doc_spec is None
+        validation = canonical_json_dumps(report.to_dict())
+        validation_lines.append(validation)
+        if doc_spec is not None:
+            doc_specs.append(doc_spec)
+            doc_lines.append(canonical_json_dumps(doc_spec))
+        print(validation if args.output == "validation" or doc_spec is None else doc_lines[-1])
+
+    if output_dir is not None:
+        _safe_output_path(output_dir, "doc_specs.jsonl").write_text(
+            "".join(line + "\n" for line in doc_lines), encoding="utf-8"
+        )
+        _safe_output_path(output_dir, "validation.jsonl").write_text(
+            "".join(line + "\n" for line in validation_lines), encoding="utf-8"
+        )
+        if args.mode == "apply":
+            _safe_output_path(output_dir, "audit.jsonl").write_text(
+                "".join(canonical_json_dumps(doc_spec.get("audit", {})) + "\n" for doc_spec in doc_specs),
+                encoding="utf-8",
+            )
+
+    return 1 if failed else 0
+
+
 def main() -> int:
     parser = argparse.ArgumentParser(description="Professional document rules intake")
     input_group = parser.add_mutually_exclusive_group(required=True)
     input_group.add_argument("--input", help="Path to input JSON")
     input_group.add_argument("--stdin", action="store_true", help="Read input JSON from stdin")
+    input_group.add_argument("--jsonl", help="Path to JSONL inputs, one project per line ('-' for stdin)")
     parser.add_argument("--mode", choices=["plan", "dry_run", "apply"], default="plan")
     parser.add_argument("--output-dir", help="Output directory for dry_run/apply JSON artifacts")
     parser.add_argument(
@@ -84,8 +144,22 @@ def main() -> int:
         default="doc_spec",
         help="Select JSON output type",
     )
+    parser.add_argument("--processes", type=int, help="Worker processes for large --jsonl batches")
+    parser.add_argument(
+        "--benchmark",
+        type=int,
+        metavar="N",
+        help="Price the --input document N times and print quotes/sec",
+    )
     args = parser.parse_args()
 
+    if args.benchmark:
+        if not args.input:
+            parser.error("--benchmark requires --input")
+        raw_input = _load_input(args.input, False)
+        print(json.dumps(benchmark(raw_input, load_rules_config(), args.benchmark, args.processes), indent=2))
+        return 0
+
     if args.mode in {"dry_run", "apply"} and not args.output_dir:
         report = _error_report("MISSING_OUTPUT_DIR", "output_dir is required for dry_run/apply", "output_dir")
         print(canonical_json_dumps(report.to_dict()))
@@ -100,6 +174,9 @@ def main() -> int:
             print(canonical_json_dumps(report.to_dict()))
             return 1
 
+    if args.jsonl:
+        return _run_jsonl(args, output_dir)
+
     raw_input = _load_input(args.input, args.stdin)
     config = load_rules_config()
 
@@ -13,9 +13,16 @@ import importlib
 import importlib.util
 import json
 import os
+import sys
 from pathlib import Path
 from typing import Dict, List, Optional, Union
 
+TOOLS_DIR = Path(__file__).resolve().parent
+if str(TOOLS_DIR) not in sys.path:
+    sys.path.insert(0, str(TOOLS_DIR))
+
+from jsonl_tail import tail_jsonl  # noqa: E402
+
 ROOT = Path(__file__).resolve().parents[2]
 CONFIG_CANDIDATES = [
     ROOT / "config" / "quota_limits.yaml",
@@ -128,17 +135,8 @@ class QuotaTracker:
     def _history_records(self, limit: int = MAX_HISTORY_READ) -> List[Dict]:
         if not self._history_path.exists():
             return []
-        records: List[Dict] = []
-        with self._history_path.open("r", encoding="utf-8") as handle:
-            for line in handle:
-                line = line.strip()
-                if not line:
-                    continue
-                try:
-                    records.append(json.loads(line))
-                except json.JSONDecodeError:
-                    continue
-        return records[-limit:]
+        # Only the tail is read, so cost tracks `limit`, not history size
+        return tail_jsonl(self._history_path, limit)
 
     def _append_history(self, entry: Dict):
         _ensure_dir(self._history_path)
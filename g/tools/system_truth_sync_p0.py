@@ -26,6 +26,12 @@ Usage examples:
 
   # โฟกัสเฉพาะ sandbox + gateway
   python g/tools/system_truth_sync_p0.py --mode core --md
+
+  # Watch: re-render Markdown only when an input changes
+  python g/tools/system_truth_sync_p0.py --md --watch --interval 5
+
+  # Opt-in: persist the telemetry line-count cache (the only file P0 writes)
+  python g/tools/system_truth_sync_p0.py --md --cache
 """
 
 import argparse
@@ -34,61 +40,27 @@ import sys
 from dataclasses import dataclass, asdict
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any, Dict, List, Optional
-
-try:
-    import yaml  # type: ignore
-except Exception:  # pragma: no cover
-    yaml = None  # will handle later
-
+from typing import List, Optional
 
-# ---- Path helpers ----
+TOOLS_DIR = Path(__file__).resolve().parent
+if str(TOOLS_DIR) not in sys.path:
+    sys.path.insert(0, str(TOOLS_DIR))
 
-def repo_root() -> Path:
-    # This file: /02luka/g/tools/system_truth_sync_p0.py
-    # parents[0] = tools, [1] = g, [2] = 02luka
-    return Path(__file__).resolve().parents[2]
-
-
-def safe_under(root: Path, p: Path) -> bool:
-    """Return True if p is inside root (or equal)."""
-    try:
-        return p.resolve().is_relative_to(root.resolve())  # py3.11+
-    except AttributeError:  # fallback
-        rp = p.resolve()
-        rr = root.resolve()
-        return rp == rr or rr in rp.parents
+# Collectors + data models are shared with system_truth_sync_p1.py
+from truth_sync_inputs import (  # noqa: E402
+    GatewayStatus,
+    LineCountCache,
+    SandboxStatus,
+    WorkOrderStatus,
+    collect_inputs,
+    default_cache_path,
+    repo_root,
+    watch,
+)
 
 
 # ---- Data models ----
 
-@dataclass
-class SandboxStatus:
-    status: str  # "GREEN" | "RED" | "UNKNOWN"
-    message: str
-    latest_report: Optional[str]
-    report_ts: Optional[str]
-
-
-@dataclass
-class GatewayStatus:
-    telemetry_file: Optional[str]
-    latest_event_ts: Optional[str]
-    latest_level: Optional[str]
-    latest_message: Optional[str]
-    total_events: int
-
-
-@dataclass
-class WorkOrderStatus:
-    id: str
-    path: str
-    status: Optional[str]
-    priority: Optional[str]
-    owner: Optional[str]
-    title: Optional[str]
-
-
 @dataclass
 class TruthSyncSummary:
     generated_at: str
@@ -99,194 +71,13 @@ class TruthSyncSummary:
     work_orders: List[WorkOrderStatus]
 
 
-# ---- Loaders ----
-
-def load_latest_sandbox_report(root: Path) -> SandboxStatus:
-    reports_dir = root / "g" / "sandbox" / "os_l0_l1" / "logs" / "liam_reports"
-    if not reports_dir.exists():
-        return SandboxStatus(
-            status="UNKNOWN",
-            message="No sandbox health reports found",
-            latest_report=None,
-            report_ts=None,
-        )
-
-    json_files = sorted(
-        reports_dir.glob("health_*.json"),
-        key=lambda p: p.stat().st_mtime,
-    )
-    if not json_files:
-        return SandboxStatus(
-            status="UNKNOWN",
-            message="No sandbox health reports found",
-            latest_report=None,
-            report_ts=None,
-        )
-
-    latest = json_files[-1]
-    try:
-        data = json.loads(latest.read_text())
-    except Exception as e:
-        return SandboxStatus(
-            status="UNKNOWN",
-            message=f"Failed to parse latest report: {e}",
-            latest_report=str(latest.relative_to(root)),
-            report_ts=None,
-        )
-
-    status = str(data.get("status", "UNKNOWN"))
-    msg = str(data.get("message", "") or "").strip() or "No message"
-    ts = str(data.get("ts", "") or None)
-
-    return SandboxStatus(
-        status=status,
-        message=msg,
-        latest_report=str(latest.relative_to(root)),
-        report_ts=ts,
-    )
-
-
-def load_gateway_status(root: Path, limit: int = 2000) -> GatewayStatus:
-    tel_path = root / "g" / "telemetry" / "gateway_v3_router.jsonl"
-    if not tel_path.exists():
-        return GatewayStatus(
-            telemetry_file=None,
-            latest_event_ts=None,
-            latest_level=None,
-            latest_message=None,
-            total_events=0,
-        )
-
-    # Read lines (limit to last N for safety)
-    try:
-        lines = tel_path.read_text().splitlines()
-    except Exception:
-        return GatewayStatus(
-            telemetry_file=str(tel_path.relative_to(root)),
-            latest_event_ts=None,
-            latest_level=None,
-            latest_message="Failed to read telemetry file",
-            total_events=0,
-        )
-
-    if not lines:
-        return GatewayStatus(
-            telemetry_file=str(tel_path.relative_to(root)),
-            latest_event_ts=None,
-            latest_level=None,
-            latest_message="No telemetry events logged",
-            total_events=0,
-        )
-
-    tail = lines[-limit:]
-    latest_data = None
-    for raw in reversed(tail):
-        raw = raw.strip()
-        if not raw:
-            continue
-        try:
-            obj = json.loads(raw)
-            latest_data = obj
-            break
-        except Exception:
-            continue
-
-    total_events = len(lines)
-
-    if latest_data is None:
-        return GatewayStatus(
-            telemetry_file=str(tel_path.relative_to(root)),
-            latest_event_ts=None,
-            latest_level=None,
-            latest_message="Failed to parse latest telemetry JSON",
-            total_events=total_events,
-        )
-
-    return GatewayStatus(
-        telemetry_file=str(tel_path.relative_to(root)),
-        latest_event_ts=str(latest_data.get("ts", "") or None),
-        latest_level=str(latest_data.get("level", "") or None),
-        latest_message=str(latest_data.get("message", "") or None),
-        total_events=total_events,
-    )
-
-
-def load_wo_yaml(path: Path) -> Dict[str, Any]:
-    if yaml is None:
-        return {}
-    try:
-        text = path.read_text()
-        data = yaml.safe_load(text) or {}
-        if not isinstance(data, dict):
-            return {}
-        return data
-    except Exception:
-        return {}
-
-
-def extract_wo_status(root: Path) -> List[WorkOrderStatus]:
-    """
-    Focus on key WOs we care about right now.
-    If a file is missing, still report it with status=None.
-    """
-    base = root / "bridge" / "outbox" / "CLC"
-
-    ids = [
-        "WO-20251113-SYSTEM-TRUTH-SYNC.yaml",
-        "WO-20251206-GATEWAY-V3-CORE.yaml",
-        "WO-20251206-SANDBOX-FIX-V1.yaml",
-        "WO-20251206-LOCAL-AGENT-REVIEW-PHASE1.yaml",
-        "WO-TEST-GATEWAY-V3.yaml",
-        "WO-20251206-LAR-GITDROP-SAVECHAIN-V1.yaml",
-    ]
-
-    result: List[WorkOrderStatus] = []
-    for fname in ids:
-        p = base / fname
-        if not safe_under(root, p):
-            continue
-
-        if not p.exists():
-            result.append(
-                WorkOrderStatus(
-                    id=fname.replace(".yaml", ""),
-                    path=str(p.relative_to(root)),
-                    status=None,
-                    priority=None,
-                    owner=None,
-                    title=None,
-                )
-            )
-            continue
-
-        data = load_wo_yaml(p)
-        status = data.get("status")
-        priority = data.get("priority")
-        owner = data.get("owner") or data.get("assignee")
-        title = data.get("title") or data.get("summary")
-
-        result.append(
-            WorkOrderStatus(
-                id=fname.replace(".yaml", ""),
-                path=str(p.relative_to(root)),
-                status=str(status) if status is not None else None,
-                priority=str(priority) if priority is not None else None,
-                owner=str(owner) if owner is not None else None,
-                title=str(title) if title is not None else None,
-            )
-        )
-
-    return result
-
-
 # ---- Summary + rendering ----
 
-def build_summary(mode: str = "full") -> TruthSyncSummary:
+def build_summary(mode: str = "full", cache: Optional[LineCountCache] = None) -> TruthSyncSummary:
     root = repo_root()
 
-    sandbox = load_latest_sandbox_report(root)
-    gateway = load_gateway_status(root)
-    wo_list = extract_wo_status(root)
+    # Independent collectors run concurrently; telemetry is read tail-only
+    sandbox, gateway, wo_list = collect_inputs(root, cache=cache)
 
     now = datetime.now(timezone.utc).isoformat()
 
@@ -392,16 +183,26 @@ def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
         action="store_true",
         help="No-op flag for future write modes; P0 is always read-only.",
     )
+    p.add_argument(
+        "--watch",
+        action="store_true",
+        help="Keep running; re-render only when an input file changes.",
+    )
+    p.add_argument(
+        "--interval",
+        type=float,
+        default=5.0,
+        help="Polling interval in seconds for --watch (default: 5).",
+    )
+    p.add_argument(
+        "--cache",
+        action="store_true",
+        help="Persist the telemetry tail cache to g/cache/truth_sync (default: in-memory only).",
+    )
     return p.parse_args(argv)
 
 
-def main(argv: Optional[List[str]] = None) -> int:
-    args = parse_args(argv)
-    mode = args.mode
-
-    # For "core" we still build full summary; consumer can choose fields.
-    summary = build_summary(mode="full" if mode == "core" else mode)
-
+def emit(summary: TruthSyncSummary, want_json: bool, want_md: bool) -> None:
     json_obj = {
         "generated_at": summary.generated_at,
         "version": summary.version,
@@ -411,16 +212,13 @@ def main(argv: Optional[List[str]] = None) -> int:
         "work_orders": [asdict(wo) for wo in summary.work_orders],
     }
 
-    want_json = args.json
-    want_md = args.md
-
     if not want_json and not want_md:
         # default: both, JSON then MD (separated)
         json.dump(json_obj, sys.stdout, ensure_ascii=False, indent=2)
         sys.stdout.write("\n\n")
         sys.stdout.write(render_markdown(summary))
         sys.stdout.write("\n")
-        return 0
+        return
 
     if want_json:
         json.dump(json_obj, sys.stdout, ensure_ascii=False, indent=2)
@@ -432,6 +230,24 @@ def main(argv: Optional[List[str]] = None) -> int:
         sys.stdout.write(render_markdown(summary))
         sys.stdout.write("\n")
 
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    mode = args.mode
+    # In-memory by default so P0 stays read-only; --watch reuses it across renders
+    cache = LineCountCache(default_cache_path(repo_root())) if args.cache else LineCountCache()
+
+    def render() -> None:
+        # For "core" we still build full summary; consumer can choose fields.
+        summary = build_summary(mode="full" if mode == "core" else mode, cache=cache)
+        emit(summary, args.json, args.md)
+        sys.stdout.flush()
+
+    if args.watch:
+        watch(repo_root(), render, interval=args.interval)
+        return 0
+
+    render()
     return 0
 
 
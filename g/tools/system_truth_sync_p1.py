@@ -4,10 +4,12 @@ system_truth_sync_p1.py
 
 P1: Writable system truth sync helper (sandbox-safe).
 - Generates JSON + Markdown (same inputs as P0).
-- Default is dry-run: prints content, no file writes.
+- Default is dry-run: prints content, no file writes (--cache opts in to
+  persisting the telemetry tail cache, as in P0).
 - --apply updates 02luka.md inside the managed marker block only, and creates a timestamped backup.
 - Refuses to apply if markers are missing.
 - Prints a small diff summary between current block and rendered block.
+- --watch re-runs (and re-applies with --apply) only when an input file changes.
 """
 
 import argparse
@@ -17,62 +19,31 @@ import sys
 from dataclasses import dataclass, asdict
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Tuple
+from typing import List, Optional, Tuple
 
-try:
-    import yaml  # type: ignore
-except Exception:  # pragma: no cover
-    yaml = None
+TOOLS_DIR = Path(__file__).resolve().parent
+if str(TOOLS_DIR) not in sys.path:
+    sys.path.insert(0, str(TOOLS_DIR))
+
+# Collectors + data models are shared with system_truth_sync_p0.py (same cache)
+from truth_sync_inputs import (  # noqa: E402
+    GatewayStatus,
+    LineCountCache,
+    SandboxStatus,
+    WorkOrderStatus,
+    collect_inputs,
+    default_cache_path,
+    repo_root,
+    watch,
+)
 
 
 MARKER_START = "<!-- SYSTEM_TRUTH_SYNC_P1_START -->"
 MARKER_END = "<!-- SYSTEM_TRUTH_SYNC_P1_END -->"
 
 
-# ---- Path helpers ----
-
-def repo_root() -> Path:
-    return Path(__file__).resolve().parents[2]
-
-
-def safe_under(root: Path, p: Path) -> bool:
-    try:
-        return p.resolve().is_relative_to(root.resolve())  # py3.11+
-    except AttributeError:
-        rp = p.resolve()
-        rr = root.resolve()
-        return rp == rr or rr in rp.parents
-
-
 # ---- Data models ----
 
-@dataclass
-class SandboxStatus:
-    status: str
-    message: str
-    latest_report: Optional[str]
-    report_ts: Optional[str]
-
-
-@dataclass
-class GatewayStatus:
-    telemetry_file: Optional[str]
-    latest_event_ts: Optional[str]
-    latest_level: Optional[str]
-    latest_message: Optional[str]
-    total_events: int
-
-
-@dataclass
-class WorkOrderStatus:
-    id: str
-    path: str
-    status: Optional[str]
-    priority: Optional[str]
-    owner: Optional[str]
-    title: Optional[str]
-
-
 @dataclass
 class TruthSyncSummary:
     generated_at: str
@@ -83,124 +54,11 @@ class TruthSyncSummary:
     work_orders: List[WorkOrderStatus]
 
 
-# ---- Loaders (same as P0) ----
-
-def load_latest_sandbox_report(root: Path) -> SandboxStatus:
-    reports_dir = root / "g" / "sandbox" / "os_l0_l1" / "logs" / "liam_reports"
-    if not reports_dir.exists():
-        return SandboxStatus("UNKNOWN", "No sandbox health reports found", None, None)
-
-    json_files = sorted(reports_dir.glob("health_*.json"), key=lambda p: p.stat().st_mtime)
-    if not json_files:
-        return SandboxStatus("UNKNOWN", "No sandbox health reports found", None, None)
-
-    latest = json_files[-1]
-    try:
-        data = json.loads(latest.read_text())
-    except Exception as e:
-        return SandboxStatus("UNKNOWN", f"Failed to parse latest report: {e}", str(latest.relative_to(root)), None)
-
-    status = str(data.get("status", "UNKNOWN"))
-    msg = str(data.get("message", "") or "").strip() or "No message"
-    ts = str(data.get("ts", "") or None)
-
-    return SandboxStatus(status=status, message=msg, latest_report=str(latest.relative_to(root)), report_ts=ts)
-
-
-def load_gateway_status(root: Path, limit: int = 2000) -> GatewayStatus:
-    tel_path = root / "g" / "telemetry" / "gateway_v3_router.jsonl"
-    if not tel_path.exists():
-        return GatewayStatus(None, None, None, None, 0)
-
-    try:
-        lines = tel_path.read_text().splitlines()
-    except Exception:
-        return GatewayStatus(str(tel_path.relative_to(root)), None, None, "Failed to read telemetry file", 0)
-
-    if not lines:
-        return GatewayStatus(str(tel_path.relative_to(root)), None, None, "No telemetry events logged", 0)
-
-    tail = lines[-limit:]
-    latest_data = None
-    for raw in reversed(tail):
-        raw = raw.strip()
-        if not raw:
-            continue
-        try:
-            obj = json.loads(raw)
-            latest_data = obj
-            break
-        except Exception:
-            continue
-
-    total_events = len(lines)
-    if latest_data is None:
-        return GatewayStatus(str(tel_path.relative_to(root)), None, None, "Failed to parse latest telemetry JSON", total_events)
-
-    return GatewayStatus(
-        telemetry_file=str(tel_path.relative_to(root)),
-        latest_event_ts=str(latest_data.get("ts", "") or None),
-        latest_level=str(latest_data.get("level", "") or None),
-        latest_message=str(latest_data.get("message", "") or None),
-        total_events=total_events,
-    )
-
-
-def load_wo_yaml(path: Path) -> Dict[str, Any]:
-    if yaml is None:
-        return {}
-    try:
-        text = path.read_text()
-        data = yaml.safe_load(text) or {}
-        return data if isinstance(data, dict) else {}
-    except Exception:
-        return {}
-
-
-def extract_wo_status(root: Path) -> List[WorkOrderStatus]:
-    base = root / "bridge" / "outbox" / "CLC"
-    ids = [
-        "WO-20251113-SYSTEM-TRUTH-SYNC.yaml",
-        "WO-20251206-GATEWAY-V3-CORE.yaml",
-        "WO-20251206-SANDBOX-FIX-V1.yaml",
-        "WO-20251206-LOCAL-AGENT-REVIEW-PHASE1.yaml",
-        "WO-TEST-GATEWAY-V3.yaml",
-        "WO-20251206-LAR-GITDROP-SAVECHAIN-V1.yaml",
-    ]
-
-    result: List[WorkOrderStatus] = []
-    for fname in ids:
-        p = base / fname
-        if not safe_under(root, p):
-            continue
-        if not p.exists():
-            result.append(WorkOrderStatus(fname.replace(".yaml", ""), str(p.relative_to(root)), None, None, None, None))
-            continue
-        data = load_wo_yaml(p)
-        status = data.get("status")
-        priority = data.get("priority")
-        owner = data.get("owner") or data.get("assignee")
-        title = data.get("title") or data.get("summary")
-        result.append(
-            WorkOrderStatus(
-                fname.replace(".yaml", ""),
-                str(p.relative_to(root)),
-                str(status) if status is not None else None,
-                str(priority) if priority is not None else None,
-                str(owner) if owner is not None else None,
-                str(title) if title is not None else None,
-            )
-        )
-    return result
-
-
 # ---- Summary + rendering ----
 
-def build_summary(mode: str = "full") -> TruthSyncSummary:
+def build_summary(mode: str = "full", cache: Optional[LineCountCache] = None) -> TruthSyncSummary:
     root = repo_root()
-    sandbox = load_latest_sandbox_report(root)
-    gateway = load_gateway_status(root)
-    wo_list = extract_wo_status(root)
+    sandbox, gateway, wo_list = collect_inputs(root, cache=cache)
     now = datetime.now(timezone.utc).isoformat()
 
     if mode not in {"full", "sandbox", "gateway", "workorders", "core"}:
@@ -332,12 +190,28 @@ def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
         default=str(repo_root() / "02luka.md"),
         help="Target file to update (default: repo_root/02luka.md)",
     )
+    p.add_argument("--watch", action="store_true", help="Re-run only when an input file changes")
+    p.add_argument("--interval", type=float, default=5.0, help="Polling interval for --watch (seconds)")
+    p.add_argument(
+        "--cache",
+        action="store_true",
+        help="Persist the telemetry tail cache to g/cache/truth_sync (default: in-memory only).",
+    )
     return p.parse_args(argv)
 
 
 def main(argv: Optional[List[str]] = None) -> int:
     args = parse_args(argv)
-    summary = build_summary(mode="full" if args.mode == "core" else args.mode)
+    cache = LineCountCache(default_cache_path(repo_root())) if args.cache else LineCountCache()
+
+    if args.watch:
+        watch(repo_root(), lambda: (run_once(args, cache), sys.stdout.flush()), interval=args.interval)
+        return 0
+    return run_once(args, cache)
+
+
+def run_once(args: argparse.Namespace, cache: Optional[LineCountCache] = None) -> int:
+    summary = build_summary(mode="full" if args.mode == "core" else args.mode, cache=cache)
 
     json_obj = {
         "generated_at": summary.generated_at,
@@ -14,13 +14,43 @@ Reads JSONL files from g/telemetry and emits normalized JSONL with a common shap
 }
 
 This keeps observability consistent across sources before reporting.
+
+Normalization is incremental: each source is followed from a checkpoint
+(dev, inode, byte offset, plus the destination size) kept in
+g/cache/telemetry_normalizer/offsets.json, and only records appended since
+the last run are normalized and appended to the destination. Sources are
+processed in parallel; `--follow` keeps tailing them.
+
+Usage:
+  python g/tools/telemetry_normalizer.py
+  python g/tools/telemetry_normalizer.py --follow --interval 2
 """
 
+import argparse
 import json
 import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any, Dict, Iterable, List
+from typing import Any, Dict, List, Optional, Tuple
+
+TOOLS_DIR = Path(__file__).resolve().parent
+if str(TOOLS_DIR) not in sys.path:
+    sys.path.insert(0, str(TOOLS_DIR))
+
+from jsonl_tail import CheckpointStore, JsonlFollower, iter_records  # noqa: E402
+
+# (source file under g/telemetry, writer label)
+TARGETS: List[Tuple[str, str]] = [
+    ("dev_lane_execution.jsonl", "dev_worker"),
+    ("qa_checklists.jsonl", "qa_worker"),
+    ("lac_patterns.jsonl", "rnd_agent"),
+    ("background_tasks.jsonl", "scheduler"),
+    ("rnd_analysis.jsonl", "rnd_agent"),
+    ("governance.jsonl", "governance"),
+]
 
 
 def _parse_ts(raw: Any) -> str:
@@ -38,34 +68,6 @@ def _parse_ts(raw: Any) -> str:
     return datetime.now(timezone.utc).isoformat()
 
 
-def _load_jsonl(path: Path, limit: int = 5000) -> List[Dict[str, Any]]:
-    rows: List[Dict[str, Any]] = []
-    if not path.exists():
-        return rows
-    try:
-        with path.open("r", encoding="utf-8") as handle:
-            for i, line in enumerate(handle):
-                if i >= limit:
-                    break
-                line = line.strip()
-                if not line:
-                    continue
-                try:
-                    rows.append(json.loads(line))
-                except json.JSONDecodeError:
-                    continue
-    except OSError:
-        return rows
-    return rows
-
-
-def _write_jsonl(path: Path, rows: Iterable[Dict[str, Any]]) -> None:
-    path.parent.mkdir(parents=True, exist_ok=True)
-    with path.open("w", encoding="utf-8") as handle:
-        for row in rows:
-            handle.write(json.dumps(row) + "\n")
-
-
 def normalize_record(row: Dict[str, Any], source: str) -> Dict[str, Any]:
     lane = row.get("lane") or row.get("routing_hint") or "unknown"
     writer = row.get("writer") or row.get("source") or source
@@ -90,32 +92,115 @@ def normalize_record(row: Dict[str, Any], source: str) -> Dict[str, Any]:
     }
 
 
-def normalize_file(src: Path, dest: Path, source_label: str) -> Dict[str, Any]:
-    rows = _load_jsonl(src)
-    normalized = [normalize_record(r, source_label) for r in rows]
-    _write_jsonl(dest, normalized)
-    return {"status": "success", "count": len(normalized), "source": str(src), "dest": str(dest)}
-
+def default_checkpoint_path(base_dir: Path) -> Path:
+    return base_dir / "g" / "cache" / "telemetry_normalizer" / "offsets.json"
+
+
+def normalize_file(
+    src: Path,
+    dest: Path,
+    source_label: str,
+    store: Optional[CheckpointStore] = None,
+    follower: Optional[JsonlFollower] = None,
+) -> Dict[str, Any]:
+    """
+    Normalize records appended to src since its checkpoint and append them to dest.
+
+    Without a checkpoint (or when dest has gone missing) src is normalized from
+    the start and dest is rewritten. A dest that grew past its checkpointed
+    size (crash between append and checkpoint) is truncated back first, so
+    rows are never duplicated. `count` is the number of newly written rows.
+    """
+    key = str(src)
+    follower = follower or JsonlFollower(src, store, key=key)
+    saved = store.get(key) if store is not None else None
+    fresh = saved is None or not dest.exists()
+    if fresh:
+        follower.reset()
+    elif dest.stat().st_size > int(saved.get("dest_offset", 0)):
+        os.truncate(dest, int(saved.get("dest_offset", 0)))
+
+    dest.parent.mkdir(parents=True, exist_ok=True)
+    count = 0
+    with dest.open("wb" if fresh else "ab") as out:
+        for row in iter_records(follower.iter_new_lines()):
+            if not isinstance(row, dict):
+                continue
+            out.write((json.dumps(normalize_record(row, source_label)) + "\n").encode("utf-8"))
+            count += 1
+        dest_offset = out.tell()
+
+    if store is not None:
+        store.put(key, {**follower.state, "dest_offset": dest_offset})
+    return {"status": "success", "count": count, "source": str(src), "dest": str(dest)}
+
+
+class TelemetryNormalizer:
+    """
+    Normalizes every TARGETS source in parallel, resuming from saved checkpoints.
+
+    Followers are kept between run_once() calls so --follow mode does not
+    re-validate checkpoints against disk on every cycle.
+    """
+
+    def __init__(
+        self,
+        base_dir: Path,
+        checkpoint_path: Optional[Path] = None,
+        targets: Optional[List[Tuple[str, str]]] = None,
+        max_workers: Optional[int] = None,
+    ) -> None:
+        self.telemetry_dir = base_dir / "g" / "telemetry"
+        self.out_dir = self.telemetry_dir / "normalized"
+        self.store = CheckpointStore(checkpoint_path or default_checkpoint_path(base_dir))
+        self.targets = list(targets or TARGETS)
+        self.max_workers = max_workers or len(self.targets) or 1
+        self._followers: Dict[str, JsonlFollower] = {}
+
+    def _normalize_target(self, filename: str, label: str) -> Dict[str, Any]:
+        src = self.telemetry_dir / filename
+        follower = self._followers.get(filename)
+        if follower is None:
+            follower = self._followers[filename] = JsonlFollower(src, self.store, key=str(src))
+        return normalize_file(src, self.out_dir / filename, label, store=self.store, follower=follower)
+
+    def run_once(self) -> List[Dict[str, Any]]:
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="normalize") as pool:
+            futures = [pool.submit(self._normalize_target, filename, label) for filename, label in self.targets]
+            results = [f.result() for f in futures]
+        self.store.save()
+        return results
+
+    def follow(self, interval: float = 2.0, max_cycles: Optional[int] = None) -> int:
+        """Tail all sources until interrupted (or max_cycles); returns rows written."""
+        written = 0
+        cycles = 0
+        try:
+            while max_cycles is None or cycles < max_cycles:
+                written += sum(r["count"] for r in self.run_once())
+                cycles += 1
+                if max_cycles is None or cycles < max_cycles:
+                    time.sleep(interval)
+        except KeyboardInterrupt:
+            self.store.save()
+        return written
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Normalize LAC telemetry JSONL incrementally")
+    parser.add_argument("--follow", action="store_true", help="Keep tailing sources and append new records")
+    parser.add_argument("--interval", type=float, default=2.0, help="Seconds between --follow cycles (default: 2)")
+    parser.add_argument("--checkpoint", type=Path, default=None, help="Offset checkpoint file")
+    args = parser.parse_args(argv)
 
-def main() -> None:
     base_dir = Path(os.getenv("LAC_BASE_DIR") or Path.cwd())
-    telemetry_dir = base_dir / "g" / "telemetry"
-    out_dir = telemetry_dir / "normalized"
-
-    targets = [
-        ("dev_lane_execution.jsonl", "dev_worker"),
-        ("qa_checklists.jsonl", "qa_worker"),
-        ("lac_patterns.jsonl", "rnd_agent"),
-        ("background_tasks.jsonl", "scheduler"),
-        ("rnd_analysis.jsonl", "rnd_agent"),
-        ("governance.jsonl", "governance"),
-    ]
-
-    for filename, label in targets:
-        src = telemetry_dir / filename
-        dest = out_dir / filename
-        normalize_file(src, dest, label)
+    normalizer = TelemetryNormalizer(base_dir, checkpoint_path=args.checkpoint)
+    if args.follow:
+        normalizer.follow(interval=args.interval)
+    else:
+        normalizer.run_once()
+    return 0
 
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
@@ -0,0 +1,313 @@
+#!/usr/bin/env python3
+"""
+truth_sync_inputs.py
+
+Shared input collectors for system_truth_sync_p0.py / system_truth_sync_p1.py.
+
+- Sandbox health reports: g/sandbox/os_l0_l1/logs/liam_reports/health_*.json
+- Gateway v3 router telemetry: g/telemetry/gateway_v3_router.jsonl
+- Key Work Orders: bridge/outbox/CLC/WO-*.yaml
+
+Telemetry is never read in full (see jsonl_tail.py):
+- the line count is cached by (dev, inode, size) in g/cache/truth_sync/tail_cache.json
+  and extended by counting only the bytes appended since the last run
+- the latest event is found by reading the file backwards in blocks
+
+Both phases use the same cache file, so P1 after P0 (or repeated --watch
+cycles) only touch new telemetry bytes. The cache is best-effort: any read or
+write failure falls back to a plain count.
+"""
+
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from jsonl_tail import LineCountCache, file_signature, last_json_line
+
+try:
+    import yaml  # type: ignore
+except Exception:  # pragma: no cover
+    yaml = None  # will handle later
+
+
+# ---- Path helpers ----
+
+def repo_root() -> Path:
+    # This file: /02luka/g/tools/truth_sync_inputs.py
+    # parents[0] = tools, [1] = g, [2] = 02luka
+    return Path(__file__).resolve().parents[2]
+
+
+def safe_under(root: Path, p: Path) -> bool:
+    """Return True if p is inside root (or equal)."""
+    try:
+        return p.resolve().is_relative_to(root.resolve())  # py3.11+
+    except AttributeError:  # fallback
+        rp = p.resolve()
+        rr = root.resolve()
+        return rp == rr or rr in rp.parents
+
+
+def default_cache_path(root: Path) -> Path:
+    return root / "g" / "cache" / "truth_sync" / "tail_cache.json"
+
+
+# ---- Data models ----
+
+@dataclass
+class SandboxStatus:
+    status: str  # "GREEN" | "RED" | "UNKNOWN"
+    message: str
+    latest_report: Optional[str]
+    report_ts: Optional[str]
+
+
+@dataclass
+class GatewayStatus:
+    telemetry_file: Optional[str]
+    latest_event_ts: Optional[str]
+    latest_level: Optional[str]
+    latest_message: Optional[str]
+    total_events: int
+
+
+@dataclass
+class WorkOrderStatus:
+    id: str
+    path: str
+    status: Optional[str]
+    priority: Optional[str]
+    owner: Optional[str]
+    title: Optional[str]
+
+
+KEY_WORK_ORDERS = [
+    "WO-20251113-SYSTEM-TRUTH-SYNC.yaml",
+    "WO-20251206-GATEWAY-V3-CORE.yaml",
+    "WO-20251206-SANDBOX-FIX-V1.yaml",
+    "WO-20251206-LOCAL-AGENT-REVIEW-PHASE1.yaml",
+    "WO-TEST-GATEWAY-V3.yaml",
+    "WO-20251206-LAR-GITDROP-SAVECHAIN-V1.yaml",
+]
+
+
+# ---- Loaders ----
+
+def load_latest_sandbox_report(root: Path) -> SandboxStatus:
+    reports_dir = root / "g" / "sandbox" / "os_l0_l1" / "logs" / "liam_reports"
+    if not reports_dir.exists():
+        return SandboxStatus(
+            status="UNKNOWN",
+            message="No sandbox health reports found",
+            latest_report=None,
+            report_ts=None,
+        )
+
+    json_files = sorted(
+        reports_dir.glob("health_*.json"),
+        key=lambda p: p.stat().st_mtime,
+    )
+    if not json_files:
+        return SandboxStatus(
+            status="UNKNOWN",
+            message="No sandbox health reports found",
+            latest_report=None,
+            report_ts=None,
+        )
+
+    latest = json_files[-1]
+    try:
+        data = json.loads(latest.read_text())
+    except Exception as e:
+        return SandboxStatus(
+            status="UNKNOWN",
+            message=f"Failed to parse latest report: {e}",
+            latest_report=str(latest.relative_to(root)),
+            report_ts=None,
+        )
+
+    status = str(data.get("status", "UNKNOWN"))
+    msg = str(data.get("message", "") or "").strip() or "No message"
+    ts = str(data.get("ts", "") or None)
+
+    return SandboxStatus(
+        status=status,
+        message=msg,
+        latest_report=str(latest.relative_to(root)),
+        report_ts=ts,
+    )
+
+
+def load_gateway_status(root: Path, limit: int = 2000, cache: Optional[LineCountCache] = None) -> GatewayStatus:
+    tel_path = root / "g" / "telemetry" / "gateway_v3_router.jsonl"
+    if not tel_path.exists():
+        return GatewayStatus(
+            telemetry_file=None,
+            latest_event_ts=None,
+            latest_level=None,
+            latest_message=None,
+            total_events=0,
+        )
+
+    # Count lines incrementally and scan only the tail (last N lines) for the latest event
+    cache = cache or LineCountCache()
+    try:
+        total_events = cache.line_count(tel_path)
+        latest_data = last_json_line(tel_path, limit) if total_events else None
+    except Exception:
+        return GatewayStatus(
+            telemetry_file=str(tel_path.relative_to(root)),
+            latest_event_ts=None,
+            latest_level=None,
+            latest_message="Failed to read telemetry file",
+            total_events=0,
+        )
+
+    if not total_events:
+        return GatewayStatus(
+            telemetry_file=str(tel_path.relative_to(root)),
+            latest_event_ts=None,
+            latest_level=None,
+            latest_message="No telemetry events logged",
+            total_events=0,
+        )
+
+    if latest_data is None or not isinstance(latest_data, dict):
+        return GatewayStatus(
+            telemetry_file=str(tel_path.relative_to(root)),
+            latest_event_ts=None,
+            latest_level=None,
+            latest_message="Failed to parse latest telemetry JSON",
+            total_events=total_events,
+        )
+
+    return GatewayStatus(
+        telemetry_file=str(tel_path.relative_to(root)),
+        latest_event_ts=str(latest_data.get("ts", "") or None),
+        latest_level=str(latest_data.get("level", "") or None),
+        latest_message=str(latest_data.get("message", "") or None),
+        total_events=total_events,
+    )
+
+
+def load_wo_yaml(path: Path) -> Dict[str, Any]:
+    if yaml is None:
+        return {}
+    try:
+        text = path.read_text()
+        data = yaml.safe_load(text) or {}
+        if not isinstance(data, dict):
+            return {}
+        return data
+    except Exception:
+        return {}
+
+
+def extract_wo_status(root: Path) -> List[WorkOrderStatus]:
+    """
+    Focus on key WOs we care about right now.
+    If a file is missing, still report it with status=None.
+    """
+    base = root / "bridge" / "outbox" / "CLC"
+
+    result: List[WorkOrderStatus] = []
+    for fname in KEY_WORK_ORDERS:
+        p = base / fname
+        if not safe_under(root, p):
+            continue
+
+        if not p.exists():
+            result.append(
+                WorkOrderStatus(
+                    id=fname.replace(".yaml", ""),
+                    path=str(p.relative_to(root)),
+                    status=None,
+                    priority=None,
+                    owner=None,
+                    title=None,
+                )
+            )
+            continue
+
+        data = load_wo_yaml(p)
+        status = data.get("status")
+        priority = data.get("priority")
+        owner = data.get("owner") or data.get("assignee")
+        title = data.get("title") or data.get("summary")
+
+        result.append(
+            WorkOrderStatus(
+                id=fname.replace(".yaml", ""),
+                path=str(p.relative_to(root)),
+                status=str(status) if status is not None else None,
+                priority=str(priority) if priority is not None else None,
+                owner=str(owner) if owner is not None else None,
+                title=str(title) if title is not None else None,
+            )
+        )
+
+    return result
+
+
+# ---- Collection ----
+
+def collect_inputs(
+    root: Path, cache: Optional[LineCountCache] = None
+) -> Tuple[SandboxStatus, GatewayStatus, List[WorkOrderStatus]]:
+    """Run the independent collectors concurrently (I/O bound) and persist the tail cache."""
+    with ThreadPoolExecutor(max_workers=3, thread_name_prefix="truth-sync") as pool:
+        sandbox = pool.submit(load_latest_sandbox_report, root)
+        gateway = pool.submit(load_gateway_status, root, cache=cache)
+        work_orders = pool.submit(extract_wo_status, root)
+        result = (sandbox.result(), gateway.result(), work_orders.result())
+    if cache is not None:
+        cache.save()
+    return result
+
+
+def input_signature(root: Path) -> Tuple[Any, ...]:
+    """Cheap stat-only fingerprint of every collector input."""
+    reports_dir = root / "g" / "sandbox" / "os_l0_l1" / "logs" / "liam_reports"
+    reports = []
+    if reports_dir.exists():
+        reports = sorted((str(p), file_signature(p)) for p in reports_dir.glob("health_*.json"))
+    tel_path = root / "g" / "telemetry" / "gateway_v3_router.jsonl"
+    base = root / "bridge" / "outbox" / "CLC"
+    return (
+        tuple(reports),
+        file_signature(tel_path),
+        tuple(file_signature(base / fname) for fname in KEY_WORK_ORDERS),
+    )
+
+
+def watch(
+    root: Path,
+    on_change: Callable[[], None],
+    interval: float = 5.0,
+    max_cycles: Optional[int] = None,
+) -> int:
+    """
+    Call on_change() once, then again only when input_signature() changes.
+
+    Polls every `interval` seconds until interrupted (or max_cycles polls).
+    Returns the number of on_change() calls.
+    """
+    last = input_signature(root)
+    on_change()
+    renders = 1
+    cycles = 0
+    try:
+        while max_cycles is None or cycles < max_cycles:
+            time.sleep(interval)
+            cycles += 1
+            current = input_signature(root)
+            if current != last:
+                last = current
+                on_change()
+                renders += 1
+    except KeyboardInterrupt:
+        pass
+    return renders
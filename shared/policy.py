@@ -1,13 +1,20 @@
 """
 Shared Policy Module - Single Source of Truth for Write Permissions.
 Used by: dev_oss, dev_gmxcli, qa_v4, docs_v4, clc_local.
+
+WritePolicy resolves the base directory once and matches paths against
+component tries of the forbidden fragments and allowed roots. The module-level
+functions use a policy cached per LAC_BASE_DIR (or cwd). check_many() /
+apply_patches() validate a batch, resolving each parent directory once, and
+write with one directory fsync per directory.
 """
 
 from __future__ import annotations
 
 import os
+import threading
 from pathlib import Path
-from typing import Tuple
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
 
 
 FORBIDDEN_PATHS = [
@@ -32,65 +39,261 @@ ALLOWED_ROOTS = [
 ]
 
 
+class _ComponentTrie:
+    """Path-component trie; terminal nodes carry the index of the pattern that ends there."""
+
+    _END = "\0end"
+
+    def __init__(self, patterns: Sequence[str]):
+        self.patterns = [p.rstrip("/").replace("\\", "/") for p in patterns]
+        self.root: Dict[str, dict] = {}
+        for index, pattern in enumerate(self.patterns):
+            node = self.root
+            for part in pattern.split("/"):
+                node = node.setdefault(part, {})
+            node.setdefault(self._END, index)
+
+    def prefix_match(self, parts: Sequence[str], start: int = 0) -> Optional[int]:
+        """Lowest pattern index that is a component prefix of parts[start:], if any."""
+        node = self.root
+        best: Optional[int] = None
+        for part in parts[start:]:
+            node = node.get(part)
+            if node is None:
+                break
+            index = node.get(self._END)
+            if index is not None and (best is None or index < best):
+                best = index
+        return best
+
+    def search(self, parts: Sequence[str]) -> Optional[int]:
+        """Lowest pattern index occurring as a contiguous run of components anywhere in parts."""
+        best: Optional[int] = None
+        for start in range(len(parts)):
+            index = self.prefix_match(parts, start)
+            if index is not None and (best is None or index < best):
+                best = index
+        return best
+
+
+class WritePolicy:
+    """
+    Write permission checks against one base directory.
+
+    A path is blocked if any run of its components (relative to the base)
+    equals a FORBIDDEN_PATHS entry, and allowed only under an ALLOWED_ROOTS
+    entry at a component boundary (g/srcfoo does not match g/src).
+    """
+
+    def __init__(
+        self,
+        base_dir: Optional[Path] = None,
+        forbidden: Sequence[str] = FORBIDDEN_PATHS,
+        allowed: Sequence[str] = ALLOWED_ROOTS,
+    ):
+        self.base_dir = Path(base_dir).resolve() if base_dir is not None else _get_base_dir()
+        self._forbidden = _ComponentTrie(forbidden)
+        self._allowed = _ComponentTrie(allowed)
+
+    def normalize(self, file_path: str, dir_cache: Optional[Dict[Path, Path]] = None) -> Path:
+        """
+        Resolve a file path against the base directory to prevent traversal.
+
+        With dir_cache, each parent directory is resolved once per batch; the
+        file itself is still checked for being a symlink.
+        """
+        target = Path(file_path)
+        if not target.is_absolute():
+            target = self.base_dir / target
+        if dir_cache is None or target.name in ("", ".", "..") or target.is_symlink():
+            return target.resolve()
+        parent = target.parent
+        resolved = dir_cache.get(parent)
+        if resolved is None:
+            resolved = dir_cache[parent] = parent.resolve()
+        return resolved / target.name
+
+    def check_resolved(self, normalized: Path) -> Tuple[bool, str]:
+        try:
+            relative_path = normalized.relative_to(self.base_dir)
+        except ValueError:
+            return False, "PATH_OUTSIDE_BASE"
+
+        parts = relative_path.parts
+        forbidden = self._forbidden.search(parts)
+        if forbidden is not None:
+            return False, f"FORBIDDEN_PATH: {self._forbidden.patterns[forbidden]}"
+
+        if self._allowed.prefix_match(parts) is not None:
+            return True, "ALLOWED"
+        return False, "PATH_NOT_IN_ALLOWED_ROOTS"
+
+    def check(self, file_path: str, dir_cache: Optional[Dict[Path, Path]] = None) -> Tuple[bool, str]:
+        """Check if file write is allowed per policy."""
+        try:
+            normalized = self.normalize(file_path, dir_cache)
+        except (OSError, RuntimeError, ValueError):
+            return False, "INVALID_PATH"
+        return self.check_resolved(normalized)
+
+    def check_many(self, file_paths: Iterable[str]) -> List[Tuple[bool, str, Optional[Path]]]:
+        """check() for a batch; returns (allowed, reason, resolved path or None) per path."""
+        dir_cache: Dict[Path, Path] = {}
+        results: List[Tuple[bool, str, Optional[Path]]] = []
+        for file_path in file_paths:
+            try:
+                normalized = self.normalize(file_path, dir_cache)
+            except (OSError, RuntimeError, ValueError):
+                results.append((False, "INVALID_PATH", None))
+                continue
+            allowed, reason = self.check_resolved(normalized)
+            results.append((allowed, reason, normalized))
+        return results
+
+    def apply_patches(
+        self,
+        patches: Iterable[Tuple[str, str]],
+        dry_run: bool = False,
+        stop_on_error: bool = False,
+        fsync: bool = True,
+    ) -> List[dict]:
+        """
+        Validate and write a batch of (file_path, content) pairs.
+
+        Returns one apply_patch()-style result per patch, in order. Each file
+        is written to a temp file and os.replace()d into place; with fsync,
+        file data is synced per file and each touched directory once at the
+        end. stop_on_error stops at the first blocked or failed patch (later
+        patches are neither written nor reported).
+        """
+        patches = list(patches)
+        checks = self.check_many(path for path, _ in patches)
+        results: List[dict] = []
+        touched_dirs: Dict[Path, None] = {}
+        made_dirs: set = set()
+        try:
+            for (file_path, content), (allowed, reason, target_path) in zip(patches, checks):
+                if not allowed:
+                    results.append({"status": "blocked", "reason": reason, "file": file_path})
+                    if stop_on_error:
+                        break
+                    continue
+                if dry_run:
+                    results.append({
+                        "status": "dry_run",
+                        "would_write": str(target_path),
+                        "content_length": len(content),
+                    })
+                    continue
+                try:
+                    if target_path.parent not in made_dirs:
+                        target_path.parent.mkdir(parents=True, exist_ok=True)
+                        made_dirs.add(target_path.parent)
+                    _write_replace(target_path, content, fsync)
+                except OSError as exc:
+                    results.append({"status": "error", "reason": str(exc), "file": str(target_path)})
+                    if stop_on_error:
+                        break
+                    continue
+                touched_dirs[target_path.parent] = None
+                results.append({
+                    "status": "success",
+                    "file": str(target_path),
+                    "bytes_written": len(content),
+                })
+        finally:
+            if fsync:
+                for directory in touched_dirs:
+                    _fsync_dir(directory)
+        return results
+
+
+def _write_replace(target_path: Path, content: str, fsync: bool) -> None:
+    tmp_path = target_path.with_name(f".{target_path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        with open(tmp_path, "w", encoding="utf-8") as handle:
+            handle.write(content)
+            if fsync:
+                handle.flush()
+                os.fsync(handle.fileno())
+        os.replace(tmp_path, target_path)
+    except OSError:
+        try:
+            tmp_path.unlink()
+        except OSError:
+            pass
+        raise
+
+
+def _fsync_dir(directory: Path) -> None:
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
 def _get_base_dir() -> Path:
     """Return the base directory for resolving paths."""
     base_dir = os.getenv("LAC_BASE_DIR")
     return Path(base_dir).resolve() if base_dir else Path.cwd().resolve()
 
 
+_policy_lock = threading.Lock()
+_policy_cache: Dict[str, WritePolicy] = {}
+
+
+def get_policy() -> WritePolicy:
+    """Policy for the current LAC_BASE_DIR (or cwd), built once per base."""
+    key = os.getenv("LAC_BASE_DIR") or os.getcwd()
+    policy = _policy_cache.get(key)
+    if policy is None:
+        with _policy_lock:
+            policy = _policy_cache.get(key)
+            if policy is None:
+                policy = _policy_cache[key] = WritePolicy()
+    return policy
+
+
 def _normalize_path(file_path: str) -> Path:
     """
     Resolve a file path against the base directory to prevent traversal.
     """
-    base_dir = _get_base_dir()
-    target = Path(file_path)
-    if not target.is_absolute():
-        target = base_dir / target
-    return target.resolve()
-
-
-def _relative_to_base(normalized_path: Path) -> Tuple[bool, Path | None]:
-    base_dir = _get_base_dir()
-    try:
-        return True, normalized_path.relative_to(base_dir)
-    except ValueError:
-        return False, None
+    return get_policy().normalize(file_path)
 
 
 def check_write_allowed(file_path: str) -> Tuple[bool, str]:
     """Check if file write is allowed per policy."""
-    try:
-        normalized = _normalize_path(file_path)
-    except (OSError, RuntimeError, ValueError):
-        return False, "INVALID_PATH"
+    return get_policy().check(file_path)
 
-    within_base, relative_path = _relative_to_base(normalized)
-    if not within_base or relative_path is None:
-        return False, "PATH_OUTSIDE_BASE"
 
-    parts = list(relative_path.parts)
+def check_many(file_paths: Iterable[str]) -> List[Tuple[bool, str]]:
+    """check_write_allowed() for a batch, resolving each parent directory once."""
+    return [(allowed, reason) for allowed, reason, _ in get_policy().check_many(file_paths)]
 
-    for forbidden in FORBIDDEN_PATHS:
-        fragment = forbidden.rstrip("/").replace("\\", "/")
-        if fragment in parts:
-            return False, f"FORBIDDEN_PATH: {fragment}"
 
-    relative_str = relative_path.as_posix()
-    for allowed in ALLOWED_ROOTS:
-        allowed_path = allowed.rstrip("/").replace("\\", "/")
-        # Check if path starts with allowed root AND has path separator boundary
-        # This prevents prefix collision attacks (e.g., g/srcfoo/ matching g/src/)
-        if relative_str.startswith(allowed_path):
-            # Check boundary: either end of string or path separator follows
-            if len(relative_str) == len(allowed_path) or relative_str[len(allowed_path)] == "/":
-                return True, "ALLOWED"
-
-    return False, "PATH_NOT_IN_ALLOWED_ROOTS"
+def apply_patches(patches: Iterable[Tuple[str, str]], dry_run: bool = False, stop_on_error: bool = False) -> List[dict]:
+    """Validate and write a batch of (file_path, content) pairs; see WritePolicy.apply_patches."""
+    return get_policy().apply_patches(patches, dry_run=dry_run, stop_on_error=stop_on_error)
 
 
 def apply_patch(file_path: str, content: str, dry_run: bool = False) -> dict:
     """Apply patch after policy check."""
-    allowed, reason = check_write_allowed(file_path)
+    policy = get_policy()
+    try:
+        target_path = policy.normalize(file_path)
+    except (OSError, RuntimeError, ValueError):
+        return {
+            "status": "blocked",
+            "reason": "INVALID_PATH",
+            "file": file_path,
+        }
+    allowed, reason = policy.check_resolved(target_path)
 
     if not allowed:
         return {
@@ -99,8 +302,6 @@ def apply_patch(file_path: str, content: str, dry_run: bool = False) -> dict:
             "file": file_path,
         }
 
-    target_path = _normalize_path(file_path)
-
     if dry_run:
         return {
             "status": "dry_run",
@@ -0,0 +1,121 @@
+"""
+Size-bounded LRU cache with a per-entry TTL.
+
+Shared by the Kim Gateway proxy (tools/kim_proxy.py) and the async hybrid
+router (agents/ai_manager/hybrid_router.py).
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+LOGGER = logging.getLogger(__name__)
+
+
+class TTLCache:
+    """
+    Thread-safe LRU cache whose entries expire `ttl` seconds after insertion.
+
+    Expired entries are dropped on read and by an optional background
+    sweeper thread, so memory stays bounded even for keys never read again.
+    max_entries <= 0 disables storing.
+    """
+
+    def __init__(self, max_entries: int, ttl: float, sweep_interval: float = 0, name: str = "ttl-cache") -> None:
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.sweep_interval = sweep_interval
+        self.name = name
+        self._entries: "OrderedDict[str, Tuple[Any, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._sweeper: Optional[threading.Thread] = None
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return a live entry (refreshing its LRU position) or None."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            value, expires_at = entry
+            if now >= expires_at:
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: str, value: Any) -> None:
+        """Insert an entry, evicting least-recently-used ones over capacity."""
+        if self.max_entries <= 0:
+            return
+        expires_at = time.monotonic() + self.ttl
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def sweep(self) -> int:
+        """Drop all expired entries; returns the number removed."""
+        now = time.monotonic()
+        with self._lock:
+            expired = [k for k, (_, exp) in self._entries.items() if now >= exp]
+            for key in expired:
+                del self._entries[key]
+            self.expirations += len(expired)
+        return len(expired)
+
+    def clear(self) -> int:
+        with self._lock:
+            size = len(self._entries)
+            self._entries.clear()
+        return size
+
+    def start_sweeper(self) -> None:
+        """Start the background sweeper thread (no-op if interval <= 0)."""
+        if self.sweep_interval <= 0 or self._sweeper is not None:
+            return
+        self._stop.clear()
+        self._sweeper = threading.Thread(target=self._sweep_loop, name=f"{self.name}-sweeper", daemon=True)
+        self._sweeper.start()
+
+    def stop_sweeper(self) -> None:
+        self._stop.set()
+        if self._sweeper is not None:
+            self._sweeper.join(timeout=1)
+            self._sweeper = None
+
+    def _sweep_loop(self) -> None:
+        while not self._stop.wait(self.sweep_interval):
+            removed = self.sweep()
+            if removed:
+                LOGGER.debug("%s sweeper removed %d expired entries", self.name, removed)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "cache_size": len(self._entries),
+                "cache_max_entries": self.max_entries,
+                "cache_hits": self.hits,
+                "cache_misses": self.misses,
+                "cache_evictions": self.evictions,
+                "cache_expirations": self.expirations,
+            }
@@ -3,6 +3,7 @@ from pathlib import Path
 
 import pytest
 
+from shared import policy
 from shared.policy import apply_patch, check_write_allowed
 from agents.clc_local.policy import check_file_allowed
 
@@ -137,3 +138,58 @@ class TestApplyPatch:
         allowed, reason = check_write_allowed(str(outside))
         assert not allowed
         assert "OUTSIDE_BASE" in reason
+
+
+class TestBatchPolicy:
+    PATHS = [
+        "g/docs/a.md",
+        "g/docs/b.md",
+        "g/docs/sub/c.md",
+        ".git/config",
+        "g/src/.env",
+        "g/srcfoo/x.py",
+        "../outside.py",
+        "tests/t.py",
+        "g/src/config/secure/key.txt",
+    ]
+
+    def test_check_many_matches_single_checks(self):
+        batch = policy.check_many(self.PATHS)
+        assert batch == [check_write_allowed(p) for p in self.PATHS]
+        assert batch[-1] == (False, "FORBIDDEN_PATH: config/secure")
+
+    def test_batch_resolves_each_directory_once(self, monkeypatch):
+        policy.get_policy()
+        calls = []
+        original = Path.resolve
+        monkeypatch.setattr(Path, "resolve", lambda self, *a, **k: calls.append(self) or original(self, *a, **k))
+        paths = [f"g/docs/page_{i}.md" for i in range(100)]
+        assert all(allowed for allowed, _ in policy.check_many(paths))
+        assert len(calls) == 1
+
+    def test_symlinked_directory_escape_blocked(self, set_base_dir, tmp_path_factory):
+        outside = tmp_path_factory.mktemp("outside")
+        (set_base_dir / "g").mkdir()
+        (set_base_dir / "g" / "docs").symlink_to(outside, target_is_directory=True)
+        assert policy.check_many(["g/docs/a.md"]) == [(False, "PATH_OUTSIDE_BASE")]
+
+    def test_apply_patches_writes_and_fsyncs_each_directory_once(self, set_base_dir, monkeypatch):
+        synced = []
+        monkeypatch.setattr(policy, "_fsync_dir", synced.append)
+        results = policy.apply_patches([
+            ("g/docs/a.md", "A"),
+            ("g/docs/b.md", "B"),
+            (".git/config", "no"),
+            ("tests/t.py", "T"),
+        ])
+        assert [r["status"] for r in results] == ["success", "success", "blocked", "success"]
+        assert (set_base_dir / "g/docs/b.md").read_text() == "B"
+        assert sorted(synced) == [set_base_dir / "g/docs", set_base_dir / "tests"]
+        assert not list((set_base_dir / "g/docs").glob(".*.tmp"))
+
+    def test_apply_patches_stop_on_error(self, set_base_dir):
+        results = policy.apply_patches(
+            [("g/docs/a.md", "A"), ("secrets/k", "no"), ("g/docs/c.md", "C")], stop_on_error=True
+        )
+        assert [r["status"] for r in results] == ["success", "blocked"]
+        assert not (set_base_dir / "g/docs/c.md").exists()
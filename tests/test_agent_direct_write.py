@@ -57,3 +57,26 @@ def test_dev_gmxcli_execute_task_pipeline():
     assert result["status"] == "success"
     assert result["self_applied"] is True
     assert len(result["files_touched"]) == 2
+
+
+def test_docs_execute_task_writes_batch_through_worker_hook():
+    batches = []
+
+    class RecordingDocsWorker(DocsWorkerV4):
+        def self_write_many(self, writes, stop_on_error=True):
+            batches.append([path for path, _ in writes])
+            return super().self_write_many(writes, stop_on_error=stop_on_error)
+
+    task = {
+        "patches": [
+            {"file": "g/docs/a.md", "content": "# a\n"},
+            {"file": "g/docs/b.md", "content": "# b\n"},
+            {"file": "g/docs/empty.md", "content": ""},
+            {"file": "g/docs/c.md", "content": "# c\n"},
+        ]
+    }
+    result = RecordingDocsWorker().execute_task(task)
+    assert batches == [["g/docs/a.md", "g/docs/b.md"]]
+    assert result["status"] == "failed"
+    assert result["reason"] == "MISSING_OR_EMPTY_CONTENT"
+    assert [r["status"] for r in result["partial_results"]] == ["success", "success", "failed"]
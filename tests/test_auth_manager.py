@@ -0,0 +1,103 @@
+import asyncio
+import json
+import os
+
+import pytest
+
+from core.auth import AuthManager, JsonUserStore
+from core.auth import manager as auth_manager
+
+
+@pytest.fixture(params=["users.json", "users.db"])
+def db_path(request, tmp_path):
+    return str(tmp_path / request.param)
+
+
+def test_sync_and_async_paths_agree(db_path):
+    auth = AuthManager(db_path=db_path, max_workers=2)
+    try:
+        assert auth.register("alice", "Password123!")
+        assert not auth.register("alice", "other")
+        assert asyncio.run(auth.register_async("bob", "Secret456!", role="admin"))
+        assert not asyncio.run(auth.register_async("bob", "x"))
+
+        assert auth.login("bob", "Secret456!") and not auth.login("bob", "wrong")
+        assert asyncio.run(auth.login_async("alice", "Password123!"))
+        assert not asyncio.run(auth.login_async("alice", "wrong"))
+        assert not asyncio.run(auth.login_async("nobody", "Password123!"))
+
+        assert auth.get_role("bob") == "admin"
+        assert auth.promote_user("alice", "manager") and auth.get_role("alice") == "manager"
+        assert auth.list_users() == ["alice", "bob"]
+        assert auth.delete_user("bob") and not auth.delete_user("bob")
+        assert AuthManager(db_path=db_path).list_users() == ["alice"]
+    finally:
+        auth.close()
+
+
+def test_login_does_not_block_event_loop(tmp_path, monkeypatch):
+    auth = AuthManager(db_path=str(tmp_path / "users.json"), max_workers=2)
+    auth.register("carol", "Password123!")
+    monkeypatch.setattr(auth_manager, "PBKDF2_ITERATIONS", 400000)
+
+    async def scenario():
+        ticks = 0
+        done = asyncio.Event()
+
+        async def ticker():
+            nonlocal ticks
+            while not done.is_set():
+                ticks += 1
+                await asyncio.sleep(0.005)
+
+        task = asyncio.create_task(ticker())
+        # Stored hash used 100k iterations, so these fail, but only after hashing
+        results = await asyncio.gather(*(auth.login_async("carol", "Password123!") for _ in range(4)))
+        done.set()
+        await task
+        return results, ticks
+
+    try:
+        results, ticks = asyncio.run(scenario())
+    finally:
+        auth.close()
+    assert results == [False] * 4
+    assert ticks > 3
+
+
+def test_json_index_reloads_only_when_file_changes(tmp_path, monkeypatch):
+    path = tmp_path / "users.json"
+    store = JsonUserStore(str(path))
+    assert store.add("dave", {"salt": "00", "password_hash": "11", "role": "user"})
+
+    parses = []
+    original = json.load
+    monkeypatch.setattr(json, "load", lambda f: parses.append(1) or original(f))
+    for _ in range(5):
+        assert store.get("dave")["role"] == "user"
+    assert parses == []
+
+    # Another writer replaces the file
+    path.write_text(json.dumps({"users": {"erin": {"salt": "00", "password_hash": "22"}}}))
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+    assert store.get("dave") is None and store.get("erin") is not None
+    assert parses == [1]
+
+
+def test_new_sqlite_store_imports_sibling_json_users(tmp_path):
+    json_auth = AuthManager(db_path=str(tmp_path / "users.json"), max_workers=1)
+    try:
+        assert json_auth.register("frank", "Password123!", role="admin")
+    finally:
+        json_auth.close()
+
+    auth = AuthManager(db_path=str(tmp_path / "users.db"), max_workers=1)
+    try:
+        assert auth.list_users() == ["frank"]
+        assert auth.login("frank", "Password123!") and auth.get_role("frank") == "admin"
+        assert auth.delete_user("frank")
+    finally:
+        auth.close()
+    # Only a newly created table is seeded; deleted users stay deleted
+    assert AuthManager(db_path=str(tmp_path / "users.db")).list_users() == []
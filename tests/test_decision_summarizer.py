@@ -0,0 +1,45 @@
+import random
+import re
+
+import decision_summarizer as ds
+
+
+def _legacy_match(text):
+    hits = []
+    for rule in ds.RULE_TABLE:
+        matched = [p for p in rule["if_any"] if re.search(p, text, flags=re.IGNORECASE)]
+        if matched:
+            hits.append((rule["rule_id"], rule, matched))
+    return hits
+
+
+WORDS = (
+    "rm -rf sudo chmod +x write the file overwrite config api_key token .env vault "
+    "strategy design trade-off multi-step choose summarize rewrite format table "
+    "hello world plist patch repo ssh key private key depends on Delete LaunchAgent"
+).split()
+
+
+def test_compiled_matcher_matches_per_pattern_search():
+    rng = random.Random(7)
+    texts = ["", "   ", "sudo write config", "rewrite the file", "API-KEY in .env"]
+    texts += [" ".join(rng.choice(WORDS) for _ in range(rng.randint(0, 14))) for _ in range(3000)]
+    for text in texts:
+        assert ds._match_rules(text) == _legacy_match(text), text
+
+
+def test_summary_picks_highest_risk():
+    s = ds.summarize_decision("sudo delete the config file and rotate the api_key")
+    assert s.risk == "critical"
+    assert s.route_hint == "secure_lane"
+    assert s.matched_rules == ["R1_EXEC_OR_FS_MUTATION", "R2_SECRETS_OR_CREDENTIALS", "R5_DEFAULT"]
+    assert "R1_EXEC_OR_FS_MUTATION: matched 2 pattern(s)" in s.rationale
+
+
+def test_summarize_many_matches_inline(monkeypatch):
+    monkeypatch.setattr(ds, "PARALLEL_THRESHOLD", 10)
+    texts = ["summarize this", "sudo chmod +x x.sh", "pick a strategy", "hello"] * 10
+    pooled = ds.summarize_many(texts, processes=2, chunk_size=7)
+    inline = [ds.summarize_decision(t) for t in texts]
+    strip = lambda s: {**s.to_dict(), "ts": 0}  # noqa: E731
+    assert [strip(s) for s in pooled] == [strip(s) for s in inline]
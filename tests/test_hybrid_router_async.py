@@ -0,0 +1,169 @@
+import asyncio
+import json
+import threading
+import time
+
+import pytest
+
+import agents.ai_manager.hybrid_router as hr
+from agents.docs_v4.docs_worker import DocsWorkerV4
+
+
+@pytest.fixture
+def router(monkeypatch, tmp_path):
+    monkeypatch.setenv("LAC_BASE_DIR", str(tmp_path))
+    r = hr.AsyncHybridRouter(hedge_after_s=0.05)
+    yield r
+    r.close()
+
+
+def test_internal_draft_matches_sync_router(router, monkeypatch):
+    monkeypatch.setattr(hr, "_call_gg", lambda text, ctx: f"GG:{text}")
+    monkeypatch.setattr(hr, "_call_local", lambda text, ctx: f"LOCAL:{text}")
+    ctx = {"mode": "draft", "project_id": "PD17"}
+    text, meta = asyncio.run(router.route("hello", ctx))
+    sync_text, sync_meta = hr.hybrid_route_text("hello", ctx)
+    assert text == sync_text == "GG:hello"
+    assert meta["engine_used"] == sync_meta["engine_used"] == hr.ENGINE_GG
+    assert meta["fallback"] is False and meta["hedged"] is False
+
+
+def test_slow_gg_is_hedged_with_local(router, monkeypatch):
+    release = threading.Event()
+
+    def slow_gg(text, ctx):
+        release.wait(2)
+        return f"GG:{text}"
+
+    monkeypatch.setattr(hr, "_call_gg", slow_gg)
+    monkeypatch.setattr(hr, "_call_local", lambda text, ctx: f"LOCAL:{text}")
+    start = time.perf_counter()
+    text, meta = asyncio.run(router.route("hello", {"mode": "draft"}))
+    release.set()
+    assert time.perf_counter() - start < 1
+    assert text == "LOCAL:hello"
+    assert meta["engine_used"] == hr.ENGINE_LOCAL
+    assert meta["hedged"] is True and meta["fallback"] is True
+
+
+def test_gg_failure_falls_back_to_local(router, monkeypatch):
+    def broken_gg(text, ctx):
+        raise RuntimeError("down")
+
+    monkeypatch.setattr(hr, "_call_gg", broken_gg)
+    monkeypatch.setattr(hr, "_call_local", lambda text, ctx: f"LOCAL:{text}")
+    text, meta = asyncio.run(router.route("hello", {"mode": "analysis"}))
+    assert text == "LOCAL:hello"
+    assert meta["error"] == "gg_error: down"
+
+
+def test_high_sensitivity_never_hedges_to_gg(router, monkeypatch):
+    calls = []
+
+    def slow_local(text, ctx):
+        time.sleep(0.2)
+        return f"LOCAL:{text}"
+
+    monkeypatch.setattr(hr, "_call_local", slow_local)
+    monkeypatch.setattr(hr, "_call_gg", lambda text, ctx: calls.append(text) or f"GG:{text}")
+    text, meta = asyncio.run(router.route("secret", {"sensitivity": "high"}))
+    assert text == "LOCAL:secret" and meta["engine_used"] == hr.ENGINE_LOCAL
+    assert calls == []
+
+
+def test_drafts_and_polish_are_cached(router, monkeypatch):
+    counts = {"gg": 0, "alter": 0}
+
+    def gg(text, ctx):
+        counts["gg"] += 1
+        return f"draft:{text}"
+
+    def alter(text, ctx):
+        counts["alter"] += 1
+        return f"polished:{text}", {"alter_status": "used"}
+
+    monkeypatch.setattr(hr, "_call_gg", gg)
+    monkeypatch.setattr(hr, "_call_alter_polish", alter)
+    ctx = {"client_facing": True, "mode": "polish", "language": "th-en"}
+    first = asyncio.run(router.route("section", ctx))
+    second = asyncio.run(router.route("section", ctx))
+    assert first[0] == second[0] == "polished:draft:section"
+    assert counts == {"gg": 1, "alter": 1}
+    assert second[1]["cache_hit"] is True
+
+    # A different target language is a different cache entry
+    asyncio.run(router.route("section", {**ctx, "language": "th"}))
+    assert counts == {"gg": 2, "alter": 2}
+
+
+def test_unchanged_draft_is_not_cached(router, monkeypatch):
+    calls = []
+    monkeypatch.setattr(hr, "_call_gg", lambda text, ctx: calls.append(text) or text)
+    asyncio.run(router.route("x", {"mode": "draft"}))
+    asyncio.run(router.route("x", {"mode": "draft"}))
+    assert len(calls) == 2
+
+
+def test_route_many_runs_concurrently_and_emits_histograms(router, monkeypatch, tmp_path):
+    def gg(text, ctx):
+        time.sleep(0.1)
+        return f"draft:{text}"
+
+    monkeypatch.setattr(hr, "_call_gg", gg)
+    monkeypatch.setattr(hr, "_call_alter_polish", lambda text, ctx: (text.upper(), {"alter_status": "used"}))
+    router.hedge_after_s = None
+    items = [(f"s{i}", {"client_facing": True, "mode": "polish"}) for i in range(8)] + [
+        ("s0", {"client_facing": True, "mode": "polish"})
+    ]
+    start = time.perf_counter()
+    results = asyncio.run(router.route_many(items, max_concurrency=8))
+    assert time.perf_counter() - start < 0.6
+    assert [text for text, _ in results] == [f"DRAFT:S{i}" for i in range(8)] + ["DRAFT:S0"]
+
+    log = tmp_path / "g" / "telemetry" / "hybrid_router_latency.jsonl"
+    event = json.loads(log.read_text().splitlines()[-1])
+    assert event["event_type"] == "HYBRID_ROUTER_LATENCY"
+    engines = event["extra"]["engines"]
+    assert engines[hr.ENGINE_GG]["count"] == 8  # duplicate routed once
+    assert sum(engines[hr.ENGINE_GG]["counts"]) == 8
+
+
+def test_openai_clients_are_pooled(monkeypatch):
+    created = []
+
+    class FakeOpenAI:
+        def __init__(self, **kwargs):
+            created.append(kwargs)
+
+    monkeypatch.setattr(hr, "OpenAI", FakeOpenAI)
+    monkeypatch.setattr(hr, "_CLIENT_CACHE", {})
+    a = hr._build_openai_client(base_url="http://x/v1", api_key="k")
+    b = hr._build_openai_client(base_url="http://x/v1", api_key="k")
+    c = hr._build_openai_client(api_key="k")
+    assert a is b and a is not c
+    assert len(created) == 2
+
+
+def test_docs_worker_polishes_sections_in_batch(monkeypatch, tmp_path):
+    monkeypatch.setenv("LAC_BASE_DIR", str(tmp_path))
+    seen = {}
+
+    def fake_many(items, max_concurrency=4):
+        seen["items"] = items
+        return [(f"P[{text}]", {"engine_used": hr.ENGINE_ALTER, "alter_status": "used"}) for text, _ in items]
+
+    monkeypatch.setattr("agents.docs_v4.docs_worker.hybrid_route_many", fake_many)
+    monkeypatch.setattr(DocsWorkerV4, "_save_via_gateway", lambda self, **kw: seen.setdefault("saved", kw["content"]))
+
+    result = DocsWorkerV4().generate_client_report_with_hybrid_router(
+        {
+            "project_id": "PD17",
+            "title": "Report",
+            "sections": [{"title": "Scope", "summary": "a"}, "plain text"],
+        }
+    )
+    assert result["ok"] is True
+    assert result["engine_used"] == hr.ENGINE_ALTER
+    assert result["content"] == "# Report\n\nP[## Scope\n\na]\n\nP[plain text]"
+    assert seen["saved"] == result["content"]
+    assert all(ctx["client_facing"] for _, ctx in seen["items"])
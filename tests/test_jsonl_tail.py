@@ -0,0 +1,161 @@
+"""
+Tests for the shared JSONL tail/follow readers (g/tools/jsonl_tail.py).
+"""
+
+import json
+import math
+import os
+
+from g.tools import jsonl_tail
+from g.tools.jsonl_tail import (
+    CheckpointStore,
+    JsonlFollower,
+    LineCountCache,
+    read_jsonl,
+    tail_jsonl,
+    tail_lines,
+)
+
+
+def _write(path, text, mode="w"):
+    with open(path, mode, encoding="utf-8") as f:
+        f.write(text)
+
+
+def test_read_and_tail_match_full_parse(tmp_path):
+    path = tmp_path / "events.jsonl"
+    rows = [{"i": i} for i in range(50)]
+    text = "".join(json.dumps(r) + "\n" for r in rows)
+    _write(path, text + "not json\n\n" + json.dumps({"i": 50}) + "\n")
+
+    assert read_jsonl(path) == rows + [{"i": 50}]
+    assert read_jsonl(path, limit=10) == rows[:10]
+    assert tail_jsonl(path, 3) == [{"i": 48}, {"i": 49}, {"i": 50}]
+    assert tail_lines(path, 3) == [b"not json", b"", b'{"i": 50}']
+    assert read_jsonl(tmp_path / "missing.jsonl") == []
+
+
+def test_decode_falls_back_to_stdlib(monkeypatch):
+    assert math.isnan(jsonl_tail.decode_line(b'{"x": NaN}')["x"])
+    monkeypatch.setattr(jsonl_tail, "orjson", None)
+    assert jsonl_tail.decode_line(b'{"x": 1}') == {"x": 1}
+
+
+def legacy_count(path):
+    return len(path.read_text().splitlines())
+
+
+def test_line_count_extends_cache_on_append(tmp_path, monkeypatch):
+    path = tmp_path / "events.jsonl"
+    path.write_text("".join(json.dumps({"i": i}) + "\n" for i in range(500)))
+    cache_path = tmp_path / "cache" / "tail.json"
+
+    cache = LineCountCache(cache_path)
+    assert cache.line_count(path) == legacy_count(path) == 500
+    cache.save()
+
+    with open(path, "a") as f:
+        f.write('{"i": 500}\n\n{"partial": true}')
+    reloaded = LineCountCache(cache_path)
+    calls = []
+    original = jsonl_tail._count_newlines
+    monkeypatch.setattr(
+        jsonl_tail, "_count_newlines", lambda f, start, end: calls.append((start, end)) or original(f, start, end)
+    )
+    assert reloaded.line_count(path) == legacy_count(path) == 503
+    # Only the appended range was scanned
+    assert calls and calls[0][0] > 0
+
+
+def legacy_nonblank_count(path):
+    return sum(1 for line in path.read_text().splitlines() if line.strip())
+
+
+def test_nonblank_line_count_skips_blank_lines_across_appends(tmp_path, monkeypatch):
+    path = tmp_path / "decisions.jsonl"
+    path.write_text('{"i": 0}\n\n  \n{"i": 1}\n{"par')
+    cache_path = tmp_path / "cache" / "tail.json"
+
+    cache = LineCountCache(cache_path)
+    assert cache.nonblank_line_count(path) == legacy_nonblank_count(path) == 3
+    assert cache.line_count(path) == 5  # both counts share one cache file
+    cache.save()
+
+    with open(path, "a") as f:
+        f.write('tial": true}\n\n{"i": 2}\n   ')
+    reloaded = LineCountCache(cache_path)
+    calls = []
+    original = jsonl_tail._count_nonblank_lines
+    monkeypatch.setattr(
+        jsonl_tail, "_count_nonblank_lines",
+        lambda f, start, end: calls.append((start, end)) or original(f, start, end),
+    )
+    assert reloaded.nonblank_line_count(path) == legacy_nonblank_count(path) == 4
+    # Scanning resumed at the start of the line that was partial before
+    assert calls == [(path.read_text().index('{"par'), path.stat().st_size)]
+    assert reloaded.nonblank_line_count(path) == 4
+
+
+def test_line_count_recounts_after_rewrite(tmp_path):
+    path = tmp_path / "events.jsonl"
+    path.write_text("a\nb\nc\n")
+    cache = LineCountCache()
+    assert cache.line_count(path) == 3
+    # Same inode, rewritten in place with different content and a larger size
+    with open(path, "r+") as f:
+        f.write("x\n\n\n\n\n\n")
+    assert cache.line_count(path) == legacy_count(path) == 6
+    path.write_text("")
+    assert cache.line_count(path) == 0
+
+
+def test_follower_resumes_from_checkpoint(tmp_path):
+    path = tmp_path / "f.jsonl"
+    store_path = tmp_path / "offsets.json"
+    _write(path, '{"n": 1}\n{"n": 2}\n{"n": 3')
+
+    store = CheckpointStore(store_path)
+    follower = JsonlFollower(path, store)
+    assert follower.read_new() == [{"n": 1}, {"n": 2}]
+    follower.checkpoint()
+    store.save()
+
+    # Partial line completed later, then a restart resumes after line 2
+    _write(path, '}\n{"n": 4}\n', mode="a")
+    follower = JsonlFollower(path, CheckpointStore(store_path))
+    assert follower.read_new() == [{"n": 3}, {"n": 4}]
+    assert follower.read_new() == []
+
+
+def test_follower_max_bytes_never_stalls_on_long_line(tmp_path):
+    path = tmp_path / "f.jsonl"
+    long_record = {"blob": "x" * 200_000}
+    _write(path, json.dumps(long_record) + '\n{"n": 1}\n{"n": 2}\n')
+
+    follower = JsonlFollower(path)
+    assert follower.read_new(max_bytes=16) == [long_record]
+    assert follower.read_new(max_bytes=4) == [{"n": 1}]
+    assert follower.read_new(max_bytes=4) == [{"n": 2}]
+    assert follower.read_new(max_bytes=4) == []
+    assert follower.offset == path.stat().st_size
+
+
+def test_follower_detects_rotation_and_rewrite(tmp_path):
+    path = tmp_path / "r.jsonl"
+    _write(path, '{"n": 1}\n{"n": 2}\n')
+    follower = JsonlFollower(path)
+    assert len(follower.read_new()) == 2
+
+    os.rename(path, tmp_path / "r.jsonl.1")
+    _write(path, '{"n": 10}\n{"n": 11}\n{"n": 12}\n')
+    assert follower.read_new() == [{"n": 10}, {"n": 11}, {"n": 12}]
+    assert follower.rotations == 1
+
+    # Same inode rewritten in place with different content
+    store = CheckpointStore()
+    follower.store = store
+    follower.checkpoint()
+    with open(path, "r+", encoding="utf-8") as f:
+        f.write('{"n": 99}')
+    resumed = JsonlFollower(path, store)
+    assert resumed.read_new()[0] == {"n": 99}
@@ -0,0 +1,184 @@
+"""Tests for the sharded, debounced context store behind UnifiedMemoryHub."""
+from __future__ import annotations
+
+import json
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from agents.memory_hub.memory_hub import ShardedContextStore, UnifiedMemoryHub
+
+
+class FakePipeline:
+    def __init__(self, redis):
+        self.redis = redis
+        self.ops = []
+
+    def hgetall(self, key):
+        self.ops.append(("hgetall", key))
+
+    def hset(self, key, mapping):
+        self.ops.append(("hset", key, mapping))
+
+    def execute(self):
+        self.redis.pipeline_executions += 1
+        results = []
+        for op in self.ops:
+            if op[0] == "hgetall":
+                results.append(dict(self.redis.hashes.get(op[1], {})))
+            else:
+                self.redis.hset(op[1], mapping=op[2])
+                results.append(1)
+        return results
+
+
+class FakeRedis:
+    def __init__(self, hashes=None):
+        self.hashes = hashes or {}
+        self.published = []
+        self.pipeline_executions = 0
+
+    def ping(self):
+        return True
+
+    def pubsub(self):
+        return self
+
+    def subscribe(self, channel):
+        pass
+
+    def keys(self, pattern):
+        raise AssertionError("KEYS must not be used")
+
+    def scan_iter(self, match=None, count=None):
+        prefix = match.rstrip("*")
+        return iter([k for k in self.hashes if k.startswith(prefix)])
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+    def hset(self, key, mapping):
+        self.hashes.setdefault(key, {}).update(mapping)
+
+    def publish(self, channel, message):
+        self.published.append((channel, message))
+
+
+def test_flush_writes_only_dirty_shards(tmp_path):
+    store = ShardedContextStore(tmp_path, flush_delay=60)
+    store.update_agent("liam", {"context": {"task": "a"}})
+    store.update_agent("gmx", {"context": {"task": "b"}})
+    # Debounced: nothing on disk until flush
+    assert not (tmp_path / "context.json").exists()
+    store.flush()
+
+    liam_shard = tmp_path / "agents" / "liam.json"
+    gmx_shard = tmp_path / "agents" / "gmx.json"
+    gmx_mtime = gmx_shard.stat().st_mtime_ns
+
+    store.update_agent("liam", {"context": {"task": "c"}})
+    store.close()
+
+    assert json.loads(liam_shard.read_text())["data"]["context"] == {"task": "c"}
+    assert gmx_shard.stat().st_mtime_ns == gmx_mtime
+    export = json.loads((tmp_path / "context.json").read_text())
+    assert set(export["agents"]) == {"liam", "gmx"}
+
+    reloaded = ShardedContextStore(tmp_path)
+    assert reloaded.snapshot()["agents"]["liam"]["context"] == {"task": "c"}
+
+
+def test_close_unregisters_exit_flush(tmp_path, monkeypatch):
+    from agents.memory_hub import memory_hub
+
+    hooks = []
+    monkeypatch.setattr(memory_hub.atexit, "register", hooks.append)
+    monkeypatch.setattr(memory_hub.atexit, "unregister", hooks.remove)
+    store = ShardedContextStore(tmp_path)
+    assert hooks == [store.close]
+    store.close()
+    assert hooks == []
+
+
+def test_external_export_edits_are_preserved(tmp_path):
+    store = ShardedContextStore(tmp_path, flush_delay=60)
+    store.update_agent("liam", {"status": "active"})
+    store.flush()
+
+    export_file = tmp_path / "context.json"
+    data = json.loads(export_file.read_text())
+    data["agents"]["cls"] = {"status": "idle"}
+    export_file.write_text(json.dumps(data))
+
+    store.update_agent("liam", {"status": "busy"})
+    store.flush()
+    agents = json.loads(export_file.read_text())["agents"]
+    assert agents["cls"] == {"status": "idle"}
+    assert agents["liam"]["status"] == "busy"
+
+
+def test_hub_reads_redis_with_scan_and_serves_view(tmp_path, monkeypatch):
+    monkeypatch.setenv("LUKA_SOT", str(tmp_path))
+    fake = FakeRedis({
+        "memory:agents:liam": {"status": "active", "context": json.dumps({"x": 1}), "last_update": "t0"},
+        "memory:agents:gmx": {"status": "idle", "context": "{}", "last_update": "t0"},
+    })
+    hub = UnifiedMemoryHub(redis_client=fake, flush_delay=60)
+    assert fake.pipeline_executions == 1
+
+    context = hub.get_unified_context()
+    assert context["agents"]["liam"]["context"] == {"x": 1}
+    assert context["agents"]["gmx"]["status"] == "idle"
+
+    hub._apply_update_event({"agent": "liam", "event": "context_update", "timestamp": "t1", "data": {"x": 2}})
+    assert hub.get_unified_context()["agents"]["liam"]["context"] == {"x": 2}
+
+    hub.update_agent_context("gmx", {"y": 3})
+    assert fake.hashes["memory:agents:gmx"]["context"] == json.dumps({"y": 3})
+    assert len(fake.published) == 1
+    hub.close()
+    assert (tmp_path / "shared_memory" / "agents" / "gmx.json").exists()
+
+
+def test_external_edit_survives_restart(tmp_path):
+    store = ShardedContextStore(tmp_path, flush_delay=60)
+    store.update_agent("liam", {"context": "v1"})
+    store.update_agent("gmx", {"context": "g"})
+    store.flush()
+
+    export_file = tmp_path / "context.json"
+    data = json.loads(export_file.read_text())
+    data["agents"]["liam"] = {"context": "EXTERNAL"}
+    export_file.write_text(json.dumps(data))
+
+    # Picked up while running: merged on the next flush and written to the shard
+    store.update_agent("gmx", {"context": "g2"})
+    store.close()
+    assert json.loads((tmp_path / "agents" / "liam.json").read_text())["data"] == {"context": "EXTERNAL"}
+    assert ShardedContextStore(tmp_path).snapshot()["agents"]["liam"] == {"context": "EXTERNAL"}
+
+    # Edited while nothing was running: context.json is newer than the shard
+    data = json.loads(export_file.read_text())
+    data["agents"]["liam"] = {"context": "OFFLINE"}
+    export_file.write_text(json.dumps(data))
+    assert ShardedContextStore(tmp_path).snapshot()["agents"]["liam"] == {"context": "OFFLINE"}
+    assert json.loads((tmp_path / "agents" / "liam.json").read_text())["data"] == {"context": "OFFLINE"}
+
+
+def test_hub_construction_rewrites_only_changed_shards(tmp_path, monkeypatch):
+    monkeypatch.setenv("LUKA_SOT", str(tmp_path))
+    fake = FakeRedis({
+        "memory:agents:liam": {"status": "active", "context": "{}", "last_update": "t0"},
+        "memory:agents:gmx": {"status": "idle", "context": "{}", "last_update": "t0"},
+    })
+    UnifiedMemoryHub(redis_client=fake, flush_delay=60).close()
+    shards = tmp_path / "shared_memory" / "agents"
+    mtimes = {p.name: p.stat().st_mtime_ns for p in shards.iterdir()}
+
+    fake.hashes["memory:agents:gmx"]["status"] = "busy"
+    hub = UnifiedMemoryHub(redis_client=fake, flush_delay=60)
+    assert hub.store._dirty == {"gmx"}
+    hub.close()
+    assert (shards / "liam.json").stat().st_mtime_ns == mtimes["liam.json"]
+    assert (shards / "gmx.json").stat().st_mtime_ns != mtimes["gmx.json"]
@@ -0,0 +1,87 @@
+"""Tests for the reverse-seek learnings loader and ledger rotation."""
+from __future__ import annotations
+
+import json
+import sys
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from agents.memory_hub import memory_hub
+from agents.memory_hub.memory_hub import (
+    get_ledger_path,
+    iter_lines_reversed,
+    load_memory,
+    rotate_ledger,
+    save_memory,
+)
+
+
+@pytest.fixture(autouse=True)
+def isolated_sot(tmp_path, monkeypatch):
+    monkeypatch.setenv("LUKA_SOT", str(tmp_path))
+    monkeypatch.delenv("LUKA_MEMORY_ROTATE", raising=False)
+    memory_hub._tail_cache.clear()
+    yield
+    memory_hub._tail_cache.clear()
+
+
+def write_ledger(agent, entries):
+    path = get_ledger_path(agent)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open("w", encoding="utf-8") as f:
+        for entry in entries:
+            f.write(json.dumps(entry) + "\n")
+    return path
+
+
+def test_iter_lines_reversed_spans_blocks(tmp_path):
+    path = tmp_path / "lines.txt"
+    lines = [f"line-{i:04d}-" + "x" * (i % 17) for i in range(500)]
+    path.write_text("\n".join(lines) + "\n")
+    got = [l.decode() for l in iter_lines_reversed(path, block_size=64)]
+    assert got == list(reversed(lines))
+
+
+def test_load_memory_reads_tail_and_skips_noise():
+    entries = [{"timestamp": "2025-01-01T00:00:00", "learning": f"L{i}"} for i in range(1000)]
+    entries.insert(998, {"event": "not-a-learning"})
+    path = write_ledger("liam", entries)
+    with path.open("a") as f:
+        f.write("{corrupt\n")
+    assert load_memory("liam", limit=3) == ["L997", "L998", "L999"]
+
+
+def test_save_memory_updates_tail_cache_without_reread(monkeypatch):
+    save_memory("gmx", "success", "first")
+    assert load_memory("gmx") == ["first"]
+
+    def fail(*args, **kwargs):
+        raise AssertionError("ledger should not be re-read")
+
+    monkeypatch.setattr(memory_hub, "_read_recent_learnings", fail)
+    save_memory("gmx", "success", "second")
+    assert load_memory("gmx") == ["first", "second"]
+
+
+def test_external_append_invalidates_cache():
+    save_memory("cls", "success", "a")
+    assert load_memory("cls") == ["a"]
+    with get_ledger_path("cls").open("a") as f:
+        f.write(json.dumps({"timestamp": "2025-01-01T00:00:00", "learning": "b"}) + "\n")
+    assert load_memory("cls") == ["a", "b"]
+
+
+def test_rotate_ledger_moves_old_bucket_and_load_spans_segments():
+    write_ledger("liam", [{"timestamp": "2025-10-03T10:00:00", "learning": f"old{i}"} for i in range(3)])
+    segment = rotate_ledger("liam", "month", now=datetime(2025, 11, 2))
+    assert segment.name == "liam_memory.202510.jsonl"
+    assert not get_ledger_path("liam").exists()
+
+    save_memory("liam", "success", "new")
+    assert load_memory("liam", limit=3) == ["old1", "old2", "new"]
+    # Same bucket: nothing to rotate
+    assert rotate_ledger("liam", "month") is None
@@ -0,0 +1,195 @@
+"""
+Tests for the Opal gateway WO status index (apps/opal_gateway/wo_status_index.py).
+"""
+
+import json
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "apps" / "opal_gateway"))
+
+from wo_status_index import (  # noqa: E402
+    VALID_STATUS_FILTERS,
+    WOStatusIndex,
+    determine_wo_status,
+    inbox_list_item,
+    sort_timestamp,
+    state_list_item,
+)
+
+
+def reference_list(state_dir, inbox_dir, status_filter):
+    """The original per-request directory scan, minus pagination."""
+    items = []
+    for state_file in state_dir.glob("*.json"):
+        try:
+            item = state_list_item(json.loads(state_file.read_text()), state_file)
+        except Exception:
+            continue
+        if status_filter != "ALL" and item["status"] != status_filter:
+            continue
+        items.append(item)
+    for inbox_file in inbox_dir.glob("*.json"):
+        if any(item["wo_id"] == inbox_file.stem for item in items):
+            continue
+        if status_filter not in ("ALL", "QUEUED"):
+            continue
+        try:
+            items.append(inbox_list_item(json.loads(inbox_file.read_text()), inbox_file))
+        except Exception:
+            continue
+    return items
+
+
+def iso(dt):
+    return dt.isoformat().replace("+00:00", "Z")
+
+
+def write(path, data):
+    path.write_text(json.dumps(data) if not isinstance(data, str) else data)
+
+
+@pytest.fixture
+def dirs(tmp_path):
+    state_dir = tmp_path / "followup" / "state"
+    inbox_dir = tmp_path / "bridge" / "inbox" / "LIAM"
+    state_dir.mkdir(parents=True)
+    inbox_dir.mkdir(parents=True)
+    return state_dir, inbox_dir
+
+
+def populate(state_dir, inbox_dir, rng, n=120):
+    now = datetime.now(timezone.utc)
+    for i in range(n):
+        updated = now - timedelta(hours=rng.randint(0, 72), seconds=i)
+        state = {
+            "id": f"WO-{i:04d}",
+            "status": rng.choice(["running", "pending", "done", "failed", "weird"]),
+            "updated_at": iso(updated),
+            "objective": "x" * rng.randint(0, 100),
+            "meta": {"source": "opal"},
+        }
+        if rng.random() < 0.1:
+            state["last_error"] = "boom"
+        write(state_dir / f"WO-{i:04d}.json", state)
+    for i in range(0, n + 40, 3):
+        write(inbox_dir / f"WO-{i:04d}.json", {
+            "objective": "queued",
+            "apio_log": {"timestamp": iso(now - timedelta(minutes=i))},
+        })
+    write(state_dir / "broken.json", "{not json")
+
+
+def test_query_matches_directory_scan(dirs):
+    state_dir, inbox_dir = dirs
+    populate(state_dir, inbox_dir, random.Random(7))
+    index = WOStatusIndex(state_dir, inbox_dir)
+    index.refresh()
+    for status in VALID_STATUS_FILTERS:
+        expected = reference_list(state_dir, inbox_dir, status)
+        items, total, _ = index.query(status, 0, 10_000)
+        assert total == len(expected)
+        assert sorted(items, key=lambda x: x["wo_id"] + x["status"]) == sorted(
+            expected, key=lambda x: x["wo_id"] + x["status"]
+        )
+        stamps = [sort_timestamp(item) for item in items]
+        assert stamps == sorted(stamps, reverse=True)
+
+
+def test_pagination_slices_sorted_listing(dirs):
+    state_dir, inbox_dir = dirs
+    populate(state_dir, inbox_dir, random.Random(3))
+    index = WOStatusIndex(state_dir, inbox_dir)
+    index.refresh()
+    full, total, _ = index.query("ALL", 0, 10_000)
+    pages = []
+    for offset in range(0, total, 25):
+        page, page_total, _ = index.query("ALL", offset, 25)
+        assert page_total == total
+        pages.extend(page)
+    assert pages == full
+    assert index.query("ALL", total + 5, 25)[0] == []
+
+
+def test_refresh_tracks_changes_and_etag(dirs):
+    state_dir, inbox_dir = dirs
+    write(inbox_dir / "WO-A.json", {"objective": "a", "apio_log": {"timestamp": "2025-01-01T00:00:00Z"}})
+    index = WOStatusIndex(state_dir, inbox_dir, rescan_interval=3600)
+    index.maybe_refresh()
+    items, _, etag = index.query()
+    assert [(i["wo_id"], i["status"]) for i in items] == [("WO-A", "QUEUED")]
+
+    # No change -> same ETag, nothing re-parsed
+    assert index.maybe_refresh() == 0
+    assert index.query()[2] == etag
+
+    # A state file for the same WO shadows the inbox entry in ALL, not in QUEUED
+    write(state_dir / "WO-A.json", {"id": "WO-A", "status": "done", "updated_at": "2025-01-02T00:00:00Z"})
+    assert index.maybe_refresh() == 1
+    items, total, new_etag = index.query()
+    assert new_etag != etag
+    assert [(i["wo_id"], i["status"]) for i in items] == [("WO-A", "DONE")]
+    assert index.query("QUEUED")[1] == 1
+
+    # Removing the state file brings the queued entry back
+    (state_dir / "WO-A.json").unlink()
+    index.maybe_refresh()
+    assert [i["status"] for i in index.query()[0]] == ["QUEUED"]
+
+
+def test_in_place_edit_picked_up_by_rescan(dirs):
+    state_dir, inbox_dir = dirs
+    path = state_dir / "WO-B.json"
+    write(path, {"id": "WO-B", "status": "running", "updated_at": iso(datetime.now(timezone.utc))})
+    index = WOStatusIndex(state_dir, inbox_dir, rescan_interval=0)
+    index.refresh()
+    assert index.query("RUNNING")[1] == 1
+    write(path, {"id": "WO-B", "status": "completed", "updated_at": iso(datetime.now(timezone.utc))})
+    st = path.stat()
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+    index.maybe_refresh()
+    assert index.query("RUNNING")[1] == 0
+    assert index.query("DONE")[1] == 1
+
+
+def test_running_items_go_stale_without_file_changes(dirs):
+    state_dir, inbox_dir = dirs
+    updated = datetime.now(timezone.utc) - timedelta(hours=23)
+    state = {"id": "WO-C", "status": "running", "updated_at": iso(updated)}
+    write(state_dir / "WO-C.json", state)
+    index = WOStatusIndex(state_dir, inbox_dir)
+    index.refresh()
+    _, _, etag = index.query("RUNNING")
+    assert index.query("RUNNING")[1] == 1
+
+    later = time.time() + 2 * 3600
+    assert index.query("RUNNING", now=later)[1] == 0
+    items, total, stale_etag = index.query("STALE", now=later)
+    assert total == 1 and items[0]["status"] == "STALE"
+    assert stale_etag != etag
+
+
+def test_large_listing_is_fast(dirs):
+    state_dir, inbox_dir = dirs
+    index = WOStatusIndex(state_dir, inbox_dir, rescan_interval=3600)
+    now = datetime.now(timezone.utc)
+    # Fill through the index's own entry path to keep the test quick
+    from wo_status_index import _Entry
+    with index._lock:
+        for i in range(50_000):
+            state = {"id": f"WO-{i}", "status": "done", "updated_at": iso(now - timedelta(seconds=i))}
+            item = state_list_item(state, Path(f"WO-{i}.json"))
+            assert determine_wo_status(state) == "DONE"
+            index._add(f"/x/WO-{i}.json", _Entry("state", (0, 0), item, (sort_timestamp(item), f"/x/WO-{i}.json")))
+    start = time.perf_counter()
+    for offset in range(0, 5000, 50):
+        items, total, _ = index.query("DONE", offset, 50)
+    per_query = (time.perf_counter() - start) / 100
+    assert total == 50_000 and len(items) == 50
+    assert per_query < 0.005
@@ -0,0 +1,127 @@
+"""
+Tests for batched event writes and checkpointed verification in os_l3_plan.
+"""
+
+import importlib.util
+import json
+import time
+from pathlib import Path
+
+import pytest
+
+TOOL = Path(__file__).resolve().parents[1] / "g" / "sandbox" / "os_l0_l1" / "tools" / "os_l3_plan.py"
+spec = importlib.util.spec_from_file_location("os_l3_plan", TOOL)
+plan = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(plan)
+
+
+@pytest.fixture
+def conn(tmp_path):
+    conn = plan.connect_db(tmp_path / "plan.db")
+    with conn:
+        plan.ensure_schema(conn)
+    yield conn
+    conn.close()
+
+
+def scenario(n_items=3):
+    return {
+        "session_id": "S",
+        "task_id": "T",
+        "plan": {"plan_id": "P1", "title": "Plan", "owner_agent": "liam"},
+        "items": [
+            {"item_id": f"I{i}", "plan_id": "P1", "kind": "task", "title": f"t{i}", "state": "PENDING"}
+            for i in range(n_items)
+        ],
+        "updates": [{"item_id": "I0", "patch": {"title": "renamed"}, "expected_version": 1}],
+        "transitions": [
+            {"item_id": "I1", "to_state": "DONE", "expected_version": 1},
+            {"item_id": "I1", "to_state": "DONE", "expected_version": 1},
+        ],
+    }
+
+
+def write_events(conn, n, start=0):
+    with conn, plan.event_batch(conn):
+        for i in range(start, start + n):
+            plan.record_event(conn, event_type="TICK", payload={"i": i})
+
+
+def test_wal_mode_enabled(conn):
+    assert conn.execute("PRAGMA journal_mode").fetchone()[0].lower() == "wal"
+
+
+def test_batched_scenario_chain_is_valid(conn):
+    result = plan.apply_scenario(conn, scenario())
+    assert result["events_written"] == 7
+    assert result["conflicts"] == 1
+    verified = plan.verify_chain(conn, full=True)
+    assert verified["chain_status"] == "OK" and verified["events"] == 7
+    head = conn.execute("SELECT curr_hash FROM events ORDER BY id DESC LIMIT 1").fetchone()[0]
+    assert conn.execute("SELECT value FROM chain_state WHERE key = 'latest_hash'").fetchone()[0] == head
+
+    # Unbatched writes continue the same chain
+    with conn:
+        plan.record_event(conn, event_type="SINGLE", payload={})
+    assert plan.verify_chain(conn)["chain_status"] == "OK"
+
+
+def test_failed_batch_rolls_back_events(conn):
+    plan.apply_scenario(conn, scenario())
+    with pytest.raises(ValueError):
+        plan.apply_scenario(conn, scenario())  # plan already exists
+    assert conn.execute("SELECT COUNT(1) FROM events").fetchone()[0] == 7
+    assert plan.verify_chain(conn)["chain_status"] == "OK"
+
+
+def test_checkpoints_written_and_used(conn):
+    with conn, plan.event_batch(conn, checkpoint_interval=100):
+        for i in range(1250):
+            plan.record_event(conn, event_type="TICK", payload={"i": i})
+    checkpoint = plan.load_checkpoint(conn)
+    assert checkpoint["event_id"] >= 1000
+
+    result = plan.verify_chain(conn)
+    assert result["chain_status"] == "OK"
+    assert result["events"] == 1250
+    assert result["verified_from"] == checkpoint["event_id"]
+    assert plan.verify_chain(conn, full=True)["events"] == 1250
+
+
+def test_tampering_after_checkpoint_detected(conn):
+    write_events(conn, 20)
+    assert plan.verify_chain(conn, checkpoint=True)["checkpoint"]["event_id"] == 20
+    write_events(conn, 5, start=20)
+    with conn:
+        conn.execute("UPDATE events SET payload_json = '{\"i\": 999}' WHERE id = 23")
+    result = plan.verify_chain(conn)
+    assert result["chain_status"] == "CORRUPTED"
+    assert result["verified_from"] == 20
+    assert [m["id"] for m in result["mismatches"]] == [23]
+
+
+def test_forged_checkpoint_forces_full_verify(conn):
+    write_events(conn, 10)
+    plan.verify_chain(conn, checkpoint=True)
+    with conn:
+        conn.execute("UPDATE events SET payload_json = '{\"i\": -1}' WHERE id = 3")
+        forged = plan.load_checkpoint(conn)
+        forged["events"] = 11
+        conn.execute(
+            "UPDATE chain_state SET value = ? WHERE key = 'checkpoint'", (json.dumps(forged),)
+        )
+    result = plan.verify_chain(conn)
+    assert result["chain_status"] == "CORRUPTED"
+    assert result["checkpoint_error"] == "bad_signature"
+    assert result["verified_from"] == 0
+    assert [m["id"] for m in result["mismatches"]] == [3]
+
+
+def test_incremental_verify_is_fast_on_large_chain(conn):
+    write_events(conn, 50_000)
+    plan.verify_chain(conn, checkpoint=True)
+    write_events(conn, 100, start=50_000)
+    start = time.perf_counter()
+    result = plan.verify_chain(conn)
+    assert time.perf_counter() - start < 0.5
+    assert result["chain_status"] == "OK" and result["events"] == 50_100
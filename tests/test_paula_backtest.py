@@ -0,0 +1,87 @@
+"""
+Tests for the offline Paula backtest harness (tools/paula_backtest.py).
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "tools"))
+
+import paula_backtest as bt  # noqa: E402
+import paula_indicators as ind  # noqa: E402
+
+
+def _series(seed=3):
+    rng = np.random.default_rng(seed)
+    return {
+        "TREND": 100 + np.arange(120) * 0.8 + rng.normal(0, 0.5, 120),
+        "WALK": 50 * np.exp(np.cumsum(rng.normal(0, 0.02, 200))),
+        "TINY": np.array([10.0, 11.0, 12.0]),
+    }
+
+
+def _reference(closes, params):
+    """Bar-by-bar loop over the same rules."""
+    frame = ind.compute_indicators({"s": closes}, params.window)["s"]
+    _, _, bias, size = ind.classify(frame.slope, frame.avg, params.slope_threshold,
+                                    params.conf_high, params.conf_mid, params.size_high, params.size_mid)
+    equity = peak = 1.0
+    max_dd = 0.0
+    prev = 0.0
+    hits = exposed = trades = 0
+    for t in range(len(closes)):
+        pos = float(bias[t] * size[t]) if t < len(closes) - 1 else 0.0
+        ret = closes[t + 1] / closes[t] - 1 if t < len(closes) - 1 else 0.0
+        r = pos * ret - params.cost_bps / 1e4 * abs(pos - prev)
+        if pos:
+            exposed += 1
+            hits += r > 0
+            trades += pos != prev
+        equity *= 1 + r
+        peak = max(peak, equity)
+        max_dd = max(max_dd, 1 - equity / peak)
+        prev = pos
+    return equity - 1, (hits / exposed if exposed else None), max_dd, trades
+
+
+def test_vectorized_simulation_matches_loop():
+    series = _series()
+    grid = bt.param_grid(windows=[5, 20], slope_thresholds=[0.001, 0.05], conf_highs=[0.7], conf_mids=[0.1, 0.4], cost_bps=5)
+    results = bt.run_backtest(series, grid)
+
+    for params in grid:
+        for symbol, closes in series.items():
+            report = results[params][symbol]
+            pnl, hit_rate, dd, trades = _reference(closes, params)
+            assert report["pnl_pct"] == pytest.approx(pnl * 100, abs=1e-3), (params, symbol)
+            assert report["max_drawdown_pct"] == pytest.approx(dd * 100, abs=1e-3)
+            assert report["trades"] == trades
+            assert report["hit_rate"] == (None if hit_rate is None else pytest.approx(hit_rate, abs=1e-4))
+    # The trending series makes money with the default sizing rules
+    assert results[grid[0]]["TREND"]["pnl_pct"] > 0 and results[grid[0]]["TREND"]["trades"] > 0
+
+
+def test_pool_sweep_matches_inline(monkeypatch):
+    series = _series()
+    grid = bt.param_grid(windows=[10, 20], conf_mids=[0.2, 0.4])
+    monkeypatch.setattr(bt, "PARALLEL_THRESHOLD", 0)
+    assert bt.sweep(series, grid, processes=2, chunk_symbols=2) == bt.run_backtest(series, grid)
+
+    report = bt.build_report(bt.run_backtest(series, grid))
+    assert len(report) == 4 and report[0]["summary"]["symbols"] == 3
+    means = [r["summary"]["mean_pnl_pct"] for r in report]
+    assert means == sorted(means, reverse=True)
+
+
+def test_local_csv_history_merges_files_per_symbol(tmp_path):
+    (tmp_path / "AAA_1.csv").write_text("date,close\n2025-01-02,2\n2025-01-01,1\n")
+    (tmp_path / "AAA_2.csv").write_text("date,close\n2025-01-03,3\n2025-01-02,2.5\n")
+    (tmp_path / "AAAB.csv").write_text("date,close\n2025-01-01,9\n")
+
+    series = bt.load_csv_history(tmp_path)
+    assert sorted(series) == ["AAA", "AAAB"]
+    assert series["AAA"].tolist() == [1, 2.5, 3]
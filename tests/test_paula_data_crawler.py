@@ -0,0 +1,135 @@
+"""
+Tests for the Paula watchlist crawl (tools/paula_data_crawler.py) against a
+local HTTP stub server.
+"""
+
+import importlib
+import json
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlsplit
+
+import pytest
+
+pytest.importorskip("numpy")
+pytest.importorskip("requests")
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "tools"))
+
+BARS = {
+    "AAA": [{"date": f"2025-01-{d:02d}", "close": 10 + d} for d in range(1, 6)],
+    "BBB": [{"date": f"2025-01-{d:02d}", "close": 50 - d} for d in range(1, 4)],
+}
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    requests_seen = []
+
+    def do_GET(self):
+        symbol = parse_qs(urlsplit(self.path).query).get("symbol", [""])[0]
+        etag = f'"{symbol}-{len(BARS.get(symbol, []))}"'
+        self.requests_seen.append((symbol, time.monotonic(), self.headers.get("If-None-Match")))
+        if symbol not in BARS:
+            self.send_response(404)
+            self.end_headers()
+            return
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.end_headers()
+            return
+        body = json.dumps(BARS[symbol]).encode()
+        self.send_response(200)
+        self.send_header("ETag", etag)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def stub_server():
+    _StubHandler.requests_seen = []
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _StubHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}/ohlc", _StubHandler.requests_seen
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def crawler(tmp_path, monkeypatch):
+    monkeypatch.setenv("LUKA_SOT", str(tmp_path))
+    import paula_data_crawler
+    module = importlib.reload(paula_data_crawler)
+    module.DATA_DIR.mkdir(parents=True)
+    return module
+
+
+def test_watchlist_crawl_is_conditional_and_rate_limited(crawler, stub_server, tmp_path):
+    url, seen = stub_server
+    (crawler.DATA_DIR / "AAA_extra.csv").write_text("date,close\n2025-01-10,99\n")
+    store = crawler.OHLCStore(tmp_path / "store")
+    validators = crawler.ValidatorCache(tmp_path / "validators.json")
+    limiter = crawler.HostRateLimiter(rps=20)
+
+    reports = crawler.crawl_many(["AAA", "BBB", "ZZZ"], [url], store, limiter=limiter, validators=validators)
+    assert (reports["AAA"]["added"], reports["AAA"]["csv_files"]) == (6, 1)
+    assert reports["BBB"]["added"] == 3 and reports["BBB"]["http"][0]["status"] == 200
+    assert reports["ZZZ"]["total"] == 0 and reports["ZZZ"]["http"][0]["status"] == 404
+    assert all(r["http"][0]["latency_ms"] >= 0 for r in reports.values())
+    # Same host: request starts are spaced by the rate limit
+    starts = sorted(t for _, t, _ in seen)
+    assert all(b - a >= 0.045 for a, b in zip(starts, starts[1:]))
+
+    # Second run: validators are sent back, unchanged sources add nothing
+    reports = crawler.crawl_many(["AAA", "BBB"], [url], store,
+                                 limiter=limiter, validators=crawler.ValidatorCache(tmp_path / "validators.json"))
+    assert [r["http"][0]["status"] for r in reports.values()] == [304, 304]
+    assert [(r["added"], r["csv_files"], r["total"]) for r in reports.values()] == [(0, 0, 6), (0, 0, 3)]
+    assert store.read("AAA")["close"].tolist() == [11, 12, 13, 14, 15, 99]
+
+
+def test_parallel_csv_parse_matches_inline(crawler, monkeypatch):
+    paths = []
+    for i in range(5):
+        path = crawler.DATA_DIR / f"S{i}.csv"
+        path.write_text("date,close\n" + "".join(f"2025-02-{d:02d},{i + d}\n" for d in range(1, 11)))
+        paths.append(str(path))
+    monkeypatch.setattr(crawler, "PARALLEL_CSV_MIN", 2)
+    parallel = crawler.parse_csv_files(paths, processes=2)
+    inline = crawler.parse_csv_files(paths, processes=1)
+    assert list(parallel) == paths
+    for p in paths:
+        assert parallel[p]["close"].tolist() == inline[p]["close"].tolist()
+
+
+def test_validators_saved_only_after_rows_are_stored(crawler, stub_server, tmp_path, monkeypatch):
+    url, seen = stub_server
+    store = crawler.OHLCStore(tmp_path / "store")
+    validators_path = tmp_path / "validators.json"
+    limiter = crawler.HostRateLimiter(rps=1000)
+
+    def failing_append(symbol, bars, sources=None):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(store, "append", failing_append)
+    with pytest.raises(OSError):
+        crawler.crawl_many(["AAA"], [url], store, limiter=limiter, validators=crawler.ValidatorCache(validators_path))
+    assert not validators_path.exists()
+    monkeypatch.undo()
+
+    reports = crawler.crawl_many(["AAA"], [url], store, limiter=limiter, validators=crawler.ValidatorCache(validators_path))
+    assert reports["AAA"]["http"][0]["status"] == 200 and reports["AAA"]["added"] == 5
+    assert [etag for _, _, etag in seen] == [None, None]
+
+
+def test_watchlist_csv_files_match_whole_symbol(crawler):
+    for name in ("SET50.csv", "SET50_2025.csv", "SET50Z25_2025.csv", "SET500.csv"):
+        (crawler.DATA_DIR / name).write_text("date,close\n2025-01-01,1\n")
+    assert [f.name for f in crawler.local_csv_files("SET50", fallback=False)] == ["SET50.csv", "SET50_2025.csv"]
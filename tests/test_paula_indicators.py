@@ -0,0 +1,73 @@
+"""
+Tests for the vectorized Paula indicator engine (tools/paula_indicators.py).
+"""
+
+import importlib
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "tools"))
+
+import paula_indicators as ind  # noqa: E402
+
+
+@pytest.fixture
+def analytics(tmp_path, monkeypatch):
+    monkeypatch.setenv("LUKA_SOT", str(tmp_path))
+    monkeypatch.delenv("PAULA_SYMBOLS", raising=False)
+    import paula_predictive_analytics
+    return importlib.reload(paula_predictive_analytics)
+
+
+def _series(seed=1):
+    rng = np.random.default_rng(seed)
+    series = {
+        "UP": 50 + np.arange(60) * 0.5 + rng.normal(0, 0.05, 60),
+        "WALK": 1000 * np.exp(np.cumsum(rng.normal(0, 0.01, 300))),
+        "SHORT": np.array([1.0, 2.0, 3.0]),
+        "FLAT": np.full(25, 7.0),
+    }
+    return series
+
+
+@pytest.mark.parametrize("block_size", [ind.BLOCK_SIZE, 7])
+def test_every_window_matches_pure_python(analytics, monkeypatch, block_size):
+    monkeypatch.setattr(ind, "BLOCK_SIZE", block_size)
+    series = _series()
+    result = ind.compute_indicators(series, window=20)
+
+    assert np.all(np.isnan(result["SHORT"].slope)) and not result["SHORT"].bias.any()
+    for symbol, closes in series.items():
+        frame = result[symbol]
+        assert np.all(np.isnan(frame.slope[:19]))
+        for end in range(19, len(closes)):
+            expected = analytics.window_metrics([float(c) for c in closes[end - 19:end + 1]])
+            got = frame.latest(end)
+            for key in ("slope", "vol", "avg", "pct_move", "confidence"):
+                assert got[key] == pytest.approx(expected[key], rel=1e-7, abs=1e-9), (symbol, end, key)
+            assert (got["bias"], got["size"]) == (expected["bias"], expected["size"]), (symbol, end)
+
+
+def test_main_writes_one_bias_file_per_symbol(analytics, monkeypatch, capsys):
+    series = _series()
+    monkeypatch.setattr(analytics, "load_closes", lambda s: (series[s], f"test:{s}") if s in series else (None, None))
+    monkeypatch.setattr(sys, "argv", ["paula_predictive_analytics.py", "--symbols", "UP,WALK,SHORT,MISSING"])
+    analytics.main()
+
+    printed = capsys.readouterr().out.split()
+    assert [Path(p).name.split("_")[2] for p in printed] == ["UP", "WALK"]
+    insight = json.loads(Path(printed[0]).read_text())
+    expected = analytics.window_metrics([float(c) for c in series["UP"][-20:]])
+    assert insight["bias"] == expected["bias"] == "long"
+    assert insight["trend_confidence"] == round(expected["confidence"], 2)
+    assert insight["window_size"] == 20 and insight["data_source"] == "test:UP"
+
+
+def test_benchmark_reports_throughput():
+    result = ind.benchmark(n_symbols=3, n_bars=100, repeat=1)
+    assert result["symbol_bars_per_sec"] > 0
@@ -0,0 +1,85 @@
+"""
+Tests for the columnar Paula OHLC store (tools/paula_ohlc_store.py).
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "tools"))
+
+import paula_ohlc_store as store_mod  # noqa: E402
+
+
+def _csv(path, text):
+    path.write_text(text, encoding="utf-8")
+    return path
+
+
+def test_csv_ingest_dedupes_sorts_and_skips_bad_rows(tmp_path):
+    good = _csv(tmp_path / "SYM_1.csv", "timestamp,open,high,low,close,volume\n"
+                "2025-01-02,1,2,0.5,1.5,100\n2025-01-01,1,2,0.5,1.4,100\n2025-01-02,1,2,0.5,1.6,100\n")
+    mixed = _csv(tmp_path / "SYM_2.csv", "Date,Open,High,Low,Close\n"
+                 "2025-01-03T09:00:00+07:00,1,2,,1.7\nnot-a-date,1,2,3,oops\n2025-01-04T00:00:00Z,1,2,1,0\n")
+    store = store_mod.OHLCStore(tmp_path / "store")
+
+    assert store.ingest_csv("SYM", [good, mixed]) == 3
+    bars = store.read("SYM")
+    assert isinstance(bars["close"], np.memmap)
+    assert bars["close"].tolist() == [1.4, 1.6, 1.7]
+    assert np.all(np.diff(bars["timestamp"]) > 0)
+    assert bars["timestamp"][2] == 1735869600  # +07:00 converted to UTC
+
+    # Unchanged files are not re-read
+    assert store.ingest_csv("SYM", [good, mixed]) == 0
+
+
+def test_append_only_adds_new_bars_and_merges_gaps(tmp_path):
+    store = store_mod.OHLCStore(tmp_path)
+    first = store_mod.bars_from_records([{"date": f"2025-01-{d:02d}", "close": d} for d in (2, 3, 5)])
+    assert store.append("S", first) == 3
+
+    later = store_mod.bars_from_records([{"date": "2025-01-05", "close": 99}, {"date": "2025-01-06", "close": 6}])
+    assert store.append("S", later) == 1
+    assert store.read("S")["close"].tolist() == [2, 3, 5, 6]  # stored bars win
+
+    gap = store_mod.bars_from_records([{"date": "2025-01-04", "close": 4}, {"date": "2025-01-01", "close": 1}])
+    assert store.append("S", gap) == 2
+    assert store.read("S")["close"].tolist() == [1, 2, 3, 4, 5, 6]
+    assert store.load_meta("S")["count"] == 6
+
+
+def test_interrupted_append_is_truncated(tmp_path):
+    store = store_mod.OHLCStore(tmp_path)
+    store.append("S", store_mod.bars_from_records([{"date": "2025-01-01", "close": 1}]))
+    # Bytes written without a meta.json update (crash mid-append)
+    with open(store.symbol_dir("S") / "close.f8", "ab") as fh:
+        np.array([42.0]).tofile(fh)
+    store.append("S", store_mod.bars_from_records([{"date": "2025-01-02", "close": 2}]))
+    assert store.read("S")["close"].tolist() == [1, 2]
+    assert (store.symbol_dir("S") / "close.f8").stat().st_size == 16
+
+
+def test_interrupted_merge_keeps_previous_generation(tmp_path, monkeypatch):
+    store = store_mod.OHLCStore(tmp_path)
+    store.append("S", store_mod.bars_from_records([{"date": f"2025-01-{d:02d}", "close": d} for d in (2, 3)]))
+    gap = store_mod.bars_from_records([{"date": "2025-01-01", "close": 1}])
+
+    def crash(symbol, meta):
+        raise OSError("crash before meta.json swap")
+
+    monkeypatch.setattr(store, "_save_meta", crash)
+    with pytest.raises(OSError):
+        store.append("S", gap)
+    monkeypatch.undo()
+    assert store.read("S")["close"].tolist() == [2, 3]
+    assert store.read("S")["timestamp"].size == 2
+
+    assert store.append("S", gap) == 1
+    assert store.read("S")["close"].tolist() == [1, 2, 3]
+    assert store.load_meta("S")["generation"] == 1
+    names = sorted(p.name for p in store.symbol_dir("S").iterdir())
+    assert names == sorted([f"{c}.g1{store_mod._SUFFIX[c]}" for c in store_mod.COLUMNS] + ["meta.json"])
@@ -1,11 +1,13 @@
 import copy
 import json
+import os
 import subprocess
 import sys
 import tempfile
 from pathlib import Path
 
-from core.pro_docs.engine import build_doc_spec, load_rules_config
+from core.pro_docs import engine as pro_docs_engine
+from core.pro_docs.engine import PricingEngine, build_doc_spec, load_rules_config
 from core.pro_docs.utils import canonical_json_dumps
 from core.pro_docs.validate import ValidationError, enforce_project_input, validate_project_input
 
@@ -244,3 +246,62 @@ def test_cli_output_dir_guardrails():
             text=True,
         )
         assert result.returncode != 0
+
+
+def _batch_inputs() -> list:
+    sample = _load_sample()
+    good = [dict(sample, project_id=f"PRJ-B{i}", vat_percent=i % 3) for i in range(6)]
+    bad = dict(sample, project_id="PRJ-BAD", pricing_profile="bogus")
+    return good[:3] + [bad] + good[3:]
+
+
+def test_pricing_engine_batch_matches_single_builds(monkeypatch):
+    config = load_rules_config()
+    engine = PricingEngine(config)
+    inputs = _batch_inputs()
+
+    results = engine.build_doc_specs(inputs, processes=1)
+    assert [result.ok for result in results] == [True, True, True, False, True, True, True]
+    assert {issue.code for issue in results[3].report.errors} >= {"INVALID_PRICING_PROFILE"}
+    for raw_input, result in zip(inputs, results):
+        if result.ok:
+            assert canonical_json_dumps(result.doc_spec) == build_doc_spec(raw_input, config).canonical_json()
+
+    monkeypatch.setattr(pro_docs_engine, "PARALLEL_THRESHOLD", 0)
+    pooled = engine.build_doc_specs(inputs, processes=2, chunk_size=2)
+    assert pooled == results
+
+
+def test_pricing_engine_rejects_invalid_config():
+    config = copy.deepcopy(load_rules_config())
+    config.pop("rounding")
+    try:
+        PricingEngine(config)
+    except ValidationError as exc:
+        assert "MISSING_ROUNDING_RULE" in {issue.code for issue in exc.report.errors}
+    else:
+        assert False, "ValidationError was not raised"
+
+
+def test_cli_jsonl_stream(tmp_path):
+    repo_root = Path(__file__).resolve().parents[1]
+    cli_path = repo_root / "g" / "tools" / "pro_docs_intake.py"
+    inputs = _batch_inputs()
+    stream = "\n".join(json.dumps(item) for item in inputs) + "\n\nnot json\n"
+    env = dict(os.environ, PYTHONPATH=str(repo_root))
+
+    result = subprocess.run(
+        [sys.executable, str(cli_path), "--jsonl", "-", "--mode", "apply", "--output-dir", str(tmp_path)],
+        input=stream,
+        capture_output=True,
+        text=True,
+        env=env,
+    )
+    assert result.returncode == 1
+    lines = [json.loads(line) for line in result.stdout.splitlines()]
+    assert len(lines) == 8
+    assert lines[0]["meta"]["project_id"] == "PRJ-B0"
+    assert lines[3]["status"] == "error" and lines[-1]["errors"][0]["code"] == "INVALID_JSON"
+    assert len((tmp_path / "doc_specs.jsonl").read_text().splitlines()) == 6
+    assert len((tmp_path / "audit.jsonl").read_text().splitlines()) == 6
+    assert len((tmp_path / "validation.jsonl").read_text().splitlines()) == 8
@@ -253,3 +253,46 @@ def test_export_cache(tmp_path):
     assert "chat-2" in cache
     assert cache["chat-1"]["profile"] == "profile-1"
     assert cache["chat-2"]["profile"] == "profile-2"
+
+
+def test_writes_append_to_log_and_reload(tmp_path):
+    """Writes go to the op log; a fresh store replays snapshot + log."""
+    store = make_store(tmp_path)
+    store.set_profile("chat-1", "kim_k2_poc")
+    snapshot = store.store_path.read_text()
+    store.set_profile("chat-2", "profile-2")
+    store.clear_profile("chat-1")
+
+    # Snapshot untouched by plain writes; ops live in the log
+    assert store.store_path.read_text() == snapshot
+    assert len(store.log_path.read_text().splitlines()) == 4
+
+    reloaded = make_store(tmp_path)
+    assert reloaded.get_profile("chat-1").profile_id == DEFAULT_PROFILE.id
+    assert reloaded.get_profile("chat-2").profile_id == "profile-2"
+
+
+def test_torn_log_tail_is_discarded(tmp_path):
+    """A partially written trailing op is dropped on load."""
+    store = make_store(tmp_path)
+    store.set_profile("chat-1", "kim_k2_poc")
+    store.close()
+    with store.log_path.open("a", encoding="utf-8") as handle:
+        handle.write('{"chat": "chat-2", "op": "se')
+
+    reloaded = make_store(tmp_path)
+    assert reloaded.get_profile("chat-1").profile_id == "kim_k2_poc"
+    assert reloaded.get_profile("chat-2").profile_id == DEFAULT_PROFILE.id
+    reloaded.set_profile("chat-3", "profile-3")
+    assert make_store(tmp_path).get_profile("chat-3").profile_id == "profile-3"
+
+
+def test_compaction_folds_log_into_snapshot(tmp_path):
+    """Log is compacted into the snapshot once it outgrows the live set."""
+    store = ProfileStore(tmp_path / "profiles.json", compact_threshold=10)
+    for i in range(25):
+        store.set_profile("chat-1", f"profile-{i}")
+
+    assert len(store.log_path.read_text().splitlines()) < 12
+    reloaded = make_store(tmp_path)
+    assert reloaded.get_profile("chat-1").profile_id == "profile-24"
@@ -1,7 +1,8 @@
 import json
 from pathlib import Path
 
-from g.tools.telemetry_normalizer import normalize_file
+from g.tools.jsonl_tail import CheckpointStore
+from g.tools.telemetry_normalizer import TelemetryNormalizer, default_checkpoint_path, normalize_file
 
 
 def _write_jsonl(path: Path, rows):
@@ -30,3 +31,62 @@ def test_normalize_file(tmp_path):
     assert out_rows[1]["event"] == "fail"
     assert out_rows[1]["lane"] == "dev_gmxcli"
     assert out_rows[1]["reason"] == "LINT_FAILED"
+
+
+def _rows(path: Path):
+    return [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+
+
+def test_normalize_file_appends_only_new_records(tmp_path):
+    src = tmp_path / "g/telemetry/qa_checklists.jsonl"
+    dest = tmp_path / "g/telemetry/normalized/qa_checklists.jsonl"
+    offsets = tmp_path / "offsets.json"
+    _write_jsonl(src, [{"ts": "2025-11-29T00:00:00Z", "status": "pass"}] * 6000)
+
+    store = CheckpointStore(offsets)
+    assert normalize_file(src, dest, "qa_worker", store=store)["count"] == 6000
+    store.save()
+
+    with src.open("a", encoding="utf-8") as handle:
+        handle.write(json.dumps({"ts": "2025-11-29T02:00:00Z", "status": "error"}) + "\n")
+    store = CheckpointStore(offsets)
+    assert normalize_file(src, dest, "qa_worker", store=store)["count"] == 1
+    assert normalize_file(src, dest, "qa_worker", store=store)["count"] == 0
+    rows = _rows(dest)
+    assert len(rows) == 6001
+    assert rows[-1]["event"] == "fail"
+
+
+def test_normalize_file_truncates_rows_written_after_checkpoint(tmp_path):
+    src = tmp_path / "src.jsonl"
+    dest = tmp_path / "out/dest.jsonl"
+    _write_jsonl(src, [{"status": "success"}])
+    store = CheckpointStore()
+    normalize_file(src, dest, "dev_worker", store=store)
+
+    # Simulate a crash after appending but before the checkpoint was saved
+    with dest.open("a", encoding="utf-8") as handle:
+        handle.write('{"partial": true}\n')
+    with src.open("a", encoding="utf-8") as handle:
+        handle.write(json.dumps({"status": "failed"}) + "\n")
+    normalize_file(src, dest, "dev_worker", store=store)
+    assert [r["event"] for r in _rows(dest)] == ["success", "fail"]
+
+
+def test_normalizer_runs_all_targets_and_follows(tmp_path):
+    telemetry = tmp_path / "g/telemetry"
+    _write_jsonl(telemetry / "dev_lane_execution.jsonl", [{"status": "success"}])
+    _write_jsonl(telemetry / "governance.jsonl", [{"status": "warn"}, {"status": "fail"}])
+
+    normalizer = TelemetryNormalizer(tmp_path)
+    counts = {Path(r["source"]).name: r["count"] for r in normalizer.run_once()}
+    assert counts["dev_lane_execution.jsonl"] == 1
+    assert counts["governance.jsonl"] == 2
+    assert counts["qa_checklists.jsonl"] == 0
+    assert default_checkpoint_path(tmp_path).exists()
+
+    with (telemetry / "governance.jsonl").open("a", encoding="utf-8") as handle:
+        handle.write(json.dumps({"status": "success"}) + "\n")
+    resumed = TelemetryNormalizer(tmp_path)
+    assert resumed.follow(interval=0, max_cycles=2) == 1
+    assert len(_rows(telemetry / "normalized/governance.jsonl")) == 3
@@ -0,0 +1,65 @@
+"""
+Tests for the shared truth-sync collectors (g/tools/truth_sync_inputs.py).
+"""
+
+import json
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "g" / "tools"))
+
+import truth_sync_inputs as tsi  # noqa: E402
+
+
+def telemetry(root):
+    path = root / "g" / "telemetry" / "gateway_v3_router.jsonl"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def test_gateway_status_reads_latest_event_from_tail(tmp_path):
+    path = telemetry(tmp_path)
+    lines = [json.dumps({"ts": f"t{i}", "level": "INFO", "message": f"m{i}"}) for i in range(3000)]
+    path.write_text("\n".join(lines) + "\n   \nnot json\n")
+    status = tsi.load_gateway_status(tmp_path, cache=tsi.LineCountCache())
+    assert status.total_events == 3002
+    assert (status.latest_event_ts, status.latest_level, status.latest_message) == ("t2999", "INFO", "m2999")
+
+    # Latest event beyond the tail limit is not reported
+    path.write_text(lines[0] + "\n" + "garbage\n" * 10)
+    status = tsi.load_gateway_status(tmp_path, limit=5)
+    assert status.total_events == 11
+    assert status.latest_message == "Failed to parse latest telemetry JSON"
+
+
+def test_gateway_status_empty_and_missing(tmp_path):
+    assert tsi.load_gateway_status(tmp_path).telemetry_file is None
+    telemetry(tmp_path).write_text("")
+    assert tsi.load_gateway_status(tmp_path).latest_message == "No telemetry events logged"
+
+
+def test_watch_renders_only_on_input_change(tmp_path, monkeypatch):
+    path = telemetry(tmp_path)
+    path.write_text('{"ts": "1"}\n')
+    renders = []
+    polls = iter(range(10))
+
+    def fake_sleep(_):
+        n = next(polls)
+        if n == 2:
+            with open(path, "a") as f:
+                f.write('{"ts": "2"}\n')
+
+    monkeypatch.setattr(tsi.time, "sleep", fake_sleep)
+    count = tsi.watch(tmp_path, lambda: renders.append(tsi.input_signature(tmp_path)), max_cycles=5)
+    assert count == 2
+    assert renders[0] != renders[1]
+
+
+def test_collect_inputs_matches_individual_loaders(tmp_path):
+    telemetry(tmp_path).write_text('{"ts": "1", "level": "WARN", "message": "hi"}\n')
+    sandbox, gateway, work_orders = tsi.collect_inputs(tmp_path, cache=tsi.LineCountCache(tmp_path / "c.json"))
+    assert sandbox == tsi.load_latest_sandbox_report(tmp_path)
+    assert gateway == tsi.load_gateway_status(tmp_path)
+    assert work_orders == tsi.extract_wo_status(tmp_path)
+    assert (tmp_path / "c.json").exists()
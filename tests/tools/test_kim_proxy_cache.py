@@ -0,0 +1,111 @@
+"""
+Unit tests for KimGatewayProxy caching, coalescing and fan-out.
+"""
+
+import asyncio
+import threading
+import time
+
+from shared.ttl_cache import TTLCache
+from tools.kim_proxy import KimGatewayProxy
+
+
+class _FakeResponse:
+    def __init__(self, payload):
+        self._payload = payload
+        self.content = b"{}"
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return self._payload
+
+
+class _FakeSession:
+    """Counts POSTs; optionally blocks until released to force overlap."""
+
+    def __init__(self, gate=None):
+        self.calls = 0
+        self.gate = gate
+        self._lock = threading.Lock()
+
+    def post(self, url, json=None, timeout=None, headers=None):
+        with self._lock:
+            self.calls += 1
+        if self.gate is not None:
+            self.gate.wait(timeout=5)
+        return _FakeResponse({"results": [{"id": json["query"], "score": 1.0, "content": "x"}]})
+
+    def close(self):
+        pass
+
+
+def make_proxy(session, **kwargs):
+    proxy = KimGatewayProxy(cache_sweep_interval=0, **kwargs)
+    proxy.session = session
+    return proxy
+
+
+class TestTTLCache:
+    def test_lru_eviction_and_counters(self):
+        cache = TTLCache(max_entries=2, ttl=60)
+        cache.put("a", "A")
+        cache.put("b", "B")
+        assert cache.get("a") == "A"  # a becomes most recent
+        cache.put("c", "C")  # evicts b
+        assert cache.get("b") is None
+        assert cache.get("c") == "C"
+        stats = cache.stats()
+        assert stats["cache_size"] == 2
+        assert stats["cache_evictions"] == 1
+        assert stats["cache_hits"] == 2
+        assert stats["cache_misses"] == 1
+
+    def test_sweep_removes_expired(self):
+        cache = TTLCache(max_entries=10, ttl=0.01)
+        cache.put("a", "A")
+        cache.put("b", "B")
+        time.sleep(0.02)
+        assert cache.sweep() == 2
+        assert len(cache) == 0
+        assert cache.stats()["cache_expirations"] == 2
+
+
+class TestKimGatewayProxy:
+    def test_cache_hit_skips_upstream(self):
+        session = _FakeSession()
+        proxy = make_proxy(session, cache_enabled=True)
+        proxy.search("q1")
+        proxy.search("q1")
+        stats = proxy.get_stats()
+        assert session.calls == 1
+        assert stats["cache_hits"] == 1
+        assert stats["upstream_requests"] == 1
+
+    def test_concurrent_identical_searches_are_coalesced(self):
+        gate = threading.Event()
+        session = _FakeSession(gate=gate)
+        proxy = make_proxy(session)
+        results = []
+
+        threads = [threading.Thread(target=lambda: results.append(proxy.search("same"))) for _ in range(5)]
+        for t in threads:
+            t.start()
+        deadline = time.time() + 2
+        while proxy.get_stats()["coalesced_requests"] < 4 and time.time() < deadline:
+            time.sleep(0.01)
+        gate.set()
+        for t in threads:
+            t.join()
+
+        assert session.calls == 1
+        assert len(results) == 5
+        assert all(r is results[0] for r in results)
+
+    def test_search_many_preserves_order(self):
+        session = _FakeSession()
+        proxy = make_proxy(session)
+        responses = asyncio.run(proxy.search_many(["a", "b", {"query": "c", "limit": 3}]))
+        assert [r.results[0].id for r in responses] == ["a", "b", "c"]
+        assert session.calls == 3
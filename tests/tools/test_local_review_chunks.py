@@ -0,0 +1,91 @@
+"""
+Unit tests for chunked, cached review in tools.lib.local_review_engine.
+"""
+
+import time
+
+import pytest
+
+from tools.lib.local_review_chunks import HunkResultCache, build_chunks, split_file_diff
+from tools.lib.local_review_engine import ReviewEngine
+from tools.lib.local_review_llm import LLMConfig, LLMError, StubLLMClient
+
+
+def file_diff(name, hunks):
+    parts = [f"diff --git a/{name} b/{name}\n", f"--- a/{name}\n", f"+++ b/{name}\n"]
+    for start, lines in hunks:
+        parts.append(f"@@ -{start},1 +{start},{len(lines)} @@\n")
+        parts.extend(f"+{line}\n" for line in lines)
+    return "".join(parts)
+
+
+def make_diffs(marker_line="x = 1  # TODO tidy"):
+    return [
+        ("a.py", file_diff("a.py", [(1, ["a = 1"]), (40, [marker_line])])),
+        ("b.py", file_diff("b.py", [(10, ["b = 2  # FIXME"])])),
+        ("c.py", file_diff("c.py", [(5, ["c = 3"] * 50)])),
+    ]
+
+
+def stub(max_calls=100, latency_s=0.0):
+    config = LLMConfig(provider="stub", model="stub-model", max_tokens=1, temperature=0.0, max_calls=max_calls)
+    return StubLLMClient(config, latency_s=latency_s)
+
+
+def test_split_and_pack_respect_hunk_boundaries():
+    hunks = [h for name, text in make_diffs() for h in split_file_diff(name, text)]
+    assert [(h.file, h.new_start) for h in hunks] == [("a.py", 1), ("a.py", 40), ("b.py", 10), ("c.py", 5)]
+    chunks = build_chunks(hunks, max_tokens=60)
+    assert len(chunks) > 1
+    assert [h for c in chunks for h in c.hunks] == hunks
+    for chunk in chunks:
+        for hunk in chunk.hunks:
+            assert hunk.header in chunk.text
+
+
+def test_chunked_matches_single_call_issues():
+    single = ReviewEngine(stub(), focus_areas=[]).analyze_chunked(make_diffs(), max_chunk_tokens=100000)
+    many = ReviewEngine(stub(), focus_areas=[]).analyze_chunked(make_diffs(), max_chunk_tokens=40, max_in_flight=3)
+    assert many.metrics["chunks_reviewed"] > single.metrics["chunks_reviewed"] == 1
+    assert [(i.file, i.line, i.description) for i in many.issues] == [
+        (i.file, i.line, i.description) for i in single.issues
+    ]
+    assert [(i.file, i.line) for i in many.issues] == [("a.py", 40), ("b.py", 10)]
+
+
+def test_cache_only_rereviews_changed_hunks(tmp_path):
+    cache = HunkResultCache(tmp_path)
+    first = ReviewEngine(stub(), focus_areas=["security"]).analyze_chunked(
+        make_diffs(), max_chunk_tokens=40, cache=cache
+    )
+    assert first.metrics["cached_hunks"] == 0
+
+    llm = stub()
+    second = ReviewEngine(llm, focus_areas=["security"]).analyze_chunked(
+        make_diffs(marker_line="x = 2"), max_chunk_tokens=40, cache=cache
+    )
+    assert second.metrics["cached_hunks"] == 3
+    assert llm.calls_made == 1
+    assert [(i.file, i.line) for i in second.issues] == [("b.py", 10)]
+
+    # Different focus areas do not reuse the cache
+    other = ReviewEngine(stub(), focus_areas=["perf"]).analyze_chunked(
+        make_diffs(), max_chunk_tokens=40, cache=cache
+    )
+    assert other.metrics["cached_hunks"] == 0
+
+
+def test_chunks_run_concurrently():
+    diffs = [(f"f{i}.py", file_diff(f"f{i}.py", [(1, ["v = 1"] * 20)])) for i in range(8)]
+    engine = ReviewEngine(stub(latency_s=0.05), focus_areas=[])
+    start = time.perf_counter()
+    result = engine.analyze_chunked(diffs, max_chunk_tokens=60, max_in_flight=8)
+    elapsed = time.perf_counter() - start
+    assert result.metrics["chunks_reviewed"] == 8
+    assert elapsed < 0.05 * 8 * 0.75
+
+
+def test_call_budget_enforced_up_front():
+    engine = ReviewEngine(stub(max_calls=1), focus_areas=[])
+    with pytest.raises(LLMError):
+        engine.analyze_chunked(make_diffs(), max_chunk_tokens=40)
@@ -0,0 +1,88 @@
+"""
+Unit tests for streamed diff collection in tools.lib.local_review_git.
+"""
+
+import subprocess
+
+import pytest
+
+from tools.lib.local_review_git import GitInterface
+
+
+def git(repo, *args):
+    return subprocess.check_output(["git", *args], cwd=repo, text=True)
+
+
+@pytest.fixture
+def repo(tmp_path):
+    git(tmp_path, "init", "-q")
+    git(tmp_path, "config", "user.email", "t@example.com")
+    git(tmp_path, "config", "user.name", "t")
+    (tmp_path / "keep.py").write_text("a = 1\n")
+    (tmp_path / "old name.txt").write_text("x\n" * 20)
+    (tmp_path / "gone.md").write_text("bye\n")
+    git(tmp_path, "add", "-A")
+    git(tmp_path, "commit", "-qm", "init")
+
+    (tmp_path / "keep.py").write_text("a = 2\nb = 3\n")
+    (tmp_path / "new.py").write_text("print('hi')\n")
+    (tmp_path / "lock.json").write_text('{"a": 1}\n')
+    (tmp_path / "img.bin").write_bytes(b"\x00\x01\x02" * 10)
+    (tmp_path / "gone.md").unlink()
+    git(tmp_path, "mv", "old name.txt", "new name.txt")
+    git(tmp_path, "add", "-A")
+    return tmp_path
+
+
+def collect(repo, **overrides):
+    kwargs = dict(
+        target=None,
+        base=None,
+        ignore_patterns=[],
+        exclude_files=[],
+        drop_files=[],
+        priority_ext=[".py"],
+        deprioritize_ext=[".json"],
+        soft_limit_kb=60,
+        hard_limit_kb=100,
+    )
+    kwargs.update(overrides)
+    return GitInterface(repo_root=repo).get_filtered_diff("staged", **kwargs)
+
+
+def test_single_stream_matches_per_file_diffs(repo, monkeypatch):
+    calls = []
+    real_popen = subprocess.Popen
+
+    def spy(args, *a, **kw):
+        calls.append(args)
+        return real_popen(args, *a, **kw)
+
+    monkeypatch.setattr(subprocess, "Popen", spy)
+    result = collect(repo, ignore_patterns=["*.json"])
+    assert len(calls) == 1
+
+    assert result.files_included == ["gone.md", "keep.py", "new name.txt", "new.py"]
+    assert sorted(result.files_excluded) == ["img.bin", "lock.json"]
+    assert not result.truncated
+
+    for name in ("keep.py", "new.py", "gone.md"):
+        per_file = git(repo, "diff", "--cached", "-U3", "--", name)
+        assert per_file.rstrip("\n") in result.text
+    assert "rename to new name.txt" in result.text
+
+
+def test_oversize_file_dropped_while_streaming(repo):
+    (repo / "big.py").write_text("x = 1\n" * 3000)
+    git(repo, "add", "big.py")
+    result = collect(repo, soft_limit_kb=1, hard_limit_kb=2)
+    assert result.truncated
+    assert "big.py" in result.files_excluded
+    assert "big.py" not in result.files_included
+    assert result.stats["bytes"] <= 1.2 * 1024
+
+
+def test_unquote_path():
+    assert GitInterface._unquote_path('"caf\\303\\251 x.txt"') == "café x.txt"
+    assert GitInterface._header_path('diff --git a/x y.py b/x y.py\n') == "x y.py"
+    assert GitInterface._header_path('diff --git a/a.py b/b.py\n') is None
@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""
+Test CLC Executor v5 Rollback
+
+Tests for rollback strategies covering:
+- Pre-image journal capture and backup_restore
+- Batched git_revert (single git restore call)
+"""
+
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import yaml
+
+# Add project root to path
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from agents.clc import executor_v5
+from agents.clc.executor_v5 import (
+    ExecutionResult,
+    PreImageJournal,
+    WOStatus,
+    WorkOrder,
+    apply_rollback,
+    execute_work_order,
+    process_file_operation,
+    prune_preimage_journals,
+)
+
+
+def _work_order(wo_id, strategy):
+    return WorkOrder(
+        wo_id=wo_id,
+        created_at="2025-12-10T10:00:00+07:00",
+        origin={"world": "BACKGROUND", "actor": "CLC"},
+        target_paths=[],
+        zone_summary={},
+        risk_level="HIGH",
+        desired_state="Test rollback",
+        change_type="MIXED",
+        rollback_strategy=strategy,
+        approver=None,
+        constraints=[],
+    )
+
+
+def _result(wo, paths):
+    return ExecutionResult(
+        wo_id=wo.wo_id,
+        status=WOStatus.FAILED,
+        files_modified=paths,
+        checksums={},
+        execution_time=0.0,
+        errors=["forced"],
+        warnings=[],
+    )
+
+
+def _allow_all(path, actor, operation="write", content=None, context=None, compute_checksum=True):
+    return type('obj', (object,), {'allowed': True, 'warnings': []})()
+
+
+def test_backup_restore_undoes_500_file_wo(tmp_path, monkeypatch):
+    monkeypatch.setenv("LUKA_ROOT", str(tmp_path))
+    monkeypatch.setattr(executor_v5, "check_write_allowed", _allow_all)
+    reports = tmp_path / "g" / "reports"
+    reports.mkdir(parents=True)
+    originals = {}
+    for i in range(500):
+        path = reports / f"r{i:03d}.md"
+        path.write_text(f"original {i % 50}\n" * 20)
+        originals[path] = path.read_bytes()
+    (reports / "r000.md").chmod(0o640)
+
+    wo = _work_order("WO-ROLLBACK-500", "backup_restore")
+    journal = PreImageJournal(wo.wo_id)
+    ops = [{"path": str(p), "operation": "modify", "content": f"new {p.name}\n"} for p in originals]
+    ops.append({"path": "g/reports/added.md", "operation": "add", "content": "added\n"})
+    ops.append({"path": "g/reports/r001.md", "operation": "delete"})
+    modified = []
+    for op in ops:
+        success, file_op, errors = process_file_operation(op, wo, journal=journal)
+        assert success, errors
+        modified.append(file_op.path)
+    assert (reports / "added.md").exists() and not (reports / "r001.md").exists()
+    # Identical pre-images are stored once
+    assert len(list((tmp_path / "g" / "rollback" / "clc" / "objects").rglob("*.z"))) == 50
+
+    start = time.perf_counter()
+    ok, errors = apply_rollback(wo, _result(wo, modified))
+    elapsed = time.perf_counter() - start
+
+    assert ok, errors
+    assert elapsed < 1.0
+    assert not (reports / "added.md").exists()
+    for path, content in originals.items():
+        assert path.read_bytes() == content
+    assert (reports / "r000.md").stat().st_mode & 0o777 == 0o640
+
+
+def test_journal_first_capture_wins(tmp_path):
+    target = tmp_path / "a.txt"
+    target.write_text("v1")
+    journal = PreImageJournal("WO-FIRST", root=tmp_path / "journal")
+    before = journal.capture(str(target))
+    target.write_text("v2")
+    assert journal.capture(str(target)) != before
+    target.write_text("v3")
+
+    loaded = PreImageJournal.load("WO-FIRST", root=tmp_path / "journal")
+    assert loaded.restore() == ([str(target)], [])
+    assert target.read_text() == "v1"
+    assert PreImageJournal.load("WO-MISSING", root=tmp_path / "journal") is None
+
+
+def test_git_revert_restores_all_paths_in_one_call(tmp_path, monkeypatch):
+    monkeypatch.setenv("LUKA_ROOT", str(tmp_path))
+    git = ["git", "-c", "user.email=t@example.com", "-c", "user.name=t", "-C", str(tmp_path)]
+    subprocess.run(git + ["init", "-q"], check=True)
+    paths = []
+    for i in range(30):
+        path = tmp_path / "g" / "reports" / f"f {i}[x].md"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(f"committed {i}\n")
+        paths.append(path)
+    subprocess.run(git + ["add", "-A"], check=True)
+    subprocess.run(git + ["commit", "-q", "-m", "init"], check=True)
+    for path in paths:
+        path.write_text("changed\n")
+
+    calls = []
+    real_run = subprocess.run
+    monkeypatch.setattr(subprocess, "run", lambda *a, **kw: calls.append(a) or real_run(*a, **kw))
+    wo = _work_order("WO-GIT-001", "git_revert")
+    modified = [str(p) for p in paths[:10]] + [str(p.relative_to(tmp_path)) for p in paths[10:]]
+    ok, errors = apply_rollback(wo, _result(wo, modified))
+
+    assert ok, errors
+    assert len(calls) == 1
+    assert [p.read_text() for p in paths] == [f"committed {i}\n" for i in range(30)]
+
+
+def _run_wo(tmp_path, wo_id, strategy, ops):
+    wo_file = tmp_path / f"{wo_id}.yaml"
+    wo_file.write_text(yaml.dump({
+        "wo_id": wo_id,
+        "created_at": "2025-12-10T10:00:00+07:00",
+        "origin": {"world": "BACKGROUND", "actor": "CLC"},
+        "target_paths": [],
+        "risk_level": "LOW",
+        "desired_state": "Test",
+        "change_type": "MODIFY",
+        "rollback_strategy": strategy,
+        "operations": ops,
+    }))
+    return execute_work_order(str(wo_file))
+
+
+def test_only_backup_restore_wos_are_journaled_and_reruns_keep_originals(tmp_path, monkeypatch):
+    monkeypatch.setenv("LUKA_ROOT", str(tmp_path))
+    monkeypatch.setattr(executor_v5, "check_write_allowed", _allow_all)
+    target = tmp_path / "g" / "reports" / "doc.md"
+    target.parent.mkdir(parents=True)
+    target.write_text("original\n")
+    journal_root = tmp_path / "g" / "rollback" / "clc"
+
+    result = _run_wo(tmp_path, "WO-GIT-ONLY", "git_revert",
+                     [{"path": "g/reports/doc.md", "operation": "modify", "content": "git\n"}])
+    assert result.status == WOStatus.COMPLETED
+    assert not journal_root.exists()
+
+    target.write_text("original\n")
+    for content in ("first run\n", "second run\n"):
+        result = _run_wo(tmp_path, "WO-RERUN", "backup_restore",
+                         [{"path": "g/reports/doc.md", "operation": "modify", "content": content}])
+        assert result.status == WOStatus.COMPLETED
+    assert target.read_text() == "second run\n"
+
+    wo = _work_order("WO-RERUN", "backup_restore")
+    ok, errors = apply_rollback(wo, _result(wo, [str(target)]))
+    assert ok, errors
+    assert target.read_text() == "original\n"
+    # A completed restore drops the manifest
+    assert PreImageJournal.load("WO-RERUN") is None
+
+
+def test_prune_removes_expired_manifests_and_unreferenced_objects(tmp_path):
+    root = tmp_path / "journal"
+    files = {}
+    for name in ("old", "new"):
+        files[name] = tmp_path / f"{name}.txt"
+        files[name].write_text(f"{name} content\n")
+        PreImageJournal(f"WO-{name.upper()}", root=root).capture(str(files[name]))
+
+    now = time.time() + 2 * 3600
+    old_manifest = root / "wo" / "WO-OLD.jsonl"
+    os.utime(old_manifest, (now - 30 * 86400, now - 30 * 86400))
+    assert prune_preimage_journals(root, retention_days=7, now=now) == (1, 1)
+    assert not old_manifest.exists()
+    assert PreImageJournal.load("WO-NEW", root=root).restore() == ([str(files["new"])], [])
+    # Objects inside the grace period survive even when unreferenced
+    PreImageJournal("WO-TMP", root=root).capture(str(files["old"]))
+    (root / "wo" / "WO-TMP.jsonl").unlink()
+    assert prune_preimage_journals(root, retention_days=7) == (0, 0)
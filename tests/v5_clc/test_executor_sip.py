@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Test CLC Executor v5 SIP Writer
+
+Tests for the streaming SIP write path covering:
+- Checksums computed while writing (no re-read)
+- Chunked content and atomic replace
+- One directory fsync per WO directory
+"""
+
+import hashlib
+import sys
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from agents.clc import executor_v5
+from agents.clc.executor_v5 import SIPWriter, apply_sip_single_file
+from bridge.core import sandbox_guard_v5
+
+
+def test_sip_writer_streams_chunks_and_syncs_each_directory_once(tmp_path, monkeypatch):
+    synced = []
+    monkeypatch.setattr(executor_v5, "_fsync_dir", synced.append)
+    monkeypatch.setattr(executor_v5, "SIP_CHUNK_SIZE", 7)
+    writer = SIPWriter()
+    expected = {}
+    for sub in ("a", "b"):
+        (tmp_path / sub).mkdir()
+        for i in range(3):
+            content = f"{sub}-{i} héllo\n" * 5
+            path = tmp_path / sub / f"f{i}.txt"
+            ok, before, after, temp = apply_sip_single_file(str(path), content, writer=writer)
+            assert ok and before is None and not Path(temp).exists()
+            expected[path] = hashlib.sha256(content.encode("utf-8")).hexdigest()
+            assert after == expected[path]
+    generated = tmp_path / "a" / "big.txt"
+    checksum, _ = writer.write(generated, (f"line {i}\n" for i in range(1000)))
+    assert synced == []
+
+    writer.sync()
+    assert sorted(synced) == [str(tmp_path / "a"), str(tmp_path / "b")]
+    assert checksum == hashlib.sha256(generated.read_bytes()).hexdigest()
+    assert not list(tmp_path.rglob("*.tmp"))
+
+    # Verification trusts the recorded inode/size instead of re-reading
+    monkeypatch.setattr(executor_v5, "compute_file_checksum", lambda path: "re-read")
+    for path, digest in expected.items():
+        assert writer.verify(str(path), digest) == digest
+    (tmp_path / "b" / "f0.txt").write_text("changed by someone else\n")
+    assert writer.verify(str(tmp_path / "b" / "f0.txt"), expected[tmp_path / "b" / "f0.txt"]) == "re-read"
+
+
+def test_single_file_sip_reports_before_checksum(tmp_path):
+    path = tmp_path / "doc.md"
+    path.write_text("old\n")
+    ok, before, after, _ = apply_sip_single_file(str(path), "new\n", operation="modify")
+    assert ok
+    assert before == hashlib.sha256(b"old\n").hexdigest()
+    assert after == hashlib.sha256(b"new\n").hexdigest()
+    assert path.read_text() == "new\n"
+
+
+def test_sandbox_checksum_is_chunked(tmp_path, monkeypatch):
+    path = tmp_path / "blob.bin"
+    path.write_bytes(bytes(range(256)) * 41)
+    monkeypatch.setattr(sandbox_guard_v5, "CHECKSUM_CHUNK_SIZE", 100)
+    assert sandbox_guard_v5.compute_file_checksum(str(path)) == hashlib.sha256(path.read_bytes()).hexdigest()
+    assert sandbox_guard_v5.compute_file_checksum(str(tmp_path / "missing")) is None
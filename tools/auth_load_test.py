@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+auth_load_test.py - Concurrent login throughput of AuthManager.login_async
+
+Registers one user in a throwaway store, then fires N concurrent logins on
+one event loop for each hashing pool size and reports logins/sec. With
+PBKDF2 offloaded to the pool, throughput should scale with the pool size up
+to the number of cores.
+
+Usage:
+    python tools/auth_load_test.py [--logins 64] [--workers 1,2,4,8] [--sqlite]
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+# Add project root to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from core.auth import AuthManager
+
+
+async def _run_logins(auth: AuthManager, username: str, password: str, count: int) -> float:
+    started = time.perf_counter()
+    results = await asyncio.gather(*(auth.login_async(username, password) for _ in range(count)))
+    elapsed = time.perf_counter() - started
+    if not all(results):
+        raise RuntimeError("login failed during load test")
+    return elapsed
+
+
+def run_load_test(logins: int, workers_list, sqlite: bool = False):
+    """Returns [(workers, seconds, logins_per_sec)]."""
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "users.db" if sqlite else "users.json")
+        setup = AuthManager(db_path=db_path)
+        setup.register("load_user", "LoadTestPassword1!")
+        for workers in workers_list:
+            auth = AuthManager(db_path=db_path, max_workers=workers)
+            try:
+                elapsed = asyncio.run(_run_logins(auth, "load_user", "LoadTestPassword1!", logins))
+            finally:
+                auth.close()
+            results.append((workers, elapsed, logins / elapsed))
+    return results
+
+
+def main():
+    cores = os.cpu_count() or 1
+    default_workers = sorted({1, 2, 4, cores} & set(range(1, cores + 1)))
+    parser = argparse.ArgumentParser(description="AuthManager concurrent login load test")
+    parser.add_argument("--logins", type=int, default=64, help="Concurrent logins per run")
+    parser.add_argument("--workers", default=",".join(map(str, default_workers)), help="Pool sizes to compare")
+    parser.add_argument("--sqlite", action="store_true", help="Use the SQLite user store")
+    args = parser.parse_args()
+
+    workers_list = [int(w) for w in args.workers.split(",") if w.strip()]
+    print(f"🔐 {args.logins} concurrent logins, {cores} cores")
+    baseline = None
+    for workers, elapsed, rate in run_load_test(args.logins, workers_list, args.sqlite):
+        baseline = baseline or rate
+        print(f"  workers={workers:<3} {elapsed:7.3f}s  {rate:8.1f} logins/s  x{rate / baseline:.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -33,6 +33,12 @@ import subprocess
 import sys
 from typing import Any, Dict, List, Optional
 
+_CODE_ROOT = pathlib.Path(__file__).resolve().parents[1]
+if str(_CODE_ROOT) not in sys.path:
+    sys.path.insert(0, str(_CODE_ROOT))
+
+from g.tools.jsonl_tail import LineCountCache, iter_records, tail_lines  # noqa: E402
+
 
 def get_repo_root() -> pathlib.Path:
     return pathlib.Path(os.environ.get("REPO_ROOT", str(pathlib.Path.home() / "02luka"))).resolve()
@@ -43,6 +49,7 @@ def get_paths():
         "root": root,
         "core_dir": root / "g" / "core_history",
         "dec_path": root / "g" / "telemetry" / "decision_log.jsonl",
+        "line_cache": root / "g" / "cache" / "core_history" / "line_count.json",
         "rule_src": root / "decision_summarizer.py"
     }
 
@@ -127,18 +134,8 @@ def read_decision_rows_last_n(n: int = 50) -> List[Dict[str, Any]]:
     if not paths["dec_path"].exists():
         return []
     try:
-        lines = paths["dec_path"].read_text(encoding="utf-8", errors="replace").splitlines()
-        rows: List[Dict[str, Any]] = []
-        for line in lines[-n:]:
-            line = line.strip()
-            if not line:
-                continue
-            try:
-                rows.append(json.loads(line))
-            except Exception:
-                # Keep engine resilient: ignore malformed lines.
-                continue
-        return rows
+        # Reads backwards from the end; malformed lines are ignored to keep the engine resilient.
+        return list(iter_records(tail_lines(paths["dec_path"], n)))
     except Exception:
         return []
 
@@ -149,8 +146,10 @@ def decision_stats() -> Dict[str, Any]:
         return {"status": "missing", "count": 0, "recent": []}
 
     try:
-        # Count lines without loading JSON for speed.
-        count = sum(1 for _ in paths["dec_path"].read_text(encoding="utf-8", errors="replace").splitlines() if _.strip())
+        # Count non-blank lines without loading JSON; only bytes appended since the last run are scanned.
+        cache = LineCountCache(paths["line_cache"])
+        count = cache.nonblank_line_count(paths["dec_path"])
+        cache.save()
     except Exception:
         count = 0
 
@@ -11,16 +11,21 @@ Features:
 - Request/response logging
 - Error handling and retry logic
 - Async/sync interface support
-- Response caching (optional)
+- Response caching (optional, LRU + TTL with background sweeping)
+- Single-flight coalescing of identical concurrent searches
 """
 
 import os
+import asyncio
 import json
 import logging
+import threading
+import sys
 import time
-from typing import Dict, List, Optional, Any
+from pathlib import Path
+from typing import Dict, List, Optional, Any, Callable, Union
 from dataclasses import dataclass, asdict
-from datetime import datetime, timedelta
+from datetime import datetime
 
 try:
     import requests  # type: ignore[import-untyped]
@@ -32,11 +37,17 @@ try:
         # Fallback: use requests' bundled urllib3 (guaranteed to work if requests is installed)
         from requests.packages.urllib3.util.retry import Retry  # type: ignore[import-untyped]
 except ImportError as e:
-    import sys
     print(f"Error: Missing dependencies. Install with: pip install requests", file=sys.stderr)
     print(f"ImportError: {e}", file=sys.stderr)
     sys.exit(1)
 
+# Ensure project root is on sys.path when executed as a script
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from shared.ttl_cache import TTLCache
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
@@ -69,6 +80,15 @@ class SearchResponse:
     timestamp: str
 
 
+class _InFlight:
+    """Pending upstream call shared by coalesced callers"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Optional[SearchResponse] = None
+        self.error: Optional[BaseException] = None
+
+
 class KimGatewayProxy:
     """
     Proxy client for Kim Gateway search service.
@@ -83,7 +103,11 @@ class KimGatewayProxy:
         timeout: int = 30,
         max_retries: int = 3,
         cache_enabled: bool = False,
-        cache_ttl: int = 300  # 5 minutes
+        cache_ttl: int = 300,  # 5 minutes
+        cache_max_entries: int = 1024,
+        cache_sweep_interval: float = 60.0,
+        coalesce_requests: bool = True,
+        pool_size: int = 10
     ):
         """
         Initialize Kim Gateway proxy client.
@@ -94,6 +118,12 @@ class KimGatewayProxy:
             max_retries: Number of retry attempts
             cache_enabled: Enable response caching
             cache_ttl: Cache TTL in seconds
+            cache_max_entries: Maximum cached responses before LRU eviction
+            cache_sweep_interval: Seconds between background sweeps of expired
+                entries (0 disables the sweeper thread)
+            coalesce_requests: Share one upstream request between concurrent
+                identical searches
+            pool_size: Connection pool size of the shared HTTP session
         """
         self.base_url = base_url.rstrip('/')
         self.search_endpoint = f"{self.base_url}/search"
@@ -107,14 +137,28 @@ class KimGatewayProxy:
             status_forcelist=[429, 500, 502, 503, 504],
             allowed_methods=["GET", "POST"]
         )
-        adapter = HTTPAdapter(max_retries=retry_strategy)
+        adapter = HTTPAdapter(
+            max_retries=retry_strategy,
+            pool_connections=pool_size,
+            pool_maxsize=pool_size
+        )
         self.session.mount("http://", adapter)
         self.session.mount("https://", adapter)
 
         # Cache setup
         self.cache_enabled = cache_enabled
         self.cache_ttl = cache_ttl
-        self._cache: Dict[str, tuple[SearchResponse, datetime]] = {}
+        self._cache = TTLCache(cache_max_entries, cache_ttl, cache_sweep_interval, name="kim-proxy-cache")
+        if cache_enabled:
+            self._cache.start_sweeper()
+
+        # Single-flight coalescing
+        self.coalesce_requests = coalesce_requests
+        self.pool_size = pool_size
+        self._inflight: Dict[str, _InFlight] = {}
+        self._inflight_lock = threading.Lock()
+        self._upstream_requests = 0
+        self._coalesced_requests = 0
 
         logger.info(f"Initialized KimGatewayProxy: {self.base_url}")
 
@@ -124,21 +168,49 @@ class KimGatewayProxy:
 
     def _get_from_cache(self, key: str) -> Optional[SearchResponse]:
         """Retrieve from cache if valid"""
-        if not self.cache_enabled or key not in self._cache:
+        if not self.cache_enabled:
             return None
 
-        response, timestamp = self._cache[key]
-        if datetime.now() - timestamp > timedelta(seconds=self.cache_ttl):
-            del self._cache[key]
-            return None
-
-        logger.debug(f"Cache hit for query: {key[:50]}...")
+        response = self._cache.get(key)
+        if response is not None:
+            logger.debug(f"Cache hit for query: {key[:50]}...")
         return response
 
     def _put_in_cache(self, key: str, response: SearchResponse):
         """Store in cache"""
         if self.cache_enabled:
-            self._cache[key] = (response, datetime.now())
+            self._cache.put(key, response)
+
+    def _single_flight(self, key: str, fetch: Callable[[], SearchResponse]) -> SearchResponse:
+        """Run fetch once per key; concurrent callers wait for the leader's result"""
+        if not self.coalesce_requests:
+            return fetch()
+
+        with self._inflight_lock:
+            flight = self._inflight.get(key)
+            leader = flight is None
+            if leader:
+                flight = _InFlight()
+                self._inflight[key] = flight
+            else:
+                self._coalesced_requests += 1
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.result
+
+        try:
+            flight.result = fetch()
+            return flight.result
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._inflight_lock:
+                self._inflight.pop(key, None)
+            flight.done.set()
 
     def search(
         self,
@@ -175,9 +247,18 @@ class KimGatewayProxy:
         if cached:
             return cached
 
+        return self._single_flight(cache_key, lambda: self._fetch(request, cache_key))
+
+    def _fetch(self, request: SearchRequest, cache_key: str) -> SearchResponse:
+        """Execute one upstream search request and cache the response"""
+        query = request.query
+        limit = request.limit
+
         # Prepare request
         start_time = time.time()
         payload = asdict(request)
+        with self._inflight_lock:
+            self._upstream_requests += 1
 
         logger.info(f"Searching Kim Gateway: '{query}' (limit={limit})")
 
@@ -265,20 +346,61 @@ class KimGatewayProxy:
 
     def get_stats(self) -> Dict[str, Any]:
         """Get proxy statistics"""
-        return {
+        stats = {
             'endpoint': self.search_endpoint,
             'cache_enabled': self.cache_enabled,
-            'cache_size': len(self._cache) if self.cache_enabled else 0,
-            'timeout': self.timeout
+            'timeout': self.timeout,
+            'pool_size': self.pool_size,
+            'upstream_requests': self._upstream_requests,
+            'coalesced_requests': self._coalesced_requests,
         }
+        stats.update(self._cache.stats())
+        if not self.cache_enabled:
+            stats['cache_size'] = 0
+        return stats
 
     def clear_cache(self):
         """Clear response cache"""
         if self.cache_enabled:
-            cache_size = len(self._cache)
-            self._cache.clear()
+            cache_size = self._cache.clear()
             logger.info(f"Cleared cache ({cache_size} entries)")
 
+    async def search_many(
+        self,
+        queries: List[Union[str, Dict[str, Any]]],
+        limit: int = 10,
+        max_concurrency: Optional[int] = None,
+        return_exceptions: bool = False
+    ) -> List[Union[SearchResponse, BaseException]]:
+        """
+        Execute several searches concurrently over the pooled session.
+
+        Args:
+            queries: Query strings, or dicts of search() keyword arguments
+            limit: Default result limit for plain string queries
+            max_concurrency: Maximum in-flight requests (defaults to pool_size)
+            return_exceptions: Return failures in place instead of raising
+
+        Returns:
+            Responses in the same order as queries
+        """
+        semaphore = asyncio.Semaphore(max_concurrency or self.pool_size)
+
+        async def run_one(item: Union[str, Dict[str, Any]]) -> SearchResponse:
+            kwargs = {'query': item, 'limit': limit} if isinstance(item, str) else {'limit': limit, **item}
+            async with semaphore:
+                return await asyncio.to_thread(self.search, **kwargs)
+
+        return await asyncio.gather(
+            *(run_one(item) for item in queries),
+            return_exceptions=return_exceptions
+        )
+
+    def close(self):
+        """Stop the cache sweeper and release pooled connections"""
+        self._cache.stop_sweeper()
+        self.session.close()
+
 
 def demo():
     """Demo usage of Kim Gateway proxy"""
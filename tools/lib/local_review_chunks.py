@@ -0,0 +1,181 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import re
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+_HUNK_HEADER = re.compile(r"^@@ -\d+(?:,\d+)? \+(\d+)(?:,(\d+))? @@")
+
+# Rough chars-per-token ratio used for budgeting (no tokenizer dependency)
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(text: str) -> int:
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+@dataclass
+class DiffHunk:
+    """One '@@' hunk of a file diff, carrying its file header for standalone review."""
+
+    file: str
+    header: str
+    body: str
+    new_start: int
+    new_len: int
+
+    @property
+    def text(self) -> str:
+        return self.header + self.body
+
+    @property
+    def digest(self) -> str:
+        return hashlib.sha256(f"{self.file}\0{self.body}".encode("utf-8")).hexdigest()
+
+    def covers(self, line: int) -> bool:
+        return self.new_start <= line < self.new_start + max(self.new_len, 1)
+
+
+@dataclass
+class DiffChunk:
+    """A token-budgeted group of hunks reviewed in a single LLM call."""
+
+    hunks: List[DiffHunk] = field(default_factory=list)
+    tokens: int = 0
+
+    @property
+    def text(self) -> str:
+        parts: List[str] = []
+        current_file: Optional[str] = None
+        for hunk in self.hunks:
+            if hunk.file != current_file:
+                parts.append(hunk.header)
+                current_file = hunk.file
+            parts.append(hunk.body)
+        return "".join(parts)
+
+
+def split_file_diff(filename: str, diff_text: str) -> List[DiffHunk]:
+    """Split a single-file diff into hunks; header-only diffs become one hunk."""
+    lines = diff_text.splitlines(keepends=True)
+    header_lines: List[str] = []
+    idx = 0
+    while idx < len(lines) and not lines[idx].startswith("@@"):
+        header_lines.append(lines[idx])
+        idx += 1
+    header = "".join(header_lines)
+
+    hunks: List[DiffHunk] = []
+    body: List[str] = []
+    start, length = 0, 0
+    for line in lines[idx:]:
+        if line.startswith("@@"):
+            if body:
+                hunks.append(DiffHunk(filename, header, "".join(body), start, length))
+            match = _HUNK_HEADER.match(line)
+            start = int(match.group(1)) if match else 0
+            length = int(match.group(2)) if match and match.group(2) is not None else 1
+            body = [line]
+        else:
+            body.append(line)
+    if body:
+        hunks.append(DiffHunk(filename, header, "".join(body), start, length))
+    if not hunks and header:
+        # Mode change / rename without content: review the header itself
+        hunks.append(DiffHunk(filename, header, "", 0, 0))
+    return hunks
+
+
+def build_chunks(hunks: Sequence[DiffHunk], max_tokens: int) -> List[DiffChunk]:
+    """
+    Pack hunks, in order, into chunks of at most max_tokens.
+
+    Chunks break only on hunk boundaries; a hunk larger than the budget gets a
+    chunk of its own. The file header is counted once per file per chunk.
+    """
+    chunks: List[DiffChunk] = []
+    current = DiffChunk()
+    current_file: Optional[str] = None
+    for hunk in hunks:
+        cost = estimate_tokens(hunk.body)
+        if hunk.file != current_file:
+            cost += estimate_tokens(hunk.header)
+        if current.hunks and current.tokens + cost > max_tokens:
+            chunks.append(current)
+            current = DiffChunk()
+            current_file = None
+            cost = estimate_tokens(hunk.header) + estimate_tokens(hunk.body)
+        current.hunks.append(hunk)
+        current.tokens += cost
+        current_file = hunk.file
+    if current.hunks:
+        chunks.append(current)
+    return chunks
+
+
+class HunkResultCache:
+    """
+    On-disk cache of per-hunk review issues.
+
+    Keyed by (hunk content hash, model, focus areas) so a re-run after a small
+    fix only sends changed hunks to the LLM.
+    """
+
+    def __init__(self, cache_dir: Path) -> None:
+        self.cache_dir = Path(cache_dir)
+
+    @staticmethod
+    def make_key(hunk: DiffHunk, model: str, focus_areas: Sequence[str]) -> str:
+        raw = json.dumps([hunk.digest, model, sorted(focus_areas)])
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / key[:2] / f"{key}.json"
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        try:
+            return json.loads(self._path(key).read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+
+    def put(self, key: str, value: Dict[str, Any]) -> None:
+        path = self._path(key)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+            tmp.write_text(json.dumps(value), encoding="utf-8")
+            os.replace(tmp, path)
+        except OSError:
+            logging.debug("Failed to write review cache entry %s", key, exc_info=True)
+
+
+def assign_to_hunks(
+    chunk: DiffChunk, issues: Sequence[Dict[str, Any]]
+) -> List[Tuple[DiffHunk, List[Dict[str, Any]]]]:
+    """
+    Attribute chunk issues back to hunks by file and new-side line range.
+
+    Issues that match no hunk line range go to the first hunk of their file,
+    or to the chunk's first hunk when the file is unknown.
+    """
+    buckets: Dict[int, List[Dict[str, Any]]] = {i: [] for i in range(len(chunk.hunks))}
+    for issue in issues:
+        issue_file = str(issue.get("file", ""))
+        try:
+            line = int(issue.get("line") or 0)
+        except (TypeError, ValueError):
+            line = 0
+        same_file = [
+            i for i, hunk in enumerate(chunk.hunks)
+            if issue_file and (issue_file == hunk.file or issue_file.endswith("/" + hunk.file) or hunk.file.endswith("/" + issue_file))
+        ]
+        target = next((i for i in same_file if chunk.hunks[i].covers(line)), None)
+        if target is None:
+            target = same_file[0] if same_file else 0
+        buckets[target].append(issue)
+    return [(chunk.hunks[i], buckets[i]) for i in range(len(chunk.hunks))]
@@ -2,11 +2,22 @@ from __future__ import annotations
 
 import json
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, field
-from typing import Any, Dict, List, Sequence
-
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from tools.lib.local_review_chunks import (
+    DiffChunk,
+    DiffHunk,
+    HunkResultCache,
+    assign_to_hunks,
+    build_chunks,
+    split_file_diff,
+)
 from tools.lib.local_review_llm import LLMClient, LLMError
 
+SEVERITY_ORDER = {"critical": 0, "warning": 1, "suggestion": 2, "info": 3}
+
 
 @dataclass
 class Issue:
@@ -47,6 +58,92 @@ class ReviewEngine:
         payload = self.llm.complete(system_prompt, user_prompt)
         return self._parse_response(payload)
 
+    def analyze_chunked(
+        self,
+        file_diffs: Sequence[Tuple[str, str]],
+        *,
+        max_chunk_tokens: int = 6000,
+        max_in_flight: int = 4,
+        cache: Optional[HunkResultCache] = None,
+        context: str = "",
+    ) -> ReviewResult:
+        """
+        Review a diff as token-budgeted chunks split on file/hunk boundaries.
+
+        Cached hunks are skipped; the rest are packed into chunks and reviewed
+        concurrently (at most max_in_flight LLM calls at once). Issues are
+        merged in a deterministic order regardless of completion order.
+        """
+        hunks: List[DiffHunk] = []
+        for filename, diff_text in file_diffs:
+            hunks.extend(split_file_diff(filename, diff_text))
+
+        model = getattr(getattr(self.llm, "config", None), "model", "")
+        raw_issues: List[Dict[str, Any]] = []
+        summaries: List[str] = []
+        pending: List[DiffHunk] = []
+        keys: Dict[int, str] = {}
+        cached_hunks = 0
+
+        for hunk in hunks:
+            if cache is not None:
+                key = HunkResultCache.make_key(hunk, model, self.focus_areas)
+                keys[id(hunk)] = key
+                hit = cache.get(key)
+                if hit is not None:
+                    cached_hunks += 1
+                    raw_issues.extend(hit.get("issues", []))
+                    if hit.get("summary"):
+                        summaries.append(hit["summary"])
+                    continue
+            pending.append(hunk)
+
+        chunks = build_chunks(pending, max_chunk_tokens)
+        remaining_calls = getattr(getattr(self.llm, "config", None), "max_calls", None)
+        if remaining_calls is not None:
+            remaining_calls -= getattr(self.llm, "calls_made", 0)
+            if len(chunks) > remaining_calls:
+                raise LLMError(
+                    f"Chunked review needs {len(chunks)} LLM calls but "
+                    f"max_review_calls_per_run allows {remaining_calls}"
+                )
+
+        def review_chunk(chunk: DiffChunk) -> Dict[str, Any]:
+            payload = self.llm.complete(self._system_prompt(), self._user_prompt(chunk.text, context))
+            if not isinstance(payload, dict):
+                raise LLMError("LLM response is not a JSON object")
+            return payload
+
+        if chunks:
+            with ThreadPoolExecutor(max_workers=max(1, max_in_flight)) as pool:
+                payloads = list(pool.map(review_chunk, chunks))
+        else:
+            payloads = []
+
+        for chunk, payload in zip(chunks, payloads):
+            chunk_issues = [item for item in (payload.get("issues") or []) if isinstance(item, dict)]
+            summary = str(payload.get("summary") or "")
+            raw_issues.extend(chunk_issues)
+            if summary:
+                summaries.append(summary)
+            if cache is not None:
+                for hunk, hunk_issues in assign_to_hunks(chunk, chunk_issues):
+                    cache.put(keys[id(hunk)], {"issues": hunk_issues, "summary": summary})
+
+        result = self._parse_response({"summary": "", "issues": raw_issues})
+        result.issues.sort(key=lambda i: (
+            i.file, i.line, SEVERITY_ORDER.get(i.severity.lower(), len(SEVERITY_ORDER)),
+            i.category, i.description, i.suggestion,
+        ))
+        distinct = list(dict.fromkeys(summaries))
+        result.summary = " ".join(distinct) if distinct else "No summary provided"
+        result.metrics = {
+            "hunks": len(hunks),
+            "cached_hunks": cached_hunks,
+            "chunks_reviewed": len(chunks),
+        }
+        return result
+
     def _system_prompt(self) -> str:
         return (
             "You are an expert senior software engineer performing a code review. "
@@ -2,10 +2,14 @@ from __future__ import annotations
 
 import fnmatch
 import logging
+import re
 import subprocess
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Dict, List, Optional, Sequence, Tuple
+from typing import Dict, Iterator, List, Optional, Pattern, Sequence, Tuple
+
+_DIFF_HEADER = "diff --git "
+_QUOTED_ESCAPES = {"a": "\a", "b": "\b", "f": "\f", "n": "\n", "r": "\r", "t": "\t", "v": "\v", "\\": "\\", '"': '"'}
 
 
 class GitDiffError(RuntimeError):
@@ -19,6 +23,8 @@ class DiffResult:
     files_excluded: List[str]
     truncated: bool
     stats: Dict[str, int]
+    # Per-file (filename, diff text) blobs in the order they appear in `text`
+    file_diffs: List[Tuple[str, str]] = field(default_factory=list)
 
 
 class GitInterface:
@@ -75,26 +81,146 @@ class GitInterface:
                 continue
         raise GitDiffError("No base branch found (checked origin/main, main, master)")
 
-    def _numstat(self, scope_args: Sequence[str]) -> Dict[str, bool]:
-        """Return mapping file -> is_binary using git numstat."""
-        out = self._run_git(["diff", *scope_args, "--numstat"])
-        mapping: Dict[str, bool] = {}
-        for line in out.splitlines():
-            parts = line.split("\t")
-            if len(parts) < 3:
-                continue
-            add, delete, filename = parts[0], parts[1], parts[2]
-            mapping[filename] = add == "-" or delete == "-"
-        return mapping
+    @staticmethod
+    def _compile_matcher(patterns: Sequence[str]) -> Optional[Pattern[str]]:
+        """Fold fnmatch patterns into one precompiled regex (None when empty)."""
+        if not patterns:
+            return None
+        return re.compile("|".join(f"(?:{fnmatch.translate(pat)})" for pat in patterns))
 
-    def _file_diff(self, scope_args: Sequence[str], filename: str, context_lines: int) -> str:
-        return self._run_git(
-            ["diff", *scope_args, f"-U{context_lines}", "--", filename]
+    @staticmethod
+    def _unquote_path(path: str) -> str:
+        """Decode a git C-style quoted path ("a/caf\\303\\251")."""
+        if not (path.startswith('"') and path.endswith('"')):
+            return path
+        body = path[1:-1]
+        out = bytearray()
+        i = 0
+        while i < len(body):
+            ch = body[i]
+            if ch == "\\" and i + 1 < len(body):
+                nxt = body[i + 1]
+                if nxt in "01234567":
+                    out.append(int(body[i + 1:i + 4], 8))
+                    i += 4
+                    continue
+                out.extend(_QUOTED_ESCAPES.get(nxt, nxt).encode("utf-8"))
+                i += 2
+                continue
+            out.extend(ch.encode("utf-8"))
+            i += 1
+        return out.decode("utf-8", errors="replace")
+
+    @classmethod
+    def _header_path(cls, header: str) -> Optional[str]:
+        """Post-image path from a 'diff --git a/X b/X' header (None if ambiguous)."""
+        rest = header[len(_DIFF_HEADER):].rstrip("\n")
+        if rest.startswith('"') or rest.endswith('"'):
+            match = re.match(r'^("(?:[^"\\]|\\.)*"|\S+) ("(?:[^"\\]|\\.)*"|\S+)$', rest)
+            if not match:
+                return None
+            new = cls._unquote_path(match.group(2))
+            return new[2:] if new.startswith("b/") else new
+        # Unquoted: both sides are the same path unless this is a rename/copy
+        path_len = (len(rest) - 5) // 2
+        if path_len > 0 and rest[2:2 + path_len] == rest[5 + path_len:]:
+            return rest[5 + path_len:]
+        return None
+
+    def _stream_diff(self, scope_args: Sequence[str], context_lines: int) -> Iterator[str]:
+        """Yield lines of a single 'git diff -U<n>' run without buffering the whole output."""
+        args = ["git", "diff", *scope_args, f"-U{context_lines}"]
+        logging.debug("Running git command: %s", " ".join(args[1:]))
+        proc = subprocess.Popen(
+            args,
+            cwd=self.repo_root,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True,
+            encoding="utf-8",
+            errors="replace",
         )
+        assert proc.stdout is not None
+        try:
+            yield from proc.stdout
+        finally:
+            proc.stdout.close()
+            stderr = proc.stderr.read() if proc.stderr else ""
+            if proc.stderr:
+                proc.stderr.close()
+            returncode = proc.wait()
+        if returncode != 0:
+            raise GitDiffError(stderr or f"git diff exited with {returncode}")
+
+    def _iter_file_diffs(
+        self,
+        lines: Iterator[str],
+        keep_text,
+    ) -> Iterator[Tuple[str, Optional[str], int, bool]]:
+        """
+        Split a diff stream on 'diff --git' headers.
+
+        keep_text(filename) returns the max bytes of text to retain for that file
+        (0 = skip, None = unlimited). Yields (filename, text or None, size_bytes, is_binary);
+        text is None when the file was skipped or exceeded its retention cap.
+        """
+        header: Optional[str] = None
+        meta: List[str] = []
+        filename: Optional[str] = None
+        parts: List[str] = []
+        size = 0
+        cap: Optional[int] = None
+        binary = False
+        dropped = False
+
+        def finish():
+            text = None if dropped or cap == 0 else "".join(parts)
+            return filename, text, size, binary
+
+        for line in lines:
+            if line.startswith(_DIFF_HEADER):
+                if filename is not None:
+                    yield finish()
+                header = line
+                filename = self._header_path(line)
+                meta = [line]
+                parts, size, binary, dropped = [], len(line.encode("utf-8")), False, False
+                cap = keep_text(filename) if filename is not None else None
+                if filename is None:
+                    # Rename/copy: resolve the name from the extended header lines
+                    continue
+                parts = [line] if cap != 0 else []
+                continue
+            if header is None:
+                continue
 
-    @staticmethod
-    def _is_match(patterns: Sequence[str], path: str) -> bool:
-        return any(fnmatch.fnmatch(path, pat) for pat in patterns)
+            if filename is None:
+                meta.append(line)
+                size += len(line.encode("utf-8"))
+                if line.startswith(("rename to ", "copy to ")):
+                    filename = self._unquote_path(line.split(" ", 2)[2].rstrip("\n"))
+                elif line.startswith("+++ "):
+                    target = self._unquote_path(line[4:].rstrip("\n"))
+                    filename = target[2:] if target.startswith("b/") else target
+                if filename is not None:
+                    cap = keep_text(filename)
+                    parts = list(meta) if cap != 0 else []
+                continue
+
+            size += len(line.encode("utf-8"))
+            if line.startswith("Binary files ") or line.startswith("GIT binary patch"):
+                binary = True
+            if cap == 0 or dropped:
+                continue
+            if cap is not None and size > cap:
+                # Oversize: stop retaining text, keep counting bytes
+                parts = []
+                dropped = True
+                continue
+            parts.append(line)
+
+        if filename is not None:
+            yield finish()
 
     def get_filtered_diff(
         self,
@@ -110,60 +236,89 @@ class GitInterface:
         soft_limit_kb: int,
         hard_limit_kb: int,
         context_lines: int = 3,
+        trim: bool = True,
     ) -> DiffResult:
-        scope_args = self._diff_scope_args(mode, target, base)
-        name_only_args = ["diff", *scope_args, "--name-only"]
-        names_out = self._run_git(name_only_args)
-        filenames = [line.strip() for line in names_out.splitlines() if line.strip()]
+        """
+        Collect the filtered diff with a single streamed 'git diff' invocation.
 
-        binary_map = self._numstat(scope_args)
+        Per-file blobs are split on 'diff --git' headers and binary files are
+        detected from the same stream. A file diff that can never fit the soft
+        limit is not retained while streaming, and retained text is capped at
+        the hard limit (lowest-priority, latest files are released first).
+
+        With trim=False (chunked review) the soft limit is not applied; only the
+        hard limit bounds what is kept.
+        """
+        scope_args = self._diff_scope_args(mode, target, base)
+        ignore_re = self._compile_matcher([*ignore_patterns, *exclude_files])
+        soft_limit_bytes = soft_limit_kb * 1024
+        hard_limit_bytes = hard_limit_kb * 1024
+
+        def keep_text(filename: str) -> Optional[int]:
+            if ignore_re is not None and ignore_re.match(filename):
+                return 0
+            if not trim:
+                return hard_limit_bytes
+            priority = self._priority_for_file(filename, priority_ext, deprioritize_ext, drop_files)
+            # _trim_to_limit never keeps a single file above these sizes
+            return int(soft_limit_bytes * 1.2) if priority == 0 else soft_limit_bytes
 
         included: List[str] = []
         excluded: List[str] = []
         file_blobs: List[Tuple[str, str, int, int]] = []
+        released: List[str] = []
         total_bytes = 0
+        retained_bytes = 0
 
-        for filename in filenames:
-            if self._is_match(ignore_patterns, filename) or self._is_match(exclude_files, filename):
+        for filename, diff_text, size_bytes, is_binary in self._iter_file_diffs(
+            self._stream_diff(scope_args, context_lines), keep_text
+        ):
+            if ignore_re is not None and ignore_re.match(filename):
                 excluded.append(filename)
                 continue
-            if binary_map.get(filename):
+            if is_binary:
                 excluded.append(filename)
                 continue
 
-            try:
-                diff_text = self._file_diff(scope_args, filename, context_lines)
-            except GitDiffError as exc:
-                logging.warning("Skipping %s due to git diff error: %s", filename, exc)
-                excluded.append(filename)
-                continue
-
-            size_bytes = len(diff_text.encode("utf-8"))
             priority = self._priority_for_file(
                 filename, priority_ext, deprioritize_ext, drop_files
             )
+            total_bytes += size_bytes
+            included.append(filename)
+            if diff_text is None:
+                # Larger than any limit: trimming would drop it anyway
+                released.append(filename)
+                continue
 
             file_blobs.append((filename, diff_text, size_bytes, priority))
-            included.append(filename)
-            total_bytes += size_bytes
+            retained_bytes += size_bytes
+            while retained_bytes > hard_limit_bytes and len(file_blobs) > 1:
+                victim = max(range(len(file_blobs)), key=lambda i: (file_blobs[i][3], i))
+                name, _, victim_size, _ = file_blobs.pop(victim)
+                retained_bytes -= victim_size
+                released.append(name)
 
         # Early exit: nothing to review
         if not file_blobs:
-            return DiffResult(text="", files_included=[], files_excluded=excluded, truncated=False, stats={"files": 0, "bytes": 0})
+            excluded.extend(released)
+            return DiffResult(text="", files_included=[], files_excluded=excluded, truncated=bool(released), stats={"files": 0, "bytes": 0})
 
         # Smart truncation if over soft limit or hard limit
         truncated = False
-        if total_bytes > soft_limit_kb * 1024 or total_bytes > hard_limit_kb * 1024:
+        if not trim:
+            truncated = bool(released)
+        elif total_bytes > soft_limit_bytes or total_bytes > hard_limit_bytes:
             truncated = True
             # First drop explicit drop_files and deprioritized extensions
             file_blobs, dropped = self._trim_to_limit(
                 file_blobs,
-                soft_limit_kb * 1024,
+                soft_limit_bytes,
                 drop_files=drop_files,
                 deprioritize_ext=deprioritize_ext,
             )
             excluded.extend(dropped)
             included = [f for f, *_ in file_blobs]
+        excluded.extend(released)
 
         # Build combined diff
         combined_parts: List[str] = []
@@ -182,6 +337,7 @@ class GitInterface:
             files_excluded=excluded,
             truncated=truncated,
             stats=stats,
+            file_diffs=[(filename, diff_text) for filename, diff_text, *_ in file_blobs],
         )
 
     def _priority_for_file(
@@ -1,8 +1,11 @@
 from __future__ import annotations
 
+import hashlib
 import json
 import logging
 import os
+import threading
+import time
 from dataclasses import dataclass
 from typing import Any, Dict, Optional
 
@@ -26,6 +29,7 @@ class LLMClient:
     def __init__(self, config: LLMConfig) -> None:
         self.config = config
         self.calls_made = 0
+        self._calls_lock = threading.Lock()
         self._client = None
         if config.provider != "anthropic":
             raise LLMError(f"Unsupported provider: {config.provider}")
@@ -62,14 +66,17 @@ class LLMClient:
             raise LLMError("ANTHROPIC_API_KEY is not set.")
         self._client = anthropic.Anthropic(api_key=api_key)
 
-    def complete(self, system_prompt: str, user_prompt: str) -> Dict[str, Any]:
-        if self.calls_made >= self.config.max_calls:
-            raise LLMError("max_review_calls_per_run exceeded")
+    def _reserve_call(self) -> None:
+        with self._calls_lock:
+            if self.calls_made >= self.config.max_calls:
+                raise LLMError("max_review_calls_per_run exceeded")
+            self.calls_made += 1
 
+    def complete(self, system_prompt: str, user_prompt: str) -> Dict[str, Any]:
         if not self._client:
             raise LLMError("LLM client not initialized")
 
-        self.calls_made += 1
+        self._reserve_call()
         logging.debug("Calling Anthropic model=%s", self.config.model)
 
         try:
@@ -99,3 +106,59 @@ class LLMClient:
             return json.loads(content_text)
         except json.JSONDecodeError as exc:
             raise LLMError(f"Invalid JSON from LLM: {exc}") from exc
+
+
+class StubLLMClient(LLMClient):
+    """
+    Offline, deterministic LLM client for tests and benchmarks.
+
+    Flags every added diff line containing one of `markers` as a warning and
+    sleeps `latency_s` per call to mimic network latency.
+    """
+
+    def __init__(
+        self,
+        config: LLMConfig,
+        *,
+        latency_s: float = 0.0,
+        markers: tuple = ("TODO", "FIXME"),
+    ) -> None:
+        self.config = config
+        self.calls_made = 0
+        self._calls_lock = threading.Lock()
+        self._client = None
+        self.latency_s = latency_s
+        self.markers = markers
+
+    def complete(self, system_prompt: str, user_prompt: str) -> Dict[str, Any]:
+        self._reserve_call()
+        if self.latency_s:
+            time.sleep(self.latency_s)
+
+        issues = []
+        current_file = ""
+        new_line = 0
+        for line in user_prompt.splitlines():
+            if line.startswith("+++ "):
+                target = line[4:]
+                current_file = target[2:] if target.startswith("b/") else target
+            elif line.startswith("@@"):
+                try:
+                    new_line = int(line.split("+", 1)[1].split(",", 1)[0].split(" ", 1)[0])
+                except (IndexError, ValueError):
+                    new_line = 0
+            elif line.startswith("+"):
+                if any(marker in line for marker in self.markers):
+                    issues.append({
+                        "file": current_file,
+                        "line": new_line,
+                        "severity": "warning",
+                        "category": "quality",
+                        "description": f"Unresolved marker: {line[1:].strip()[:80]}",
+                    })
+                new_line += 1
+            elif line.startswith(" "):
+                new_line += 1
+
+        digest = hashlib.sha256(user_prompt.encode("utf-8")).hexdigest()[:8]
+        return {"summary": f"stub review {digest}", "issues": issues, "metrics": {}}
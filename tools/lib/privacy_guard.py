@@ -1,10 +1,16 @@
 from __future__ import annotations
 
+import bisect
 import fnmatch
 import re
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Dict, List, Optional, Sequence
+from typing import Dict, List, Optional, Sequence, Tuple
+
+# Leading global inline flags, e.g. "(?i)", which cannot appear mid-alternation
+_GLOBAL_FLAGS = re.compile(r"^\(\?([aiLmsux]+)\)")
+_SCOPED_FLAGS = {re.IGNORECASE: "i", re.MULTILINE: "m", re.DOTALL: "s", re.VERBOSE: "x"}
 
 
 @dataclass
@@ -49,6 +55,9 @@ class SecurityWarning:
 class PrivacyGuard:
     """Pre-flight checks for secrets and unsafe files."""
 
+    # Diffs at least this large are split by file across processes when requested
+    PARALLEL_THRESHOLD_BYTES = 4 * 1024 * 1024
+
     def __init__(
         self,
         *,
@@ -68,11 +77,34 @@ class PrivacyGuard:
             "gcp_service_account": re.compile(r"\"type\": \"service_account\""),
         }
 
-    def scan_diff(self, diff_text: str) -> List[SecurityWarning]:
-        """Scan unified diff text for secrets; respects allowlist and per-file context."""
-        warnings: List[SecurityWarning] = []
-        current_file: Optional[str] = None
-        for idx, raw_line in enumerate(diff_text.splitlines(), 1):
+    def _combined_pattern(self) -> re.Pattern[str]:
+        """
+        One zero-width alternation of every secret pattern, used as a prefilter.
+
+        Each pattern keeps its own flags as a scoped group; the lookahead makes
+        the search non-consuming so no hit can hide another.
+        """
+        key = tuple((kind, p.pattern, p.flags) for kind, p in self.patterns.items())
+        cached = getattr(self, "_combined_cache", None)
+        if cached and cached[0] == key:
+            return cached[1]
+        parts = []
+        for pattern in self.patterns.values():
+            body = _GLOBAL_FLAGS.sub("", pattern.pattern)
+            flags = "".join(f for bit, f in _SCOPED_FLAGS.items() if pattern.flags & bit)
+            parts.append(f"(?{flags}:{body})" if flags else f"(?:{body})")
+        combined = re.compile("(?=" + "|".join(parts) + ")", re.MULTILINE)
+        self._combined_cache = (key, combined)
+        return combined
+
+    def _scan_lines(
+        self, lines: Sequence[str], line_offset: int, current_file: Optional[str]
+    ) -> List[SecurityWarning]:
+        """Scan diff lines (numbered from line_offset + 1) starting in current_file."""
+        # Pass 1: strip diff prefixes and record (line number, file) per scanned line
+        contents: List[str] = []
+        meta: List[Tuple[int, Optional[str]]] = []
+        for idx, raw_line in enumerate(lines, line_offset + 1):
             # Track current file from diff headers
             if raw_line.startswith("+++ "):
                 path = raw_line[4:].strip()
@@ -90,9 +122,34 @@ class PrivacyGuard:
             content = raw_line
             if raw_line[:1] in {"+", "-", " "} and not raw_line.startswith(("+++", "---")):
                 content = raw_line[1:]
+            contents.append(content)
+            meta.append((idx, current_file))
+
+        if not contents:
+            return []
 
-            # Allowlist check
-            if self.allowlist and self.allowlist.is_allowed(content, file_path=current_file):
+        # Pass 2: one prefilter search over the joined buffer, mapped back via line offsets
+        buffer = "\n".join(contents)
+        starts: List[int] = []
+        pos = 0
+        for content in contents:
+            starts.append(pos)
+            pos += len(content) + 1
+
+        combined = self._combined_pattern()
+        warnings: List[SecurityWarning] = []
+        search_from = 0
+        while True:
+            hit = combined.search(buffer, search_from)
+            if hit is None:
+                break
+            row = bisect.bisect_right(starts, hit.start()) - 1
+            search_from = starts[row + 1] if row + 1 < len(starts) else len(buffer) + 1
+            content = contents[row]
+            idx, file_path = meta[row]
+
+            # Allowlist check (only for lines that actually contain a hit)
+            if self.allowlist and self.allowlist.is_allowed(content, file_path=file_path):
                 continue
 
             for kind, pattern in self.patterns.items():
@@ -103,12 +160,53 @@ class PrivacyGuard:
                             kind=kind,
                             match=match.group(0),
                             context=context,
-                            file=current_file,
+                            file=file_path,
                             line=idx,
                         )
                     )
+            if search_from > len(buffer):
+                break
         return warnings
 
+    @staticmethod
+    def _split_by_file(lines: Sequence[str]) -> List[Tuple[int, int, Optional[str]]]:
+        """Split diff lines on 'diff --git' headers: (start, end, file in effect at start)."""
+        segments: List[Tuple[int, int, Optional[str]]] = []
+        seg_start = 0
+        seg_file: Optional[str] = None
+        current_file: Optional[str] = None
+        for i, raw_line in enumerate(lines):
+            if raw_line.startswith("diff --git ") and i > seg_start:
+                segments.append((seg_start, i, seg_file))
+                seg_start, seg_file = i, current_file
+            if raw_line.startswith("+++ "):
+                path = raw_line[4:].strip()
+                if path != "/dev/null":
+                    current_file = path[2:] if path.startswith("b/") else path
+                else:
+                    current_file = None
+        segments.append((seg_start, len(lines), seg_file))
+        return segments
+
+    def scan_diff(self, diff_text: str, *, processes: Optional[int] = None) -> List[SecurityWarning]:
+        """
+        Scan unified diff text for secrets; respects allowlist and per-file context.
+
+        A single combined-regex pass finds candidate lines; the allowlist and
+        the per-pattern matching run only on those lines. With processes > 1,
+        diffs of PARALLEL_THRESHOLD_BYTES or more are split by file and scanned
+        in a process pool. Findings and their order are the same either way.
+        """
+        lines = diff_text.splitlines()
+        if processes and processes > 1 and len(diff_text) >= self.PARALLEL_THRESHOLD_BYTES:
+            segments = self._split_by_file(lines)
+            if len(segments) > 1:
+                jobs = [(self, lines[start:end], start, seg_file) for start, end, seg_file in segments]
+                with ProcessPoolExecutor(max_workers=processes) as pool:
+                    results = pool.map(_scan_segment, jobs, chunksize=max(1, len(jobs) // (processes * 4)))
+                    return [warning for part in results for warning in part]
+        return self._scan_lines(lines, 0, None)
+
     def is_safe_file(self, filename: str) -> bool:
         path = Path(filename)
         name = path.name
@@ -124,3 +222,9 @@ class PrivacyGuard:
     @staticmethod
     def _match_pattern(path: str, pattern: str) -> bool:
         return Path(path).match(pattern)
+
+
+def _scan_segment(job: Tuple[PrivacyGuard, Sequence[str], int, Optional[str]]) -> List[SecurityWarning]:
+    """Process-pool worker for PrivacyGuard.scan_diff."""
+    guard, lines, line_offset, current_file = job
+    return guard._scan_lines(lines, line_offset, current_file)
@@ -18,9 +18,10 @@ if str(PROJECT_ROOT) not in sys.path:
 
 import yaml
 
+from tools.lib.local_review_chunks import HunkResultCache
 from tools.lib.local_review_engine import ReviewEngine, ReviewResult, build_offline_result
 from tools.lib.local_review_git import DiffResult, GitDiffError, GitInterface
-from tools.lib.local_review_llm import LLMClient, LLMConfig, LLMError
+from tools.lib.local_review_llm import LLMClient, LLMConfig, LLMError, StubLLMClient
 from tools.lib.privacy_guard import PrivacyGuard, SecretAllowlist
 
 
@@ -117,6 +118,21 @@ class AppConfig:
             except (ValueError, TypeError):
                 pass  # Already reported above
 
+        # Chunked review validation
+        chunked = review.get("chunked")
+        if chunked is not None and not isinstance(chunked, bool):
+            errors.append(f"review.chunked must be a boolean, got {type(chunked).__name__}")
+        for key, minimum in (("chunk_tokens", 1), ("max_in_flight", 1)):
+            value = review.get(key)
+            if value is None:
+                continue
+            try:
+                value_int = int(value)
+                if value_int < minimum:
+                    errors.append(f"review.{key} must be >= {minimum}, got {value_int}")
+            except (ValueError, TypeError):
+                errors.append(f"review.{key} must be an integer, got {type(value).__name__}")
+
         # Secret scan validation
         secret_scan = review.get("secret_scan", {})
         if isinstance(secret_scan, dict):
@@ -472,6 +488,8 @@ def build_llm(config: AppConfig) -> LLMClient:
         temperature=float(api_cfg.get("temperature", 0.2)),
         max_calls=int(api_cfg.get("max_review_calls_per_run", 1)),
     )
+    if llm_config.provider == "stub":
+        return StubLLMClient(llm_config, latency_s=float(api_cfg.get("stub_latency_s", 0.0)))
     return LLMClient(llm_config)
 
 
@@ -542,6 +560,7 @@ def main(argv: Optional[Sequence[str]] = None) -> int:
     git = GitInterface()
 
     review_cfg = config.review
+    chunked = bool(review_cfg.get("chunked", False))
     try:
         diff = git.get_filtered_diff(
             args.mode,
@@ -555,6 +574,7 @@ def main(argv: Optional[Sequence[str]] = None) -> int:
             soft_limit_kb=int(review_cfg.get("soft_limit_kb", 60)),
             hard_limit_kb=int(review_cfg.get("hard_limit_kb", 100)),
             context_lines=int(review_cfg.get("context_lines", 3)),
+            trim=not chunked,
         )
     except GitDiffError as exc:
         print(f"[local-review] git error: {exc}", file=sys.stderr)
@@ -583,7 +603,16 @@ def main(argv: Optional[Sequence[str]] = None) -> int:
         try:
             llm = build_llm(config)
             engine = ReviewEngine(llm, focus_areas=review_cfg.get("focus_areas", []))
-            review_result = engine.analyze_diff(diff.text)
+            if chunked:
+                cache_dir = review_cfg.get("chunk_cache_dir", "g/cache/local_review")
+                review_result = engine.analyze_chunked(
+                    diff.file_diffs,
+                    max_chunk_tokens=int(review_cfg.get("chunk_tokens", 6000)),
+                    max_in_flight=int(review_cfg.get("max_in_flight", 4)),
+                    cache=HunkResultCache(Path(cache_dir)) if cache_dir else None,
+                )
+            else:
+                review_result = engine.analyze_diff(diff.text)
         except LLMError as exc:
             print(f"[local-review] LLM error: {exc}", file=sys.stderr)
             return 2
@@ -0,0 +1,350 @@
+#!/usr/bin/env python3
+"""
+Paula Backtest - replay the bias/position-size signal over stored history
+
+For every symbol and every parameter set, the signal of paula_indicators.py
+(rolling OLS slope, confidence, bias, 30%/15% sizing) is evaluated on each
+bar's close and held for the next bar:
+
+    position[t] = bias[t] * size[t]
+    return[t]   = position[t] * (close[t+1] / close[t] - 1) - cost * |position[t] - position[t-1]|
+
+Per symbol it reports compounded PnL, hit rate (share of exposed bars with a
+positive return), max drawdown, exposure and number of entries. Everything
+is vectorized over all bars of all symbols; a parameter-grid sweep is split
+by (symbol chunk, window) across a process pool.
+
+Data is local only: CSV files in LUKA_SOT/data/market (SYMBOL*.csv) or the
+columnar OHLC store (--store). No network access.
+
+Usage:
+    python tools/paula_backtest.py [SYMBOL ...] [--csv-dir DIR | --store]
+        [--windows 10,20,40] [--slope-thresholds 0.0005,0.001,0.002]
+        [--conf-high 0.6,0.7,0.8] [--conf-mid 0.3,0.4,0.5] [--cost-bps 0]
+        [--processes N] [--top 10] [--out report.json]
+"""
+import argparse
+import itertools
+import json
+import logging
+import os
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+from paula_indicators import CONF_HIGH, CONF_MID, SIZE_HIGH, SIZE_MID, SLOPE_THRESHOLD, WINDOW, classify, compute_indicators
+from paula_ohlc_store import OHLCStore, concat_bars, dedupe_sort, read_csv_bars
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+log = logging.getLogger("paula_backtest")
+
+SOT = Path(os.environ.get("LUKA_SOT", "/Users/icmini/02luka")).expanduser()
+DATA_DIR = SOT / "data" / "market"
+OUT_DIR = SOT / "mls" / "paula" / "backtest"
+
+# Symbols per pool task; each task also covers one window length
+CHUNK_SYMBOLS = 64
+# Below this many (symbols x bars x parameter sets) the sweep runs inline
+PARALLEL_THRESHOLD = 5_000_000
+
+
+@dataclass(frozen=True)
+class Params:
+    window: int = WINDOW
+    slope_threshold: float = SLOPE_THRESHOLD
+    conf_high: float = CONF_HIGH
+    conf_mid: float = CONF_MID
+    size_high: float = SIZE_HIGH
+    size_mid: float = SIZE_MID
+    cost_bps: float = 0.0
+
+
+def param_grid(
+    windows: Sequence[int] = (WINDOW,),
+    slope_thresholds: Sequence[float] = (SLOPE_THRESHOLD,),
+    conf_highs: Sequence[float] = (CONF_HIGH,),
+    conf_mids: Sequence[float] = (CONF_MID,),
+    cost_bps: float = 0.0,
+) -> List[Params]:
+    """Cartesian product of the given values, skipping sets with conf_mid >= conf_high."""
+    return [
+        Params(window=w, slope_threshold=s, conf_high=h, conf_mid=m, cost_bps=cost_bps)
+        for w, s, h, m in itertools.product(windows, slope_thresholds, conf_highs, conf_mids)
+        if m < h
+    ]
+
+
+# ---- Data ----
+
+def csv_symbols(csv_dir: Path) -> List[str]:
+    """Symbols with CSV files in csv_dir (file name up to the first '_')."""
+    return sorted({p.stem.split("_")[0] for p in csv_dir.glob("*.csv")})
+
+
+def load_csv_history(csv_dir: Path = DATA_DIR, symbols: Optional[Iterable[str]] = None) -> Dict[str, np.ndarray]:
+    """Close prices per symbol from local CSVs, merged, sorted and deduped by timestamp."""
+    series: Dict[str, np.ndarray] = {}
+    for symbol in symbols or csv_symbols(csv_dir):
+        parts = []
+        for path in sorted(csv_dir.glob(f"{symbol}*.csv")):
+            if path.stem.split("_")[0] != symbol:
+                continue
+            try:
+                parts.append(read_csv_bars(path))
+            except (OSError, UnicodeDecodeError) as e:
+                log.error(f"Error reading {path.name}: {e}")
+        closes = dedupe_sort(concat_bars(parts))["close"]
+        if closes.size:
+            series[symbol] = closes
+    return series
+
+
+def load_store_history(store: OHLCStore, symbols: Optional[Iterable[str]] = None) -> Dict[str, np.ndarray]:
+    """Close prices per symbol from the columnar store (memory-mapped)."""
+    series: Dict[str, np.ndarray] = {}
+    for symbol in symbols or store.symbols():
+        closes = store.read(symbol)["close"]
+        if closes.size:
+            series[symbol] = closes
+    return series
+
+
+# ---- Simulation ----
+
+def _layout(closes: np.ndarray, lengths: np.ndarray) -> Dict[str, np.ndarray]:
+    """Segment bounds, segment ids and next-bar returns shared by every simulate() call."""
+    starts = np.concatenate(([0], np.cumsum(lengths)[:-1])).astype(np.int64)
+    ends = starts + lengths - 1
+    # Next-bar return, 0 on each symbol's last bar
+    ret = np.zeros(closes.size)
+    ret[:-1] = closes[1:] / closes[:-1] - 1.0
+    ret[ends] = 0.0
+    return {"starts": starts, "ends": ends, "seg": np.repeat(np.arange(lengths.size), lengths), "ret": ret}
+
+
+def simulate(
+    closes: np.ndarray,
+    lengths: np.ndarray,
+    bias: np.ndarray,
+    size: np.ndarray,
+    cost_bps: float = 0.0,
+    layout: Optional[Dict[str, np.ndarray]] = None,
+) -> Dict[str, np.ndarray]:
+    """
+    Per-symbol results for concatenated series (lengths[i] bars each, all >= 2).
+
+    Returns arrays indexed by symbol: pnl_pct, hit_rate (NaN without exposure),
+    max_drawdown_pct, exposure, trades.
+    """
+    layout = layout or _layout(closes, lengths)
+    starts, ends, seg, ret = layout["starts"], layout["ends"], layout["seg"], layout["ret"]
+    n = closes.size
+
+    pos = np.where(size > 0, bias * size, 0.0)
+    pos[ends] = 0.0
+    prev = np.empty(n)
+    prev[1:] = pos[:-1]
+    prev[starts] = 0.0
+    strat = pos * ret - (cost_bps / 1e4) * np.abs(pos - prev)
+
+    # Compounded equity in log space, restarted per symbol
+    log_ret = np.log1p(np.maximum(strat, -0.999999))
+    cum = np.cumsum(log_ret)
+    base = np.empty(lengths.size)
+    base[0] = 0.0
+    base[1:] = cum[starts[1:] - 1]
+    log_eq = cum - base[seg]
+
+    # Segmented running max: lift each symbol above the previous one's range
+    span = float(np.max(log_eq) - np.min(log_eq)) + 1.0
+    lift = seg * span
+    peak = np.maximum(np.maximum.accumulate(log_eq + lift) - lift, 0.0)
+    drawdown = -np.expm1(log_eq - peak)
+
+    exposed = pos != 0
+    hits = np.add.reduceat(((strat > 0) & exposed).astype(np.int64), starts)
+    exposed_bars = np.add.reduceat(exposed.astype(np.int64), starts)
+    entries = np.add.reduceat((exposed & (pos != prev)).astype(np.int64), starts)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        hit_rate = np.where(exposed_bars > 0, hits / exposed_bars, np.nan)
+    return {
+        "pnl_pct": np.expm1(log_eq[ends]) * 100,
+        "hit_rate": hit_rate,
+        "max_drawdown_pct": np.maximum.reduceat(drawdown, starts) * 100,
+        "exposure": exposed_bars / np.maximum(lengths - 1, 1),
+        "trades": entries,
+    }
+
+
+def _symbol_report(metrics: Dict[str, np.ndarray], i: int, bars: int) -> Dict[str, Any]:
+    hit_rate = float(metrics["hit_rate"][i])
+    return {
+        "bars": bars,
+        "pnl_pct": round(float(metrics["pnl_pct"][i]), 4),
+        "hit_rate": None if np.isnan(hit_rate) else round(hit_rate, 4),
+        "max_drawdown_pct": round(float(metrics["max_drawdown_pct"][i]), 4),
+        "exposure": round(float(metrics["exposure"][i]), 4),
+        "trades": int(metrics["trades"][i]),
+    }
+
+
+def run_backtest(series: Mapping[str, Sequence[float]], params_list: Sequence[Params]) -> Dict[Params, Dict[str, Dict[str, Any]]]:
+    """
+    Backtest every parameter set on every symbol (inline).
+
+    Indicators are computed once per distinct window. Symbols with fewer than
+    two bars are skipped. Returns {params: {symbol: report}}.
+    """
+    symbols = [s for s in series if np.asarray(series[s]).size >= 2]
+    results: Dict[Params, Dict[str, Dict[str, Any]]] = {p: {} for p in params_list}
+    if not symbols:
+        return results
+    closes = np.concatenate([np.asarray(series[s], dtype=np.float64) for s in symbols])
+    lengths = np.array([np.asarray(series[s]).size for s in symbols], dtype=np.int64)
+
+    by_window: Dict[int, List[Params]] = defaultdict(list)
+    for p in params_list:
+        by_window[p.window].append(p)
+    layout = _layout(closes, lengths)
+    for window, group in by_window.items():
+        frames = compute_indicators({s: series[s] for s in symbols}, window)
+        slope = np.concatenate([frames[s].slope for s in symbols])
+        avg = np.concatenate([frames[s].avg for s in symbols])
+        for p in group:
+            _, _, bias, size = classify(slope, avg, p.slope_threshold, p.conf_high, p.conf_mid, p.size_high, p.size_mid)
+            metrics = simulate(closes, lengths, bias, size, p.cost_bps, layout)
+            results[p] = {s: _symbol_report(metrics, i, int(lengths[i])) for i, s in enumerate(symbols)}
+    return results
+
+
+def _backtest_task(task: Tuple[Dict[str, np.ndarray], List[Params]]):
+    return run_backtest(*task)
+
+
+def sweep(
+    series: Mapping[str, Sequence[float]],
+    params_list: Sequence[Params],
+    *,
+    processes: Optional[int] = None,
+    chunk_symbols: int = CHUNK_SYMBOLS,
+) -> Dict[Params, Dict[str, Dict[str, Any]]]:
+    """
+    run_backtest() split into (symbol chunk, window) tasks on a process pool.
+
+    Results are identical to run_backtest(); processes=1 (or a small sweep)
+    runs inline.
+    """
+    workers = processes or os.cpu_count() or 1
+    total_bars = sum(np.asarray(v).size for v in series.values())
+    if workers <= 1 or total_bars * len(params_list) < PARALLEL_THRESHOLD:
+        return run_backtest(series, params_list)
+
+    symbols = list(series)
+    by_window: Dict[int, List[Params]] = defaultdict(list)
+    for p in params_list:
+        by_window[p.window].append(p)
+    tasks = [
+        ({s: np.asarray(series[s]) for s in symbols[i:i + chunk_symbols]}, group)
+        for i in range(0, len(symbols), chunk_symbols)
+        for group in by_window.values()
+    ]
+    results: Dict[Params, Dict[str, Dict[str, Any]]] = {p: {} for p in params_list}
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for part in pool.map(_backtest_task, tasks):
+            for p, per_symbol in part.items():
+                results[p].update(per_symbol)
+    return results
+
+
+def summarize(per_symbol: Mapping[str, Dict[str, Any]]) -> Dict[str, Any]:
+    """Cross-symbol aggregate of one parameter set."""
+    if not per_symbol:
+        return {"symbols": 0}
+    pnl = [r["pnl_pct"] for r in per_symbol.values()]
+    hits = [r["hit_rate"] for r in per_symbol.values() if r["hit_rate"] is not None]
+    return {
+        "symbols": len(pnl),
+        "mean_pnl_pct": round(float(np.mean(pnl)), 4),
+        "median_pnl_pct": round(float(np.median(pnl)), 4),
+        "mean_hit_rate": round(float(np.mean(hits)), 4) if hits else None,
+        "worst_drawdown_pct": max(r["max_drawdown_pct"] for r in per_symbol.values()),
+        "trades": sum(r["trades"] for r in per_symbol.values()),
+    }
+
+
+def build_report(results: Mapping[Params, Mapping[str, Dict[str, Any]]]) -> List[Dict[str, Any]]:
+    """Parameter sets ranked by mean PnL across symbols."""
+    rows = [
+        {"params": asdict(p), "summary": summarize(per_symbol), "per_symbol": dict(per_symbol)}
+        for p, per_symbol in results.items()
+    ]
+    rows.sort(key=lambda r: r["summary"].get("mean_pnl_pct", float("-inf")), reverse=True)
+    return rows
+
+
+def _floats(text: str) -> List[float]:
+    return [float(v) for v in text.split(",") if v.strip()]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline backtest of Paula bias signals")
+    parser.add_argument("symbols", nargs="*", help="Symbols (default: all found)")
+    parser.add_argument("--csv-dir", type=Path, default=DATA_DIR, help="Directory of SYMBOL*.csv files")
+    parser.add_argument("--store", action="store_true", help="Read the columnar OHLC store instead of CSVs")
+    parser.add_argument("--windows", default=str(WINDOW))
+    parser.add_argument("--slope-thresholds", default=str(SLOPE_THRESHOLD))
+    parser.add_argument("--conf-high", default=str(CONF_HIGH))
+    parser.add_argument("--conf-mid", default=str(CONF_MID))
+    parser.add_argument("--cost-bps", type=float, default=0.0, help="Cost per unit of position change, in bps")
+    parser.add_argument("--processes", type=int, default=None)
+    parser.add_argument("--top", type=int, default=10, help="Parameter sets to print")
+    parser.add_argument("--out", type=Path, default=None, help="Report path (default: OUT_DIR/paula_backtest_<ts>.json)")
+    args = parser.parse_args()
+
+    if args.store:
+        series = load_store_history(OHLCStore(), args.symbols)
+    else:
+        series = load_csv_history(args.csv_dir, args.symbols)
+    if not series:
+        log.error("NO_DATA - no local history found")
+        print("NO_DATA")
+        raise SystemExit(1)
+
+    grid = param_grid(
+        [int(w) for w in _floats(args.windows)],
+        _floats(args.slope_thresholds),
+        _floats(args.conf_high),
+        _floats(args.conf_mid),
+        args.cost_bps,
+    )
+    if not grid:
+        parser.error("empty parameter grid (conf-mid must be below conf-high)")
+
+    started = datetime.now()
+    report = build_report(sweep(series, grid, processes=args.processes))
+    elapsed = (datetime.now() - started).total_seconds()
+    bars = sum(np.asarray(v).size for v in series.values())
+    log.info(f"✅ {len(grid)} parameter sets x {len(series)} symbols ({bars} bars) in {elapsed:.2f}s")
+
+    for row in report[:args.top]:
+        p, s = row["params"], row["summary"]
+        print(
+            f"w={p['window']} slope>{p['slope_threshold']} conf={p['conf_high']}/{p['conf_mid']}: "
+            f"mean pnl {s['mean_pnl_pct']:+.2f}% hit {s['mean_hit_rate']} "
+            f"worst dd {s['worst_drawdown_pct']:.2f}% trades {s['trades']}"
+        )
+
+    out = args.out or OUT_DIR / f"paula_backtest_{started.strftime('%Y%m%d_%H%M%S')}.json"
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps({"generated_at": started.astimezone().isoformat(), "elapsed_sec": round(elapsed, 3),
+                               "bars": bars, "results": report}, ensure_ascii=False, indent=2))
+    print(str(out))
+
+
+if __name__ == "__main__":
+    main()
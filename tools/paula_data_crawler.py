@@ -1,15 +1,32 @@
 #!/usr/bin/env python3
 """
 Paula Data Crawler - Fetch OHLC market data from CSV or HTTP endpoint
+
+Single symbol (PAULA_SYMBOL) or a watchlist (--symbols A,B / PAULA_SYMBOLS).
+With the columnar store available, a watchlist is crawled in one run:
+
+- HTTP: every (symbol, endpoint) pair fetched concurrently over one pooled
+  requests.Session; PAULA_PRICE_ENDPOINT may list several endpoints
+- per-host rate limit (PAULA_HOST_RPS requests/sec, default 5)
+- conditional requests: ETag / Last-Modified are remembered per
+  (endpoint, symbol) and a 304 means no new bars
+- changed CSV files of all symbols parsed in parallel worker processes
+- per-symbol latency / bars-added report (log + crawl_report_<date>.json)
 """
+import argparse
 import os
 import sys
 import json
 import csv
 import time
 import logging
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import asdict, dataclass
 from datetime import datetime, timezone
 from pathlib import Path
+from typing import Dict, List, Optional
+from urllib.parse import urlsplit
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 log = logging.getLogger("paula_data_crawler")
@@ -20,19 +37,37 @@ except ImportError:
     requests = None
     log.warning("requests library not available - HTTP endpoint fetching disabled")
 
+try:
+    from paula_ohlc_store import OHLCStore, bars_from_records, concat_bars, read_csv_bars, to_records  # requires numpy
+except ImportError:
+    OHLCStore = None
+    log.warning("numpy not available - columnar OHLC store disabled, using JSON snapshots only")
+
 SOT = Path(os.environ.get("LUKA_SOT", "/Users/icmini/02luka")).expanduser()
 DATA_DIR = SOT / "data" / "market"
 OUT_DIR = SOT / "mls" / "paula" / "intel"
 OUT_DIR.mkdir(parents=True, exist_ok=True)
+VALIDATOR_CACHE = SOT / "mls" / "paula" / "cache" / "http_validators.json"
+
+HTTP_TIMEOUT = 15
+HOST_RPS = float(os.environ.get("PAULA_HOST_RPS", "5") or 0)
+MAX_WORKERS = 8
+# Fewer changed CSV files than this are parsed inline
+PARALLEL_CSV_MIN = 4
+
+
+def local_csv_files(symbol: str, fallback: bool = True):
+    """Symbol-specific CSV files (SYMBOL.csv, SYMBOL_*.csv), falling back to any CSV in DATA_DIR."""
+    files = sorted(f for f in DATA_DIR.glob(f"{symbol}*.csv") if f.stem.split("_")[0] == symbol)
+    if not files and fallback:
+        files = sorted((DATA_DIR).glob("*.csv"))
+    return files
 
 
 def read_local_csv(symbol: str):
     """Read OHLC data from local CSV files."""
     rows = []
-    # Prefer symbol-specific files, fallback to any CSV
-    files = sorted((DATA_DIR).glob(f"{symbol}*.csv"))
-    if not files:
-        files = sorted((DATA_DIR).glob("*.csv"))
+    files = local_csv_files(symbol)
     
     for f in files[-3:]:  # Read last 3 files to keep light
         try:
@@ -62,6 +97,25 @@ def read_local_csv(symbol: str):
     return rows
 
 
+def rows_from_payload(data, source="HTTP"):
+    """JSON list of bar dicts -> normalized rows (last 500 records)."""
+    rows = []
+    for idx, d in enumerate(data[-500:], start=1):  # Keep last 500 records
+        try:
+            rows.append({
+                "timestamp": d.get("timestamp") or d.get("time") or d.get("date"),
+                "open": float(d.get("open", 0) or 0),
+                "high": float(d.get("high", 0) or 0),
+                "low": float(d.get("low", 0) or 0),
+                "close": float(d.get("close", 0) or 0),
+                "volume": float(d.get("volume", 0) or 0)
+            })
+        except (ValueError, KeyError, TypeError, AttributeError) as e:
+            log.warning(f"{source} data decode error at index {idx}: {e}")
+            continue
+    return rows
+
+
 def fetch_http(endpoint: str, symbol: str):
     """Fetch OHLC data from HTTP endpoint."""
     if not requests:
@@ -70,31 +124,236 @@ def fetch_http(endpoint: str, symbol: str):
     
     try:
         params = {"symbol": symbol} if "?" not in endpoint else None
-        resp = requests.get(endpoint, params=params, timeout=15)
+        resp = requests.get(endpoint, params=params, timeout=HTTP_TIMEOUT)
         resp.raise_for_status()
-        data = resp.json()
-        
-        rows = []
-        for idx, d in enumerate(data[-500:], start=1):  # Keep last 500 records
-            try:
-                rows.append({
-                    "timestamp": d.get("timestamp") or d.get("time") or d.get("date"),
-                    "open": float(d.get("open", 0) or 0),
-                    "high": float(d.get("high", 0) or 0),
-                    "low": float(d.get("low", 0) or 0),
-                    "close": float(d.get("close", 0) or 0),
-                    "volume": float(d.get("volume", 0) or 0)
-                })
-            except (ValueError, KeyError, TypeError) as e:
-                log.warning(f"HTTP data decode error at index {idx}: {e}")
-                continue
-        
-        return rows
+        return rows_from_payload(resp.json())
     except Exception as e:
         log.warning(f"HTTP fetch failed for {endpoint}: {e}")
         return []
 
 
+# ---- Watchlist crawl ----
+
+class HostRateLimiter:
+    """At most `rps` request starts per second per host, shared by all threads."""
+
+    def __init__(self, rps: float = HOST_RPS):
+        self.interval = 1.0 / rps if rps > 0 else 0.0
+        self._next: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def wait(self, url: str) -> float:
+        """Block until a request to url's host may start; returns seconds waited."""
+        if not self.interval:
+            return 0.0
+        host = urlsplit(url).netloc
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next.get(host, 0.0))
+            self._next[host] = start + self.interval
+        delay = start - now
+        if delay > 0:
+            time.sleep(delay)
+        return delay
+
+
+class ValidatorCache:
+    """ETag / Last-Modified per (endpoint, symbol), persisted as one JSON file."""
+
+    def __init__(self, path: Optional[Path] = VALIDATOR_CACHE):
+        self.path = path
+        self._entries: Dict[str, Dict[str, str]] = {}
+        self._lock = threading.Lock()
+        if path is not None:
+            try:
+                data = json.loads(path.read_text(encoding="utf-8"))
+                if isinstance(data, dict):
+                    self._entries = data
+            except (OSError, ValueError):
+                pass
+
+    def headers(self, key: str) -> Dict[str, str]:
+        with self._lock:
+            entry = self._entries.get(key) or {}
+        out = {}
+        if entry.get("etag"):
+            out["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            out["If-Modified-Since"] = entry["last_modified"]
+        return out
+
+    @staticmethod
+    def from_response(resp) -> Dict[str, str]:
+        return {k: v for k, v in (("etag", resp.headers.get("ETag")),
+                                  ("last_modified", resp.headers.get("Last-Modified"))) if v}
+
+    def set(self, key: str, entry: Dict[str, str]) -> None:
+        """Record validators for key (an empty entry forgets it)."""
+        with self._lock:
+            if entry:
+                self._entries[key] = entry
+            else:
+                self._entries.pop(key, None)
+
+    def save(self) -> None:
+        if self.path is None:
+            return
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.path.with_name(f".{self.path.name}.{os.getpid()}.tmp")
+            with self._lock:
+                tmp.write_text(json.dumps(self._entries), encoding="utf-8")
+            os.replace(tmp, self.path)
+        except OSError as e:
+            log.warning(f"Could not save HTTP validator cache: {e}")
+
+
+@dataclass
+class FetchResult:
+    endpoint: str
+    status: Optional[int] = None  # None when the request failed
+    records: int = 0
+    latency_ms: float = 0.0
+    wait_ms: float = 0.0
+    error: Optional[str] = None
+
+
+def make_session(pool_size: int = MAX_WORKERS):
+    """requests.Session whose connection pool fits pool_size concurrent requests per host."""
+    session = requests.Session()
+    adapter = requests.adapters.HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def fetch_conditional(session, endpoint: str, symbol: str, limiter: HostRateLimiter, validators: ValidatorCache):
+    """
+    Conditional GET of one symbol from one endpoint.
+
+    Returns (FetchResult, rows, validators); rows is [] on 304 Not Modified
+    or failure. The response's validators (None unless rows were fetched)
+    are not recorded here: the caller sets them once the rows are stored.
+    """
+    params = {"symbol": symbol} if "?" not in endpoint else None
+    key = f"{endpoint}|{symbol}"
+    result = FetchResult(endpoint=endpoint)
+    result.wait_ms = round(limiter.wait(endpoint) * 1000, 1)
+    t0 = time.perf_counter()
+    try:
+        resp = session.get(endpoint, params=params, headers=validators.headers(key), timeout=HTTP_TIMEOUT)
+        result.status = resp.status_code
+        if resp.status_code == 304:
+            return result, [], None
+        resp.raise_for_status()
+        rows = rows_from_payload(resp.json(), source=f"HTTP {symbol}")
+        result.records = len(rows)
+        return result, rows, ValidatorCache.from_response(resp)
+    except Exception as e:
+        log.warning(f"HTTP fetch failed for {endpoint} ({symbol}): {e}")
+        result.error = str(e)
+        return result, [], None
+    finally:
+        result.latency_ms = round((time.perf_counter() - t0) * 1000, 1)
+
+
+def _parse_csv(path: str):
+    """Worker: parse one CSV file; None if it cannot be read."""
+    try:
+        return read_csv_bars(Path(path))
+    except (OSError, UnicodeDecodeError) as e:
+        log.error(f"Error reading {Path(path).name}: {e}")
+        return None
+
+
+def parse_csv_files(paths: List[str], processes: Optional[int] = None):
+    """Parse CSV files, in a process pool when there are several; {path: bars or None}."""
+    workers = processes or os.cpu_count() or 1
+    if workers <= 1 or len(paths) < PARALLEL_CSV_MIN:
+        return {p: _parse_csv(p) for p in paths}
+    with ProcessPoolExecutor(max_workers=min(workers, len(paths))) as pool:
+        return dict(zip(paths, pool.map(_parse_csv, paths)))
+
+
+def crawl_many(
+    symbols: List[str],
+    endpoints: List[str],
+    store=None,
+    *,
+    max_workers: int = MAX_WORKERS,
+    processes: Optional[int] = None,
+    session=None,
+    limiter: Optional[HostRateLimiter] = None,
+    validators: Optional[ValidatorCache] = None,
+):
+    """
+    Crawl a watchlist into the columnar store in one run.
+
+    Returns {symbol: report} with bars added/stored, CSV files ingested and one
+    FetchResult dict (status, latency, rate-limit wait) per endpoint.
+    """
+    store = store or OHLCStore()
+    limiter = limiter or HostRateLimiter()
+    validators = validators if validators is not None else ValidatorCache()
+    reports = {s: {"added": 0, "total": 0, "csv_files": 0, "http": []} for s in symbols}
+    started = time.perf_counter()
+
+    http_rows: Dict[str, List[dict]] = {s: [] for s in symbols}
+    pending: Dict[str, Dict[str, Dict[str, str]]] = {s: {} for s in symbols}
+    if endpoints and requests:
+        own_session = session is None
+        session = session or make_session(max_workers)
+        try:
+            with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="paula-fetch") as pool:
+                futures = {
+                    pool.submit(fetch_conditional, session, endpoint, symbol, limiter, validators): symbol
+                    for symbol in symbols
+                    for endpoint in endpoints
+                }
+                for future, symbol in futures.items():
+                    result, rows, entry = future.result()
+                    reports[symbol]["http"].append(asdict(result))
+                    http_rows[symbol] += rows
+                    if entry is not None:
+                        pending[symbol][f"{result.endpoint}|{symbol}"] = entry
+        finally:
+            if own_session:
+                session.close()
+    elif endpoints:
+        log.warning("requests library not available - skipping HTTP fetch")
+
+    # CSV files for a watchlist must be symbol-specific (no fallback to any CSV)
+    changed = {s: store.changed_csv(s, local_csv_files(s, fallback=len(symbols) == 1)) for s in symbols}
+    parsed = parse_csv_files([p for c in changed.values() for p in c], processes)
+
+    # Validators are kept only for symbols whose rows reached the store, so a
+    # failed or interrupted append is re-fetched in full next time
+    committed = False
+    try:
+        for symbol in symbols:
+            parts = []
+            if http_rows[symbol]:
+                parts.append(bars_from_records(http_rows[symbol]))
+            sources = {}
+            for path, sig in changed[symbol].items():
+                if parsed.get(path) is not None:
+                    parts.append(parsed[path])
+                    sources[path] = sig
+            if parts:
+                reports[symbol]["added"] = store.append(symbol, concat_bars(parts), sources=sources)
+            for key, entry in pending[symbol].items():
+                validators.set(key, entry)
+                committed = True
+            reports[symbol]["csv_files"] = len(sources)
+            reports[symbol]["total"] = int(store.load_meta(symbol).get("count", 0))
+    finally:
+        if committed:
+            validators.save()
+
+    log.info(f"Crawled {len(symbols)} symbols in {time.perf_counter() - started:.2f}s")
+    return reports
+
+
 def combine_and_sort(rows):
     """Combine and deduplicate rows by timestamp + close price."""
     uniq = {}
@@ -109,14 +368,52 @@ def combine_and_sort(rows):
     return out
 
 
-def main():
-    symbol = os.environ.get("PAULA_SYMBOL", "SET50Z25")
-    endpoint = os.environ.get("PAULA_PRICE_ENDPOINT", "").strip()
+def write_snapshot(symbol: str, rows):
+    ts = datetime.now(timezone.utc).astimezone().isoformat()
+    out = {
+        "timestamp": ts,
+        "symbol": symbol,
+        "records": len(rows),
+        "ohlc": rows
+    }
+    
+    out_file = OUT_DIR / f"crawler_{symbol}_{datetime.now().strftime('%Y%m%d')}.json"
+    out_file.write_text(json.dumps(out, ensure_ascii=False, indent=2))
     
+    log.info(f"✅ Crawled {len(rows)} records, saved to {out_file}")
+    print(str(out_file))
+
+
+def resolve_symbols(args):
+    if args.symbols:
+        names = args.symbols.split(",")
+    elif os.environ.get("PAULA_SYMBOLS"):
+        names = os.environ["PAULA_SYMBOLS"].split(",")
+    else:
+        names = [os.environ.get("PAULA_SYMBOL", "SET50Z25")]
+    return list(dict.fromkeys(n.strip() for n in names if n.strip()))
+
+
+def write_crawl_report(reports):
+    out_file = OUT_DIR / f"crawl_report_{datetime.now().strftime('%Y%m%d')}.json"
+    out_file.write_text(json.dumps({
+        "timestamp": datetime.now(timezone.utc).astimezone().isoformat(),
+        "symbols": reports,
+    }, ensure_ascii=False, indent=2))
+    for symbol, r in reports.items():
+        latency = ", ".join(
+            f"{h['endpoint']} {h['status'] or 'ERR'} {h['latency_ms']}ms" for h in r["http"]
+        ) or "no HTTP"
+        log.info(f"{symbol}: +{r['added']} bars ({r['total']} stored), {r['csv_files']} CSV files, {latency}")
+    return out_file
+
+
+def crawl_legacy(symbol: str, endpoints: List[str]):
+    """JSON-snapshot crawl of one symbol (no columnar store); False if no data was found."""
     rows = []
     
-    # Try HTTP endpoint first (if provided)
-    if endpoint:
+    # Try HTTP endpoints first (if provided)
+    for endpoint in endpoints:
         log.info(f"Fetching from HTTP endpoint: {endpoint}")
         rows += fetch_http(endpoint, symbol)
     
@@ -125,28 +422,49 @@ def main():
     rows += read_local_csv(symbol)
     
     if not rows:
-        log.error("No data found from CSV or HTTP endpoint")
-        sys.exit(1)
+        return False
     
     # Combine and deduplicate
     rows = combine_and_sort(rows)
     
     # Keep last 100 for downstream processing
-    rows = rows[-100:]
-    
-    ts = datetime.now(timezone.utc).astimezone().isoformat()
-    out = {
-        "timestamp": ts,
-        "symbol": symbol,
-        "records": len(rows),
-        "ohlc": rows
-    }
+    write_snapshot(symbol, rows[-100:])
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Paula data crawler")
+    parser.add_argument("--symbols", help="Comma-separated watchlist (overrides PAULA_SYMBOLS / PAULA_SYMBOL)")
+    parser.add_argument("--workers", type=int, default=MAX_WORKERS, help="Concurrent HTTP requests")
+    args = parser.parse_args()
     
-    out_file = OUT_DIR / f"crawler_{symbol}_{datetime.now().strftime('%Y%m%d')}.json"
-    out_file.write_text(json.dumps(out, ensure_ascii=False, indent=2))
+    symbols = resolve_symbols(args)
+    endpoints = [e.strip() for e in os.environ.get("PAULA_PRICE_ENDPOINT", "").split(",") if e.strip()]
     
-    log.info(f"✅ Crawled {len(rows)} records, saved to {out_file}")
-    print(str(out_file))
+    if OHLCStore is not None:
+        store = OHLCStore()
+        reports = crawl_many(symbols, endpoints, store, max_workers=args.workers)
+        found = 0
+        for symbol in symbols:
+            if not reports[symbol]["total"]:
+                log.error(f"No data found from CSV or HTTP endpoint for {symbol}")
+                continue
+            found += 1
+            # Daily JSON snapshot of the latest bars for health checks / legacy readers
+            write_snapshot(symbol, to_records(store.read(symbol), limit=100))
+        write_crawl_report(reports)
+        if not found:
+            sys.exit(1)
+        return
+
+    found = 0
+    for symbol in symbols:
+        if crawl_legacy(symbol, endpoints):
+            found += 1
+        else:
+            log.error(f"No data found from CSV or HTTP endpoint for {symbol}")
+    if not found:
+        sys.exit(1)
 
 
 if __name__ == "__main__":
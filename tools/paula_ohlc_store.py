@@ -0,0 +1,360 @@
+#!/usr/bin/env python3
+"""
+Paula OHLC Store - columnar, append-only, memory-mapped bar storage per symbol
+
+Layout (under $LUKA_SOT/data/market/store/<SYMBOL>/):
+  timestamp.i8  int64 epoch seconds (UTC), sorted ascending, unique
+  open.f8 high.f8 low.f8 close.f8 volume.f8   float64 columns
+  meta.json     {"count": N, "last_ts": T, "generation": G,
+                 "sources": {csv_path: [size, mtime_ns]}}
+
+Columns are raw little-endian arrays, so reads are np.memmap views (zero-copy)
+of the first meta["count"] rows. Appends write only bars newer than the last
+stored bar; bars that fill a gap in history trigger a one-off merge rewrite
+into a new generation of column files (<column>.g<G>.<suffix>; generation 0
+is the plain names). meta.json is replaced last and names the generation, so
+a crash mid-append leaves extra bytes that the next append truncates away, and
+a crash mid-merge leaves the previous generation intact. Single writer per
+symbol.
+"""
+import csv
+import json
+import logging
+import os
+import warnings
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+
+log = logging.getLogger("paula_ohlc_store")
+
+SOT = Path(os.environ.get("LUKA_SOT", "/Users/icmini/02luka")).expanduser()
+STORE_DIR = SOT / "data" / "market" / "store"
+
+PRICE_COLUMNS = ("open", "high", "low", "close", "volume")
+COLUMNS = ("timestamp",) + PRICE_COLUMNS
+DTYPES = {"timestamp": np.dtype("<i8"), **{c: np.dtype("<f8") for c in PRICE_COLUMNS}}
+_SUFFIX = {"timestamp": ".i8", **{c: ".f8" for c in PRICE_COLUMNS}}
+TIMESTAMP_KEYS = ("timestamp", "time", "date")
+
+Bars = Dict[str, np.ndarray]
+
+
+def empty_bars() -> Bars:
+    return {c: np.empty(0, dtype=DTYPES[c]) for c in COLUMNS}
+
+
+# ---- Parsing ----
+
+def _parse_one_timestamp(value: str) -> Optional[int]:
+    value = value.strip()
+    if not value:
+        return None
+    try:
+        num = float(value)
+        return int(num / 1000) if num > 1e11 else int(num)  # epoch ms or s
+    except ValueError:
+        pass
+    try:
+        dt = datetime.fromisoformat(value[:-1] + "+00:00" if value.endswith("Z") else value)
+    except ValueError:
+        return None
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return int(dt.timestamp())
+
+
+def parse_timestamps(values: np.ndarray) -> np.ndarray:
+    """
+    Strings (ISO dates/datetimes or epoch s/ms) -> float64 epoch seconds, NaN if invalid.
+
+    Uses vectorized numpy conversion and falls back to per-value parsing only
+    when the whole column is not in one uniform format.
+    """
+    values = np.asarray(values, dtype=str)
+    if values.size == 0:
+        return np.empty(0, dtype=np.float64)
+    stripped = np.char.strip(values)
+    try:
+        num = stripped.astype(np.float64)
+        return np.where(num > 1e11, np.floor(num / 1000), np.floor(num))
+    except ValueError:
+        pass
+    try:
+        with warnings.catch_warnings():
+            # numpy warns (but converts to UTC) for explicit offsets
+            warnings.simplefilter("ignore", DeprecationWarning)
+            parsed = stripped.astype("datetime64[s]")
+        out = parsed.astype(np.int64).astype(np.float64)
+        out[np.isnat(parsed)] = np.nan
+        return out
+    except ValueError:
+        pass
+    parsed_each = [_parse_one_timestamp(v) for v in stripped.tolist()]
+    return np.array([np.nan if ts is None else ts for ts in parsed_each], dtype=np.float64)
+
+
+def normalize_bars(raw: Dict[str, Any]) -> Bars:
+    """
+    Column arrays (timestamp as strings or epoch numbers) -> clean Bars.
+
+    Drops rows without a valid timestamp or with a zero/NaN close, then sorts
+    by timestamp and dedupes it, keeping the last occurrence of each timestamp.
+    """
+    ts_raw = np.asarray(raw.get("timestamp", []))
+    ts = ts_raw.astype(np.float64) if ts_raw.dtype.kind in "iuf" else parse_timestamps(ts_raw)
+    n = ts.shape[0]
+    cols = {
+        c: np.nan_to_num(np.asarray(raw.get(c, np.zeros(n)), dtype=np.float64), nan=0.0) if c != "close"
+        else np.asarray(raw.get(c, np.zeros(n)), dtype=np.float64)
+        for c in PRICE_COLUMNS
+    }
+    keep = ~np.isnan(ts) & ~np.isnan(cols["close"]) & (cols["close"] != 0)
+    return dedupe_sort({"timestamp": ts[keep].astype(np.int64), **{c: v[keep] for c, v in cols.items()}})
+
+
+def dedupe_sort(bars: Bars) -> Bars:
+    """Sort by timestamp and keep the last occurrence of each timestamp (vectorized)."""
+    ts = bars["timestamp"]
+    if ts.size == 0:
+        return {c: np.asarray(bars[c], dtype=DTYPES[c]) for c in COLUMNS}
+    # np.unique on the reversed array returns sorted values and first (= last) indices
+    _, rev_idx = np.unique(ts[::-1], return_index=True)
+    idx = ts.size - 1 - rev_idx
+    return {c: np.asarray(bars[c], dtype=DTYPES[c])[idx] for c in COLUMNS}
+
+
+def concat_bars(parts: Iterable[Bars]) -> Bars:
+    parts = [p for p in parts if p["timestamp"].size]
+    if not parts:
+        return empty_bars()
+    return {c: np.concatenate([p[c] for p in parts]).astype(DTYPES[c], copy=False) for c in COLUMNS}
+
+
+def bars_from_records(records: List[Dict[str, Any]]) -> Bars:
+    """Row dicts (HTTP payloads, legacy JSON snapshots) -> clean Bars."""
+    def col(key: str) -> List[float]:
+        out = []
+        for r in records:
+            try:
+                out.append(float(r.get(key, 0) or 0))
+            except (TypeError, ValueError):
+                out.append(np.nan if key == "close" else 0.0)
+        return out
+
+    ts = [str(next((r.get(k) for k in TIMESTAMP_KEYS if r.get(k)), "") or "") for r in records]
+    return normalize_bars({"timestamp": np.array(ts, dtype=str), **{c: col(c) for c in PRICE_COLUMNS}})
+
+
+def _read_csv_rows(path: Path, ts_key: Optional[str]) -> Dict[str, List[Any]]:
+    """Row-by-row fallback for CSVs that are not uniformly numeric."""
+    cols: Dict[str, List[Any]] = {c: [] for c in COLUMNS}
+    with path.open("r", encoding="utf-8", newline="") as fh:
+        reader = csv.DictReader(fh)
+        reader.fieldnames = [h.strip().lower() for h in reader.fieldnames or []]
+        for line_num, row in enumerate(reader, start=2):
+            try:
+                values = [float(row.get(c, 0) or 0) for c in PRICE_COLUMNS]
+            except ValueError as e:
+                log.warning(f"CSV decode error in {path.name} line {line_num}: {e}")
+                continue
+            cols["timestamp"].append((row.get(ts_key) or "") if ts_key else "")
+            for c, v in zip(PRICE_COLUMNS, values):
+                cols[c].append(v)
+    return cols
+
+
+def read_csv_bars(path: Path) -> Bars:
+    """
+    Vectorized CSV ingestion: numeric columns via one np.loadtxt call.
+
+    Header names are matched case-insensitively; missing price columns are 0.
+    Files with blank or malformed cells fall back to a row-by-row parse that
+    skips bad rows.
+    """
+    with path.open("r", encoding="utf-8", newline="") as fh:
+        header = [h.strip().lower() for h in next(csv.reader(fh), [])]
+    ts_key = next((k for k in TIMESTAMP_KEYS if k in header), None)
+    present = [c for c in PRICE_COLUMNS if c in header]
+    raw: Dict[str, Any]
+    try:
+        if ts_key is None or not present:
+            raise ValueError("missing timestamp or price columns")
+        common = dict(delimiter=",", skiprows=1, encoding="utf-8", quotechar='"', ndmin=1)
+        ts_raw = np.loadtxt(path, usecols=[header.index(ts_key)], dtype=str, **common)
+        numeric = np.loadtxt(path, usecols=[header.index(c) for c in present], dtype=np.float64,
+                             **{**common, "ndmin": 2})
+        raw = {"timestamp": ts_raw}
+        for i, c in enumerate(present):
+            raw[c] = numeric[:, i]
+        for c in PRICE_COLUMNS:
+            raw.setdefault(c, np.zeros(ts_raw.shape[0]))
+    except ValueError:
+        raw = _read_csv_rows(path, ts_key)
+    return normalize_bars(raw)
+
+
+# ---- Store ----
+
+class OHLCStore:
+    """Per-symbol columnar store; see module docstring for the on-disk layout."""
+
+    def __init__(self, root: Path = STORE_DIR):
+        self.root = Path(root)
+
+    def symbol_dir(self, symbol: str) -> Path:
+        return self.root / symbol
+
+    def _column_path(self, symbol: str, column: str, generation: int = 0) -> Path:
+        gen = f".g{generation}" if generation else ""
+        return self.symbol_dir(symbol) / f"{column}{gen}{_SUFFIX[column]}"
+
+    def load_meta(self, symbol: str) -> Dict[str, Any]:
+        try:
+            meta = json.loads((self.symbol_dir(symbol) / "meta.json").read_text(encoding="utf-8"))
+            if isinstance(meta, dict):
+                return meta
+        except (OSError, ValueError):
+            pass
+        return {"count": 0, "last_ts": None, "sources": {}}
+
+    def _save_meta(self, symbol: str, meta: Dict[str, Any]) -> None:
+        path = self.symbol_dir(symbol) / "meta.json"
+        tmp = path.with_name(f".meta.json.{os.getpid()}.tmp")
+        tmp.write_text(json.dumps(meta), encoding="utf-8")
+        os.replace(tmp, path)
+
+    def symbols(self) -> List[str]:
+        if not self.root.exists():
+            return []
+        return sorted(p.name for p in self.root.iterdir() if (p / "meta.json").exists())
+
+    def read(self, symbol: str) -> Bars:
+        """Read-only memory-mapped columns (zero-copy) of all stored bars."""
+        meta = self.load_meta(symbol)
+        count = int(meta.get("count", 0))
+        if count == 0:
+            return empty_bars()
+        generation = int(meta.get("generation", 0))
+        return {
+            c: np.memmap(self._column_path(symbol, c, generation), dtype=DTYPES[c], mode="r", shape=(count,))
+            for c in COLUMNS
+        }
+
+    def _write_all(self, symbol: str, bars: Bars, generation: int) -> None:
+        """Write every column of a new generation; live until meta.json names it."""
+        for c in COLUMNS:
+            np.ascontiguousarray(bars[c], dtype=DTYPES[c]).tofile(self._column_path(symbol, c, generation))
+
+    def _drop_other_generations(self, symbol: str, generation: int) -> None:
+        keep = {self._column_path(symbol, c, generation).name for c in COLUMNS}
+        for c in COLUMNS:
+            for path in self.symbol_dir(symbol).glob(f"{c}*{_SUFFIX[c]}"):
+                if path.name not in keep:
+                    try:
+                        path.unlink()
+                    except OSError:
+                        pass
+
+    def append(self, symbol: str, bars: Bars, sources: Optional[Dict[str, List[int]]] = None) -> int:
+        """
+        Add bars (any order, may overlap stored history); returns bars added.
+
+        Bars newer than the last stored bar are appended to the column files.
+        Timestamps already stored are ignored (stored bars win). Older bars that
+        fill gaps cause a merge rewrite of the symbol.
+        """
+        bars = dedupe_sort(bars)
+        self.symbol_dir(symbol).mkdir(parents=True, exist_ok=True)
+        meta = self.load_meta(symbol)
+        count = int(meta.get("count", 0))
+        generation = int(meta.get("generation", 0))
+        stored = self.read(symbol)
+
+        ts = bars["timestamp"]
+        if count:
+            pos = np.searchsorted(stored["timestamp"], ts)
+            exists = (pos < count) & (stored["timestamp"][np.minimum(pos, count - 1)] == ts)
+            new = ~exists
+            older = new & (ts <= int(meta["last_ts"]))
+        else:
+            new = np.ones(ts.size, dtype=bool)
+            older = np.zeros(ts.size, dtype=bool)
+        added = int(new.sum())
+
+        last_ts = meta.get("last_ts")
+        if older.any():
+            merged = dedupe_sort(concat_bars([{c: bars[c][new] for c in COLUMNS},
+                                              {c: np.array(stored[c]) for c in COLUMNS}]))
+            del stored
+            generation += 1
+            self._write_all(symbol, merged, generation)
+            count = merged["timestamp"].size
+            last_ts = int(merged["timestamp"][-1])
+        elif added:
+            del stored
+            for c in COLUMNS:
+                path = self._column_path(symbol, c, generation)
+                limit = count * DTYPES[c].itemsize
+                # Drop bytes of an interrupted append that meta.json never recorded
+                if path.exists() and path.stat().st_size > limit:
+                    os.truncate(path, limit)
+                with open(path, "ab") as fh:
+                    np.ascontiguousarray(bars[c][new], dtype=DTYPES[c]).tofile(fh)
+            count += added
+            last_ts = int(ts[new][-1])
+
+        if added or sources:
+            meta["last_ts"] = last_ts
+            meta["count"] = count
+            if generation:
+                meta["generation"] = generation
+            meta.setdefault("sources", {}).update(sources or {})
+            self._save_meta(symbol, meta)
+            if older.any():
+                self._drop_other_generations(symbol, generation)
+        return added
+
+    def changed_csv(self, symbol: str, paths: Iterable[Path]) -> Dict[str, List[int]]:
+        """{path: [size, mtime_ns]} of CSV files not yet ingested in their current state."""
+        seen = self.load_meta(symbol).get("sources", {})
+        changed: Dict[str, List[int]] = {}
+        for path in paths:
+            try:
+                st = Path(path).stat()
+            except OSError:
+                continue
+            sig = [st.st_size, st.st_mtime_ns]
+            if seen.get(str(path)) != sig:
+                changed[str(path)] = sig
+        return changed
+
+    def ingest_csv(self, symbol: str, paths: Iterable[Path]) -> int:
+        """Ingest CSV files that changed since they were last ingested; returns bars added."""
+        parts: List[Bars] = []
+        sources: Dict[str, List[int]] = {}
+        for path, sig in self.changed_csv(symbol, paths).items():
+            try:
+                parts.append(read_csv_bars(Path(path)))
+            except (OSError, UnicodeDecodeError) as e:
+                log.error(f"Error reading {Path(path).name}: {e}")
+                continue
+            sources[path] = sig
+        if not parts:
+            return 0
+        return self.append(symbol, concat_bars(parts), sources=sources)
+
+
+def to_records(bars: Bars, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+    """Bars -> JSON-friendly row dicts (ISO UTC timestamps), optionally only the last `limit`."""
+    sl = slice(-limit, None) if limit else slice(None)
+    cols = {c: bars[c][sl].tolist() for c in COLUMNS}
+    return [
+        {
+            "timestamp": datetime.fromtimestamp(ts, tz=timezone.utc).isoformat(),
+            **{c: cols[c][i] for c in PRICE_COLUMNS},
+        }
+        for i, ts in enumerate(cols["timestamp"])
+    ]
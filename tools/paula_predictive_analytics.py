@@ -1,7 +1,13 @@
 #!/usr/bin/env python3
 """
 Paula Predictive Analytics - Calculate market bias, trend confidence, and volatility
+
+Symbols: --symbols A,B / PAULA_SYMBOLS=A,B / --all (every symbol in the OHLC
+store), else PAULA_SYMBOL. With numpy installed, all symbols are evaluated in
+one pass of the vectorized engine (paula_indicators.py); otherwise the
+pure-Python regression below is used per symbol.
 """
+import argparse
 import os
 import sys
 import json
@@ -18,6 +24,19 @@ INTEL_DIR = SOT / "mls" / "paula" / "intel"
 OUT_DIR = INTEL_DIR
 OUT_DIR.mkdir(parents=True, exist_ok=True)
 
+try:
+    from paula_ohlc_store import OHLCStore  # requires numpy
+except ImportError:
+    OHLCStore = None
+
+try:
+    from paula_indicators import compute_indicators  # requires numpy
+except ImportError:
+    compute_indicators = None
+
+WINDOW = 20
+SUGGESTIONS = {0.3: "open 30% size", 0.15: "open 15% size", 0.0: "wait"}
+
 
 def linear_slope(y):
     """
@@ -38,15 +57,22 @@ def linear_slope(y):
     return num / den
 
 
-def main():
-    symbol = os.environ.get("PAULA_SYMBOL", "SET50Z25")
-    
+def load_closes(symbol):
+    """
+    Close prices for symbol: full history from the columnar store (memory-mapped,
+    zero-copy) when available, else the latest crawler JSON snapshot.
+
+    Returns (closes or None if there is no data, data source label).
+    """
+    if OHLCStore is not None:
+        bars = OHLCStore().read(symbol)
+        if bars["close"].size:
+            return bars["close"], f"ohlc_store:{symbol}"
+
     # Find latest crawler file
     files = sorted(INTEL_DIR.glob(f"crawler_{symbol}_*.json"))
     if not files:
-        log.error("NO_CRAWLED_DATA - Run paula_data_crawler.py first")
-        print("NO_CRAWLED_DATA")
-        sys.exit(1)
+        return None, None
     
     # Read crawler data
     try:
@@ -57,17 +83,11 @@ def main():
         sys.exit(1)
     
     # Extract close prices
-    closes = [r.get("close", 0) for r in data.get("ohlc", []) if r.get("close")]
-    
-    if len(closes) < 20:
-        log.warning(f"NOT_ENOUGH_DATA - Only {len(closes)} records, need at least 20")
-        print("NOT_ENOUGH_DATA")
-        sys.exit(1)
-    
-    # Calculate metrics
-    last_close = closes[-1]
-    window = closes[-20:]  # Last 20 bars
-    
+    return [r.get("close", 0) for r in data.get("ohlc", []) if r.get("close")], str(files[-1].name)
+
+
+def window_metrics(window):
+    """Slope/volatility/bias metrics of one window (pure Python)."""
     slope = linear_slope(window)  # Positive → up-bias, negative → down-bias
     vol = pstdev(window) if len(window) > 1 else 0.0
     avg = mean(window)
@@ -84,46 +104,109 @@ def main():
     else:
         bias = "flat"
     
-    # Position suggestion based on confidence
+    # Position size based on confidence
     if conf >= 0.7:
         size = 0.3
-        suggestion = "open 30% size"
     elif conf >= 0.4:
         size = 0.15
-        suggestion = "open 15% size"
     else:
         size = 0.0
-        suggestion = "wait"
     
-    # Generate insight
-    insight = {
+    return {"slope": slope, "vol": vol, "avg": avg, "pct_move": pct_move,
+            "confidence": conf, "bias": bias, "size": size}
+
+
+def build_insight(symbol, metrics, last_close, window_size, data_source):
+    vol, avg = metrics["vol"], metrics["avg"]
+    return {
         "timestamp": datetime.now().astimezone().isoformat(),
         "symbol": symbol,
-        "trend_confidence": round(conf, 2),
-        "predicted_move_pct": round(pct_move, 2),
+        "trend_confidence": round(metrics["confidence"], 2),
+        "predicted_move_pct": round(metrics["pct_move"], 2),
         "volatility_est": round(vol / (avg or 1), 4),
-        "bias": bias,
-        "position_suggestion": suggestion,
+        "bias": metrics["bias"],
+        "position_suggestion": SUGGESTIONS[metrics["size"]],
         "reasons": [
-            f"20-bar slope = {round(slope, 6)}",
+            f"{window_size}-bar slope = {round(metrics['slope'], 6)}",
             f"vol ~ {round(vol, 4)} (normalized)",
             "simple regression (no ML), robust & fast"
         ],
         "last_close": last_close,
-        "window_size": len(window),
-        "data_source": str(files[-1].name)
+        "window_size": window_size,
+        "data_source": data_source
     }
+
+
+def write_insight(symbol, insight):
+    """Write the dated bias files for symbol; returns the primary file path."""
+    day = datetime.now().strftime('%Y%m%d')
+    payload = json.dumps(insight, ensure_ascii=False, indent=2)
     
     # Save bias file with symbol key for multi-symbol support
-    out_file = OUT_DIR / f"paula_bias_{symbol}_{datetime.now().strftime('%Y%m%d')}.json"
-    out_file.write_text(json.dumps(insight, ensure_ascii=False, indent=2))
-    
-    log.info(f"✅ Generated bias: {bias} (confidence: {conf:.2f})")
-    print(str(out_file))
+    out_file = OUT_DIR / f"paula_bias_{symbol}_{day}.json"
+    out_file.write_text(payload)
     
     # Also save to a symbol-keyed file for easy lookup
-    symbol_file = OUT_DIR / f"bias_{symbol}_{datetime.now().strftime('%Y%m%d')}.json"
-    symbol_file.write_text(json.dumps(insight, ensure_ascii=False, indent=2))
+    symbol_file = OUT_DIR / f"bias_{symbol}_{day}.json"
+    symbol_file.write_text(payload)
+    return out_file
+
+
+def resolve_symbols(args):
+    if args.symbols:
+        names = args.symbols.split(",")
+    elif args.all:
+        if OHLCStore is None:
+            log.error("--all needs the OHLC store (numpy not installed)")
+            return []
+        names = OHLCStore().symbols()
+    elif os.environ.get("PAULA_SYMBOLS"):
+        names = os.environ["PAULA_SYMBOLS"].split(",")
+    else:
+        names = [os.environ.get("PAULA_SYMBOL", "SET50Z25")]
+    return list(dict.fromkeys(n.strip() for n in names if n.strip()))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Paula predictive analytics")
+    parser.add_argument("--symbols", help="Comma-separated symbols (overrides PAULA_SYMBOLS / PAULA_SYMBOL)")
+    parser.add_argument("--all", action="store_true", help="Every symbol in the OHLC store")
+    args = parser.parse_args()
+    
+    symbols = resolve_symbols(args)
+    loaded = {}
+    failures = []
+    for symbol in symbols:
+        closes, data_source = load_closes(symbol)
+        if closes is None:
+            log.error(f"NO_CRAWLED_DATA for {symbol} - Run paula_data_crawler.py first")
+            failures.append("NO_CRAWLED_DATA")
+        elif len(closes) < WINDOW:
+            log.warning(f"NOT_ENOUGH_DATA for {symbol} - Only {len(closes)} records, need at least {WINDOW}")
+            failures.append("NOT_ENOUGH_DATA")
+        else:
+            loaded[symbol] = (closes, data_source)
+    
+    if not loaded:
+        print(failures[0] if failures else "NO_SYMBOLS")
+        sys.exit(1)
+    
+    if compute_indicators is not None:
+        # Every window of every symbol in one pass; insights use the latest bar
+        engine = compute_indicators({s: closes for s, (closes, _) in loaded.items()}, WINDOW)
+        metrics_by_symbol = {s: ind.latest() for s, ind in engine.items()}
+    else:
+        metrics_by_symbol = {
+            s: window_metrics([float(c) for c in closes[-WINDOW:]])
+            for s, (closes, _) in loaded.items()
+        }
+    
+    for symbol, (closes, data_source) in loaded.items():
+        metrics = metrics_by_symbol[symbol]
+        insight = build_insight(symbol, metrics, float(closes[-1]), WINDOW, data_source)
+        out_file = write_insight(symbol, insight)
+        log.info(f"✅ {symbol}: generated bias: {metrics['bias']} (confidence: {metrics['confidence']:.2f})")
+        print(str(out_file))
 
 
 if __name__ == "__main__":
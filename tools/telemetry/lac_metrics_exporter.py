@@ -6,11 +6,18 @@ import json
 import math
 import os
 import statistics
+import sys
 from dataclasses import dataclass
 from datetime import datetime, timedelta, timezone
 from pathlib import Path
 from typing import Any, Dict, List, Optional, Tuple
 
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from g.tools.jsonl_tail import read_jsonl  # noqa: E402
+
 DEFAULT_ROOT = Path(os.environ.get("LUKA_SOT") or os.environ.get("LUKA_ROOT") or os.path.expanduser("~/02luka")).resolve()
 
 def _parse_iso(ts: str) -> Optional[datetime]:
@@ -65,29 +72,23 @@ class MetricEvent:
 
 def load_events(metrics_path: Path) -> List[MetricEvent]:
     events: List[MetricEvent] = []
-    with metrics_path.open("r", encoding="utf-8") as f:
-        for line in f:
-            line = line.strip()
-            if not line:
-                continue
-            try:
-                obj = json.loads(line)
-            except Exception:
-                continue
-            ts = _parse_iso(str(obj.get("ts", ""))) or None
-            if ts is None:
-                continue
-            wo_id = str(obj.get("wo_id", "UNKNOWN"))
-            status = str(obj.get("status", "unknown"))
-            try:
-                duration_ms = int(obj.get("duration_ms", 0))
-            except Exception:
-                duration_ms = 0
-            try:
-                queue_depth = int(obj.get("queue_depth", 0))
-            except Exception:
-                queue_depth = 0
-            events.append(MetricEvent(ts=ts, wo_id=wo_id, status=status, duration_ms=duration_ms, queue_depth=queue_depth, raw=obj))
+    for obj in read_jsonl(metrics_path):
+        if not isinstance(obj, dict):
+            continue
+        ts = _parse_iso(str(obj.get("ts", ""))) or None
+        if ts is None:
+            continue
+        wo_id = str(obj.get("wo_id", "UNKNOWN"))
+        status = str(obj.get("status", "unknown"))
+        try:
+            duration_ms = int(obj.get("duration_ms", 0))
+        except Exception:
+            duration_ms = 0
+        try:
+            queue_depth = int(obj.get("queue_depth", 0))
+        except Exception:
+            queue_depth = 0
+        events.append(MetricEvent(ts=ts, wo_id=wo_id, status=status, duration_ms=duration_ms, queue_depth=queue_depth, raw=obj))
     # sort chronological
     events.sort(key=lambda e: e.ts)
     return events
@@ -13,11 +13,18 @@ from __future__ import annotations
 import argparse
 import json
 import os
+import sys
 from dataclasses import dataclass
 from datetime import datetime, timedelta, timezone
 from pathlib import Path
 from typing import Any, Dict, List, Optional, Tuple
 
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from g.tools.jsonl_tail import read_jsonl  # noqa: E402
+
 
 @dataclass
 class MetricsEvent:
@@ -68,18 +75,9 @@ def load_events(path: Path) -> List[MetricsEvent]:
     events: List[MetricsEvent] = []
     if not path.exists():
         return events
-    try:
-        lines = path.read_text(encoding="utf-8").splitlines()
-    except Exception:
-        return events
 
-    for line in lines:
-        line = line.strip()
-        if not line:
-            continue
-        try:
-            payload = json.loads(line)
-        except Exception:
+    for payload in read_jsonl(path):
+        if not isinstance(payload, dict):
             continue
         ts_raw = payload.get("ts")
         ts = parse_ts(str(ts_raw)) if ts_raw else None